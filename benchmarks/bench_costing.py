@@ -0,0 +1,51 @@
+"""Benchmark re-pricing every resource assignment.
+
+Usage::
+
+    python benchmarks/bench_costing.py [activities] [resources]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.model.rsrcrates import ResourceRates
+from xer_parser.reader import Reader
+from xer_parser.scheduling.costing import reprice_assignments
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    resources = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities, resources=resources
+        )
+        reader = Reader(path)
+    print(f"assignments:  {len(reader.activityresources.assignments)}")
+
+    start = time.perf_counter()
+    costs = reprice_assignments(reader)
+    print(f"current:      {time.perf_counter() - start:.2f}s, {len(costs)} re-priced")
+
+    # a 5% rise from mid-2024 for every resource
+    scenario = ResourceRates()
+    for rate in reader.resourcerates.resourcerates:
+        scenario.add(vars(rate))
+        scenario.add(
+            {
+                "rsrc_id": rate.rsrc_id,
+                "cost_per_qty": str(float(rate.cost_per_qty) * 1.05),
+                "start_date": "2024-07-01 00:00",
+            }
+        )
+    start = time.perf_counter()
+    costs = reprice_assignments(reader, resourcerates=scenario)
+    print(f"scenario:     {time.perf_counter() - start:.2f}s, {len(costs)} re-priced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Benchmark the CPM scheduler on a synthetic network.
+
+Usage::
+
+    python benchmarks/bench_cpm.py [activities]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling import CPMScheduler
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities)
+        start = time.perf_counter()
+        reader = Reader(path)
+        parsed = time.perf_counter()
+        cpm = CPMScheduler(reader)
+        indexed = time.perf_counter()
+        cpm.schedule()
+        scheduled = time.perf_counter()
+    print(f"activities:    {cpm.network.node_count}")
+    print(f"relationships: {cpm.network.relation_count}")
+    print(f"parse:         {parsed - start:.2f}s")
+    print(f"index:         {indexed - parsed:.2f}s")
+    print(f"schedule:      {scheduled - indexed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
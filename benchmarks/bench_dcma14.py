@@ -0,0 +1,74 @@
+"""Benchmark the DCMA 14-point checks 1 to 11 on a synthetic programme.
+
+The critical path test, CPLI and risk assessment are left out: they are
+timed by the scheduling benchmarks. The checks are run once for the whole
+programme, then again with per-project and per-WBS counts, and in compact
+mode while streaming the findings; the results of both modes are
+serialised to JSON.
+
+Usage::
+
+    python benchmarks/bench_dcma14.py [activities] [projects]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.dcma14 import DCMA14
+from xer_parser.reader import Reader
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"),
+            activities // projects,
+            projects=projects,
+            resources=activities // 100,
+        )
+        start = time.perf_counter()
+        reader = Reader(path)
+        print(f"parse:     {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    results = DCMA14(reader, schedule=False).analysis()
+    elapsed = time.perf_counter() - start
+    print(f"checks:    {elapsed:.2f}s for {activities} activities")
+    for check in ("successors", "predecessors", "lags", "leads", "totalfloat"):
+        print(f"  {check:<12} {results['analysis'][check]['cnt']}")
+
+    start = time.perf_counter()
+    size = len(json.dumps(results, default=str))
+    print(f"json:      {time.perf_counter() - start:.2f}s, {size / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with open(os.path.join(tmp, "findings.jsonl"), "w") as findings:
+            compact = DCMA14(reader, schedule=False, compact=True).analysis(findings)
+        elapsed = time.perf_counter() - start
+        lines = os.path.getsize(findings.name) / 1e6
+        print(f"compact:   {elapsed:.2f}s with {lines:.1f} MB of findings streamed")
+    start = time.perf_counter()
+    size = len(json.dumps(compact))
+    print(f"json:      {time.perf_counter() - start:.2f}s, {size / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    groups = DCMA14(reader, group_by=["project", "wbs"], schedule=False).analysis()[
+        "groups"
+    ]
+    elapsed = time.perf_counter() - start
+    print(
+        f"grouped:   {elapsed:.2f}s for {len(groups['project'])} projects"
+        f" and {len(groups['wbs'])} WBS nodes"
+    )
+
+
+if __name__ == "__main__":
+    main()
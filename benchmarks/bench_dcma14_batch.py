@@ -0,0 +1,44 @@
+"""Benchmark the batch DCMA runner over many synthetic XER files.
+
+The files are assessed once in the calling process and once over a process
+pool, writing the trend table each time.
+
+Usage::
+
+    python benchmarks/bench_dcma14_batch.py [files] [activities]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.dcma14.batch import run_batch
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    activities = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [
+            write_synthetic_xer(
+                os.path.join(tmp, f"update{n:03d}.xer"),
+                activities,
+                resources=activities // 100,
+                seed=n,
+            )
+            for n in range(files)
+        ]
+        output = os.path.join(tmp, "trend.csv")
+        for workers in (1, None):
+            start = time.perf_counter()
+            rows = run_batch(paths, output, workers=workers)
+            elapsed = time.perf_counter() - start
+            label = "serial" if workers == 1 else f"{os.cpu_count()} workers"
+            print(f"{label:<12} {elapsed:.2f}s for {files} files, {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
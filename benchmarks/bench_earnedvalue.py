@@ -0,0 +1,42 @@
+"""Benchmark earned value totals and S-curves.
+
+Usage::
+
+    python benchmarks/bench_earnedvalue.py [activities] [projects] [resources]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling.earnedvalue import EarnedValue
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    resources = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities, projects, resources
+        )
+        reader = Reader(path)
+    print(f"assignments:  {len(reader.activityresources.assignments)}")
+    for period in ("day", "week", "month"):
+        ev = EarnedValue(reader, period=period)
+        start = time.perf_counter()
+        summary = ev.summary()
+        curves = ev.series()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{period + ':':<13} {elapsed:.2f}s, {len(summary)} WBS nodes, "
+            f"{len(curves['pv'])} periods"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark extracting single projects from a multi-project XER file.
+
+Building the project index is timed once, then every project is extracted
+to its own file, and the time per project is compared with writing the
+whole file.
+
+Usage::
+
+    python benchmarks/bench_extract.py [activities] [projects]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.extract import ProjectIndex, extract_project
+from xer_parser.reader import Reader
+from xer_parser.write import writeXER
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 150_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities // projects, projects, 500
+        )
+        reader = Reader(path)
+
+        start = time.perf_counter()
+        index = ProjectIndex(reader)
+        indexed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for project in reader.projects.projects:
+            output = os.path.join(tmp, f"{project.proj_id}.xer")
+            extract_project(reader, project.proj_id, output, index)
+        extracted = (time.perf_counter() - start) / projects
+        size = os.path.getsize(output) / 2**20
+
+        start = time.perf_counter()
+        writeXER(reader, os.path.join(tmp, "full.xer"))
+        full = time.perf_counter() - start
+
+    print(f"activities:     {len(reader.activities.activities)}, {projects} projects")
+    print(f"index:          {indexed * 1000:.0f} ms")
+    print(f"per project:    {extracted * 1000:.0f} ms, {size:.1f} MB")
+    print(f"whole file:     {full * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
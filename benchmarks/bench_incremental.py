@@ -0,0 +1,69 @@
+"""Benchmark incremental re-scheduling after single what-if edits.
+
+Usage::
+
+    python benchmarks/bench_incremental.py [activities] [edits]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling import IncrementalScheduler
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities)
+        reader = Reader(path)
+    cpm = IncrementalScheduler(reader)
+    start = time.perf_counter()
+    cpm.schedule()
+    full = time.perf_counter() - start
+
+    rng = random.Random(0)
+    net = cpm.network
+    order = net.topological_order()
+    timings = {"duration": [], "relationship": []}
+    moved = []
+    full_backward = 0
+    for n in range(edits):
+        node = rng.randrange(net.node_count)
+        if n % 2 == 0:
+            kind = "duration"
+            slack = (cpm.total_float[node] or 0) // 60
+            cpm.set_duration(net.task_ids[node], cpm.dur[node] / 60 + min(slack, 8))
+        else:
+            kind = "relationship"
+            a, b = sorted(rng.sample(range(len(order)), 2))
+            cpm.add_relationship(net.task_ids[order[a]], net.task_ids[order[b]])
+        finish = dict(cpm.project_finish)
+        start = time.perf_counter()
+        moved.append(len(cpm.reschedule()))
+        timings[kind].append((time.perf_counter() - start) * 1000)
+        if cpm.project_finish != finish:
+            full_backward += 1
+
+    print(f"activities:         {net.node_count}")
+    print(f"relationships:      {net.relation_count}")
+    print(f"full schedule:      {full * 1000:.0f} ms")
+    for kind, values in timings.items():
+        values.sort()
+        print(
+            f"{kind + ' edit:':<20}median {statistics.median(values):.2f} ms, "
+            f"p95 {values[int(len(values) * 0.95)]:.2f} ms"
+        )
+    print(f"affected per edit:  median {statistics.median(moved):.0f}")
+    print(f"finish moved:       {full_backward} of {edits} edits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark resource leveling.
+
+Every resource has a limit of one unit per hour; assignments need half a
+unit, one unit or two units per hour, so some activities queue for their
+resource and the double-rate ones can only be placed with over-allocation
+allowed.
+
+Usage::
+
+    python benchmarks/bench_leveling.py [activities] [resources]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.model.classes.schedoption import SchedOption
+from xer_parser.reader import Reader
+from xer_parser.scheduling.cpm import CPMScheduler
+from xer_parser.scheduling.leveling import ResourceLeveler
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    resources = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities, resources=resources
+        )
+        reader = Reader(path)
+    print(f"assignments:  {len(reader.activityresources.assignments)}")
+
+    start = time.perf_counter()
+    CPMScheduler(reader).schedule()
+    print(f"cpm:          {time.perf_counter() - start:.2f}s")
+    for pct in ("0", "100"):
+        options = SchedOption({"level_all_rsrc_flag": "Y", "level_over_alloc_pct": pct})
+        leveler = ResourceLeveler(reader, options=options)
+        start = time.perf_counter()
+        dates = leveler.level()
+        elapsed = time.perf_counter() - start
+        delayed = sum(1 for x in dates.values() if x["delay_hr_cnt"] > 0)
+        print(
+            f"level {pct + '%:':<6} {elapsed:.2f}s, {delayed} delayed, "
+            f"{len(leveler.overallocated)} not leveled"
+        )
+
+
+if __name__ == "__main__":
+    main()
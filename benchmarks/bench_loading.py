@@ -0,0 +1,45 @@
+"""Benchmark time-phased resource histograms.
+
+The synthetic file has one assignment per activity; the assignment list is
+repeated ``copies`` times to stand for activities with several resources.
+
+Usage::
+
+    python benchmarks/bench_loading.py [activities] [copies] [resources]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling.loading import ResourceLoading
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    resources = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities, resources=resources
+        )
+        reader = Reader(path)
+    assignments = reader.activityresources.assignments * copies
+    print(f"assignments:  {len(assignments)}")
+    for period in ("day", "week", "month"):
+        loading = ResourceLoading(reader)
+        start = time.perf_counter()
+        histogram = loading.histogram(
+            quantity="target", period=period, assignments=assignments
+        )
+        elapsed = time.perf_counter() - start
+        buckets = sum(len(x) for x in histogram.values())
+        print(f"{period + ':':<13} {elapsed:.2f}s, {buckets} resource periods")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark circular logic detection on a synthetic network.
+
+A number of backward relationships are added to the synthetic schedule so
+that it contains loops.
+
+Usage::
+
+    python benchmarks/bench_loops.py [activities] [loops]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling.loops import find_loops
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 250_000
+    loops = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities)
+        reader = Reader(path)
+
+    start = time.perf_counter()
+    acyclic = find_loops(reader)
+    clean = time.perf_counter() - start
+
+    rng = random.Random(0)
+    tasks = reader.activities.activities
+    for n in range(loops):
+        i = rng.randrange(len(tasks) - 100)
+        reader.relations.add(
+            {
+                "task_pred_id": str(10**9 + n),
+                "pred_task_id": str(tasks[i + 50].task_id),
+                "task_id": str(tasks[i].task_id),
+                "pred_type": "PR_FS",
+                "lag_hr_cnt": "0",
+            }
+        )
+    start = time.perf_counter()
+    found = find_loops(reader)
+    looped = time.perf_counter() - start
+
+    print(f"activities:     {len(tasks)}")
+    print(f"relationships:  {len(reader.relations.relations)}")
+    print(f"acyclic:        {clean * 1000:.0f} ms, {len(acyclic)} loops")
+    print(
+        f"with loops:     {looped * 1000:.0f} ms, {len(found)} loops "
+        f"over {sum(len(x['activities']) for x in found)} activities"
+    )
+
+
+if __name__ == "__main__":
+    main()
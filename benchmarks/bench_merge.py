@@ -0,0 +1,54 @@
+"""Benchmark merging several synthetic XER files into one.
+
+Every file has the same IDs, so every project record is renumbered and the
+resources and calendars are shared. The merge is timed, and its peak memory
+allocated is measured in a second, traced run.
+
+Usage::
+
+    python benchmarks/bench_merge.py [activities per file] [files]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.merge import merge_xer
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = [
+            write_synthetic_xer(
+                os.path.join(tmp, f"{i}.xer"), activities, 1, 500, seed=i
+            )
+            for i in range(files)
+        ]
+        size = sum(os.path.getsize(x) for x in sources) / 2**20
+        output = os.path.join(tmp, "merged.xer")
+
+        start = time.perf_counter()
+        merger = merge_xer(sources, output)
+        elapsed = time.perf_counter() - start
+        # traced separately, tracing slows the merge down
+        tracemalloc.start()
+        merge_xer(sources, output)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        with open(output, "rb") as merged:
+            rows = sum(1 for _ in merged)
+
+    print(f"files:          {files} x {activities} activities, {size:.1f} MB")
+    print(f"merged:         {rows} rows, tables {', '.join(merger.order)}")
+    print(f"time:           {elapsed:.2f} s, {size / elapsed:.1f} MB/s")
+    print(f"peak memory:    {peak:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark the schedule-check rule engine on a synthetic programme.
+
+Every registered rule runs over one snapshot; the time spent on each shared
+index and each rule is printed.
+
+Usage::
+
+    python benchmarks/bench_rules.py [activities] [workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.dcma14.rules import RuleEngine
+from xer_parser.reader import Reader
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities, resources=activities // 100
+        )
+        start = time.perf_counter()
+        reader = Reader(path)
+        print(f"parse:     {time.perf_counter() - start:.2f}s")
+
+    engine = RuleEngine(reader)
+    start = time.perf_counter()
+    results = engine.run(workers)
+    print(f"rules:     {time.perf_counter() - start:.2f}s for {len(results)} rules")
+    for name, seconds in engine.timings["indexes"].items():
+        print(f"  index {name:<22} {seconds:.3f}s")
+    for name, result in results.items():
+        print(f"  rule  {name:<22} {result['seconds']:.3f}s  {result['cnt']}")
+
+
+if __name__ == "__main__":
+    main()
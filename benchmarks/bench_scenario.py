@@ -0,0 +1,54 @@
+"""Benchmark scheduling what-if scenarios over one parsed baseline.
+
+Each scenario lengthens a few activities and drops a relationship, then is
+scheduled; the baseline is parsed once and never copied.
+
+Usage::
+
+    python benchmarks/bench_scenario.py [activities] [scenarios]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scenario import Scenario
+from xer_parser.scheduling import CPMScheduler
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities)
+        start = time.perf_counter()
+        reader = Reader(path)
+        print(f"parse:        {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(0)
+    task_ids = [x.task_id for x in reader.activities.activities]
+    relation_ids = [x.task_pred_id for x in reader.relations.relations]
+    start = time.perf_counter()
+    CPMScheduler(reader).schedule()
+    print(f"baseline:     {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    scenarios = []
+    for n in range(count):
+        scenario = Scenario(reader, f"S{n}")
+        for task_id in rng.sample(task_ids, 10):
+            scenario.set_duration(task_id, 8 * rng.randint(5, 20))
+        scenario.remove_relation(rng.choice(relation_ids))
+        CPMScheduler(scenario).schedule()
+        scenarios.append(scenario)
+    elapsed = time.perf_counter() - start
+    changed = sum(len(x.changes["activities"]["updated"]) for x in scenarios)
+    print(f"scenarios:    {elapsed / count:.2f}s each, {changed} activities changed")
+
+
+if __name__ == "__main__":
+    main()
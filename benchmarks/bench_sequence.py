@@ -0,0 +1,56 @@
+"""Benchmark out-of-sequence detection on a synthetic update.
+
+The synthetic schedule has no progress, so the first activities in
+``task_id`` order are given actual dates, with a share of them started
+before their predecessors allow.
+
+Usage::
+
+    python benchmarks/bench_sequence.py [activities] [progressed]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.scheduling.sequence import find_out_of_sequence
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    progressed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities)
+        reader = Reader(path)
+
+    rng = random.Random(0)
+    tasks = reader.activities.activities
+    origin = datetime(2024, 1, 1, 8)
+    for n, task in enumerate(tasks[: int(len(tasks) * progressed)]):
+        # mostly in sequence, some started a day early or before a predecessor
+        start = origin + timedelta(hours=n - (24 if rng.random() < 0.05 else 0))
+        task.act_start_date = start
+        if rng.random() < 0.9:
+            task.act_end_date = start + timedelta(hours=8)
+
+    start = time.perf_counter()
+    found = find_out_of_sequence(reader)
+    elapsed = time.perf_counter() - start
+
+    print(f"activities:     {len(tasks)}")
+    print(f"relationships:  {len(reader.relations.relations)}")
+    print(f"detection:      {elapsed * 1000:.0f} ms")
+    kinds = Counter((x["pred_type"], x["violation"]) for x in found)
+    for (kind, violation), cnt in sorted(kinds.items()):
+        print(f"  {kind} {violation:<6} {cnt}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark writing an XER file back from a synthetic programme.
+
+The streamed writer is compared with writing the complete ``get_tsv``
+tables through ``csv.writer``, for time and peak memory allocated while
+writing (measured in a second, traced run), and the write throughput of the
+streamed writer, whose dates, numbers and flags are formatted as P6 writes
+them, is reported in rows and megabytes per second.
+
+Usage::
+
+    python benchmarks/bench_write.py [activities] [projects]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.write import _HEADER, XER_TABLES, writeXER
+
+
+def write_tables(reader: Reader, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output, delimiter="\t")
+        writer.writerow(_HEADER)
+        for _, name, _ in XER_TABLES:
+            writer.writerows(getattr(reader, name).get_tsv())
+        writer.writerow(["%E"])
+
+
+def measure(write, reader: Reader, path: str) -> tuple[float, float]:
+    start = time.perf_counter()
+    write(reader, path)
+    elapsed = time.perf_counter() - start
+    # traced separately, tracing slows the write down
+    tracemalloc.start()
+    write(reader, path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(
+            os.path.join(tmp, "bench.xer"), activities // projects, projects, 500
+        )
+        reader = Reader(path)
+        tables = os.path.join(tmp, "tables.xer")
+        streamed = os.path.join(tmp, "streamed.xer")
+        table_time, table_peak = measure(write_tables, reader, tables)
+        stream_time, stream_peak = measure(writeXER, reader, streamed)
+        size = os.path.getsize(streamed) / 2**20
+        with open(streamed, "rb") as output:
+            rows = sum(1 for _ in output)
+
+    print(f"activities:     {len(reader.activities.activities)}")
+    print(f"file:           {size:.1f} MB, {rows} rows")
+    print(f"get_tsv tables: {table_time:.2f} s, peak {table_peak:.1f} MB")
+    print(f"streamed:       {stream_time:.2f} s, peak {stream_peak:.1f} MB")
+    print(
+        f"throughput:     {rows / stream_time:,.0f} rows/s, "
+        f"{size / stream_time:.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark writing back a few changed activities of a large XER file.
+
+The file is read with ``track_changes``, a number of activities are changed,
+and writing the update (copying the unchanged rows) is compared with
+formatting every record.
+
+Usage::
+
+    python benchmarks/bench_write_changes.py [activities] [changed]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from synthetic import write_synthetic_xer
+
+from xer_parser.reader import Reader
+from xer_parser.write import iter_rows, write_rows, writeXER
+
+
+def main() -> None:
+    activities = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    changed = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_xer(os.path.join(tmp, "bench.xer"), activities, 1, 500)
+        reader = Reader(path, track_changes=True)
+        tasks = reader.activities.activities
+        for task in random.Random(0).sample(tasks, changed):
+            task.remain_drtn_hr_cnt = 0.0
+            task.task_name = f"{task.task_name} (updated)"
+
+        output = os.path.join(tmp, "update.xer")
+        start = time.perf_counter()
+        writeXER(reader, output)
+        tracked = time.perf_counter() - start
+        size = os.path.getsize(output) / 2**20
+
+        start = time.perf_counter()
+        with open(os.path.join(tmp, "full.xer"), "wb", buffering=1 << 20) as stream:
+            write_rows(stream, iter_rows(reader))
+        full = time.perf_counter() - start
+
+    print(f"activities:     {len(tasks)}, {changed} changed")
+    print(f"file:           {size:.1f} MB")
+    print(f"changes only:   {tracked * 1000:.0f} ms")
+    print(f"every record:   {full * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Synthetic XER files for the benchmarks.
+
+The generated schedules are random but reproducible: every activity gets one
+to three predecessors among the activities just before it, so the network is
+a long, connected DAG similar in shape to a real construction programme.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+DATA_DATE = datetime(2024, 1, 1, 8, 0)
+_FORMAT = "%Y-%m-%d %H:%M"
+
+STANDARD_CALENDAR = (
+    "(0||CalendarData()((0||DaysOfWeek()((0||1()())"
+    + "".join(
+        f"(0||{day}()((0||0(s|08:00|f|12:00)())(0||1(s|13:00|f|17:00)())))"
+        for day in range(2, 7)
+    )
+    + "(0||7()())))(0||VIEW(ShowTotal|Y)())(0||Exceptions()("
+    "(0||0(d|45292)())(0||1(d|45407)())(0||2(d|45651)()))))"
+)
+
+_WBS_FIELDS = [
+    "wbs_id", "proj_id", "obs_id", "seq_num", "est_wt", "proj_node_flag",
+    "sum_data_flag", "status_code", "wbs_short_name", "wbs_name", "phase_id",
+    "parent_wbs_id", "ev_user_pct", "ev_etc_user_value", "orig_cost",
+    "indep_remain_total_cost", "ann_dscnt_rate_pct", "dscnt_period_type",
+    "indep_remain_work_qty", "anticip_start_date", "anticip_end_date",
+    "ev_compute_type", "ev_etc_compute_type", "guid", "tmpl_guid",
+    "plan_open_state",
+]  # fmt: skip
+
+
+def _table(name, fields, rows):
+    yield f"%T\t{name}"
+    yield "%F\t" + "\t".join(fields)
+    for row in rows:
+        yield "%R\t" + "\t".join("" if x is None else str(x) for x in row)
+
+
+def synthetic_lines(activities, projects=1, resources=0, seed=0):
+    """
+    Generate the lines of a synthetic XER file.
+
+    Parameters
+    ----------
+    activities : int
+        Number of activities per project
+    projects : int
+        Number of projects
+    resources : int
+        Number of resources; every activity gets one assignment when non-zero
+    seed : int
+        Random seed
+
+    Yields
+    ------
+    str
+        The lines of the file, without line terminators
+    """
+    rng = random.Random(seed)
+    yield "ERMHDR\t8.0\t2024-01-01\tProject\tadmin\tbench\tdbxDatabaseNoName\tProject Management\tUSD"
+    yield from _table(
+        "PROJECT",
+        [
+            "proj_id",
+            "proj_short_name",
+            "clndr_id",
+            "last_recalc_date",
+            "plan_start_date",
+        ],
+        [
+            (p, f"PRJ{p}", 1, DATA_DATE.strftime(_FORMAT), DATA_DATE.strftime(_FORMAT))
+            for p in range(1, projects + 1)
+        ],
+    )
+    yield from _table(
+        "CALENDAR",
+        ["clndr_id", "default_flag", "clndr_name", "clndr_type", "day_hr_cnt",
+         "week_hr_cnt", "clndr_data"],
+        [(1, "Y", "Standard 5 Day", "CA_Base", 8, 40, STANDARD_CALENDAR)],
+    )  # fmt: skip
+    wbs_rows = []
+    for p in range(1, projects + 1):
+        row = dict.fromkeys(_WBS_FIELDS, "")
+        row.update(wbs_id=p, proj_id=p, wbs_short_name=f"W{p}", wbs_name=f"WBS {p}")
+        wbs_rows.append([row[x] for x in _WBS_FIELDS])
+    yield from _table("PROJWBS", _WBS_FIELDS, wbs_rows)
+    if resources:
+        yield from _table(
+            "RSRC",
+            ["rsrc_id", "parent_rsrc_id", "clndr_id", "rsrc_name", "rsrc_short_name",
+             "rsrc_type"],
+            [
+                (r, (r - 1) // 10 if r > 10 else None, 1, f"Resource {r}", f"R{r}",
+                 "RT_Labor")
+                for r in range(1, resources + 1)
+            ],
+        )  # fmt: skip
+        yield from _table(
+            "RSRCRATE",
+            ["rsrc_rate_id", "rsrc_id", "max_qty_per_hr", "cost_per_qty", "start_date"],
+            [
+                (r, r, 1, 50 + r % 25, "2020-01-01 00:00")
+                for r in range(1, resources + 1)
+            ],
+        )
+
+    tasks, preds, assignments = [], [], []
+    for p in range(1, projects + 1):
+        base = (p - 1) * activities
+        for i in range(activities):
+            task_id = base + i + 1
+            hours = 8 * rng.randint(1, 10) if i not in (0, activities - 1) else 0
+            start = DATA_DATE + timedelta(days=i // 5)
+            kind = (
+                "TT_Mile"
+                if i == 0
+                else "TT_FinMile"
+                if i == activities - 1
+                else "TT_Task"
+            )
+            tasks.append(
+                (
+                    task_id, p, p, 1, f"A{task_id}", f"Activity {task_id}", kind,
+                    "TK_NotStart", "DT_FixedDrtn", hours, hours,
+                    8 * rng.randint(-2, 40), start.strftime(_FORMAT),
+                    (start + timedelta(hours=hours)).strftime(_FORMAT),
+                    start.strftime(_FORMAT),
+                    (start + timedelta(hours=hours)).strftime(_FORMAT),
+                )
+            )  # fmt: skip
+            if i:
+                for pred in {
+                    rng.randint(max(0, i - 20), i - 1) for _ in range(rng.randint(1, 3))
+                }:
+                    kind = rng.choices(
+                        ["PR_FS", "PR_SS", "PR_FF", "PR_SF"], [85, 8, 6, 1]
+                    )[0]
+                    lag = rng.choice([0, 0, 0, 0, 8, 16, -8])
+                    preds.append(
+                        (len(preds) + 1, task_id, base + pred + 1, p, p, kind, lag)
+                    )
+            if resources:
+                qty = hours * rng.choice([0.5, 1, 2])
+                assignments.append(
+                    (len(assignments) + 1, task_id, p, rng.randint(1, resources), qty,
+                     qty, qty / hours if hours else 0, qty * 60, 0, 0, tasks[-1][12],
+                     tasks[-1][13])
+                )  # fmt: skip
+    yield from _table(
+        "TASK",
+        ["task_id", "proj_id", "wbs_id", "clndr_id", "task_code", "task_name",
+         "task_type", "status_code", "duration_type", "target_drtn_hr_cnt",
+         "remain_drtn_hr_cnt", "total_float_hr_cnt", "target_start_date",
+         "target_end_date", "early_start_date", "early_end_date"],
+        tasks,
+    )  # fmt: skip
+    yield from _table(
+        "TASKPRED",
+        ["task_pred_id", "task_id", "pred_task_id", "proj_id", "pred_proj_id",
+         "pred_type", "lag_hr_cnt"],
+        preds,
+    )  # fmt: skip
+    if resources:
+        yield from _table(
+            "TASKRSRC",
+            ["taskrsrc_id", "task_id", "proj_id", "rsrc_id", "target_qty", "remain_qty",
+             "remain_qty_per_hr", "target_cost", "act_reg_qty", "act_reg_cost",
+             "target_start_date", "target_end_date"],
+            assignments,
+        )  # fmt: skip
+    yield "%E"
+
+
+def write_synthetic_xer(path, activities, projects=1, resources=0, seed=0):
+    """
+    Write a synthetic XER file.
+
+    Parameters
+    ----------
+    path : str
+        Output file path
+    activities : int
+        Number of activities per project
+    projects : int
+        Number of projects
+    resources : int
+        Number of resources
+    seed : int
+        Random seed
+
+    Returns
+    -------
+    str
+        The output file path
+    """
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        for line in synthetic_lines(activities, projects, resources, seed):
+            output.write(line + "\r\n")
+    return path
@@ -1,6 +1,5 @@
 from xer_parser.dcma14.analysis import DCMA14
+from xer_parser.dcma14.batch import assess_file, iter_batch, run_batch
+from xer_parser.dcma14.rules import RuleEngine, rule
 
-# Auto-build __all__
-__all__ = []
-for module in [DCMA14]:
-    __all__.extend(module.__all__)
+__all__ = ["DCMA14", "RuleEngine", "assess_file", "iter_batch", "rule", "run_batch"]
@@ -1,11 +1,20 @@
 """Module for performing DCMA 14-point schedule assessments.
 
-This module implements the Defense Contract Management Agency (DCMA) 14-point schedule assessment, which evaluates the quality and reliability of project schedules.
+This module implements the Defense Contract Management Agency (DCMA)
+14-point schedule assessment, which evaluates the quality and reliability
+of project schedules.
 """
 
+import json
 import logging
+from collections.abc import Sequence
 from datetime import datetime
-from typing import Any
+from typing import IO, Any
+
+from xer_parser.model.classes.p6codes import ActivityType, ConstraintType
+from xer_parser.scheduling.incremental import IncrementalScheduler
+from xer_parser.scheduling.montecarlo import MonteCarlo
+from xer_parser.scheduling.paths import PathTracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,15 +24,63 @@ __all__ = [
     "DCMA14",
 ]
 
+_MILESTONES = (ActivityType.StartMilestone, ActivityType.FinishMilestone)
+# Constraints counted by check 5: must start/finish on, start/finish no later than
+_HARD_CONSTRAINTS = (
+    ConstraintType.MandatoryStart,
+    ConstraintType.MandatoryFinish,
+    ConstraintType.StartOnOrBefore,
+    ConstraintType.FinishOnOrBefore,
+)
+_RELATION_TYPES = ("PR_FS", "PR_SS", "PR_FF", "PR_SF")
+# Counters kept per group: the group's activities and relationships, then
+# the checks; lags, leads and FS relationships are shares of relationships
+_GROUP_COUNTERS = (
+    "activity_cnt",
+    "relationship_cnt",
+    "successors",
+    "predecessors",
+    "lags",
+    "leads",
+    "relations",
+    "constraints",
+    "totalfloat",
+    "negativefloat",
+    "duration",
+    "invaliddates",
+    "resources",
+    "slippage",
+)
+_RELATION_COUNTERS = ("lags", "leads", "relations")
+# Check (and date) of the activity findings, in the order of the lists a task
+# can be flagged in during the activity sweep
+_ACTIVITY_FINDINGS = (
+    ("successors", None),
+    ("predecessors", None),
+    ("constraints", None),
+    ("totalfloat", None),
+    ("negativefloat", None),
+    ("duration", None),
+    ("invaliddates", "actual_start"),
+    ("invaliddates", "actual_finish"),
+    ("invaliddates", "early_start"),
+    ("invaliddates", "early_finish"),
+    ("resources", None),
+    ("slippage", "actual_finish"),
+    ("slippage", "early_finish"),
+)
+
 
 class DCMA14:
     """
-    Implementation of the Defense Contract Management Agency (DCMA) 14-point schedule assessment.
+    Implementation of the Defense Contract Management Agency (DCMA)
+    14-point schedule assessment.
 
-    This class analyzes a project schedule against the DCMA 14-point assessment criteria,
-    which are industry-standard metrics for evaluating schedule quality and reliability.
-    The assessment checks various aspects like missing logic, constraints,
-    high float, resource assignments, and more.
+    This class analyzes a project schedule against the DCMA 14-point
+    assessment criteria, which are industry-standard metrics for evaluating
+    schedule quality and reliability. The assessment checks various aspects
+    like missing logic, constraints, high float, resource assignments, and
+    more.
 
     Parameters
     ----------
@@ -36,6 +93,25 @@ class DCMA14:
         Maximum acceptable lag in days, default is 0
     tf_limit : int, optional
         Maximum acceptable total float in days, default is 0
+    risk_iterations : int, optional
+        Monte Carlo iterations of the schedule risk assessment run by
+        ``analysis``, default is 0 (not run)
+    data_date : str or datetime, optional
+        Data date of the projects without a ``last_recalc_date``; the date
+        checks are skipped for such projects if not given
+    group_by : str, int or sequence, optional
+        Groupings of the per-group counts computed by ``analysis``:
+        ``"project"``, ``"wbs"`` (every WBS node counts the activities of
+        its branch) or an activity code type, by ``actv_code_type_id`` or
+        name (grouped by code value)
+    schedule : bool, optional
+        Run the checks that schedule the programme (critical path test,
+        CPLI, longest path and risk assessment) in ``analysis``, default is
+        False; scheduling costs a CPM pass over the whole programme
+    compact : bool, optional
+        Report flagged activities and relationships by ID in ``analysis``,
+        with one shared table of activity codes and names, instead of
+        describing every activity in every list; default is False
 
     Attributes
     ----------
@@ -48,6 +124,16 @@ class DCMA14:
         Maximum acceptable lag in days
     tf_limit : int
         Maximum acceptable total float in days
+    risk_iterations : int
+        Monte Carlo iterations of the schedule risk assessment
+    data_date : datetime or None
+        Data date of the projects without a ``last_recalc_date``
+    group_by : list
+        Groupings of the per-group counts
+    schedule : bool
+        Whether ``analysis`` runs the checks that schedule the programme
+    compact : bool
+        Whether ``analysis`` reports flagged records by ID
     results : Dict[str, Any]
         Dictionary containing the analysis results
 
@@ -87,6 +173,11 @@ class DCMA14:
         duration_limit: int = 1,
         lag_limit: int = 0,
         tf_limit: int = 0,
+        risk_iterations: int = 0,
+        data_date: str | datetime | None = None,
+        group_by: str | int | Sequence[str | int] | None = None,
+        schedule: bool = False,
+        compact: bool = False,
     ) -> None:
         """
         Initialize a DCMA14 analysis object.
@@ -102,21 +193,60 @@ class DCMA14:
             Maximum acceptable lag in days, default is 0
         tf_limit : int, optional
             Maximum acceptable total float in days, default is 0
+        risk_iterations : int, optional
+            Monte Carlo iterations of the schedule risk assessment run by
+            ``analysis``, default is 0 (not run)
+        data_date : str or datetime, optional
+            Data date of the projects without a ``last_recalc_date``
+        group_by : str, int or sequence, optional
+            ``"project"``, ``"wbs"`` and/or activity code types to count the
+            checks per group for
+        schedule : bool, optional
+            Run the checks that schedule the programme in ``analysis``,
+            default is False
+        compact : bool, optional
+            Report flagged records by ID, default is False
         """
         self.count = 0
         self.programme = programme
         self.dur_limit = duration_limit
         self.lag_limit = lag_limit
         self.tf_limit = tf_limit
+        self.risk_iterations = risk_iterations
+        if isinstance(data_date, str):
+            data_date = datetime.strptime(data_date, "%Y-%m-%d %H:%M")
+        self.data_date = data_date
+        if group_by is None:
+            group_by = []
+        elif isinstance(group_by, str | int):
+            group_by = [group_by]
+        self.group_by = list(group_by)
+        self.schedule = schedule
+        self.compact = compact
         self.results: dict[str, Any] = {}
         self.results["analysis"] = {}
+        self._scheduler: IncrementalScheduler | None = None
+        self._described: dict[Any, dict[str, Any]] = {}
+        self._names: dict[Any, tuple[Any, Any]] = {}
 
-    def analysis(self) -> dict[str, Any]:
+    def analysis(self, findings: IO[str] | None = None) -> dict[str, Any]:
         """
         Perform the DCMA 14-point schedule assessment analysis.
 
         This method runs all the checks defined in the DCMA 14-point assessment
-        and compiles the results into a structured dictionary.
+        and compiles the results into a structured dictionary. Checks 1 to 11
+        are accumulated in one sweep over the relationships and one sweep over
+        the activities, so the assessment is linear in the size of the
+        programme. With ``group_by``, the counts of every group are
+        accumulated in the same sweeps and returned under ``groups``.
+
+        Parameters
+        ----------
+
+        findings : IO[str], optional
+            Text stream the findings of checks 1 to 11 are written to as JSON
+            Lines while sweeping, one line per flagged activity or
+            relationship and check
 
         Returns
         -------
@@ -130,332 +260,504 @@ class DCMA14:
 
         The returned dictionary includes counts and percentages for each metric,
         as well as lists of problematic activities where applicable.
+        ``groups`` holds, for every grouping, the ``summary`` and the ``cnt``
+        and ``pct`` of checks 1 to 11 keyed by project ID, WBS ID or code
+        value (None for activities without a value).
+
+        With ``compact``, the lists of activities are replaced by ``ids``
+        (``task_id``), relationships by parallel ``ids`` (``task_pred_id``),
+        ``predecessors``, ``successors``, ``types`` and ``lags`` arrays, and
+        ``activities`` maps the ``task_id`` of every activity referred to
+        to its ``task_code`` and ``task_name``.
+
+        A finding is ``{"check", "task_id", "task_code", "task_name"}`` for
+        an activity, with the ``date`` field checked for invalid dates and
+        slippage, or ``{"check", "task_pred_id", "pred_task_id", "task_id",
+        "pred_type", "lag_hr_cnt"}`` for a relationship.
         """
-        self.activity_count = len(self.programme.activities)
-        self.relation_count = len(self.programme.relations)
-        self.results["analysis"]["summary"] = {
+        activities = self.programme.activities.activities
+        relations = self.programme.relations.relations
+        self._described = {}
+        self._names = {}
+        self.activity_count = len(activities)
+        self.relation_count = len(relations)
+        analysis = self.results["analysis"]
+        analysis["summary"] = {
             "activity_cnt": self.activity_count,
             "relationship_cnt": self.relation_count,
         }
+
+        # relationship sweep: logic (1), lags (2), leads (3) and types (4)
+        with_predecessors, with_successors = set(), set()
+        self.lags, self.leads, self.fsRel = [], [], []
+        types = dict.fromkeys(_RELATION_TYPES, 0)
+        lag_limit = self.lag_limit * 8.0
+        groupings = self._groupings()
+        # relationship counts per successor, added to its groups below
+        tallies: dict[Any, list[int]] = {}
+
+        def emit(check: str, relation: Any) -> None:
+            findings.write(
+                json.dumps(
+                    {
+                        "check": check,
+                        "task_pred_id": relation.task_pred_id,
+                        "pred_task_id": relation.pred_task_id,
+                        "task_id": relation.task_id,
+                        "pred_type": relation.pred_type,
+                        "lag_hr_cnt": relation.lag_hr_cnt,
+                    }
+                )
+                + "\n"
+            )
+
+        for relation in relations:
+            with_predecessors.add(relation.task_id)
+            with_successors.add(relation.pred_task_id)
+            if groupings:
+                tally = tallies.get(relation.task_id)
+                if tally is None:
+                    tally = tallies[relation.task_id] = [0, 0, 0, 0]
+                tally[0] += 1
+            lag = relation.lag_hr_cnt
+            if lag:
+                if lag > lag_limit:
+                    self.lags.append(relation)
+                    if groupings:
+                        tally[1] += 1
+                    if findings is not None:
+                        emit("lags", relation)
+                if lag < 0:
+                    self.leads.append(relation)
+                    if groupings:
+                        tally[2] += 1
+                    if findings is not None:
+                        emit("leads", relation)
+            kind = relation.pred_type
+            types[kind] = types.get(kind, 0) + 1
+            if kind == "PR_FS":
+                self.fsRel.append(relation)
+                if groupings:
+                    tally[3] += 1
+
+        # activity sweep: logic (1), constraints (5), float (6, 7),
+        # durations (8), invalid dates (9), resources (10) and slippage (11)
+        resourced = self._resourced()
+        data_dates = self._data_dates()
+        tf_limit = self.tf_limit * 8.0
+        self.no_successors, self.no_predecessors = [], []
+        self.constraints, self.totalfloat, self.negativefloat = [], [], []
+        self.duration = []
+        self.invalidactualstart, self.invalidactualfinish = [], []
+        self.invalidearlystart, self.invalidearlyfinish = [], []
+        self.no_resources = []
+        self.actualendslippage, self.earlyendslippage = [], []
+        # lists a task may have just been appended to, in _GROUP_COUNTERS order
+        tracked = (
+            self.no_successors,
+            self.no_predecessors,
+            self.constraints,
+            self.totalfloat,
+            self.negativefloat,
+            self.duration,
+            self.invalidactualstart,
+            self.invalidactualfinish,
+            self.invalidearlystart,
+            self.invalidearlyfinish,
+            self.no_resources,
+            self.actualendslippage,
+            self.earlyendslippage,
+        )
+        no_tally = [0, 0, 0, 0]
+        for task in activities:
+            task_id = task.task_id
+            if task_id not in with_successors:
+                self.no_successors.append(task)
+            if task_id not in with_predecessors:
+                self.no_predecessors.append(task)
+            if (
+                task.cstr_type in _HARD_CONSTRAINTS
+                or task.cstr_type2 in _HARD_CONSTRAINTS
+            ):
+                self.constraints.append(task)
+            total_float = task.total_float_hr_cnt
+            if total_float:
+                if total_float > tf_limit:
+                    self.totalfloat.append(task)
+                if total_float < 0:
+                    self.negativefloat.append(task)
+            if task.duration > self.dur_limit:
+                self.duration.append(task)
+            data_date = data_dates.get(str(task.proj_id))
+            if data_date is not None:
+                if task.act_start_date is not None and task.act_start_date > data_date:
+                    self.invalidactualstart.append(task)
+                if task.act_end_date is not None and task.act_end_date > data_date:
+                    self.invalidactualfinish.append(task)
+                if (
+                    task.early_start_date is not None
+                    and task.early_start_date < data_date
+                ):
+                    self.invalidearlystart.append(task)
+                if task.early_end_date is not None and task.early_end_date < data_date:
+                    self.invalidearlyfinish.append(task)
+            if task_id not in resourced:
+                self.no_resources.append(task)
+            target = task.target_end_date
+            if target is not None:
+                if task.act_end_date is not None and task.act_end_date > target:
+                    self.actualendslippage.append(task)
+                if task.early_end_date is not None and task.early_end_date > target:
+                    self.earlyendslippage.append(task)
+            if findings is not None:
+                for (check, date), found in zip(
+                    _ACTIVITY_FINDINGS, tracked, strict=True
+                ):
+                    if found and found[-1] is task:
+                        finding = {
+                            "check": check,
+                            "task_id": task_id,
+                            "task_code": task.task_code,
+                            "task_name": task.task_name,
+                        }
+                        if date is not None:
+                            finding["date"] = date
+                        findings.write(json.dumps(finding) + "\n")
+            if groupings:
+                hit = [1 if x and x[-1] is task else 0 for x in tracked]
+                tally = tallies.get(task_id, no_tally)
+                row = (
+                    1,
+                    tally[0],
+                    hit[0],
+                    hit[1],
+                    tally[1],
+                    tally[2],
+                    tally[3],
+                    hit[2],
+                    hit[3],
+                    hit[4],
+                    hit[5],
+                    hit[6] + hit[7] + hit[8] + hit[9],
+                    hit[10],
+                    hit[11] + hit[12],
+                )
+                for keys, counters in groupings.values():
+                    for key in keys(task):
+                        found = counters.get(key)
+                        if found is None:
+                            found = counters[key] = [0] * len(_GROUP_COUNTERS)
+                        for i, value in enumerate(row):
+                            found[i] += value
+
         # 1.1 successors
-        self.no_successors = self.chk_successors()
         self.no_successors_cnt = len(self.no_successors)
-        self.results["analysis"]["successors"] = {
-            "cnt": self.no_successors_cnt,
-            "activities": [self.get_activity(x.task_id) for x in self.no_successors],
-            "pct": self.no_successors_cnt / float(self.activity_count),
-        }
+        analysis["successors"] = self._activities(self.no_successors)
         # 1.2 predecessors
-        self.no_predecessors = self.chk_predessors()
         self.no_predecessors_cnt = len(self.no_predecessors)
-        self.results["analysis"]["predecessors"] = {
-            "cnt": self.no_predecessors_cnt,
-            "activities": [self.get_activity(x.task_id) for x in self.no_predecessors],
-            "pct": self.no_predecessors_cnt / float(self.activity_count),
-        }
+        analysis["predecessors"] = self._activities(self.no_predecessors)
         # 2 lags
-        self.lags = list(
-            filter(
-                lambda x: x.lag_hr_cnt > self.lag_limit if x.lag_hr_cnt else None,
-                self.programme.relations,
-            )
-        )
-        self.results["analysis"]["lags"] = {
-            "cnt": len(self.lags),
-            "relations": [
-                {
-                    "successor": self.get_activity(x.task_id),
-                    "predecessor": self.get_activity(x.pred_task_id),
-                    "type": x.pred_type,
-                    "lag": int(x.lag_hr_cnt / 8.0),
-                }
-                for x in self.lags
-            ],
-            "pct": len(self.lags) / float(self.relation_count),
-        }
+        analysis["lags"] = self._relations(self.lags)
         # 3 leads
-        self.leads = self.programme.relations.leads
-        self.results["analysis"]["leads"] = {
-            "cnt": len(self.leads),
-            "relations": [
-                {
-                    "successor": self.get_activity(x.task_id),
-                    "predecessor": self.get_activity(x.pred_task_id),
-                    "type": x.pred_type,
-                    "lag": int(x.lag_hr_cnt / 8.0),
-                }
-                for x in self.leads
-            ],
-            "pct": len(self.leads) / float(self.relation_count),
-        }
+        analysis["leads"] = self._relations(self.leads)
         # 4 relationships
-        self.fsRel = self.programme.relations.finish_to_start
-        self.results["analysis"]["relations"] = {
+        fs = self._relations(self.fsRel)
+        analysis["relations"] = {
             "fs_cnt": len(self.fsRel),
-            "relationship": [
-                {
-                    "successor": self.get_activity(x.task_id),
-                    "predecessor": self.get_activity(x.pred_task_id),
-                    "type": x.pred_type,
-                    "lag": int(x.lag_hr_cnt / 8.0),
-                }
-                for x in self.fsRel
-            ],
+            "ss_cnt": types["PR_SS"],
+            "ff_cnt": types["PR_FF"],
+            "sf_cnt": types["PR_SF"],
+            "pct": fs.pop("pct"),
         }
+        del fs["cnt"]
+        if self.compact:
+            analysis["relations"].update(fs)
+        else:
+            analysis["relations"]["relationship"] = fs["relations"]
         # 5 constraints
-        lst = ["CS_MANDFIN", "CS_MANDFIN"]
-        self.constraints = list(
-            filter(
-                lambda x: getattr(x, "ConstraintType", None) in lst,
-                self.programme.activities,
-            )
-        )
-        self.results["analysis"]["constraints"] = {
+        analysis["constraints"] = {
             "cstr_cnt": len(self.constraints),
-            "cstrs": [self.get_activity(x.task_id) for x in self.constraints],
+            ("ids" if self.compact else "cstrs"): self._list(self.constraints),
+            "pct": self._pct(len(self.constraints), self.activity_count),
         }
         # 6 large total float
-        self.totalfloat = list(
-            filter(
-                lambda x: (
-                    x.total_float_hr_cnt / 8.0 > self.tf_limit
-                    if x.total_float_hr_cnt
-                    else 0
-                ),
-                self.programme.activities.activities,
-            )
-        )
-        self.results["analysis"]["totalfloat"] = {
-            "cnt": len(self.totalfloat),
-            "activities": [self.get_activity(x.task_id) for x in self.totalfloat],
-            "pct": len(self.totalfloat) / float(self.activity_count),
-        }
+        analysis["totalfloat"] = self._activities(self.totalfloat)
         # 7 negative total float
-        self.negativefloat = list(
-            filter(
-                lambda x: x.total_float_hr_cnt / 8.0 < 0 if x.total_float_hr_cnt else 0,
-                self.programme.activities.activities,
-            )
-        )
-        self.results["analysis"]["negativefloat"] = {
-            "cnt": len(self.negativefloat),
-            "activities": [self.get_activity(x.task_id) for x in self.negativefloat],
-            "pct": len(self.negativefloat) / float(self.activity_count),
-        }
+        analysis["negativefloat"] = self._activities(self.negativefloat)
         # 8 durations
-        self.duration = list(
-            filter(
-                lambda x: x.duration > self.dur_limit,
-                self.programme.activities.activities,
-            )
-        )
-        self.results["analysis"]["duration"] = {
-            "cnt": len(self.duration),
-            "activities": [self.get_activity(x.task_id) for x in self.duration],
-            "pct": len(self.duration) / float(self.activity_count),
-        }
-        # 9 Check for Invalid Dates
-        # no actual dates beyong data date
-        # Populate data_date with all project IDs and their corresponding dates
-        data_date = {}
-        for x in self.programme.projects:
-            if x.proj_id and x.last_recalc_date:
-                data_date[str(x.proj_id)] = datetime.strptime(
-                    x.last_recalc_date, "%Y-%m-%d %H:%M"
-                )
-            else:
-                # Assign a default date if last_recalc_date is missing
-                data_date[str(x.proj_id)] = datetime(
-                    2025, 4, 15
-                )  # Default to current date
-
-        logger.debug(data_date)  # Debugging output to verify data_date population
-
-        # Ensure all project IDs are included in data_date with a default value
-        for project in self.programme.projects:
-            if str(project.proj_id) not in data_date:
-                data_date[str(project.proj_id)] = datetime(
-                    2025, 4, 15
-                )  # Default to current date
-
-        # Ensure all project IDs are included in the data_date dictionary with a default value
-        for proj_id in self.programme.projects:
-            if str(proj_id) not in data_date:
-                data_date[str(proj_id)] = datetime.datetime(1900, 1, 1)  # Default date
-
-        self.invalidactualstart = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.act_start_date is None
-                    else x.act_start_date > data_date[str(x.proj_id)]
-                ),
-                self.programme.activities.activities,
-            )
-        )
-        self.invalidactualfinish = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.act_end_date is None
-                    else x.act_end_date > data_date[str(x.proj_id)]
-                ),
-                self.programme.activities.activities,
-            )
-        )
-        self.invalidearlystart = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.early_start_date is None
-                    else x.early_start_date < data_date[str(x.proj_id)]
-                ),
-                self.programme.activities.activities,
-            )
-        )
-        self.invalidearlyfinish = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.early_end_date is None
-                    else x.early_end_date < data_date[str(x.proj_id)]
-                ),
-                self.programme.activities.activities,
-            )
-        )
+        analysis["duration"] = self._activities(self.duration)
+        # 9 invalid dates: actual dates after, or early dates before, the data date
         cnt = (
-            len(self.invalidactualfinish)
-            + len(self.invalidactualstart)
+            len(self.invalidactualstart)
+            + len(self.invalidactualfinish)
             + len(self.invalidearlystart)
             + len(self.invalidearlyfinish)
         )
-        pct = cnt / float(self.activity_count)
         self.invaliddates = {
-            "actual_start": [
-                self.get_activity(x.task_id) for x in self.invalidactualstart
-            ],
-            "actual_finish": [
-                self.get_activity(x.task_id) for x in self.invalidactualfinish
-            ],
-            "early_start": [
-                self.get_activity(x.task_id) for x in self.invalidearlystart
-            ],
-            "early_finish": [
-                self.get_activity(x.task_id) for x in self.invalidearlyfinish
-            ],
+            "actual_start": self._list(self.invalidactualstart),
+            "actual_finish": self._list(self.invalidactualfinish),
+            "early_start": self._list(self.invalidearlystart),
+            "early_finish": self._list(self.invalidearlyfinish),
             "cnt": cnt,
-            "pct": pct,
+            "pct": self._pct(cnt, self.activity_count),
         }
-        self.results["analysis"]["invaliddates"] = self.invaliddates
-
-        # 10 Check resource assignments
-        no_resources = []
-        tasks_id = [x.task_id for x in self.programme.activities.activities]
-        for t_id in tasks_id:
-            assignments = self.programme.activityresources.find_by_activity_id(t_id)
-            if len(assignments) == 0:
-                no_resources.append(t_id)
-        self.results["analysis"]["resources"] = {
-            "activities": [self.get_activity(x) for x in no_resources],
-            "cnt": len(no_resources),
-            "pct": len(no_resources) / float(self.activity_count),
-        }
-        logger.info(no_resources)
-
-        # 11 slippage from target
-        # end dates are later than target end dates
-        self.actualendslippage = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.act_end_date is None
-                    else x.act_end_date > x.target_end_date
-                ),
-                self.programme.activities.activities,
-            )
-        )
-        self.earlyendslippage = list(
-            filter(
-                lambda x: (
-                    None
-                    if x.early_end_date is None
-                    else x.early_end_date > x.target_end_date
-                ),
-                self.programme.activities.activities,
-            )
-        )
+        analysis["invaliddates"] = self.invaliddates
+        # 10 resource assignments
+        analysis["resources"] = self._activities(self.no_resources)
+        logger.debug("No resources: %s", [x.task_id for x in self.no_resources])
+        # 11 slippage from target: finish dates later than the planned finish
         slipped = self.actualendslippage + self.earlyendslippage
-        logger.info("SLIPPED: %s", slipped)
-        self.results["analysis"]["slippage"] = {
-            "activities": [
-                {
-                    "id": x.task_code,
-                    "name": x.task_name,
-                    "early_finish": str(x.early_end_date),
-                    "planned_finish": str(x.target_end_date),
-                }
-                for x in slipped
-            ],
-            "cnt": len(slipped),
-            "pct": len(slipped) / float(self.activity_count),
-        }
+        logger.debug("Slipped: %s", [x.task_id for x in slipped])
+        if self.compact:
+            analysis["slippage"] = self._activities(slipped)
+        else:
+            analysis["slippage"] = {
+                "activities": [
+                    {
+                        "id": x.task_code,
+                        "name": x.task_name,
+                        "early_finish": str(x.early_end_date),
+                        "planned_finish": str(x.target_end_date),
+                    }
+                    for x in slipped
+                ],
+                "cnt": len(slipped),
+                "pct": self._pct(len(slipped), self.activity_count),
+            }
 
-        # 12 Critical Path Test
-
-        # 13 Critical Path Length Index
-        # calculated as cirical path length + total float / critical path length
-        # critical = list(filter(lambda x: x.total_float_hr_cnt <= 10.0 if x.total_float_hr_cnt else None, self.programme.activities.activities))
-        critical_activities = []
-        for act in self.programme.activities.activities:
-            if act.total_float_hr_cnt is not None:
-                logger.info("TF FOUND: %s, %s", act.task_code, act.total_float_hr_cnt)
-                if act.total_float_hr_cnt <= 0:
-                    critical_activities.append(act)
-            else:
-                logger.info("TF Not found")
+        if groupings:
+            self.results["groups"] = {
+                spec: {key: _group_result(x) for key, x in counters.items()}
+                for spec, (_, counters) in groupings.items()
+            }
 
-        logger.info(
-            "critical: %s",
-            [
-                (task.task_code, task.early_start_date, task.total_float_hr_cnt)
-                for task in critical_activities
-            ],
-        )
+        if self.schedule:
+            # 12 Critical Path Test
+            analysis["critical_path_test"] = self.critical_path_test()
 
-        self.results["analysis"]["critical"] = {
-            "activities": [self.get_activity(x.task_id) for x in critical_activities],
-            "cnt": len(critical_activities),
-            "pct": len(critical_activities) / self.activity_count,
-        }
+            # 13 Critical Path Length Index
+            analysis["cpli"] = self.cpli()
+
+            # activities on the longest path
+            scheduler = self.scheduler()
+            critical = PathTracer(scheduler).longest_path() if scheduler else []
+            tasks = self.programme.activities
+            analysis["critical"] = self._activities(
+                [tasks.find_by_id(x) for x in critical]
+            )
 
-        # 14 BLEI
+            # 14 BLEI
 
-        # Add missing_logic key to the results
-        self.results["missing_logic"] = {
-            "activities": [
-                act
-                for act in self.programme.activities.activities
-                if act.logic_missing  # Assuming logic_missing is a property or method
-            ]
+            # schedule risk assessment
+            if self.risk_iterations:
+                analysis["risk"] = self.risk_analysis(self.risk_iterations)
+
+        # activities without any logic, and with float above the limit
+        unlinked = [x for x in self.no_successors if x.task_id not in with_predecessors]
+        self.high_float = self.totalfloat
+        if self.compact:
+            self.results["missing_logic"] = {"ids": self._list(unlinked)}
+            self.results["high_float"] = {
+                "count": len(self.high_float),
+                "ids": self._list(self.high_float),
+            }
+            self.results["activities"] = self._names
+        else:
+            self.results["missing_logic"] = {"activities": unlinked}
+            self.results["high_float"] = {
+                "count": len(self.high_float),
+                "tasks": self.high_float,
+            }
+
+        return self.results
+
+    def scheduler(self) -> IncrementalScheduler | None:
+        """
+        Get the CPM scheduler used by the critical path checks.
+
+        The programme is scheduled once, on first use.
+
+        Returns
+        -------
+        IncrementalScheduler or None
+            The scheduled network, or None if it cannot be scheduled (e.g.
+            because of circular logic)
+        """
+        if self._scheduler is None:
+            scheduler = IncrementalScheduler(self.programme)
+            try:
+                scheduler.schedule()
+            except ValueError as e:
+                logger.warning("Cannot schedule the programme: %s", e)
+                return None
+            self._scheduler = scheduler
+        return self._scheduler
+
+    def critical_path_test(self, delay: float = 600) -> dict[str, Any]:
+        """
+        Run the DCMA critical path test (check 12).
+
+        A delay is added to the remaining duration of the first incomplete
+        activity on the longest path; the test passes if the project finish
+        slips by the same amount of working time. The schedule is restored
+        afterwards.
+
+        Parameters
+        ----------
+        delay : float, optional
+            Delay in days of the activity calendar's working hours, by
+            default 600
+
+        Returns
+        -------
+        dict[str, Any]
+            The tested activity, the delay and slip in days and whether the
+            test ``passed``
+        """
+        result: dict[str, Any] = {
+            "activity": None,
+            "delay": delay,
+            "slip": 0.0,
+            "passed": False,
         }
+        scheduler = self.scheduler()
+        if scheduler is None:
+            return result
+        network = scheduler.network
+        path = [
+            x
+            for x in PathTracer(scheduler).longest_path()
+            if network.tasks[network.pos[x]].task_type not in _MILESTONES
+        ]
+        if not path:
+            return result
+        task_id = path[0]
+        node = network.pos[task_id]
+        proj_id = scheduler.proj[node]
+        cal = scheduler.cal[node]
+        finish = scheduler.project_finish[proj_id]
+        duration = scheduler.dur[node]
+        day = cal.hours_per_day * 60.0
+        scheduler.set_duration(task_id, duration / 60.0 + delay * cal.hours_per_day)
+        scheduler.reschedule()
+        slip = cal.work_minutes_between(finish, scheduler.project_finish[proj_id])
+        scheduler.set_duration(task_id, duration / 60.0)
+        scheduler.reschedule()
+        result["activity"] = self.get_activity(task_id)
+        result["slip"] = slip / day
+        result["passed"] = slip == round(delay * day)
+        return result
 
-        # Populate logic_missing attribute for tasks
-        for task in self.programme.activities.activities:
-            task.logic_missing = not (task.predecessors or task.successors)
+    def cpli(self) -> dict[str, Any]:
+        """
+        Compute the DCMA critical path length index (check 13).
+
+        CPLI is (critical path length + total float) / critical path length,
+        where the critical path length runs from the data date to the project
+        finish and the total float is the float of the activities finishing
+        the project against its must-finish date.
 
-        # Add logic to include 'high_float' key in the analysis results
-        self.high_float = [
-            task
-            for task in self.programme.activities.activities
-            if task.float_value is not None
-            and task.float_value > 100  # Example threshold
+        Returns
+        -------
+        dict[str, Any]
+            CPLI, critical path length and float in days of the working
+            hours of the finishing activity's calendar per project, the
+            lowest ``cpli`` and whether it ``passed`` (>= 0.95)
+        """
+        result: dict[str, Any] = {"projects": {}, "cpli": None, "passed": False}
+        scheduler = self.scheduler()
+        if scheduler is None:
+            return result
+        tracer = PathTracer(scheduler)
+        for proj_id in scheduler.project_finish:
+            nodes = tracer.finish_nodes(proj_id)
+            if not nodes:
+                continue
+            node = nodes[0]
+            cal = scheduler.cal[node]
+            day = cal.hours_per_day * 60.0
+            length = cal.work_minutes_between(
+                scheduler.dd[node], scheduler.project_finish[proj_id]
+            )
+            floats = [scheduler.total_float[i] for i in nodes]
+            total_float = min((x for x in floats if x is not None), default=0)
+            index = (length + total_float) / length if length > 0 else None
+            result["projects"][proj_id] = {
+                "length": length / day,
+                "float": total_float / day,
+                "cpli": index,
+            }
+        indexes = [
+            x["cpli"] for x in result["projects"].values() if x["cpli"] is not None
         ]
-        self.results["high_float"] = {
-            "count": len(self.high_float),
-            "tasks": self.high_float,
-        }
+        if indexes:
+            result["cpli"] = min(indexes)
+            result["passed"] = result["cpli"] >= 0.95
+        return result
 
-        return self.results
+    def risk_analysis(
+        self,
+        iterations: int = 1000,
+        distributions: dict[int, tuple[str, float, float, float]] | None = None,
+        default: tuple[str, float, float, float] | None = (
+            "triangular",
+            0.9,
+            1.0,
+            1.25,
+        ),
+        seed: int = 0,
+        workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run a Monte Carlo schedule risk assessment.
+
+        Parameters
+        ----------
+        iterations : int, optional
+            Number of iterations, default is 1000
+        distributions : dict[int, tuple[str, float, float, float]], optional
+            Duration distribution per ``task_id``, see ``MonteCarlo``
+        default : tuple[str, float, float, float] or None, optional
+            Distribution of the other activities as factors of their
+            remaining duration, default is triangular (0.9, 1.0, 1.25)
+        seed : int, optional
+            Seed of the random numbers, default is 0
+        workers : int, optional
+            Number of worker processes, default is one per CPU
+
+        Returns
+        -------
+        dict[str, Any]
+            P50 and P80 finish dates, the probability of meeting the
+            deterministic finish and the ``activities`` with a criticality
+            index above zero, most critical first
+        """
+        scheduler = self.scheduler()
+        if scheduler is None:
+            return {"iterations": 0, "activities": []}
+        risk = MonteCarlo(scheduler, distributions, default).run(
+            iterations, seed=seed, workers=workers
+        )
+        ranked = sorted(
+            risk["activities"].items(),
+            key=lambda x: (-x[1]["criticality"], -abs(x[1]["sensitivity"])),
+        )
+        return {
+            "iterations": iterations,
+            "deterministic_finish": risk["deterministic_finish"],
+            "p50_finish": risk["p50_finish"],
+            "p80_finish": risk["p80_finish"],
+            "probability_on_time": risk["probability_on_time"],
+            "activities": [
+                {
+                    "activity": self.get_activity(task_id),
+                    "criticality": values["criticality"],
+                    "sensitivity": values["sensitivity"],
+                }
+                for task_id, values in ranked
+                if values["criticality"] > 0
+            ],
+        }
 
     def chk_successors(self) -> list[Any]:
         """
@@ -469,7 +771,10 @@ class DCMA14:
         list[Task]
             list of activities without successors
         """
-        return self.programme.activities.has_no_successor
+        linked = {x.pred_task_id for x in self.programme.relations.relations}
+        return [
+            x for x in self.programme.activities.activities if x.task_id not in linked
+        ]
 
     def chk_predessors(self) -> list[Any]:
         """
@@ -483,7 +788,10 @@ class DCMA14:
         list[Task]
             list of activities without predecessors
         """
-        return self.programme.activities.has_no_predecessor
+        linked = {x.task_id for x in self.programme.relations.relations}
+        return [
+            x for x in self.programme.activities.activities if x.task_id not in linked
+        ]
 
     def get_activity(self, id: int) -> dict[str, Any] | None:
         """
@@ -500,15 +808,281 @@ class DCMA14:
             Dictionary containing key information about the activity,
             or None if the activity is not found
         """
+        described = self._described.get(id)
+        if described is not None:
+            return described
         activity = self.programme.activities.find_by_id(id)
-        # print(activity)
-        if isinstance(activity, list):
+        if activity is None or isinstance(activity, list):
             return None
+        return self._describe(activity)
+
+    def _describe(self, activity: Any) -> dict[str, Any]:
+        # built once per activity, however many checks list it
+        described = self._described.get(activity.task_id)
+        if described is None:
+            described = self._described[activity.task_id] = {
+                "id": activity.task_code,
+                "name": activity.task_name,
+                "duration": activity.duration,
+                "tf": (
+                    activity.total_float_hr_cnt / 8.0
+                    if activity.total_float_hr_cnt
+                    else 0
+                ),
+            }
+        return described
+
+    def _list(self, found: list[Any]) -> list[Any]:
+        """
+        List flagged activities: by ID in compact mode, described otherwise.
+
+        Parameters
+        ----------
+        found : list[Task]
+            The activities
+
+        Returns
+        -------
+        list
+            ``task_id`` values, or ``get_activity`` descriptions
+        """
+        if not self.compact:
+            return [self._describe(x) for x in found]
+        names = self._names
+        for task in found:
+            if task.task_id not in names:
+                names[task.task_id] = (task.task_code, task.task_name)
+        return [x.task_id for x in found]
+
+    def _name(self, task_id: Any) -> Any:
+        if task_id not in self._names:
+            task = self.programme.activities.find_by_id(task_id)
+            if task is not None and not isinstance(task, list):
+                self._names[task_id] = (task.task_code, task.task_name)
+        return task_id
+
+    def _activities(self, found: list[Any]) -> dict[str, Any]:
         return {
-            "id": activity.task_code,
-            "name": activity.task_name,
-            "duration": activity.duration,
-            "tf": (
-                activity.total_float_hr_cnt / 8.0 if activity.total_float_hr_cnt else 0
-            ),
+            "cnt": len(found),
+            ("ids" if self.compact else "activities"): self._list(found),
+            "pct": self._pct(len(found), self.activity_count),
         }
+
+    def _relations(self, found: list[Any]) -> dict[str, Any]:
+        if self.compact:
+            return {
+                "cnt": len(found),
+                "ids": [x.task_pred_id for x in found],
+                "predecessors": [self._name(x.pred_task_id) for x in found],
+                "successors": [self._name(x.task_id) for x in found],
+                "types": [x.pred_type for x in found],
+                "lags": [int((x.lag_hr_cnt or 0) / 8.0) for x in found],
+                "pct": self._pct(len(found), self.relation_count),
+            }
+        return {
+            "cnt": len(found),
+            "relations": [
+                {
+                    "successor": self.get_activity(x.task_id),
+                    "predecessor": self.get_activity(x.pred_task_id),
+                    "type": x.pred_type,
+                    "lag": int((x.lag_hr_cnt or 0) / 8.0),
+                }
+                for x in found
+            ],
+            "pct": self._pct(len(found), self.relation_count),
+        }
+
+    @staticmethod
+    def _pct(count: int, total: int) -> float:
+        return count / float(total) if total else 0.0
+
+    def _resourced(self) -> set[Any]:
+        """
+        Get the activities with at least one resource assignment.
+
+        Assignments of a role without a resource do not count.
+
+        Returns
+        -------
+        set[int]
+            ``task_id`` of every activity with an assigned resource
+        """
+        assignments = getattr(self.programme, "activityresources", None)
+        if assignments is None:
+            return set()
+        return {x.task_id for x in assignments.assignments if x.rsrc_id}
+
+    def _data_dates(self) -> dict[str, datetime]:
+        """
+        Get the data date of every project.
+
+        Returns
+        -------
+        dict[str, datetime]
+            ``last_recalc_date``, or the ``data_date`` option, keyed by
+            ``proj_id`` as a string; projects with neither are left out
+        """
+        return _data_dates(self.programme, self.data_date)
+
+    def _groupings(self) -> dict[Any, tuple[Any, dict[Any, list[int]]]]:
+        """
+        Prepare the groupings of ``group_by``.
+
+        Returns
+        -------
+        dict
+            For every grouping, a function giving the group keys of an
+            activity and the (empty) counters of its groups
+
+        Raises
+        ------
+        ValueError
+            If a grouping is neither a project, WBS nor activity code type
+            grouping
+        """
+        groupings = {}
+        for spec in self.group_by:
+            if spec == "project":
+                keys = _project_keys
+            elif spec == "wbs":
+                keys = self._wbs_keys()
+            else:
+                keys = self._code_keys(spec)
+            groupings[spec] = (keys, {})
+        return groupings
+
+    def _wbs_keys(self) -> Any:
+        """
+        Get the WBS node of an activity and its ancestors.
+
+        Returns
+        -------
+        Callable[[Task], tuple]
+            The group keys of an activity, cached per WBS node
+        """
+        wbss = getattr(self.programme, "wbss", None)
+        parent = {x.wbs_id: x.parent_wbs_id for x in getattr(wbss, "wbss", None) or []}
+        branches: dict[Any, tuple] = {}
+
+        def keys(task: Any) -> tuple:
+            wbs_id = task.wbs_id
+            branch = branches.get(wbs_id)
+            if branch is None:
+                chain, node = [wbs_id], wbs_id
+                while parent.get(node) in parent and parent[node] not in chain:
+                    node = parent[node]
+                    chain.append(node)
+                branch = branches[wbs_id] = tuple(chain)
+            return branch
+
+        return keys
+
+    def _code_keys(self, spec: str | int) -> Any:
+        """
+        Get the value of an activity code type for an activity.
+
+        Parameters
+        ----------
+        spec : str or int
+            The ``actv_code_type_id`` or the name of the code type
+
+        Returns
+        -------
+        Callable[[Task], tuple]
+            The group key of an activity: its code value, or None
+
+        Raises
+        ------
+        ValueError
+            If there is no such activity code type
+        """
+        types = (
+            getattr(getattr(self.programme, "acttypes", None), "acttypes", None) or []
+        )
+        matches = [
+            x.actv_code_type_id
+            for x in types
+            if x.actv_code_type_id == spec or x.actv_code_type == spec
+        ]
+        if not matches:
+            raise ValueError(
+                f"Unknown grouping {spec!r}, use 'project', 'wbs' or an "
+                "activity code type"
+            )
+        type_id = str(matches[0])
+        codes = getattr(
+            getattr(self.programme, "actvcodes", None), "activitycodes", None
+        )
+        names = {x.actv_code_id: x.short_name for x in codes or []}
+        values = {}
+        assigned = getattr(self.programme, "activitycodes", None)
+        for x in getattr(assigned, "taskactvs", None) or []:
+            if x.actv_code_type_id == type_id:
+                values[x.task_id] = (names.get(x.actv_code_id, x.actv_code_id),)
+
+        def keys(task: Any) -> tuple:
+            return values.get(task.task_id, (None,))
+
+        return keys
+
+
+def _data_dates(programme: Any, default: datetime | None) -> dict[str, datetime]:
+    """
+    Get the data date of every project of a programme.
+
+    Parameters
+    ----------
+    programme : Reader
+        The programme
+    default : datetime or None
+        Data date of the projects without a ``last_recalc_date``
+
+    Returns
+    -------
+    dict[str, datetime]
+        Data dates keyed by ``proj_id`` as a string; projects without one
+        are logged and left out
+    """
+    data_dates = {}
+    for project in programme.projects.projects:
+        if project.last_recalc_date:
+            data_dates[str(project.proj_id)] = datetime.strptime(
+                project.last_recalc_date, "%Y-%m-%d %H:%M"
+            )
+        elif default is not None:
+            data_dates[str(project.proj_id)] = default
+        else:
+            logger.warning(
+                "Project %s has no data date, its dates are not checked",
+                project.proj_id,
+            )
+    return data_dates
+
+
+def _project_keys(task: Any) -> tuple:
+    return (task.proj_id,)
+
+
+def _group_result(counters: list[int]) -> dict[str, Any]:
+    """
+    Turn the counters of a group into check results.
+
+    Parameters
+    ----------
+    counters : list[int]
+        Counts in ``_GROUP_COUNTERS`` order
+
+    Returns
+    -------
+    dict[str, Any]
+        The ``summary`` and the ``cnt`` and ``pct`` of every check
+    """
+    activities, relations = counters[0], counters[1]
+    result: dict[str, Any] = {
+        "summary": {"activity_cnt": activities, "relationship_cnt": relations}
+    }
+    for name, count in zip(_GROUP_COUNTERS[2:], counters[2:], strict=True):
+        total = relations if name in _RELATION_COUNTERS else activities
+        result[name] = {"cnt": count, "pct": count / float(total) if total else 0.0}
+    return result
@@ -0,0 +1,253 @@
+"""Batch DCMA 14-point assessments over many XER files.
+
+Monthly updates of many contracts are assessed together. Every file is
+parsed in a worker process with only the tables the checks read, assessed
+with per-project counts, and reduced to flat metric records before it is
+sent back, so the parent never holds more than one file's records at a time.
+The records are written to a CSV or JSON Lines trend table as the workers
+finish.
+"""
+
+import csv
+import json
+import logging
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+from xer_parser.dcma14.analysis import _GROUP_COUNTERS, DCMA14
+from xer_parser.model.classes.activitycode import ActivityCode
+from xer_parser.model.classes.acttype import ActType
+from xer_parser.model.classes.calendar import Calendar
+from xer_parser.model.classes.schedoption import SchedOption
+from xer_parser.model.classes.taskactv import TaskActv
+from xer_parser.model.classes.taskpred import TaskPred
+from xer_parser.model.classes.wbs import WBS
+from xer_parser.reader import Reader
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DCMA_TABLES", "TREND_FIELDS", "assess_file", "iter_batch", "run_batch"]
+
+# Tables read by the checks; activity code groupings also need _CODE_TABLES
+DCMA_TABLES = frozenset(
+    {"PROJECT", "PROJWBS", "CALENDAR", "SCHEDOPTIONS", "TASK", "TASKPRED", "TASKRSRC"}
+)
+_CODE_TABLES = frozenset({"ACTVTYPE", "ACTVCODE", "TASKACTV"})
+
+# Columns of the trend table
+TREND_FIELDS = ("file", "project", "data_date", "metric", "count", "pct")
+
+# Records also kept in class-level lists while a file is parsed
+_REGISTRIES = (Calendar, SchedOption, WBS, TaskPred, TaskActv, ActType, ActivityCode)
+
+
+def assess_file(
+    path: str,
+    group_by: Sequence[str | int] = (),
+    schedule: bool = False,
+    **options: Any,
+) -> list[dict[str, Any]]:
+    """
+    Assess one XER file and reduce the results to metric records.
+
+    Parameters
+    ----------
+    path : str
+        The XER file
+    group_by : Sequence[str or int], optional
+        Activity code types (ID or name) to add records for, one per code
+        value, besides the per-project records
+    schedule : bool, optional
+        Also run the critical path test and CPLI (checks 12 and 13), which
+        schedule the programme, by default False
+    **options : Any
+        ``duration_limit``, ``lag_limit``, ``tf_limit`` or ``data_date``
+        options of ``DCMA14``
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        One record per project (or code value, as ``project`` ``type=value``)
+        and metric, with the ``TREND_FIELDS``. The CPLI of a project is
+        given as ``pct`` (``count`` None) and the critical path test, for the
+        whole file, as a ``count`` of 1 if passed
+    """
+    tables = DCMA_TABLES | _CODE_TABLES if group_by else DCMA_TABLES
+    marks = [len(x.obj_list) for x in _REGISTRIES]
+    try:
+        programme = Reader(path, tables=tables)
+        dcma = DCMA14(
+            programme, group_by=["project", *group_by], schedule=schedule, **options
+        )
+        results = dcma.analysis()
+    finally:
+        # drop this file's records again, workers parse many files
+        for registry, mark in zip(_REGISTRIES, marks, strict=True):
+            del registry.obj_list[mark:]
+
+    name = os.path.basename(path)
+    projects = {x.proj_id: x for x in programme.projects.projects}
+    records = []
+
+    def add(project: Any, data_date: Any, metric: str, count: Any, pct: Any) -> None:
+        records.append(
+            {
+                "file": name,
+                "project": project,
+                "data_date": data_date,
+                "metric": metric,
+                "count": count,
+                "pct": pct,
+            }
+        )
+
+    for proj_id, checks in results["groups"]["project"].items():
+        project = projects.get(proj_id)
+        label = proj_id if project is None else project.proj_short_name or proj_id
+        data_date = None if project is None else project.last_recalc_date
+        for metric in _GROUP_COUNTERS[2:]:
+            add(label, data_date, metric, checks[metric]["cnt"], checks[metric]["pct"])
+        if schedule:
+            found = results["analysis"]["cpli"]["projects"].get(proj_id)
+            add(
+                label, data_date, "cpli", None, None if found is None else found["cpli"]
+            )
+    if schedule:
+        test = results["analysis"]["critical_path_test"]
+        add(None, None, "critical_path_test", int(test["passed"]), None)
+    for spec in group_by:
+        for value, checks in results["groups"][spec].items():
+            for metric in _GROUP_COUNTERS[2:]:
+                add(
+                    f"{spec}={value}",
+                    None,
+                    metric,
+                    checks[metric]["cnt"],
+                    checks[metric]["pct"],
+                )
+    return records
+
+
+def iter_batch(
+    paths: Iterable[str], workers: int | None = None, **options: Any
+) -> Iterator[dict[str, Any]]:
+    """
+    Assess XER files in parallel, yielding records as files finish.
+
+    Files that cannot be read or assessed are logged and skipped.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The XER files
+    workers : int, optional
+        Number of worker processes; by default one per CPU. 0 or 1 runs in
+        the calling process.
+    **options : Any
+        Options of ``assess_file``
+
+    Yields
+    ------
+    dict[str, Any]
+        The records of ``assess_file``, file by file in completion order
+    """
+    for records in _assess_files(paths, workers, options):
+        yield from records
+
+
+def run_batch(
+    paths: Iterable[str],
+    output: str,
+    workers: int | None = None,
+    **options: Any,
+) -> int:
+    """
+    Assess XER files in parallel and write the trend table.
+
+    The rows of each file are written and flushed as soon as its worker
+    finishes.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The XER files
+    output : str
+        The trend table: JSON Lines if the name ends in ``.jsonl``, CSV
+        otherwise
+    workers : int, optional
+        Number of worker processes; by default one per CPU
+    **options : Any
+        Options of ``assess_file``
+
+    Returns
+    -------
+    int
+        Number of rows written
+
+    Examples
+    --------
+    >>> from glob import glob
+    >>> from xer_parser.dcma14.batch import run_batch
+    >>> run_batch(sorted(glob("updates/*.xer")), "trend.csv", schedule=True)
+    """
+    jsonl = output.endswith(".jsonl")
+    rows = 0
+    with open(output, "w", newline="", encoding="utf-8") as stream:
+        if jsonl:
+            writer = None
+        else:
+            writer = csv.DictWriter(stream, fieldnames=TREND_FIELDS)
+            writer.writeheader()
+        for records in _assess_files(paths, workers, options):
+            if writer is None:
+                stream.writelines(json.dumps(x) + "\n" for x in records)
+            else:
+                writer.writerows(records)
+            stream.flush()
+            rows += len(records)
+    return rows
+
+
+def _assess_files(
+    paths: Iterable[str], workers: int | None, options: dict[str, Any]
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Assess XER files, in worker processes unless there is one worker.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The XER files
+    workers : int or None
+        Number of worker processes, None for one per CPU
+    options : dict[str, Any]
+        Options of ``assess_file``
+
+    Yields
+    ------
+    list[dict[str, Any]]
+        The records of each file assessed, in completion order
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                records = assess_file(path, **options)
+            except Exception:
+                logger.exception("Cannot assess %s", path)
+                continue
+            yield records
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {pool.submit(assess_file, path, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                records = future.result()
+            except Exception:
+                logger.exception("Cannot assess %s", futures[future])
+                continue
+            yield records
@@ -0,0 +1,588 @@
+"""Pluggable schedule checks over shared indexes.
+
+A rule is a function of a ``Snapshot`` returning the IDs of the activities
+(``task_id``) or relationships (``task_pred_id``) it flags. Rules are
+registered with ``rule`` and declare the indexes they read, such as the
+successor adjacency, the activities grouped by status or the total float
+column; indexes are registered with ``index``. A ``RuleEngine`` builds every
+declared index once on one snapshot of the programme and runs the rules over
+it, one after the other or over a process pool, timing each index and rule.
+
+The DCMA checks 1 to 11 are registered as rules, along with a few common
+quality checks such as out-of-sequence progress; custom rules are added the
+same way:
+
+>>> from xer_parser.dcma14.rules import RuleEngine, rule
+>>> @rule("ss_without_lag", needs=("relations",), subject="relation")
+... def ss_without_lag(snapshot):
+...     return [
+...         x.task_pred_id
+...         for x in snapshot["relations"]
+...         if x.pred_type == "PR_SS" and not x.lag_hr_cnt
+...     ]
+>>> results = RuleEngine(xer).run()
+>>> results["ss_without_lag"]["cnt"], results["ss_without_lag"]["seconds"]
+"""
+
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any
+
+from xer_parser.dcma14.analysis import _HARD_CONSTRAINTS, _data_dates
+from xer_parser.model.classes.p6codes import ActivityStatus
+from xer_parser.scheduling.sequence import find_out_of_sequence
+
+__all__ = ["INDEXES", "RULES", "Rule", "RuleEngine", "Snapshot", "index", "rule"]
+
+# Index builders by name
+INDEXES: dict[str, Callable[["Snapshot"], Any]] = {}
+
+# Rules by name, in registration order
+RULES: dict[str, "Rule"] = {}
+
+# Options of the registered rules and their defaults, as for DCMA14
+_DEFAULTS = {
+    "duration_limit": 1,
+    "lag_limit": 0,
+    "tf_limit": 0,
+    "data_date": None,
+    "required_codes": (),
+}
+
+# Snapshot of the running engine, inherited by forked worker processes
+_SNAPSHOT: "Snapshot | None" = None
+
+
+class Rule:
+    """
+    A registered schedule check.
+
+    Parameters
+    ----------
+    name : str
+        Name of the rule, unique in ``RULES``
+    check : Callable[[Snapshot], list]
+        The check, returning the IDs of the flagged records
+    needs : tuple[str, ...]
+        Indexes the check reads
+    subject : str
+        ``activity`` if the check flags ``task_id`` values, ``relation`` if
+        it flags ``task_pred_id`` values
+    """
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[["Snapshot"], list[Any]],
+        needs: tuple[str, ...],
+        subject: str,
+    ) -> None:
+        self.name = name
+        self.check = check
+        self.needs = needs
+        self.subject = subject
+
+    def __repr__(self) -> str:
+        return f"<Rule {self.name} ({self.subject}) needs {', '.join(self.needs)}>"
+
+
+def index(name: str) -> Callable:
+    """
+    Register an index builder.
+
+    Parameters
+    ----------
+    name : str
+        Name under which rules read the index
+
+    Returns
+    -------
+    Callable
+        Decorator registering a function of a ``Snapshot`` that builds the
+        index; it may read other indexes of the snapshot
+    """
+
+    def register(build: Callable[["Snapshot"], Any]) -> Callable[["Snapshot"], Any]:
+        INDEXES[name] = build
+        return build
+
+    return register
+
+
+def rule(name: str, needs: Iterable[str] = (), subject: str = "activity") -> Callable:
+    """
+    Register a rule.
+
+    Parameters
+    ----------
+    name : str
+        Name of the rule; registering a name again replaces the rule
+    needs : Iterable[str], optional
+        Indexes the rule reads, built before any rule runs
+    subject : str, optional
+        ``activity`` (default) or ``relation``
+
+    Returns
+    -------
+    Callable
+        Decorator registering a function of a ``Snapshot`` returning the
+        flagged IDs
+
+    Raises
+    ------
+    ValueError
+        If the subject or one of the indexes is unknown
+    """
+    if subject not in ("activity", "relation"):
+        raise ValueError(f"Unknown subject {subject!r}, use 'activity' or 'relation'")
+    needs = tuple(needs)
+
+    def register(check: Callable[["Snapshot"], list[Any]]) -> Callable:
+        unknown = [x for x in needs if x not in INDEXES]
+        if unknown:
+            raise ValueError(f"Rule {name!r} needs unknown indexes {unknown}")
+        RULES[name] = Rule(name, check, needs, subject)
+        return check
+
+    return register
+
+
+class Snapshot:
+    """
+    The programme seen by the rules, with indexes built on first use.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities``,
+        ``relations`` and ``projects``; ``activityresources`` and
+        ``activitycodes`` are used when present)
+    options : dict[str, Any], optional
+        Options read by the rules, over the defaults (``duration_limit``,
+        ``lag_limit`` and ``tf_limit`` as for ``DCMA14``, ``data_date`` and
+        ``required_codes``)
+
+    Attributes
+    ----------
+    timings : dict[str, float]
+        Seconds spent building each index, including the indexes it read
+    """
+
+    def __init__(self, programme: Any, options: dict[str, Any] | None = None) -> None:
+        self.programme = programme
+        self.options = {**_DEFAULTS, **(options or {})}
+        self.timings: dict[str, float] = {}
+        self._indexes: dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._indexes:
+            build = INDEXES.get(name)
+            if build is None:
+                raise KeyError(f"Unknown index {name!r}")
+            start = time.perf_counter()
+            self._indexes[name] = build(self)
+            self.timings[name] = time.perf_counter() - start
+        return self._indexes[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._indexes
+
+
+class RuleEngine:
+    """
+    Run registered rules over one snapshot of a programme.
+
+    Parameters
+    ----------
+    programme : Reader
+        The programme to check
+    rules : Iterable[str], optional
+        Names of the rules to run, by default every registered rule
+    **options : Any
+        Options of the rules, see ``Snapshot``
+
+    Attributes
+    ----------
+    snapshot : Snapshot
+        The indexes shared by the rules
+    timings : dict[str, dict[str, float]]
+        Seconds spent on each ``indexes`` build and each of the ``rules`` of
+        the last run
+
+    Raises
+    ------
+    KeyError
+        If a rule is not registered
+    """
+
+    def __init__(
+        self, programme: Any, rules: Iterable[str] | None = None, **options: Any
+    ) -> None:
+        names = list(RULES) if rules is None else list(rules)
+        unknown = [x for x in names if x not in RULES]
+        if unknown:
+            raise KeyError(f"Unknown rules {unknown}")
+        self.rules = [RULES[x] for x in names]
+        self.snapshot = Snapshot(programme, options)
+        self.timings: dict[str, dict[str, float]] = {"indexes": {}, "rules": {}}
+
+    def run(self, workers: int | None = 0) -> dict[str, dict[str, Any]]:
+        """
+        Build the indexes the rules need, then run the rules.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes the rules are spread over; 0 or 1
+            (default) runs them in the calling process, None uses one per
+            CPU. Workers are forked and share the built indexes; where
+            processes cannot be forked, threads are used.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            For every rule, its ``subject``, the flagged ``ids``, their
+            ``cnt`` and ``pct`` of the activities or relationships, and the
+            ``seconds`` the rule took
+        """
+        global _SNAPSHOT
+        snapshot = self.snapshot
+        for rule in self.rules:
+            for name in rule.needs:
+                snapshot[name]
+        self.timings["indexes"] = dict(snapshot.timings)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(self.rules) <= 1:
+            outputs = [_run(snapshot, x.name) for x in self.rules]
+        else:
+            _SNAPSHOT = snapshot
+            try:
+                with _pool(min(workers, len(self.rules))) as pool:
+                    outputs = list(pool.map(_run_shared, [x.name for x in self.rules]))
+            finally:
+                _SNAPSHOT = None
+
+        totals = {
+            "activity": len(snapshot["activities"]),
+            "relation": len(snapshot["relations"]),
+        }
+        results = {}
+        for rule, (ids, seconds) in zip(self.rules, outputs, strict=True):
+            total = totals[rule.subject]
+            results[rule.name] = {
+                "subject": rule.subject,
+                "ids": ids,
+                "cnt": len(ids),
+                "pct": len(ids) / float(total) if total else 0.0,
+                "seconds": seconds,
+            }
+        self.timings["rules"] = {x: results[x]["seconds"] for x in results}
+        return results
+
+
+def _run(snapshot: Snapshot, name: str) -> tuple[list[Any], float]:
+    start = time.perf_counter()
+    ids = list(RULES[name].check(snapshot))
+    return ids, time.perf_counter() - start
+
+
+def _run_shared(name: str) -> tuple[list[Any], float]:
+    return _run(_SNAPSHOT, name)
+
+
+def _pool(workers: int) -> Executor:
+    """
+    Get a pool whose workers see the running engine's snapshot.
+
+    Parameters
+    ----------
+    workers : int
+        Number of workers
+
+    Returns
+    -------
+    Executor
+        Forked processes where available, threads otherwise
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+# Indexes
+
+
+@index("activities")
+def _activities(snapshot: Snapshot) -> list[Any]:
+    return snapshot.programme.activities.activities
+
+
+@index("relations")
+def _relations(snapshot: Snapshot) -> list[Any]:
+    return snapshot.programme.relations.relations
+
+
+@index("tasks")
+def _tasks(snapshot: Snapshot) -> dict[Any, Any]:
+    return {x.task_id: x for x in snapshot["activities"]}
+
+
+@index("successors")
+def _successors(snapshot: Snapshot) -> dict[Any, list[Any]]:
+    """Relationships by ``pred_task_id``."""
+    adjacency: dict[Any, list[Any]] = {}
+    for relation in snapshot["relations"]:
+        adjacency.setdefault(relation.pred_task_id, []).append(relation)
+    return adjacency
+
+
+@index("predecessors")
+def _predecessors(snapshot: Snapshot) -> dict[Any, list[Any]]:
+    """Relationships by successor ``task_id``."""
+    adjacency: dict[Any, list[Any]] = {}
+    for relation in snapshot["relations"]:
+        adjacency.setdefault(relation.task_id, []).append(relation)
+    return adjacency
+
+
+@index("status")
+def _status(snapshot: Snapshot) -> dict[str | None, list[Any]]:
+    """Activities by ``status_code``, every status present."""
+    groups: dict[str | None, list[Any]] = {
+        ActivityStatus.NotStarted: [],
+        ActivityStatus.InProgress: [],
+        ActivityStatus.Complete: [],
+    }
+    for task in snapshot["activities"]:
+        groups.setdefault(task.status_code, []).append(task)
+    return groups
+
+
+@index("total_float")
+def _total_float(snapshot: Snapshot) -> list[float | None]:
+    """Total float in hours, in the order of ``activities``."""
+    return [x.total_float_hr_cnt for x in snapshot["activities"]]
+
+
+@index("duration")
+def _duration(snapshot: Snapshot) -> list[float]:
+    """Planned duration in days, in the order of ``activities``."""
+    return [x.duration for x in snapshot["activities"]]
+
+
+@index("assignments")
+def _assignments(snapshot: Snapshot) -> dict[Any, list[Any]]:
+    """Resource assignments by ``task_id``."""
+    found: dict[Any, list[Any]] = {}
+    collection = getattr(snapshot.programme, "activityresources", None)
+    for assignment in getattr(collection, "assignments", None) or []:
+        found.setdefault(assignment.task_id, []).append(assignment)
+    return found
+
+
+@index("activity_codes")
+def _activity_codes(snapshot: Snapshot) -> dict[Any, dict[str, Any]]:
+    """Code value (``actv_code_id``) by code type ID, by ``task_id``."""
+    found: dict[Any, dict[str, Any]] = {}
+    collection = getattr(snapshot.programme, "activitycodes", None)
+    for code in getattr(collection, "taskactvs", None) or []:
+        found.setdefault(code.task_id, {})[str(code.actv_code_type_id)] = (
+            code.actv_code_id
+        )
+    return found
+
+
+@index("data_dates")
+def _data_dates_index(snapshot: Snapshot) -> dict[str, datetime]:
+    """Data dates by ``proj_id`` as a string."""
+    default = snapshot.options["data_date"]
+    if isinstance(default, str):
+        default = datetime.strptime(default, "%Y-%m-%d %H:%M")
+    return _data_dates(snapshot.programme, default)
+
+
+# Rules: DCMA checks 1 to 11
+
+
+@rule("missing_predecessors", needs=("activities", "predecessors"))
+def _missing_predecessors(snapshot: Snapshot) -> list[Any]:
+    linked = snapshot["predecessors"]
+    return [x.task_id for x in snapshot["activities"] if x.task_id not in linked]
+
+
+@rule("missing_successors", needs=("activities", "successors"))
+def _missing_successors(snapshot: Snapshot) -> list[Any]:
+    linked = snapshot["successors"]
+    return [x.task_id for x in snapshot["activities"] if x.task_id not in linked]
+
+
+@rule("lags", needs=("relations",), subject="relation")
+def _lags(snapshot: Snapshot) -> list[Any]:
+    limit = snapshot.options["lag_limit"] * 8.0
+    return [
+        x.task_pred_id
+        for x in snapshot["relations"]
+        if x.lag_hr_cnt and x.lag_hr_cnt > limit
+    ]
+
+
+@rule("leads", needs=("relations",), subject="relation")
+def _leads(snapshot: Snapshot) -> list[Any]:
+    return [
+        x.task_pred_id
+        for x in snapshot["relations"]
+        if x.lag_hr_cnt and x.lag_hr_cnt < 0
+    ]
+
+
+@rule("non_fs_relations", needs=("relations",), subject="relation")
+def _non_fs_relations(snapshot: Snapshot) -> list[Any]:
+    return [x.task_pred_id for x in snapshot["relations"] if x.pred_type != "PR_FS"]
+
+
+@rule("hard_constraints", needs=("activities",))
+def _hard_constraints(snapshot: Snapshot) -> list[Any]:
+    return [
+        x.task_id
+        for x in snapshot["activities"]
+        if x.cstr_type in _HARD_CONSTRAINTS or x.cstr_type2 in _HARD_CONSTRAINTS
+    ]
+
+
+@rule("high_float", needs=("activities", "total_float"))
+def _high_float(snapshot: Snapshot) -> list[Any]:
+    limit = snapshot.options["tf_limit"] * 8.0
+    return [
+        task.task_id
+        for task, hours in zip(
+            snapshot["activities"], snapshot["total_float"], strict=True
+        )
+        if hours and hours > limit
+    ]
+
+
+@rule("negative_float", needs=("activities", "total_float"))
+def _negative_float(snapshot: Snapshot) -> list[Any]:
+    return [
+        task.task_id
+        for task, hours in zip(
+            snapshot["activities"], snapshot["total_float"], strict=True
+        )
+        if hours and hours < 0
+    ]
+
+
+@rule("high_duration", needs=("activities", "duration"))
+def _high_duration(snapshot: Snapshot) -> list[Any]:
+    limit = snapshot.options["duration_limit"]
+    return [
+        task.task_id
+        for task, days in zip(snapshot["activities"], snapshot["duration"], strict=True)
+        if days > limit
+    ]
+
+
+@rule("invalid_dates", needs=("activities", "data_dates"))
+def _invalid_dates(snapshot: Snapshot) -> list[Any]:
+    data_dates = snapshot["data_dates"]
+    found = []
+    for task in snapshot["activities"]:
+        data_date = data_dates.get(str(task.proj_id))
+        if data_date is None:
+            continue
+        if (
+            (task.act_start_date is not None and task.act_start_date > data_date)
+            or (task.act_end_date is not None and task.act_end_date > data_date)
+            or (task.early_start_date is not None and task.early_start_date < data_date)
+            or (task.early_end_date is not None and task.early_end_date < data_date)
+        ):
+            found.append(task.task_id)
+    return found
+
+
+@rule("no_resources", needs=("activities", "assignments"))
+def _no_resources(snapshot: Snapshot) -> list[Any]:
+    # as for DCMA check 10, assigning a role alone does not resource an activity
+    assigned = snapshot["assignments"]
+    return [
+        x.task_id
+        for x in snapshot["activities"]
+        if not any(a.rsrc_id for a in assigned.get(x.task_id, ()))
+    ]
+
+
+@rule("missed_activities", needs=("activities",))
+def _missed_activities(snapshot: Snapshot) -> list[Any]:
+    found = []
+    for task in snapshot["activities"]:
+        target = task.target_end_date
+        finish = task.act_end_date or task.early_end_date
+        if target is not None and finish is not None and finish > target:
+            found.append(task.task_id)
+    return found
+
+
+# Rules: common quality checks
+
+
+@rule("long_ss_lags", needs=("relations", "tasks"), subject="relation")
+def _long_ss_lags(snapshot: Snapshot) -> list[Any]:
+    """Start-to-start lags longer than the predecessor's duration."""
+    tasks = snapshot["tasks"]
+    found = []
+    for relation in snapshot["relations"]:
+        if relation.pred_type != "PR_SS" or not relation.lag_hr_cnt:
+            continue
+        pred = tasks.get(relation.pred_task_id)
+        if pred is not None and relation.lag_hr_cnt > (pred.target_drtn_hr_cnt or 0):
+            found.append(relation.task_pred_id)
+    return found
+
+
+@rule("out_of_sequence", needs=("relations", "tasks"), subject="relation")
+def _out_of_sequence(snapshot: Snapshot) -> list[Any]:
+    """Relationships violated by actual progress."""
+    found = find_out_of_sequence(
+        snapshot.programme, snapshot["tasks"], snapshot["relations"]
+    )
+    return [x["task_pred_id"] for x in found]
+
+
+@rule("missing_codes", needs=("activities", "activity_codes"))
+def _missing_codes(snapshot: Snapshot) -> list[Any]:
+    """Activities without a value for every ``required_codes`` type ID."""
+    required = [str(x) for x in snapshot.options["required_codes"]]
+    if not required:
+        return []
+    codes = snapshot["activity_codes"]
+    empty: dict[str, Any] = {}
+    return [
+        x.task_id
+        for x in snapshot["activities"]
+        if any(code not in codes.get(x.task_id, empty) for code in required)
+    ]
+
+
+@rule("missing_actual_dates", needs=("status",))
+def _missing_actual_dates(snapshot: Snapshot) -> list[Any]:
+    """Started activities without an actual start, completed ones without an
+    actual finish."""
+    status = snapshot["status"]
+    found = [
+        x.task_id
+        for x in status[ActivityStatus.InProgress] + status[ActivityStatus.Complete]
+        if x.act_start_date is None
+    ]
+    found.extend(
+        x.task_id
+        for x in status[ActivityStatus.Complete]
+        if x.act_end_date is None and x.act_start_date is not None
+    )
+    return found
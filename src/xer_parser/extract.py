@@ -0,0 +1,288 @@
+"""
+Extraction of a single project from a multi-project XER file.
+
+A ``ProjectIndex`` groups the records of the project tables (``PROJWBS``,
+``TASK``, ``TASKRSRC``, ...) by project and keys the records of the global
+tables (calendars, resources, currencies, code types, ...) by their ID, in
+one pass over a Reader. Selecting a project then visits only its own records
+and follows their references to the global records they need, with the
+ancestors of those (parent resources, accounts, OBS nodes and base
+calendars): once the index is built, extracting a project costs time in
+proportion to the project rather than to the file.
+
+The selection is written by ``writeXER`` with its ``records`` option, so it
+is streamed like a complete file, or copied from the source file for a
+Reader created with ``track_changes``.
+"""
+
+from typing import Any
+
+from xer_parser.write import XER_TABLES, writeXER
+
+__all__ = ["ProjectIndex", "extract_project"]
+
+# Tables whose records belong to a project through their proj_id
+PROJECT_TABLES = (
+    "PROJECT",
+    "CALENDAR",
+    "PROJPCAT",
+    "SCHEDOPTIONS",
+    "PROJWBS",
+    "ACTVTYPE",
+    "TASK",
+    "TASKPRED",
+    "TASKPROC",
+    "TASKRSRC",
+    "TASKACTV",
+    "UDFVALUE",
+)
+
+# Global tables, with the field identifying their records and the field
+# referencing the parent record
+GLOBAL_TABLES = {
+    "CURRTYPE": ("curr_id", None),
+    "FINTMPL": ("fintmpl_id", None),
+    "OBS": ("obs_id", "parent_obs_id"),
+    "PCATTYPE": ("proj_catg_type_id", None),
+    "RSRCCURVDATA": ("curv_id", None),
+    "UDFTYPE": ("udf_type_id", None),
+    "ACCOUNT": ("acct_id", "parent_acct_id"),
+    "PCATVAL": ("proj_catg_id", "parent_proj_catg_id"),
+    "CALENDAR": ("clndr_id", "base_clndr_id"),
+    "RSRC": ("rsrc_id", "parent_rsrc_id"),
+    "ACTVTYPE": ("actv_code_type_id", None),
+}
+
+# Global tables written with every record of a selected record, by the
+# field referencing it
+DETAIL_TABLES = {
+    "RSRCRATE": ("rsrc_id", "RSRC"),
+    "ACTVCODE": ("actv_code_type_id", "ACTVTYPE"),
+}
+
+# References followed, in order: the referencing table and field, and the
+# table referenced
+REFERENCES = (
+    ("PROJECT", "clndr_id", "CALENDAR"),
+    ("PROJECT", "acct_id", "ACCOUNT"),
+    ("PROJECT", "fintmpl_id", "FINTMPL"),
+    ("PROJWBS", "obs_id", "OBS"),
+    ("TASK", "clndr_id", "CALENDAR"),
+    ("TASK", "rsrc_id", "RSRC"),
+    ("TASKRSRC", "rsrc_id", "RSRC"),
+    ("TASKRSRC", "acct_id", "ACCOUNT"),
+    ("TASKRSRC", "curv_id", "RSRCCURVDATA"),
+    ("TASKACTV", "actv_code_type_id", "ACTVTYPE"),
+    ("UDFVALUE", "udf_type_id", "UDFTYPE"),
+    ("PROJPCAT", "proj_catg_type_id", "PCATTYPE"),
+    ("PROJPCAT", "proj_catg_id", "PCATVAL"),
+    ("PCATVAL", "proj_catg_type_id", "PCATTYPE"),
+    ("RSRC", "clndr_id", "CALENDAR"),
+    ("RSRC", "curr_id", "CURRTYPE"),
+)
+
+# Tables no record refers to, written whole
+LOOKUP_TABLES = ("NONWORK",)
+
+
+def _key(value: Any) -> str | None:
+    # IDs are parsed as int by some classes and as str by others
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class ProjectIndex:
+    """
+    Index of the records of a Reader by project and by ID.
+
+    Parameters
+    ----------
+    r : Reader
+        The Reader object containing the parsed XER data
+
+    Attributes
+    ----------
+    projects : dict[str, dict[str, tuple[list[int], list[Any]]]]
+        For every project ID, the positions in their table and the records
+        of every project table
+    keys : dict[str, dict[str, tuple[int, Any]]]
+        For every global table, its records and their position by ID
+    details : dict[str, dict[str, list[tuple[int, Any]]]]
+        For every detail table, its records and their position by the ID of
+        the record they belong to
+
+    Notes
+    -----
+    The index reflects the records when it was built: build it again after
+    adding records or moving them to another project. ``stale`` notices
+    added and removed records.
+    """
+
+    def __init__(self, r: Any) -> None:
+        self.reader = r
+        self.sizes = self._sizes()
+        self.projects: dict[str, dict[str, tuple[list[int], list[Any]]]] = {}
+        self.keys: dict[str, dict[str, tuple[int, Any]]] = {}
+        self.details: dict[str, dict[str, list[tuple[int, Any]]]] = {}
+        for table in PROJECT_TABLES:
+            # grouped by the parsed proj_id first, normalised once per group;
+            # positions and records are kept apart as a tuple per record
+            # would wake the garbage collector over and over
+            groups: dict[Any, tuple[list[int], list[Any]]] = {}
+            for position, record in enumerate(self._records(table)):
+                proj_id = getattr(record, "proj_id", None)
+                group = groups.get(proj_id)
+                if group is None:
+                    group = groups[proj_id] = ([], [])
+                group[0].append(position)
+                group[1].append(record)
+            for proj_id, group in groups.items():
+                proj_id = _key(proj_id)
+                if proj_id is not None:
+                    tables = self.projects.setdefault(proj_id, {})
+                    positions, records = tables.setdefault(table, ([], []))
+                    positions.extend(group[0])
+                    records.extend(group[1])
+        for table, (field, _) in GLOBAL_TABLES.items():
+            self.keys[table] = {
+                _key(getattr(record, field, None)): (position, record)
+                for position, record in enumerate(self._records(table))
+            }
+        for table, (field, _) in DETAIL_TABLES.items():
+            details = self.details[table] = {}
+            for position, record in enumerate(self._records(table)):
+                key = _key(getattr(record, field, None))
+                details.setdefault(key, []).append((position, record))
+
+    def _records(self, table: str) -> list[Any]:
+        for name, collection, records in XER_TABLES:
+            if name == table:
+                return getattr(getattr(self.reader, collection), records)
+        return []
+
+    def _sizes(self) -> tuple[int, ...]:
+        return tuple(
+            len(getattr(getattr(self.reader, collection), records))
+            for _, collection, records in XER_TABLES
+        )
+
+    def stale(self) -> bool:
+        """
+        Check whether records were added or removed since the index was built.
+
+        Returns
+        -------
+        bool
+            True if the number of records of a table changed
+        """
+        return self._sizes() != self.sizes
+
+    def select(self, proj_id: Any) -> dict[str, list[Any]]:
+        """
+        Select the records of a project and the global records they need.
+
+        The project's own records are its project, calendars, WBS, activities,
+        assignments, activity codes, UDF values, categories, schedule options
+        and steps, and the relationships between its activities;
+        relationships to activities of other projects are left out. The
+        global records are those referenced by these, with their ancestors,
+        and the rates of the resources and values of the code types
+        selected.
+
+        Parameters
+        ----------
+        proj_id : int or str
+            The project ID
+
+        Returns
+        -------
+        dict[str, list[Any]]
+            The records of every table, in the order of the file
+
+        Raises
+        ------
+        ValueError
+            If there is no project with that ID
+        """
+        own = self.projects.get(_key(proj_id), {})
+        if "PROJECT" not in own:
+            raise ValueError(f"No project with proj_id {proj_id}")
+        selected: dict[str, dict[int, Any]] = {
+            table: dict(zip(*records, strict=True)) for table, records in own.items()
+        }
+        # relationships are kept when both activities are in the project
+        tasks = {x.task_id for x in own.get("TASK", ((), ()))[1]}
+        selected["TASKPRED"] = {
+            position: record
+            for position, record in selected.get("TASKPRED", {}).items()
+            if record.pred_task_id in tasks
+        }
+        for table, field, target in REFERENCES:
+            for record in list(selected.get(table, {}).values()):
+                self._need(selected, target, _key(getattr(record, field, None)))
+        for table, (_, owner) in DETAIL_TABLES.items():
+            details = self.details[table]
+            chosen = selected.setdefault(table, {})
+            field = GLOBAL_TABLES[owner][0]
+            for record in selected.get(owner, {}).values():
+                chosen.update(details.get(_key(getattr(record, field, None)), ()))
+        for table in LOOKUP_TABLES:
+            selected[table] = dict(enumerate(self._records(table)))
+        return {
+            table: [records[x] for x in sorted(records)]
+            for table, records in selected.items()
+            if records
+        }
+
+    def _need(self, selected: dict[str, dict[int, Any]], table: str, key: Any) -> None:
+        # add a global record and its ancestors
+        keys = self.keys[table]
+        parent = GLOBAL_TABLES[table][1]
+        chosen = selected.setdefault(table, {})
+        while key is not None:
+            found = keys.get(key)
+            if found is None or found[0] in chosen:
+                return
+            chosen[found[0]] = found[1]
+            key = _key(getattr(found[1], parent, None)) if parent else None
+
+
+def extract_project(
+    r: Any, proj_id: Any, filename: str, index: ProjectIndex | None = None
+) -> None:
+    """
+    Write a single project of a Reader, with the global records it needs.
+
+    Parameters
+    ----------
+    r : Reader
+        The Reader object containing the parsed XER data
+    proj_id : int or str
+        The project ID
+    filename : str
+        Path to the output XER file
+    index : ProjectIndex, optional
+        The index of the Reader, built for this call if not given; pass the
+        same index to extract several projects
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError
+        If there is no project with that ID
+
+    Examples
+    --------
+    >>> from xer_parser.extract import ProjectIndex, extract_project
+    >>> index = ProjectIndex(xer)
+    >>> for project in xer.projects.projects:
+    ...     name = f"{project.proj_short_name}.xer"
+    ...     extract_project(xer, project.proj_id, name, index)
+    """
+    index = ProjectIndex(r) if index is None else index
+    writeXER(r, filename, records=index.select(proj_id))
@@ -0,0 +1,151 @@
+"""
+Field formatters for writing XER files.
+
+Values are written the way P6 exports them: dates as ``%Y-%m-%d %H:%M``,
+whole numbers without a decimal part (``8`` rather than ``8.0``), other
+numbers in plain decimal notation and flags as ``Y`` or ``N``. Formatted
+dates are memoised, as a programme repeats the same few thousand dates
+across its activities and assignments.
+
+``RowFormatter`` picks the formatter of every column once per table from the
+field names, and only visits the date, number and flag columns of each row;
+text and integer fields are left to ``csv.writer`` as they are.
+"""
+
+import re
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any
+
+__all__ = ["DATE_FORMAT", "RowFormatter", "format_date", "format_flag", "format_number"]
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Formatted dates; cleared when full, long runs of dates repeat anyway
+_DATES: dict[datetime, str] = {}
+_DATES_SIZE = 1 << 16
+
+# Fields holding numbers, by name
+_NUMBER_FIELD = re.compile(
+    r"(_cnt|_qty\d?|_cost|cost_per_qty\d?|_pct|_wt|_per_hr|_amt|_len|pct_usage_\d+)$"
+)
+
+
+def format_date(value: Any) -> Any:
+    """
+    Format a date as P6 writes it.
+
+    Parameters
+    ----------
+    value : datetime or Any
+        The date; any other value is returned unchanged
+
+    Returns
+    -------
+    str or Any
+        The date as ``%Y-%m-%d %H:%M``
+    """
+    if type(value) is not datetime:
+        return value
+    text = _DATES.get(value)
+    if text is None:
+        if len(_DATES) >= _DATES_SIZE:
+            _DATES.clear()
+        text = _DATES[value] = value.strftime(DATE_FORMAT)
+    return text
+
+
+def format_number(value: Any) -> Any:
+    """
+    Format a number as P6 writes it.
+
+    Parameters
+    ----------
+    value : float or Any
+        The number; any value other than a float is returned unchanged
+
+    Returns
+    -------
+    str or Any
+        Whole numbers without a decimal part, others in decimal notation
+        without an exponent
+    """
+    if type(value) is not float:
+        return value
+    if value.is_integer():
+        return str(int(value))
+    text = repr(value)
+    if "e" in text:
+        text = format(value, "f").rstrip("0").rstrip(".")
+    return text
+
+
+def format_flag(value: Any) -> Any:
+    """
+    Format a flag as P6 writes it.
+
+    Parameters
+    ----------
+    value : bool or Any
+        The flag; any value other than a bool is returned unchanged
+
+    Returns
+    -------
+    str or Any
+        ``Y`` or ``N``
+    """
+    if type(value) is not bool:
+        return value
+    return "Y" if value else "N"
+
+
+def _formatter(name: str) -> Callable[[Any], Any] | None:
+    if name.endswith("_date"):
+        return format_date
+    if name.endswith("_flag"):
+        return format_flag
+    if _NUMBER_FIELD.search(name):
+        return format_number
+    return None
+
+
+class RowFormatter:
+    """
+    Formats the date, number and flag fields of the rows of a table.
+
+    Parameters
+    ----------
+    fields : Sequence[str]
+        Field names of the table, in the order of the rows after their
+        ``%R`` marker
+    """
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.columns = [
+            (i, formatter)
+            for i, formatter in enumerate(map(_formatter, fields), 1)
+            if formatter is not None
+        ]
+
+    def __call__(self, row: list[Any]) -> list[Any]:
+        """
+        Format a row.
+
+        Parameters
+        ----------
+        row : list[Any]
+            The ``%R`` row, not modified
+
+        Returns
+        -------
+        list[Any]
+            A copy of the row with its dates, numbers and flags formatted
+        """
+        row = list(row)
+        size = len(row)
+        for i, formatter in self.columns:
+            if i < size:
+                value = row[i]
+                if value is not None:
+                    row[i] = formatter(value)
+        return row
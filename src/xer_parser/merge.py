@@ -0,0 +1,505 @@
+"""
+Merging of several XER files into one.
+
+The IDs of different exports collide: two contractors' files both have a
+``task_id`` 1000 and a ``clndr_id`` 1. ``XERMerger`` reads the files row by
+row, without creating their objects, in two passes:
+
+1. ``scan`` reads every file once and builds, per file, a dictionary of new
+   IDs for every table. A record keeps its ID unless an earlier file has
+   taken it, otherwise it gets the next free ID of its table. The records
+   of the global tables (currencies, calendars, resources, code types, ...)
+   are looked up by their GUID, or their natural key (such as
+   ``rsrc_short_name``) without one, and a record already merged from an
+   earlier file is mapped onto it rather than written again. The byte
+   range of every table of every file is kept.
+2. ``write`` streams each table of each file from its byte range in turn,
+   rewrites the primary and foreign keys of every row through the
+   dictionaries of its file and writes the merged table.
+
+Memory use is limited to the dictionaries and sets of IDs, whatever the size
+of the files. Only the fields of ``REFERENCES`` are rewritten: the IDs of
+tables not listed there are written as they are.
+"""
+
+import csv
+import logging
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from xer_parser.write import write_rows
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["XERMerger", "merge_xer"]
+
+# Primary key of every table with one
+PRIMARY_KEYS = {
+    "ACCOUNT": "acct_id",
+    "ACTVCODE": "actv_code_id",
+    "ACTVTYPE": "actv_code_type_id",
+    "CALENDAR": "clndr_id",
+    "CURRTYPE": "curr_id",
+    "FINTMPL": "fintmpl_id",
+    "LOCATION": "location_id",
+    "MEMOTYPE": "memo_type_id",
+    "NONWORK": "nonwork_type_id",
+    "OBS": "obs_id",
+    "PCATTYPE": "proj_catg_type_id",
+    "PCATVAL": "proj_catg_id",
+    "PROJECT": "proj_id",
+    "PROJWBS": "wbs_id",
+    "RCATTYPE": "rsrc_catg_type_id",
+    "RCATVAL": "rsrc_catg_id",
+    "ROLERATE": "role_rate_id",
+    "ROLES": "role_id",
+    "RSRC": "rsrc_id",
+    "RSRCCURVDATA": "curv_id",
+    "RSRCRATE": "rsrc_rate_id",
+    "SCHEDOPTIONS": "schedoptions_id",
+    "TASK": "task_id",
+    "TASKMEMO": "memo_id",
+    "TASKPRED": "task_pred_id",
+    "TASKPROC": "proc_id",
+    "TASKRSRC": "taskrsrc_id",
+    "UDFTYPE": "udf_type_id",
+    "UMEASURE": "unit_id",
+}
+
+# Table referenced by every key field, primary keys included
+REFERENCES = {
+    **{field: table for table, field in PRIMARY_KEYS.items()},
+    "base_clndr_id": "CALENDAR",
+    "parent_acct_id": "ACCOUNT",
+    "parent_actv_code_id": "ACTVCODE",
+    "parent_obs_id": "OBS",
+    "parent_proj_catg_id": "PCATVAL",
+    "parent_role_id": "ROLES",
+    "parent_rsrc_catg_id": "RCATVAL",
+    "parent_rsrc_id": "RSRC",
+    "parent_wbs_id": "PROJWBS",
+    "pred_proj_id": "PROJECT",
+    "pred_task_id": "TASK",
+}
+
+# Global tables, with the fields of their natural key; their records are
+# shared between files, and those with a proj_id belong to the project
+SHARED_KEYS = {
+    "ACCOUNT": ("parent_acct_id", "acct_short_name"),
+    "ACTVCODE": ("actv_code_type_id", "parent_actv_code_id", "short_name"),
+    "ACTVTYPE": ("actv_code_type",),
+    "CALENDAR": ("clndr_type", "clndr_name"),
+    "CURRTYPE": ("curr_short_name",),
+    "FINTMPL": ("fintmpl_name",),
+    "LOCATION": ("location_name",),
+    "MEMOTYPE": ("memo_type",),
+    "NONWORK": ("nonwork_code",),
+    "OBS": ("parent_obs_id", "obs_name"),
+    "PCATTYPE": ("proj_catg_type",),
+    "PCATVAL": ("proj_catg_type_id", "parent_proj_catg_id", "proj_catg_short_name"),
+    "RCATTYPE": ("rsrc_catg_type",),
+    "RCATVAL": ("rsrc_catg_type_id", "parent_rsrc_catg_id", "rsrc_catg_short_name"),
+    "ROLES": ("role_short_name",),
+    "RSRC": ("rsrc_short_name",),
+    "RSRCCURVDATA": ("curv_name",),
+    "UDFTYPE": ("table_name", "udf_type_name"),
+    "UMEASURE": ("unit_abbrev",),
+}
+
+# Tables whose records are left out with the shared record they belong to
+OWNERS = {
+    "ROLERATE": "role_id",
+    "RSRCRATE": "rsrc_id",
+    "RSRCRCAT": "rsrc_id",
+}
+
+
+def _read_rows(
+    path: str, start: int = 0, end: int | None = None
+) -> Iterator[tuple[list[str], int]]:
+    """
+    Parse the rows of a byte range of a file.
+
+    Parameters
+    ----------
+    path : str
+        The XER file
+    start : int, optional
+        Offset of the first row, by default the start of the file
+    end : int, optional
+        Offset after the last row, by default the end of the file
+
+    Yields
+    ------
+    tuple[list[str], int]
+        The fields of every row and the offset after it
+    """
+    offset = [start]
+
+    def lines() -> Iterator[str]:
+        with open(path, "rb") as source:
+            source.seek(start)
+            for line in source:
+                if end is not None and offset[0] >= end:
+                    return
+                offset[0] += len(line)
+                yield line.decode("utf-8", errors="ignore")
+
+    for row in csv.reader(lines(), delimiter="\t"):
+        yield row, offset[0]
+
+
+class _Source:
+    """
+    The tables of a file and its new IDs.
+
+    Parameters
+    ----------
+    path : str
+        The XER file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.header: list[str] | None = None
+        self.order: list[str] = []
+        # fields, and byte range of the rows, of every table
+        self.tables: dict[str, tuple[list[str], int, int]] = {}
+        # changed IDs, and IDs of records merged into an earlier file's
+        self.remap: dict[str, dict[str, str]] = {}
+        self.dropped: dict[str, set[str]] = {}
+        # table of the records of every UDF type
+        self.udf_tables: dict[str, str] = {}
+
+
+class XERMerger:
+    """
+    Merges XER files into one, renumbering colliding IDs.
+
+    Parameters
+    ----------
+    sources : Sequence[str]
+        The XER files; on collisions, the IDs of earlier files are kept
+
+    Attributes
+    ----------
+    sources : list[str]
+        The XER files
+    order : list[str]
+        The tables of the merged file, in order
+
+    Examples
+    --------
+    >>> from xer_parser.merge import XERMerger
+    >>> merger = XERMerger(["north.xer", "south.xer"])
+    >>> merger.scan()
+    >>> merger.write("portfolio.xer")
+    >>> merger.new_id(1, "TASK", 1000)
+    """
+
+    def __init__(self, sources: Sequence[str]) -> None:
+        self.sources = list(sources)
+        self.order: list[str] = []
+        self._scanned: list[_Source] = []
+        # IDs taken, and the highest numeric ID, of every table
+        self._used: dict[str, set[str]] = {}
+        self._top: dict[str, int] = {}
+        # ID of every shared record by natural key, and the file it is from
+        self._shared: dict[str, dict[tuple[str, ...], tuple[int, str]]] = {}
+
+    def scan(self) -> None:
+        """
+        Read the files and build the new IDs of their records.
+
+        Returns
+        -------
+        None
+        """
+        self.order = []
+        self._scanned = []
+        self._used = {}
+        self._top = {}
+        self._shared = {}
+        for index, path in enumerate(self.sources):
+            source = _Source(path)
+            self._scan(index, source)
+            self._scanned.append(source)
+            previous = None
+            for table in source.order:
+                # tables missing from earlier files follow those they follow
+                if table not in self.order:
+                    position = 0 if previous is None else self.order.index(previous) + 1
+                    self.order.insert(position, table)
+                previous = table
+
+    def _scan(self, index: int, source: _Source) -> None:
+        table = fields = key = None
+        start = end = 0
+
+        def close() -> None:
+            if fields is not None:
+                source.tables[table] = (fields, start, end)
+
+        for row, offset in _read_rows(source.path):
+            kind = row[0].strip() if row else ""
+            if kind == "%R" and fields is not None:
+                end = offset
+                if key is not None:
+                    self._map(index, source, table, fields, key, row)
+            elif kind == "%T":
+                close()
+                table = row[1].strip()
+                fields = None
+                if table in source.order:
+                    logger.warning(
+                        "%s repeats table %s, ignoring it", source.path, table
+                    )
+                    table = None
+                else:
+                    source.order.append(table)
+            elif kind == "%F" and table is not None:
+                fields = [x.strip() for x in row[1:]]
+                start = end = offset
+                field = PRIMARY_KEYS.get(table)
+                key = fields.index(field) + 1 if field in fields else None
+            elif kind == "ERMHDR":
+                source.header = row
+        close()
+
+    def _map(
+        self,
+        index: int,
+        source: _Source,
+        table: str,
+        fields: list[str],
+        position: int,
+        row: list[str],
+    ) -> None:
+        # new ID of a record, possibly one merged from an earlier file
+        old = row[position].strip() if position < len(row) else ""
+        if not old:
+            return
+        key = None
+        if table in SHARED_KEYS:
+            values = dict(zip(fields, row[1:], strict=False))
+            if table == "UDFTYPE":
+                source.udf_tables[old] = values.get("table_name", "").strip()
+            key = self._shared_key(source, table, values)
+        if key is not None:
+            shared = self._shared.setdefault(table, {})
+            found = shared.get(key)
+            if found is not None and found[0] != index:
+                source.dropped.setdefault(table, set()).add(old)
+                if found[1] != old:
+                    source.remap.setdefault(table, {})[old] = found[1]
+                return
+        new = self._allocate(table, old)
+        if new != old:
+            source.remap.setdefault(table, {})[old] = new
+        if key is not None and key not in shared:
+            shared[key] = (index, new)
+
+    def _shared_key(
+        self, source: _Source, table: str, values: dict[str, str]
+    ) -> tuple[str, ...] | None:
+        fields = SHARED_KEYS.get(table)
+        if fields is None or values.get("proj_id", "").strip():
+            return None
+        guid = values.get("guid", "").strip()
+        if guid:
+            return ("guid", guid)
+        key = []
+        for field in fields:
+            value = values.get(field, "").strip()
+            target = REFERENCES.get(field)
+            if target is not None:
+                value = source.remap.get(target, {}).get(value, value)
+            key.append(value)
+        if not any(key):
+            return None
+        return (table, *key)
+
+    def _allocate(self, table: str, old: str) -> str:
+        used = self._used.setdefault(table, set())
+        top = self._top.get(table, 0)
+        if old not in used:
+            new = old
+        else:
+            new = str(top + 1)
+        used.add(new)
+        if new.isdigit() and int(new) > top:
+            self._top[table] = int(new)
+        return new
+
+    def new_id(self, source: int, table: str, old: Any) -> str:
+        """
+        Get the ID of a record of a file in the merged file.
+
+        Parameters
+        ----------
+        source : int
+            Position of the file in ``sources``
+        table : str
+            The table, such as ``TASK``
+        old : Any
+            The ID of the record in the file
+
+        Returns
+        -------
+        str
+            Its ID in the merged file
+        """
+        old = str(old).strip()
+        return self._source(source).remap.get(table, {}).get(old, old)
+
+    def is_merged(self, source: int, table: str, old: Any) -> bool:
+        """
+        Check whether a record was merged into the record of an earlier file.
+
+        Parameters
+        ----------
+        source : int
+            Position of the file in ``sources``
+        table : str
+            The table, such as ``RSRC``
+        old : Any
+            The ID of the record in the file
+
+        Returns
+        -------
+        bool
+            True if the record is not written, as an earlier file has it
+        """
+        return str(old).strip() in self._source(source).dropped.get(table, ())
+
+    def _source(self, source: int) -> _Source:
+        if not self._scanned:
+            self.scan()
+        return self._scanned[source]
+
+    def iter_rows(self) -> Iterator[list[str]]:
+        """
+        Yield the rows of the merged file, one at a time.
+
+        Yields
+        ------
+        list[str]
+            The ``ERMHDR`` header row of the first file, the ``%T``, ``%F``
+            and ``%R`` rows of every table, then the ``%E`` end row
+        """
+        if not self._scanned:
+            self.scan()
+        header = next((x.header for x in self._scanned if x.header), None)
+        yield header or ["ERMHDR"]
+        for table in self.order:
+            sources = [x for x in self._scanned if table in x.tables]
+            if all(x.tables[table][1] == x.tables[table][2] for x in sources):
+                continue
+            fields: list[str] = []
+            for source in sources:
+                fields.extend(x for x in source.tables[table][0] if x not in fields)
+            yield ["%T", table]
+            yield ["%F", *fields]
+            for source in sources:
+                yield from self._rewrite(source, table, fields)
+        yield ["%E"]
+
+    def _rewrite(
+        self, source: _Source, table: str, fields: list[str]
+    ) -> Iterator[list[str]]:
+        own, start, end = source.tables[table]
+        positions = {field: i for i, field in enumerate(own, 1)}
+        layout = [positions.get(field) for field in fields]
+        columns = [
+            (i, source.remap[REFERENCES[field]])
+            for i, field in enumerate(fields, 1)
+            if field in REFERENCES and REFERENCES[field] in source.remap
+        ]
+        skip = [
+            (positions[field], source.dropped[target])
+            for field, target in (
+                (PRIMARY_KEYS.get(table), table),
+                (OWNERS.get(table), REFERENCES.get(OWNERS.get(table, ""))),
+            )
+            if field in positions and target in source.dropped
+        ]
+        udf = None
+        if table == "UDFVALUE" and "udf_type_id" in positions and "fk_id" in positions:
+            udf = (
+                positions["udf_type_id"],
+                positions["fk_id"],
+                fields.index("fk_id") + 1,
+            )
+        size = len(own) + 1
+        # rows of a file with the merged fields are rewritten in place
+        same = layout == list(range(1, size)) and len(fields) == len(own)
+        for row, _ in _read_rows(source.path, start, end):
+            if not row or row[0].strip() != "%R":
+                continue
+            if len(row) < size:
+                row.extend([""] * (size - len(row)))
+            if skip and any(row[i].strip() in dropped for i, dropped in skip):
+                continue
+            if same:
+                merged = row[:size] if len(row) > size else row
+            else:
+                merged = ["%R", *("" if i is None else row[i] for i in layout)]
+            for i, remap in columns:
+                new = remap.get(merged[i].strip())
+                if new is not None:
+                    merged[i] = new
+            if udf is not None:
+                # the record of a UDF value is in the table of its type
+                target = source.udf_tables.get(row[udf[0]].strip())
+                fk = row[udf[1]].strip()
+                if fk in source.dropped.get(target, ()):
+                    continue
+                new = source.remap.get(target, {}).get(fk)
+                if new is not None:
+                    merged[udf[2]] = new
+            yield merged
+
+    def write(self, filename: str, buffer_size: int = 1 << 20) -> None:
+        """
+        Write the merged file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the output XER file
+        buffer_size : int, optional
+            Size of the write buffer in bytes, by default 1 MiB
+
+        Returns
+        -------
+        None
+        """
+        with open(filename, "wb", buffering=buffer_size) as output:
+            write_rows(output, self.iter_rows(), formatted=False)
+
+
+def merge_xer(sources: Sequence[str], filename: str) -> XERMerger:
+    """
+    Merge XER files into one.
+
+    Parameters
+    ----------
+    sources : Sequence[str]
+        The XER files; on collisions, the IDs of earlier files are kept
+    filename : str
+        Path to the output XER file
+
+    Returns
+    -------
+    XERMerger
+        The merger, to look up the new IDs of records with ``new_id``
+
+    Examples
+    --------
+    >>> from xer_parser.merge import merge_xer
+    >>> merger = merge_xer(["north.xer", "south.xer"], "portfolio.xer")
+    """
+    merger = XERMerger(sources)
+    merger.scan()
+    merger.write(filename)
+    return merger
@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 from xer_parser.model.classes.account import Account
 
 __all__ = ["Accounts"]
@@ -12,24 +14,26 @@ class Accounts:
         self._accounts.append(Account(params))
 
     def get_tsv(self) -> list:
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list]:
         if len(self._accounts) > 0:
-            tsv.append(["%T", "ACCOUNT"])
-            tsv.append(
-                [
-                    "%F",
-                    "acct_id",
-                    "parent_acct_id",
-                    "acct_seq_num",
-                    "acct_name",
-                    "acct_short_name",
-                    "acct_descr",
-                ]
-            )
+            yield ["%T", "ACCOUNT"]
+            yield [
+                "%F",
+                "acct_id",
+                "parent_acct_id",
+                "acct_seq_num",
+                "acct_name",
+                "acct_short_name",
+                "acct_descr",
+            ]
             for account in self._accounts:
-                tsv.append(account.get_tsv())
-            return tsv
-        return []
+                yield account.get_tsv()
+
+    @property
+    def accounts(self) -> list[Account]:
+        return self._accounts
 
     def count(self) -> int:
         return len(self._accounts)
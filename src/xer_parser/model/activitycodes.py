@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 from xer_parser.model.classes.activitycode import ActivityCode
 
 __all__ = ["ActivityCodes"]
@@ -15,26 +17,24 @@ class ActivityCodes:
         return len(self._activitycodes)
 
     def get_tsv(self) -> list:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list]:
         if len(self._activitycodes) > 0:
-            tsv = []
-            tsv.append(["%T", "ACTVCODE"])
-            tsv.append(
-                [
-                    "%F",
-                    "actv_code_id",
-                    "parent_actv_code_id",
-                    "actv_code_type_id",
-                    "actv_code_name",
-                    "short_name",
-                    "seq_num",
-                    "color",
-                    "total_assignments",
-                ]
-            )
+            yield ["%T", "ACTVCODE"]
+            yield [
+                "%F",
+                "actv_code_id",
+                "parent_actv_code_id",
+                "actv_code_type_id",
+                "actv_code_name",
+                "short_name",
+                "seq_num",
+                "color",
+                "total_assignments",
+            ]
             for code in self._activitycodes:
-                tsv.append(code.get_tsv())
-            return tsv
-        return []
+                yield code.get_tsv()
 
     def find_by_id(self, id) -> ActivityCode:
         obj = list(filter(lambda x: x.actv_code_id == id, self._activitycodes))
@@ -46,6 +46,10 @@ class ActivityCodes:
         obj = list(filter(lambda x: x.actv_code_type_id == id, self._activitycodes))
         return obj
 
+    @property
+    def activitycodes(self) -> list[ActivityCode]:
+        return self._activitycodes
+
     def __len__(self) -> int:
         return len(self._activitycodes)
 
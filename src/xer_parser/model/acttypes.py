@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.acttype import ActType
@@ -22,29 +23,31 @@ class ActTypes:
         return obj
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._activitytypes) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "ACTVTYPE"])
-            tsv.append(
-                [
-                    "%F",
-                    "actv_code_type_id",
-                    "actv_short_len",
-                    "seq_num",
-                    "actv_code_type",
-                    "proj_id",
-                    "wbs_id",
-                    "actv_code_type_scope",
-                ]
-            )
+            yield ["%T", "ACTVTYPE"]
+            yield [
+                "%F",
+                "actv_code_type_id",
+                "actv_short_len",
+                "seq_num",
+                "actv_code_type",
+                "proj_id",
+                "wbs_id",
+                "actv_code_type_scope",
+            ]
             for acttyp in self._activitytypes:
-                tsv.append(acttyp.get_tsv())
-            return tsv
-        return []
+                yield acttyp.get_tsv()
 
     def count(self) -> int:
         return len(self._activitytypes)
 
+    @property
+    def acttypes(self) -> list[ActType]:
+        return self._activitytypes
+
     def __len__(self) -> int:
         return len(self._activitytypes)
 
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.calendar import Calendar
@@ -14,31 +15,29 @@ class Calendars:
         self._calendars.append(Calendar(params))
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._calendars) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "CALENDAR"])
-            tsv.append(
-                [
-                    "%F",
-                    "clndr_id",
-                    "default_flag",
-                    "clndr_name",
-                    "proj_id",
-                    "base_clndr_id",
-                    "last_chng_date",
-                    "clndr_type",
-                    "day_hr_cnt",
-                    "week_hr_cnt",
-                    "month_hr_cnt",
-                    "year_hr_cnt",
-                    "rsrc_private",
-                    "clndr_data",
-                ]
-            )
+            yield ["%T", "CALENDAR"]
+            yield [
+                "%F",
+                "clndr_id",
+                "default_flag",
+                "clndr_name",
+                "proj_id",
+                "base_clndr_id",
+                "last_chng_date",
+                "clndr_type",
+                "day_hr_cnt",
+                "week_hr_cnt",
+                "month_hr_cnt",
+                "year_hr_cnt",
+                "rsrc_private",
+                "clndr_data",
+            ]
             for cal in self._calendars:
-                tsv.append(cal.get_tsv())
-            return tsv
-        return []
+                yield cal.get_tsv()
 
     def find_by_id(self, id: Any) -> Calendar | list[Calendar]:
         obj: list[Calendar] = list(filter(lambda x: x.clndr_id == id, self._calendars))
@@ -46,6 +45,10 @@ class Calendars:
             return obj[0]
         return obj
 
+    @property
+    def calendars(self) -> list[Calendar]:
+        return self._calendars
+
     def count(self) -> int:
         return len(self._calendars)
 
@@ -24,3 +24,15 @@ class DurationTypes:
     FixedDurationAndUnits = "DT_FixedDrtn"
     FixedRate = "DT_FixedRate"
     FixedDuration = "DT_FixedDUR2"
+
+
+class ConstraintType:
+    StartOn = "CS_MSO"
+    StartOnOrBefore = "CS_MSOB"
+    StartOnOrAfter = "CS_MSOA"
+    FinishOn = "CS_MEO"
+    FinishOnOrBefore = "CS_MEOB"
+    FinishOnOrAfter = "CS_MEOA"
+    AsLateAsPossible = "CS_ALAP"
+    MandatoryStart = "CS_MANDSTART"
+    MandatoryFinish = "CS_MANDFIN"
@@ -151,6 +151,18 @@ class ResourceCurve:
         ]
         return tsv
 
+    @property
+    def pct_usage(self):
+        """
+        Get the 21 curve points, at 0%, 5%, ... 100% of the duration.
+
+        Returns
+        -------
+        list[float]
+            ``pct_usage_0`` to ``pct_usage_20``, with missing points as 0
+        """
+        return [getattr(self, f"pct_usage_{i}") or 0.0 for i in range(21)]
+
     @classmethod
     def find_by_id(cls, id):
         return next((x for x in cls.obj_list if x.curv_id == id), None)
@@ -2,6 +2,7 @@ import locale
 from datetime import datetime
 from typing import Any, ClassVar
 
+from xer_parser.formatting import format_date
 from xer_parser.model.classes.calendar import Calendar
 from xer_parser.model.taskprocs import TaskProcs
 
@@ -362,16 +363,13 @@ class Task:
             if params.get("resume_date")
             else None
         )
-        self.int_path = (
-            params.get("int_path").strip() if params.get("int_path") else None
-        )
+        # Float path (``float_path`` column) computed by the project scheduler.
+        int_path = params.get("float_path") or params.get("int_path")
+        self.int_path = int_path.strip() if int_path else None
         # This field is computed by the project scheduler and identifies the order in which the activities were
         # processed within the int path.
-        self.int_path_order = (
-            params.get("int_path_order").strip()
-            if params.get("int_path_order")
-            else None
-        )
+        int_path_order = params.get("float_path_order") or params.get("int_path_order")
+        self.int_path_order = int_path_order.strip() if int_path_order else None
         self.guid = params.get("guid").strip() if params.get("guid") else None
         self.tmpl_guid = (
             params.get("tmpl_guid").strip() if params.get("tmpl_guid") else None
@@ -483,85 +481,37 @@ class Task:
             self.target_equip_qty,
             self.act_equip_qty,
             self.remain_equip_qty,
-            self.cstr_date.strftime("%Y-%m-%d %H:%M") if self.cstr_date else None,
-            (
-                self.act_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.act_start_date
-                else None
-            ),
-            self.act_end_date.strftime("%Y-%m-%d %H:%M") if self.act_end_date else None,
-            (
-                self.late_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.late_start_date
-                else None
-            ),
-            (
-                self.late_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.late_end_date
-                else None
-            ),
-            (
-                self.expect_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.expect_end_date
-                else None
-            ),
-            (
-                self.early_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.early_start_date
-                else None
-            ),
-            (
-                self.early_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.early_end_date
-                else None
-            ),
-            self.restart_date.strftime("%Y-%m-%d %H:%M") if self.restart_date else None,
-            self.reend_date.strftime("%Y-%m-%d %H:%M") if self.reend_date else None,
-            (
-                self.target_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.target_start_date
-                else None
-            ),
-            (
-                self.target_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.target_end_date
-                else None
-            ),
-            (
-                self.rem_late_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.rem_late_start_date
-                else None
-            ),
-            (
-                self.rem_late_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.rem_late_end_date
-                else None
-            ),
+            format_date(self.cstr_date),
+            format_date(self.act_start_date),
+            format_date(self.act_end_date),
+            format_date(self.late_start_date),
+            format_date(self.late_end_date),
+            format_date(self.expect_end_date),
+            format_date(self.early_start_date),
+            format_date(self.early_end_date),
+            format_date(self.restart_date),
+            format_date(self.reend_date),
+            format_date(self.target_start_date),
+            format_date(self.target_end_date),
+            format_date(self.rem_late_start_date),
+            format_date(self.rem_late_end_date),
             self.cstr_type,
             self.priority_type,
-            self.suspend_date.strftime("%Y-%m-%d %H:%M") if self.suspend_date else None,
-            self.resume_date.strftime("%Y-%m-%d %H:%M") if self.resume_date else None,
+            format_date(self.suspend_date),
+            format_date(self.resume_date),
             self.int_path,
             self.int_path_order,
             self.guid,
             self.tmpl_guid,
-            self.cstr_date2.strftime("%Y-%m-%d %H:%M") if self.cstr_date2 else None,
+            format_date(self.cstr_date2),
             self.cstr_type2,
             self.driving_path_flag,
             self.act_this_per_work_qty,
             self.act_this_per_equip_qty,
-            (
-                self.external_early_start_date.strftime("%Y-%m-%d %H:%M")
-                if self.external_early_start_date
-                else None
-            ),
-            (
-                self.external_late_end_date.strftime("%Y-%m-%d %H:%M")
-                if self.external_late_end_date
-                else None
-            ),
-            self.create_date.strftime("%Y-%m-%d %H:%M") if self.create_date else None,
-            self.update_date.strftime("%Y-%m-%d %H:%M") if self.update_date else None,
+            format_date(self.external_early_start_date),
+            format_date(self.external_late_end_date),
+            format_date(self.create_date),
+            format_date(self.update_date),
             self.create_user,
             self.update_user,
             self.location_id,
@@ -643,7 +593,7 @@ class Task:
         """
         dur = None
         if self.target_drtn_hr_cnt:
-            if self.calendar.day_hr_cnt:
+            if self.calendar is not None and self.calendar.day_hr_cnt:
                 dur = self.target_drtn_hr_cnt / self.calendar.day_hr_cnt
             else:
                 dur = self.target_drtn_hr_cnt / 8.0
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.currency import Currency
@@ -20,29 +21,31 @@ class Currencies:
         return obj
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._currencies) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "CURRTYPE"])
-            tsv.append(
-                [
-                    "%F",
-                    "curr_id",
-                    "decimal_digit_cnt",
-                    "curr_symbol",
-                    "decimal_symbol",
-                    "digit_group_symbol",
-                    "pos_curr_fmt_type",
-                    "neg_curr_fmt_type",
-                    "curr_type",
-                    "curr_short_name",
-                    "group_digit_cnt",
-                    "base_exch_rate",
-                ]
-            )
+            yield ["%T", "CURRTYPE"]
+            yield [
+                "%F",
+                "curr_id",
+                "decimal_digit_cnt",
+                "curr_symbol",
+                "decimal_symbol",
+                "digit_group_symbol",
+                "pos_curr_fmt_type",
+                "neg_curr_fmt_type",
+                "curr_type",
+                "curr_short_name",
+                "group_digit_cnt",
+                "base_exch_rate",
+            ]
             for cur in self._currencies:
-                tsv.append(cur.get_tsv())
-            return tsv
-        return []
+                yield cur.get_tsv()
+
+    @property
+    def currencies(self) -> list[Currency]:
+        return self._currencies
 
     @property
     def count(self) -> int:
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.fintmpl import FinTmpl
@@ -14,14 +15,14 @@ class FinTmpls:
         self._FinTmpls.append(FinTmpl(params))
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._FinTmpls) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "FINTMPL"])
-            tsv.append(["%F", "fintmpl_id", "fintmpl_name", "default_flag"])
+            yield ["%T", "FINTMPL"]
+            yield ["%F", "fintmpl_id", "fintmpl_name", "default_flag"]
             for fin in self._FinTmpls:
-                tsv.append(fin.get_tsv())
-            return tsv
-        return []
+                yield fin.get_tsv()
 
     def find_by_id(self, id: Any) -> FinTmpl | list[FinTmpl]:
         obj: list[FinTmpl] = list(filter(lambda x: x.fintmpl_id == id, self._FinTmpls))
@@ -29,6 +30,10 @@ class FinTmpls:
             return obj[0]
         return obj
 
+    @property
+    def fintmpls(self) -> list[FinTmpl]:
+        return self._FinTmpls
+
     @property
     def count(self) -> int:
         return len(self._FinTmpls)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.nonwork import NonWork
@@ -14,16 +15,14 @@ class NonWorks:
         self._NonWorks.append(NonWork(params))
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._NonWorks) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "NONWORK"])
-            tsv.append(
-                ["%F", "nonwork_type_id", "seq_num", "nonwork_code", "nonwork_type"]
-            )
+            yield ["%T", "NONWORK"]
+            yield ["%F", "nonwork_type_id", "seq_num", "nonwork_code", "nonwork_type"]
             for nw in self._NonWorks:
-                tsv.append(nw.get_tsv())
-            return tsv
-        return []
+                yield nw.get_tsv()
 
     def find_by_id(self, id: Any) -> NonWork | list[NonWork]:
         obj: list[NonWork] = list(filter(lambda x: x.fintmpl_id == id, self._NonWorks))
@@ -31,6 +30,10 @@ class NonWorks:
             return obj[0]
         return obj
 
+    @property
+    def nonworks(self) -> list[NonWork]:
+        return self._NonWorks
+
     @property
     def count(self) -> int:
         return len(self._NonWorks)
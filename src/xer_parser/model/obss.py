@@ -18,24 +18,26 @@ class OBSs:
         return obj
 
     def get_tsv(self):
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._obss) > 0:
-            tsv = []
-            tsv.append(["%T", "OBS"])
-            tsv.append(
-                [
-                    "%F",
-                    "obs_id",
-                    "parent_obs_id",
-                    "guid",
-                    "seq_num",
-                    "obs_name",
-                    "obs_descr",
-                ]
-            )
+            yield ["%T", "OBS"]
+            yield [
+                "%F",
+                "obs_id",
+                "parent_obs_id",
+                "guid",
+                "seq_num",
+                "obs_name",
+                "obs_descr",
+            ]
             for obs in self._obss:
-                tsv.append(obs.get_tsv())
-            return tsv
-        return []
+                yield obs.get_tsv()
+
+    @property
+    def obss(self) -> list[OBS]:
+        return self._obss
 
     @property
     def count(self):
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.pcattype import PCatType
@@ -22,23 +23,25 @@ class PCatTypes:
         return obj
 
     def get_tsv(self) -> list[list[str | int | None]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str | int | None]]:
         if len(self._pcattypes) > 0:
-            tsv: list[list[str | int | None]] = []
-            tsv.append(["%T", "PCATTYPE"])
-            tsv.append(
-                [
-                    "%F",
-                    "proj_catg_type_id",
-                    "seq_num",
-                    "proj_catg_short_len",
-                    "proj_catg_type",
-                    "export_flag",
-                ]
-            )
+            yield ["%T", "PCATTYPE"]
+            yield [
+                "%F",
+                "proj_catg_type_id",
+                "seq_num",
+                "proj_catg_short_len",
+                "proj_catg_type",
+                "export_flag",
+            ]
             for acttyp in self._pcattypes:
-                tsv.append(acttyp.get_tsv())
-            return tsv
-        return []
+                yield acttyp.get_tsv()
+
+    @property
+    def pcattypes(self) -> list[PCatType]:
+        return self._pcattypes
 
     def count(self) -> int:
         return len(self._pcattypes)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.pcatval import PCatVal
@@ -14,23 +15,22 @@ class PCatVals:
         self._PCatVals.append(PCatVal(params))
 
     def get_tsv(self) -> list[list[str]]:
-        tsv: list[list[str]] = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._PCatVals) > 0:
-            tsv.append(["%T", "PCATVAL"])
-            tsv.append(
-                [
-                    "%F",
-                    "proj_catg_id",
-                    "proj_catg_type_id",
-                    "seq_num",
-                    "proj_catg_short_name",
-                    "parent_proj_catg_id",
-                    "proj_catg_name",
-                ]
-            )
+            yield ["%T", "PCATVAL"]
+            yield [
+                "%F",
+                "proj_catg_id",
+                "proj_catg_type_id",
+                "seq_num",
+                "proj_catg_short_name",
+                "parent_proj_catg_id",
+                "proj_catg_name",
+            ]
             for pcatval in self._PCatVals:
-                tsv.append(pcatval.get_tsv())
-        return tsv
+                yield pcatval.get_tsv()
 
     def find_by_id(self, id: str) -> PCatVal | list[PCatVal]:
         obj: list[PCatVal] = list(
@@ -40,6 +40,10 @@ class PCatVals:
             return obj[0]
         return obj
 
+    @property
+    def pcatvals(self) -> list[PCatVal]:
+        return self._PCatVals
+
     @property
     def count(self) -> int:
         return len(self._PCatVals)
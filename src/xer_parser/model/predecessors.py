@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.taskpred import TaskPred
@@ -20,6 +21,12 @@ class Predecessors:
     index : int
         Current index for iterator functionality
 
+    Notes
+    -----
+    Relationships are also indexed by predecessor and successor activity as they
+    are added, so ``get_successors`` and ``get_predecessors`` do not scan the
+    whole relationship list.
+
     Notes
     -----
     In Primavera P6, relationships can be of four types:
@@ -37,6 +44,8 @@ class Predecessors:
         """
         self.index = 0
         self.task_pred = []
+        self._by_pred: dict[int, list[TaskPred]] = {}
+        self._by_succ: dict[int, list[TaskPred]] = {}
 
     def find_by_id(self, code_id: int) -> TaskPred | None:
         """
@@ -66,28 +75,35 @@ class Predecessors:
         list[list[Any]]
             Relationship data formatted for TSV output
         """
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[Any]]:
+        """
+        Yield relationships in TSV format, one row at a time.
+
+        Yields
+        ------
+        list[Any]
+            The table and field rows, then one row per record
+        """
         if len(self.task_pred) > 0:
-            tsv.append(["%T", "TASKPRED"])
-            tsv.append(
-                [
-                    "%F",
-                    "task_pred_id",
-                    "task_id",
-                    "pred_task_id",
-                    "proj_id",
-                    "pred_proj_id",
-                    "pred_type",
-                    "lag_hr_cnt",
-                    "comments",
-                    "float_path",
-                    "aref",
-                    "arls",
-                ]
-            )
+            yield ["%T", "TASKPRED"]
+            yield [
+                "%F",
+                "task_pred_id",
+                "task_id",
+                "pred_task_id",
+                "proj_id",
+                "pred_proj_id",
+                "pred_type",
+                "lag_hr_cnt",
+                "comments",
+                "float_path",
+                "aref",
+                "arls",
+            ]
             for pred in self.task_pred:
-                tsv.append(pred.get_tsv())
-        return tsv
+                yield pred.get_tsv()
 
     def add(self, params: dict[str, Any]) -> None:
         """
@@ -100,6 +116,8 @@ class Predecessors:
         """
         pred = TaskPred(params)
         self.task_pred.append(pred)
+        self._by_pred.setdefault(pred.pred_task_id, []).append(pred)
+        self._by_succ.setdefault(pred.task_id, []).append(pred)
 
     @property
     def relations(self) -> list[TaskPred]:
@@ -153,7 +171,7 @@ class Predecessors:
         list[TaskPred]
             List of relationships where the specified activity is a predecessor
         """
-        succ = list(filter(lambda x: x.pred_task_id == act_id, self.task_pred))
+        succ = list(self._by_pred.get(act_id, ()))
         return succ
 
     def get_predecessors(self, act_id: int) -> list[TaskPred]:
@@ -170,7 +188,7 @@ class Predecessors:
         list[TaskPred]
             List of relationships where the specified activity is a successor
         """
-        succ = list(filter(lambda x: x.task_id == act_id, self.task_pred))
+        succ = list(self._by_succ.get(act_id, ()))
         return succ
 
     def count(self) -> int:
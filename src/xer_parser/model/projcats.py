@@ -12,13 +12,14 @@ class ProjCats:
         self._ProjCats.append(ProjCat(params))
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._ProjCats) > 0:
-            tsv.append(["%T", "PROJPCAT"])
-            tsv.append(["%F", "proj_id", "proj_catg_type_id", "proj_catg_id"])
+            yield ["%T", "PROJPCAT"]
+            yield ["%F", "proj_id", "proj_catg_type_id", "proj_catg_id"]
             for pcatval in self._ProjCats:
-                tsv.append(pcatval.get_tsv())
-        return tsv
+                yield pcatval.get_tsv()
 
     # def find_by_id(self, id) -> ProjCat:
     #     obj = list(filter(lambda x: x.proj_catg_id == id, self._ProjCats))
@@ -26,6 +27,10 @@ class ProjCats:
     #         return obj[0]
     #     return obj
 
+    @property
+    def projcats(self) -> list[ProjCat]:
+        return self._ProjCats
+
     @property
     def count(self):
         return len(self._ProjCats)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.rcattype import RCatType
@@ -14,22 +15,20 @@ class RCatTypes:
         self._rcattypes.append(RCatType(params))
 
     def get_tsv(self) -> list[list[str | int | None]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str | int | None]]:
         if len(self._rcattypes) > 0:
-            tsv: list[list[str | int | None]] = []
-            tsv.append(["%T", "RCATTYPE"])
-            tsv.append(
-                [
-                    "%F",
-                    "rsrc_catg_type_id",
-                    "seq_num",
-                    "rsrc_catg_short_len",
-                    "rsrc_catg_type",
-                ]
-            )
+            yield ["%T", "RCATTYPE"]
+            yield [
+                "%F",
+                "rsrc_catg_type_id",
+                "seq_num",
+                "rsrc_catg_short_len",
+                "rsrc_catg_type",
+            ]
             for rcat in self._rcattypes:
-                tsv.append(rcat.get_tsv())
-            return tsv
-        return []
+                yield rcat.get_tsv()
 
     def find_by_id(self, id: int) -> RCatType | list[RCatType]:
         obj = [
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.rcatval import RCatVal
@@ -14,22 +15,21 @@ class RCatVals:
         self._rcatvals.append(RCatVal(params))
 
     def get_tsv(self) -> list[list[str]]:
-        tsv: list[list[str]] = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._rcatvals) > 0:
-            tsv.append(["%T", "RCATVAL"])
-            tsv.append(
-                [
-                    "%F",
-                    "rsrc_catg_id",
-                    "rsrc_catg_type_id",
-                    "rsrc_catg_short_name",
-                    "rsrc_catg_name",
-                    "parent_rsrc_catg_id",
-                ]
-            )
+            yield ["%T", "RCATVAL"]
+            yield [
+                "%F",
+                "rsrc_catg_id",
+                "rsrc_catg_type_id",
+                "rsrc_catg_short_name",
+                "rsrc_catg_name",
+                "parent_rsrc_catg_id",
+            ]
             for rc in self._rcatvals:
-                tsv.append(rc.get_tsv())
-        return tsv
+                yield rc.get_tsv()
 
     def find_by_id(self, id: str) -> RCatVal | list[RCatVal]:
         obj: list[RCatVal] = list(
@@ -1,9 +1,28 @@
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 from xer_parser.model.classes.rsrc import Resource
 
 __all__ = ["Resources"]
 
+# TASKRSRC fields accumulated by ``Resources.rollup``
+ROLLUP_FIELDS = (
+    "target_qty",
+    "remain_qty",
+    "act_reg_qty",
+    "act_ot_qty",
+    "target_cost",
+    "remain_cost",
+    "act_reg_cost",
+    "act_ot_cost",
+)
+
+
+def _as_float(value: Any) -> float:
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
 
 class Resources:
     """
@@ -19,6 +38,13 @@ class Resources:
         Internal list of Resource objects
     index : int
         Current index for iterator functionality
+
+    Notes
+    -----
+    Lookups by ID are served from a dictionary maintained by ``add``. The
+    hierarchy (pre-order numbering of every resource tree) is built lazily in a
+    single pass the first time it is needed and discarded whenever a resource is
+    added, so ancestor/descendant queries do not rescan the resource list.
     """
 
     def __init__(self) -> None:
@@ -27,6 +53,9 @@ class Resources:
         """
         self.index = 0
         self._rsrcs = []
+        self._by_id: dict[int, Resource] = {}
+        self._hierarchy: dict[str, Any] | None = None
+        self._rollup: dict[int, dict[str, float]] | None = None
 
     def add(self, params: dict[str, Any]) -> None:
         """
@@ -39,6 +68,9 @@ class Resources:
         """
         rsrc = Resource(params)
         self._rsrcs.append(rsrc)
+        self._by_id[rsrc.rsrc_id] = rsrc
+        self._hierarchy = None
+        self.invalidate_rollup()
 
     def get_resource_by_id(self, id: int) -> Resource | None:
         """
@@ -54,12 +86,7 @@ class Resources:
         Resource or None
             The resource with the specified ID, or None if not found
         """
-        rsrc = list(filter(lambda x: x.rsrc_id == id, self._rsrcs))
-        if len(rsrc) > 0:
-            rsrc = rsrc[0]
-        else:
-            rsrc = None
-        return rsrc
+        return self._by_id.get(id)
 
     def get_parent(self, id: int) -> Resource | None:
         """
@@ -75,12 +102,232 @@ class Resources:
         Resource or None
             The parent resource, or None if the resource has no parent or is not found
         """
-        rsrc = list(filter(lambda x: x.rsrc_id == id, self._rsrcs))
-        if len(rsrc) > 0:
-            rsrc = rsrc[0]
-        else:
-            rsrc = None
-        return rsrc
+        rsrc = self._by_id.get(id)
+        if rsrc is None or rsrc.parent_rsrc_id is None:
+            return None
+        return self._by_id.get(rsrc.parent_rsrc_id)
+
+    def get_children(self, id: int) -> list[Resource]:
+        """
+        Get the direct children of a resource.
+
+        Parameters
+        ----------
+        id : int
+            The resource ID whose children are requested
+
+        Returns
+        -------
+        list[Resource]
+            Resources whose parent is the specified resource, in file order
+        """
+        hierarchy = self._get_hierarchy()
+        return [self._by_id[x] for x in hierarchy["children"].get(id, [])]
+
+    def get_ancestors(self, id: int) -> list[Resource]:
+        """
+        Get all ancestors of a resource, nearest first.
+
+        Parameters
+        ----------
+        id : int
+            The resource ID whose ancestors are requested
+
+        Returns
+        -------
+        list[Resource]
+            The parent, grand-parent, ... up to the root of the resource tree
+        """
+        hierarchy = self._get_hierarchy()
+        parents = hierarchy["parent"]
+        ancestors = []
+        parent_id = parents.get(id)
+        while parent_id is not None:
+            ancestors.append(self._by_id[parent_id])
+            parent_id = parents.get(parent_id)
+        return ancestors
+
+    def get_descendants(self, id: int) -> list[Resource]:
+        """
+        Get every resource below a resource in the hierarchy.
+
+        Parameters
+        ----------
+        id : int
+            The resource ID whose subtree is requested
+
+        Returns
+        -------
+        list[Resource]
+            All descendants in depth-first (pre-order) order, excluding the
+            resource itself
+        """
+        hierarchy = self._get_hierarchy()
+        pos = hierarchy["pos"].get(id)
+        if pos is None:
+            return []
+        order = hierarchy["order"]
+        return [self._by_id[x] for x in order[pos + 1 : hierarchy["end"][id]]]
+
+    def is_ancestor(self, ancestor_id: int, id: int) -> bool:
+        """
+        Check whether a resource lies above another one in the hierarchy.
+
+        Parameters
+        ----------
+        ancestor_id : int
+            The candidate ancestor resource ID
+        id : int
+            The resource ID to test
+
+        Returns
+        -------
+        bool
+            True if ``ancestor_id`` is a (strict) ancestor of ``id``
+        """
+        hierarchy = self._get_hierarchy()
+        pos = hierarchy["pos"]
+        if ancestor_id not in pos or id not in pos:
+            return False
+        return pos[ancestor_id] < pos[id] < hierarchy["end"][ancestor_id]
+
+    def rollup(self, assignments: Iterable[Any]) -> dict[int, dict[str, float]]:
+        """
+        Aggregate assignment units and costs over each resource subtree.
+
+        Every assignment is added to its own resource, then the totals are
+        pushed up the hierarchy in reverse pre-order, so the whole rollup costs
+        one pass over the assignments plus one pass over the resources. The
+        result is cached and can be read back with ``get_rollup`` until a
+        resource is added, ``invalidate_rollup`` is called or ``rollup`` is
+        called again.
+
+        Parameters
+        ----------
+        assignments : Iterable[TaskRsrc]
+            Resource assignments, e.g. ``reader.activityresources.assignments``
+
+        Returns
+        -------
+        dict[int, dict[str, float]]
+            Mapping of resource ID to the totals of ``ROLLUP_FIELDS`` for the
+            resource and all of its descendants
+        """
+        hierarchy = self._get_hierarchy()
+        totals = {x: dict.fromkeys(ROLLUP_FIELDS, 0.0) for x in hierarchy["order"]}
+        for assignment in assignments:
+            own = totals.get(assignment.rsrc_id)
+            if own is None:
+                continue
+            for field in ROLLUP_FIELDS:
+                own[field] += _as_float(getattr(assignment, field, None))
+        parents = hierarchy["parent"]
+        for rsrc_id in reversed(hierarchy["order"]):
+            parent_id = parents.get(rsrc_id)
+            if parent_id is not None:
+                parent, child = totals[parent_id], totals[rsrc_id]
+                for field in ROLLUP_FIELDS:
+                    parent[field] += child[field]
+        self._rollup = totals
+        return totals
+
+    def get_rollup(self, id: int) -> dict[str, float] | None:
+        """
+        Get the cached subtree totals of a resource.
+
+        Parameters
+        ----------
+        id : int
+            The resource ID
+
+        Returns
+        -------
+        dict[str, float] or None
+            Totals computed by the last ``rollup`` call, or None if no rollup
+            is cached or the resource is unknown
+        """
+        if self._rollup is None:
+            return None
+        return self._rollup.get(id)
+
+    def invalidate_rollup(self) -> None:
+        """
+        Drop the cached subtree totals.
+
+        Call it after changing the units or costs of assignments, so that
+        ``get_rollup`` does not return totals of the old values.
+
+        Returns
+        -------
+        None
+        """
+        self._rollup = None
+
+    def _get_hierarchy(self) -> dict[str, Any]:
+        """
+        Build (or return the cached) index of the resource hierarchy.
+
+        The index holds the children of every resource, the parent of every
+        non-root resource, and a pre-order numbering in which the subtree of a
+        resource occupies the contiguous range ``order[pos[id]:end[id]]``.
+        Parents that are missing from the file, and parent links forming a
+        cycle, are treated as roots so every resource appears exactly once.
+
+        Returns
+        -------
+        dict[str, Any]
+            The hierarchy index
+        """
+        if self._hierarchy is not None:
+            return self._hierarchy
+        children: dict[int, list[int]] = {}
+        for rsrc in self._rsrcs:
+            if rsrc.parent_rsrc_id in self._by_id:
+                children.setdefault(rsrc.parent_rsrc_id, []).append(rsrc.rsrc_id)
+        roots = [x.rsrc_id for x in self._rsrcs if x.parent_rsrc_id not in self._by_id]
+        # resources in a parent cycle are unreachable from the real roots
+        roots.extend(x.rsrc_id for x in self._rsrcs)
+        order: list[int] = []
+        pos: dict[int, int] = {}
+        end: dict[int, int] = {}
+        parent: dict[int, int] = {}
+        for root in roots:
+            if root in pos:
+                continue
+            pos[root] = len(order)
+            order.append(root)
+            stack = [(root, iter(children.get(root, [])))]
+            while stack:
+                node, it = stack[-1]
+                child = next(it, None)
+                if child is None:
+                    end[node] = len(order)
+                    stack.pop()
+                elif child not in pos:
+                    parent[child] = node
+                    pos[child] = len(order)
+                    order.append(child)
+                    stack.append((child, iter(children.get(child, []))))
+        self._hierarchy = {
+            "children": children,
+            "parent": parent,
+            "order": order,
+            "pos": pos,
+            "end": end,
+        }
+        return self._hierarchy
+
+    @property
+    def resources(self) -> list[Resource]:
+        """
+        Get all resources.
+
+        Returns
+        -------
+        list[Resource]
+            The resources, in the order they were added
+        """
+        return self._rsrcs
 
     def __iter__(self) -> "Resources":
         """
@@ -136,48 +383,55 @@ class Resources:
         list[list[Any]]
             Resources data formatted for TSV output
         """
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[Any]]:
+        """
+        Yield resources in TSV format, one row at a time.
+
+        Yields
+        ------
+        list[Any]
+            The table and field rows, then one row per record
+        """
         if len(self._rsrcs) > 0:
-            tsv.append(["%T", "RSRC"])
-            tsv.append(
-                [
-                    "%F",
-                    "rsrc_id",
-                    "parent_rsrc_id",
-                    "clndr_id",
-                    "role_id",
-                    "shift_id",
-                    "user_id",
-                    "pobs_id",
-                    "guid",
-                    "rsrc_seq_num",
-                    "email_addr",
-                    "employee_code",
-                    "office_phone",
-                    "other_phone",
-                    "rsrc_name",
-                    "rsrc_short_name",
-                    "rsrc_title_name",
-                    "def_qty_per_hr",
-                    "cost_qty_type",
-                    "ot_factor",
-                    "active_flag",
-                    "auto_compute_act_flag",
-                    "def_cost_qty_link_flag",
-                    "ot_flag",
-                    "curr_id",
-                    "unit_id",
-                    "rsrc_type",
-                    "location_id",
-                    "rsrc_notes",
-                    "load_tasks_flag",
-                    "level_flag",
-                    "last_checksum",
-                ]
-            )
+            yield ["%T", "RSRC"]
+            yield [
+                "%F",
+                "rsrc_id",
+                "parent_rsrc_id",
+                "clndr_id",
+                "role_id",
+                "shift_id",
+                "user_id",
+                "pobs_id",
+                "guid",
+                "rsrc_seq_num",
+                "email_addr",
+                "employee_code",
+                "office_phone",
+                "other_phone",
+                "rsrc_name",
+                "rsrc_short_name",
+                "rsrc_title_name",
+                "def_qty_per_hr",
+                "cost_qty_type",
+                "ot_factor",
+                "active_flag",
+                "auto_compute_act_flag",
+                "def_cost_qty_link_flag",
+                "ot_flag",
+                "curr_id",
+                "unit_id",
+                "rsrc_type",
+                "location_id",
+                "rsrc_notes",
+                "load_tasks_flag",
+                "level_flag",
+                "last_checksum",
+            ]
             for rsr in self._rsrcs:
-                tsv.append(rsr.get_tsv())
-        return tsv
+                yield rsr.get_tsv()
 
     def build_tree(self) -> list[dict[int, Any]]:
         """
@@ -196,9 +450,8 @@ class Resources:
         # pass 1: create nodes dictionary
         a = self._get_list()
         nodes = {}
-        for i in a:
-            id, parent_id = i
-            nodes[id] = {id: self.get_resource_by_id(id)}
+        for rsrc in self._rsrcs:
+            nodes[rsrc.rsrc_id] = {rsrc.rsrc_id: rsrc}
         # a = a[1:]
         # pass 2: create trees and parent-child relations
         forest = []
@@ -1,4 +1,5 @@
 from xer_parser.model.classes.rolerate import RoleRate
+from xer_parser.model.rsrcrates import RATE_FIELDS
 
 __all__ = ["RoleRates"]
 
@@ -7,37 +8,80 @@ class RoleRates:
     def __init__(self) -> None:
         self.index = 0
         self._rolerates = []
+        self._by_role: dict[int, RoleRate] | None = None
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._rolerates) > 0:
-            tsv.append(["%T", "ROLERATE"])
-            tsv.append(
-                [
-                    "%F",
-                    "role_rate_id",
-                    "role_id",
-                    "cost_per_qty",
-                    "cost_per_qty2",
-                    "cost_per_qty3",
-                    "cost_per_qty4",
-                    "cost_per_qty5",
-                ]
-            )
+            yield ["%T", "ROLERATE"]
+            yield [
+                "%F",
+                "role_rate_id",
+                "role_id",
+                "cost_per_qty",
+                "cost_per_qty2",
+                "cost_per_qty3",
+                "cost_per_qty4",
+                "cost_per_qty5",
+            ]
             for rr in self._rolerates:
-                tsv.append(rr.get_tsv())
-        return tsv
+                yield rr.get_tsv()
 
     def add(self, params):
         self._rolerates.append(RoleRate(params))
-        self._rolerates = []
+        self._by_role = None
 
     def find_by_id(self, id) -> RoleRate:
-        obj = list(filter(lambda x: x.actv_code_type_id == id, self._rolerates))
+        obj = list(filter(lambda x: x.role_rate_id == id, self._rolerates))
         if len(obj) > 0:
             return obj[0]
         return obj
 
+    @property
+    def rolerates(self) -> list[RoleRate]:
+        return self._rolerates
+
+    def get_rate(self, role_id: int) -> RoleRate | None:
+        """
+        Get the rate of a role.
+
+        Parameters
+        ----------
+        role_id : int
+            The role
+
+        Returns
+        -------
+        RoleRate or None
+            Its ROLERATE record (the last one if there are several), None if
+            it has none
+        """
+        if self._by_role is None:
+            self._by_role = {x.role_id: x for x in self._rolerates}
+        return self._by_role.get(role_id)
+
+    def cost_per_qty(self, role_id: int, level: int = 1) -> float | None:
+        """
+        Get the price per unit of a role.
+
+        Parameters
+        ----------
+        role_id : int
+            The role
+        level : int, optional
+            Price level from 1 (``cost_per_qty``, default) to 5
+            (``cost_per_qty5``)
+
+        Returns
+        -------
+        float or None
+            The price, None if the role has no rate or the level is empty
+        """
+        rate = self.get_rate(role_id)
+        return getattr(rate, RATE_FIELDS[level - 1], None) if rate else None
+
     @property
     def count(self):
         return len(self._rolerates)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.role import Role
@@ -11,28 +12,26 @@ class Roles:
         self._roles: list[Role] = []
 
     def get_tsv(self) -> list[list[str | int | None]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str | int | None]]:
         if len(self._roles) > 0:
-            tsv: list[list[str | int | None]] = []
-            tsv.append(["%T", "ROLE"])
-            tsv.append(
-                [
-                    "%F",
-                    "role_id",
-                    "parent_role_id",
-                    "seq_num",
-                    "role_name",
-                    "role_short_name",
-                    "pobs_id",
-                    "def_cost_qty_link_flag",
-                    "cost_qty_type",
-                    "role_descr",
-                    "last_checksum",
-                ]
-            )
+            yield ["%T", "ROLE"]
+            yield [
+                "%F",
+                "role_id",
+                "parent_role_id",
+                "seq_num",
+                "role_name",
+                "role_short_name",
+                "pobs_id",
+                "def_cost_qty_link_flag",
+                "cost_qty_type",
+                "role_descr",
+                "last_checksum",
+            ]
             for role in self._roles:
-                tsv.append(role.get_tsv())
-            return tsv
-        return []
+                yield role.get_tsv()
 
     def add(self, params: dict[str, Any]) -> None:
         self._roles.append(Role(params))
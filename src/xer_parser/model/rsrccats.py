@@ -9,13 +9,14 @@ class ResourceCategories:
         self._rsrccat = []
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._rsrccat) > 0:
-            tsv.append(["%T", "RSRCRCAT"])
-            tsv.append(["%F", "rsrc_id", "rsrc_catg_type_id", "rsrc_catg_id"])
+            yield ["%T", "RSRCRCAT"]
+            yield ["%F", "rsrc_id", "rsrc_catg_type_id", "rsrc_catg_id"]
             for rc in self._rsrccat:
-                tsv.append(rc.get_tsv())
-        return tsv
+                yield rc.get_tsv()
 
     def add(self, params):
         self._rsrccat.append(ResourceCat(params))
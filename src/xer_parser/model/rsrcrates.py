@@ -1,44 +1,171 @@
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any
+
 from xer_parser.model.classes.rsrcrate import ResourceRate
 
 __all__ = ["ResourceRates"]
 
+# Rate fields of the five price levels, indexed by level - 1
+RATE_FIELDS = (
+    "cost_per_qty",
+    "cost_per_qty2",
+    "cost_per_qty3",
+    "cost_per_qty4",
+    "cost_per_qty5",
+)
+
+
+def _as_date(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value:
+        try:
+            return datetime.fromisoformat(value.strip())
+        except ValueError:
+            pass
+    return datetime.min
+
 
 class ResourceRates:
     def __init__(self) -> None:
         self.index = 0
         self._rsrcrates = []
+        self._timelines: dict[int, tuple[list[datetime], list[ResourceRate]]] | None = (
+            None
+        )
 
     def add(self, params):
         self._rsrcrates.append(ResourceRate(params))
+        self._timelines = None
 
     def find_by_id(self, id) -> ResourceRate:
-        obj = list(filter(lambda x: x.actv_code_type_id == id, self._rsrcrates))
+        obj = list(filter(lambda x: x.rsrc_rate_id == str(id), self._rsrcrates))
         if len(obj) > 0:
             return obj[0]
         return obj
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._rsrcrates) > 0:
-            tsv.append(["%T", "RSRCRATE"])
-            tsv.append(
-                [
-                    "%F",
-                    "rsrc_rate_id",
-                    "rsrc_id",
-                    "max_qty_per_hr",
-                    "cost_per_qty",
-                    "start_date",
-                    "shift_period_id",
-                    "cost_per_qty2",
-                    "cost_per_qty3",
-                    "cost_per_qty4",
-                    "cost_per_qty5",
-                ]
-            )
+            yield ["%T", "RSRCRATE"]
+            yield [
+                "%F",
+                "rsrc_rate_id",
+                "rsrc_id",
+                "max_qty_per_hr",
+                "cost_per_qty",
+                "start_date",
+                "shift_period_id",
+                "cost_per_qty2",
+                "cost_per_qty3",
+                "cost_per_qty4",
+                "cost_per_qty5",
+            ]
             for rr in self._rsrcrates:
-                tsv.append(rr.get_tsv())
-        return tsv
+                yield rr.get_tsv()
+
+    @property
+    def resourcerates(self) -> list[ResourceRate]:
+        return self._rsrcrates
+
+    def get_rates(self, rsrc_id: int) -> list[ResourceRate]:
+        """
+        Get the rates of a resource in date order.
+
+        Parameters
+        ----------
+        rsrc_id : int
+            The resource
+
+        Returns
+        -------
+        list[ResourceRate]
+            Its RSRCRATE records sorted by ``start_date``; records without a
+            start date come first
+        """
+        timeline = self._get_timelines().get(rsrc_id)
+        return list(timeline[1]) if timeline else []
+
+    def get_rate(self, rsrc_id: int, when: Any = None) -> ResourceRate | None:
+        """
+        Get the rate of a resource in effect at a date.
+
+        Parameters
+        ----------
+        rsrc_id : int
+            The resource
+        when : datetime or str, optional
+            The date, by default the latest rate is returned
+
+        Returns
+        -------
+        ResourceRate or None
+            The record with the latest ``start_date`` not after ``when``, the
+            earliest record if ``when`` precedes them all, None if the
+            resource has no rates
+        """
+        timeline = self._get_timelines().get(rsrc_id)
+        if not timeline:
+            return None
+        starts, rates = timeline
+        if when is None:
+            return rates[-1]
+        i = bisect_right(starts, _as_date(when)) - 1
+        return rates[max(i, 0)]
+
+    def cost_per_qty(
+        self, rsrc_id: int, when: Any = None, level: int = 1
+    ) -> float | None:
+        """
+        Get the price per unit of a resource at a date.
+
+        Parameters
+        ----------
+        rsrc_id : int
+            The resource
+        when : datetime or str, optional
+            The date, as for ``get_rate``
+        level : int, optional
+            Price level from 1 (``cost_per_qty``, default) to 5
+            (``cost_per_qty5``)
+
+        Returns
+        -------
+        float or None
+            The price, None if the resource has no rate or the level is empty
+        """
+        rate = self.get_rate(rsrc_id, when)
+        value = getattr(rate, RATE_FIELDS[level - 1], None) if rate else None
+        return float(value) if value not in (None, "") else None
+
+    def _get_timelines(self) -> dict[int, tuple[list[datetime], list[ResourceRate]]]:
+        """
+        Build the sorted rate timeline of every resource once.
+
+        Returns
+        -------
+        dict[int, tuple[list[datetime], list[ResourceRate]]]
+            Start dates and records of every resource, in date order
+        """
+        if self._timelines is None:
+            grouped: dict[int, list[tuple[datetime, int, ResourceRate]]] = {}
+            for n, rate in enumerate(self._rsrcrates):
+                if rate.rsrc_id is None:
+                    continue
+                grouped.setdefault(int(rate.rsrc_id), []).append(
+                    (_as_date(rate.start_date), n, rate)
+                )
+            self._timelines = {}
+            for rsrc_id, entries in grouped.items():
+                entries.sort(key=lambda x: x[:2])
+                self._timelines[rsrc_id] = (
+                    [x[0] for x in entries],
+                    [x[2] for x in entries],
+                )
+        return self._timelines
 
     @property
     def count(self):
@@ -12,15 +12,14 @@ class TaskActvs:
         self._taskactvs.append(TaskActv(params, data))
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._taskactvs) > 0:
-            tsv.append(["%T", "TASKACTV"])
-            tsv.append(
-                ["%F", "task_id", "actv_code_type_id", "actv_code_id", "proj_id"]
-            )
+            yield ["%T", "TASKACTV"]
+            yield ["%F", "task_id", "actv_code_type_id", "actv_code_id", "proj_id"]
             for taskact in self._taskactvs:
-                tsv.append(taskact.get_tsv())
-        return tsv
+                yield taskact.get_tsv()
 
     def find_by_code_id(self, id) -> TaskActv:
         obj = list(filter(lambda x: x.actv_code_id == id, self._taskactvs))
@@ -37,6 +36,10 @@ class TaskActvs:
     def count(self):
         return len(self._taskactvs)
 
+    @property
+    def taskactvs(self) -> list[TaskActv]:
+        return self._taskactvs
+
     def __len__(self) -> int:
         return len(self._taskactvs)
 
@@ -12,27 +12,25 @@ class TaskProcs:
         self._TaskProcs.append(TaskProc(params))
 
     def get_tsv(self):
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._TaskProcs) > 0:
-            tsv = []
-            tsv.append(["%T", "TASKPROC"])
-            tsv.append(
-                [
-                    "%F",
-                    "proc_id",
-                    "task_id",
-                    "proj_id",
-                    "seq_num",
-                    "proc_name",
-                    "complete_flag",
-                    "proc_wt",
-                    "complete_pct",
-                    "proc_descr",
-                ]
-            )
+            yield ["%T", "TASKPROC"]
+            yield [
+                "%F",
+                "proc_id",
+                "task_id",
+                "proj_id",
+                "seq_num",
+                "proc_name",
+                "complete_flag",
+                "proc_wt",
+                "complete_pct",
+                "proc_descr",
+            ]
             for taskproc in self._TaskProcs:
-                tsv.append(taskproc.get_tsv())
-            return tsv
-        return []
+                yield taskproc.get_tsv()
 
     def find_by_id(self, id) -> TaskProc:
         obj = list(filter(lambda x: x.proc_id == id, self._TaskProcs))
@@ -44,6 +42,10 @@ class TaskProcs:
         objs = list(filter(lambda x: x.task_id == id, self._TaskProcs))
         return objs
 
+    @property
+    def taskprocs(self) -> list[TaskProc]:
+        return self._TaskProcs
+
     @property
     def count(self):
         return len(self._TaskProcs)
@@ -13,10 +13,12 @@ class Tasks:
     def __init__(self) -> None:
         self.index = 0
         self._tasks = []
+        self._by_id = {}
 
     def add(self, params, data) -> None:
         task = Task(params, data)
         self._tasks.append(task)
+        self._by_id.setdefault(task.task_id, task)
 
     @property
     def activities(self) -> list[Task]:
@@ -62,10 +64,10 @@ class Tasks:
         return list(filter(lambda x: x is not None, lst))
 
     def find_by_id(self, id):  # TODO: Add correct return type annotation
-        obj = list(filter(lambda x: x.task_id == id, self._tasks))
-        if len(obj) > 0:
-            return obj[0]
-        return obj
+        obj = self._by_id.get(id)
+        if obj is not None:
+            return obj
+        return []
 
     def find_by_code(self, code):  # TODO: Add correct return type annotation
         obj = list(filter(lambda x: x.task_code == code, self._tasks))
@@ -184,77 +186,76 @@ class Tasks:
         return list(filter(lambda x: x.cstr_type == type, self._tasks))
 
     def get_tsv(self):
-        tsv = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self):
         if len(self._tasks) > 0:
-            tsv.append(["%T", "TASK"])
-            tsv.append(
-                [
-                    "%F",
-                    "task_id",
-                    "proj_id",
-                    "wbs_id",
-                    "clndr_id",
-                    "phys_complete_pct",
-                    "rev_fdbk_flag",
-                    "est_wt",
-                    "lock_plan_flag",
-                    "auto_compute_act_flag",
-                    "complete_pct_type",
-                    "task_type",
-                    "duration_type",
-                    "status_code",
-                    "task_code",
-                    "task_name",
-                    "rsrc_id",
-                    "total_float_hr_cnt",
-                    "free_float_hr_cnt",
-                    "remain_drtn_hr_cnt",
-                    "act_work_qty",
-                    "remain_work_qty",
-                    "target_work_qty",
-                    "target_drtn_hr_cnt",
-                    "target_equip_qty",
-                    "act_equip_qty",
-                    "remain_equip_qty",
-                    "cstr_date",
-                    "act_start_date",
-                    "act_end_date",
-                    "late_start_date",
-                    "late_end_date",
-                    "expect_end_date",
-                    "early_start_date",
-                    "early_end_date",
-                    "restart_date",
-                    "reend_date",
-                    "target_start_date",
-                    "target_end_date",
-                    "rem_late_start_date",
-                    "rem_late_end_date",
-                    "cstr_type",
-                    "priority_type",
-                    "suspend_date",
-                    "resume_date",
-                    "float_path",
-                    "float_path_order",
-                    "guid",
-                    "tmpl_guid",
-                    "cstr_date2",
-                    "cstr_type2",
-                    "driving_path_flag",
-                    "act_this_per_work_qty",
-                    "act_this_per_equip_qty",
-                    "external_early_start_date",
-                    "external_late_end_date",
-                    "create_date",
-                    "update_date",
-                    "create_user",
-                    "update_user",
-                    "location_id",
-                ]
-            )
+            yield ["%T", "TASK"]
+            yield [
+                "%F",
+                "task_id",
+                "proj_id",
+                "wbs_id",
+                "clndr_id",
+                "phys_complete_pct",
+                "rev_fdbk_flag",
+                "est_wt",
+                "lock_plan_flag",
+                "auto_compute_act_flag",
+                "complete_pct_type",
+                "task_type",
+                "duration_type",
+                "status_code",
+                "task_code",
+                "task_name",
+                "rsrc_id",
+                "total_float_hr_cnt",
+                "free_float_hr_cnt",
+                "remain_drtn_hr_cnt",
+                "act_work_qty",
+                "remain_work_qty",
+                "target_work_qty",
+                "target_drtn_hr_cnt",
+                "target_equip_qty",
+                "act_equip_qty",
+                "remain_equip_qty",
+                "cstr_date",
+                "act_start_date",
+                "act_end_date",
+                "late_start_date",
+                "late_end_date",
+                "expect_end_date",
+                "early_start_date",
+                "early_end_date",
+                "restart_date",
+                "reend_date",
+                "target_start_date",
+                "target_end_date",
+                "rem_late_start_date",
+                "rem_late_end_date",
+                "cstr_type",
+                "priority_type",
+                "suspend_date",
+                "resume_date",
+                "float_path",
+                "float_path_order",
+                "guid",
+                "tmpl_guid",
+                "cstr_date2",
+                "cstr_type2",
+                "driving_path_flag",
+                "act_this_per_work_qty",
+                "act_this_per_equip_qty",
+                "external_early_start_date",
+                "external_late_end_date",
+                "create_date",
+                "update_date",
+                "create_user",
+                "update_user",
+                "location_id",
+            ]
             for task in self._tasks:
-                tsv.append(task.get_tsv())
-        return tsv
+                yield task.get_tsv()
 
     def get_by_project(self, id):
         return list(filter(lambda x: x.proj_id == id, self._tasks))
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.udftype import UDFType
@@ -14,26 +15,25 @@ class UDFTypes:
         self._udftypes.append(UDFType(params))
 
     def get_tsv(self) -> list[list[str]]:
-        tsv: list[list[str]] = []
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._udftypes) > 0:
-            tsv.append(["%T", "UDFTYPE"])
-            tsv.append(
-                [
-                    "%F",
-                    "udf_type_id",
-                    "table_name",
-                    "udf_type_name",
-                    "udf_type_label",
-                    "logical_data_type",
-                    "super_flag",
-                    "indicator_expression",
-                    "summary_indicator_expression",
-                    "export_flag",
-                ]
-            )
+            yield ["%T", "UDFTYPE"]
+            yield [
+                "%F",
+                "udf_type_id",
+                "table_name",
+                "udf_type_name",
+                "udf_type_label",
+                "logical_data_type",
+                "super_flag",
+                "indicator_expression",
+                "summary_indicator_expression",
+                "export_flag",
+            ]
             for udf in self._udftypes:
-                tsv.append(udf.get_tsv())
-        return tsv
+                yield udf.get_tsv()
 
     def find_by_id(self, id: str) -> UDFType | list[UDFType]:
         obj: list[UDFType] = list(
@@ -43,6 +43,10 @@ class UDFTypes:
             return obj[0]
         return obj
 
+    @property
+    def udftypes(self) -> list[UDFType]:
+        return self._udftypes
+
     @property
     def count(self) -> int:
         return len(self._udftypes)
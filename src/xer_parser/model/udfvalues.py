@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any
 
 from xer_parser.model.classes.udfvalue import UDFValue
@@ -14,25 +15,23 @@ class UDFValues:
         self._udfvalues.append(UDFValue(params))
 
     def get_tsv(self) -> list[list[str]]:
+        return list(self.iter_tsv())
+
+    def iter_tsv(self) -> Iterator[list[str]]:
         if len(self._udfvalues) > 0:
-            tsv: list[list[str]] = []
-            tsv.append(["%T", "UDFVALUE"])
-            tsv.append(
-                [
-                    "%F",
-                    "udf_type_id",
-                    "fk_id",
-                    "proj_id",
-                    "udf_date",
-                    "udf_number",
-                    "udf_text",
-                    "udf_code_id",
-                ]
-            )
+            yield ["%T", "UDFVALUE"]
+            yield [
+                "%F",
+                "udf_type_id",
+                "fk_id",
+                "proj_id",
+                "udf_date",
+                "udf_number",
+                "udf_text",
+                "udf_code_id",
+            ]
             for udfval in self._udfvalues:
-                tsv.append(udfval.get_tsv())
-            return tsv
-        return []
+                yield udfval.get_tsv()
 
     def find_by_id(self, id: Any) -> UDFValue | list[UDFValue]:
         obj: list[UDFValue] = list(
@@ -42,6 +41,10 @@ class UDFValues:
             return obj[0]
         return obj
 
+    @property
+    def udfvalues(self) -> list[UDFValue]:
+        return self._udfvalues
+
     @property
     def count(self) -> int:
         return len(self._udfvalues)
@@ -10,9 +10,11 @@ import codecs
 import csv
 import logging
 import mmap
+from collections.abc import Iterable
 from typing import Any, ClassVar
 
 # Local imports
+from xer_parser.extract import ProjectIndex, extract_project
 from xer_parser.model.accounts import Accounts
 from xer_parser.model.activitycodes import ActivityCodes
 from xer_parser.model.activityresources import ActivityResources
@@ -48,7 +50,9 @@ from xer_parser.model.tasks import Tasks
 from xer_parser.model.udftypes import UDFTypes
 from xer_parser.model.udfvalues import UDFValues
 from xer_parser.model.wbss import WBSs
-from xer_parser.write import writeXER
+from xer_parser.scheduling.loops import find_loops
+from xer_parser.tracking import SourceSpans
+from xer_parser.write import XER_TABLES, writeXER
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -67,6 +71,17 @@ class Reader:
 
     filename : str
         Path to the XER file to be parsed
+    validate : bool, optional
+        Check the loaded file with ``validate`` and log a warning for every
+        problem found, by default False
+    tables : Iterable[str], optional
+        Names of the tables to load, such as ``{"PROJECT", "TASK"}``; the
+        records of every other table are skipped. By default every table is
+        loaded.
+    track_changes : bool, optional
+        Keep the byte span of every row and track which records change, so
+        that ``write`` copies the unchanged rows from the file instead of
+        formatting them again, by default False
 
     Attributes
     ----------
@@ -81,6 +96,10 @@ class Reader:
         Collection of Work Breakdown Structure elements in the XER file
     relations : Predecessors
         Collection of relationships between activities in the XER file
+    loops : list[dict] or None
+        Circular logic found by ``validate``, None until it has run
+    spans : SourceSpans or None
+        Byte spans of the rows of the file if changes are tracked
 
     Examples
     --------
@@ -119,6 +138,62 @@ class Reader:
             raise ValueError("You have to provide the filename")
         writeXER(self, filename)
 
+    def extract_project(self, proj_id: Any, filename: str) -> None:
+        """
+        Write a single project to an XER file.
+
+        The project is written with the records it needs from the global
+        tables, such as the calendars, resources, currencies and activity code
+        types it uses. The records are found through a ``ProjectIndex`` of
+        the file, built on the first call and again after records are added
+        or removed, so extracting each project of a multi-project file takes
+        time in proportion to the project.
+
+        Parameters
+        ----------
+
+        proj_id : int or str
+            The project ID
+        filename : str
+            Path to the output XER file
+
+        Raises
+        ------
+
+        ValueError
+            If there is no project with that ID
+
+        Returns
+        -------
+
+        None
+        """
+        if self._project_index is None or self._project_index.stale():
+            self._project_index = ProjectIndex(self)
+        extract_project(self, proj_id, filename, self._project_index)
+
+    def validate(self) -> list[dict[str, list[Any]]]:
+        """
+        Check the relationships of the parsed file for circular logic.
+
+        Every loop is logged as a warning and the result is kept in
+        ``loops``.
+
+        Returns
+        -------
+
+        list[dict[str, list[Any]]]
+            The loops as returned by ``xer_parser.scheduling.loops.find_loops``
+        """
+        self.loops = find_loops(self)
+        for loop in self.loops:
+            logger.warning(
+                "Circular logic between task_id %s (task_pred_id %s)",
+                loop["activities"],
+                loop["relations"],
+            )
+        return self.loops
+
     def create_object(self, object_type: str, params: dict[str, Any]) -> None:
         """
         Create appropriate objects based on the record type.
@@ -589,8 +664,17 @@ class Reader:
         """
         return self._nonworks
 
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self,
+        filename: str,
+        validate: bool = False,
+        tables: Iterable[str] | None = None,
+        track_changes: bool = False,
+    ) -> None:
         self.file = filename
+        self.loops: list[dict[str, list[Any]]] | None = None
+        self.spans = SourceSpans(filename) if track_changes else None
+        self._project_index: ProjectIndex | None = None
         self._tasks = Tasks()
         self._predecessors = Predecessors()
         self._projects = Projects()
@@ -628,16 +712,19 @@ class Reader:
         self._data.taskresource = self._activityresources
         self._data.taskactvcodes = self._activitycodes
         self._data.predecessors = self._predecessors
-        with codecs.open(filename, encoding="utf-8", errors="ignore") as tsvfile:
-            stream = csv.reader(tsvfile, delimiter="\t")
-            for row in stream:
-                if row[0] == "%T":
-                    current_table = row[1]
-                elif row[0] == "%F":
-                    current_headers = [r.strip() for r in row[1:]]
-                elif row[0] == "%R":
-                    zipped_record = dict(zip(current_headers, row[1:], strict=False))
-                    self.create_object(current_table, zipped_record)
+        wanted = None if tables is None else set(tables)
+        if self.spans is None:
+            with codecs.open(filename, encoding="utf-8", errors="ignore") as tsvfile:
+                self._load(csv.reader(tsvfile, delimiter="\t"), wanted)
+        else:
+            self._load(self.spans.read(), wanted)
+            for table, collection, records in XER_TABLES:
+                if not self.spans.attach(
+                    table, getattr(getattr(self, collection), records)
+                ):
+                    logger.warning("Changes to %s records are not tracked", table)
+        if validate:
+            self.validate()
 
         # for line in content:
         #     line_lst = line.split('\t')
@@ -646,6 +733,36 @@ class Reader:
         #     elif line_lst[0] == "%R":
         #         self.create_object(current_table, line_lst[1:])
 
+    def _load(self, stream: Iterable[list[str]], wanted: set[str] | None) -> None:
+        """
+        Create the objects of the rows of a file.
+
+        Parameters
+        ----------
+
+        stream : Iterable[list[str]]
+            The rows of the file
+        wanted : set[str] or None
+            Names of the tables to load, None for every table
+
+        Returns
+        -------
+
+        None
+        """
+        skipping = False
+        for row in stream:
+            if row[0] == "%T":
+                current_table = row[1]
+                skipping = wanted is not None and current_table.strip() not in wanted
+            elif skipping:
+                continue
+            elif row[0] == "%F":
+                current_headers = [r.strip() for r in row[1:]]
+            elif row[0] == "%R":
+                zipped_record = dict(zip(current_headers, row[1:], strict=False))
+                self.create_object(current_table, zipped_record)
+
     def get_num_lines(self, file_path: str) -> int:
         """
         Get the number of lines in a file.
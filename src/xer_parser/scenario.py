@@ -0,0 +1,477 @@
+"""
+Copy-on-write what-if scenarios over a parsed programme.
+
+A ``Scenario`` wraps a ``Reader`` (or another scenario) without copying it.
+Its activities, relationships, assignments and projects are thin views of
+the base records: reading a field falls through to the base record unless
+the scenario changed it, and writing a field stores the new value in the
+scenario only. Removed and added relationships are kept per scenario as
+well, and scenarios can be scheduled or analysed independently with the
+classes of ``xer_parser.scheduling``.
+
+A scenario is not stored as changes alone: the first time the records of a
+table are read, it builds a small view object for every base record of that
+table. The base records themselves are shared rather than copied, so many
+variants of one baseline can be held in memory at once, each costing its
+changes plus one view per base record it has read.
+"""
+
+from typing import Any
+
+from xer_parser.model.classes.calendar import Calendar
+from xer_parser.model.classes.taskpred import TaskPred
+
+__all__ = ["Scenario"]
+
+# Collections overlaid by a scenario: list property and key field
+_TABLES = {
+    "activities": ("activities", "task_id"),
+    "relations": ("relations", "task_pred_id"),
+    "activityresources": ("assignments", "taskrsrc_id"),
+    "projects": ("projects", "proj_id"),
+}
+
+
+class _Row:
+    """
+    View of a base record with the scenario's changes on top.
+
+    Parameters
+    ----------
+    base : Any
+        The base record
+    changes : dict[Any, dict[str, Any]]
+        Changed fields of the table's records, keyed by record ID
+    key : Any
+        ID of the record
+    """
+
+    __slots__ = ("_base", "_changes", "_key", "_own")
+
+    def __init__(self, base: Any, changes: dict[Any, dict[str, Any]], key: Any) -> None:
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_changes", changes)
+        object.__setattr__(self, "_key", key)
+        # the record's entry in ``changes``, shared so reads need one lookup
+        object.__setattr__(self, "_own", changes.get(key))
+
+    def __getattr__(self, name: str) -> Any:
+        own = self._own
+        if own is not None and name in own:
+            return own[name]
+        return getattr(self._base, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        own = self._own
+        if own is None:
+            own = self._changes.setdefault(self._key, {})
+            object.__setattr__(self, "_own", own)
+        own[name] = value
+
+    def __repr__(self) -> str:
+        return f"<{type(self._base).__name__} view {self._key}>"
+
+
+class _Table:
+    """
+    Collection of record views standing in for a collection of the base.
+
+    The records are exposed under the same list property as the base
+    collection (``activities``, ``relations``, ``assignments`` or
+    ``projects``).
+
+    Parameters
+    ----------
+    base : Any
+        The base collection
+    list_attr : str
+        Name of the list property of the base collection
+    key_attr : str
+        Name of the ID field of its records
+    """
+
+    def __init__(self, base: Any, list_attr: str, key_attr: str) -> None:
+        self._base = base
+        self._list_attr = list_attr
+        self._key_attr = key_attr
+        self.changes: dict[Any, dict[str, Any]] = {}
+        self.added: list[Any] = []
+        self.removed: set[Any] = set()
+        self._rows: list[Any] | None = None
+        self._index: dict[Any, Any] | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == self.__dict__.get("_list_attr"):
+            return self.rows()
+        raise AttributeError(name)
+
+    def rows(self) -> list[Any]:
+        """
+        Get the records of the scenario, built once until rows are added or
+        removed.
+
+        Returns
+        -------
+        list[Any]
+            Views of the base records not removed, then the added records
+        """
+        if self._rows is None:
+            key_attr, changes, removed = self._key_attr, self.changes, self.removed
+            base_rows = (
+                getattr(self._base, self._list_attr) if self._base is not None else []
+            )
+            rows = []
+            for record in base_rows:
+                key = getattr(record, key_attr)
+                if key not in removed:
+                    rows.append(_Row(record, changes, key))
+            rows.extend(self.added)
+            self._rows = rows
+        return self._rows
+
+    def find_by_id(self, key: Any) -> Any:
+        """
+        Get a record of the scenario by ID.
+
+        Parameters
+        ----------
+        key : Any
+            The record ID
+
+        Returns
+        -------
+        Any
+            The record view, None if there is no such record
+        """
+        if self._index is None:
+            self._index = {getattr(x, self._key_attr): x for x in self.rows()}
+        return self._index.get(key)
+
+    def add(self, record: Any) -> None:
+        self.added.append(record)
+        self._reset()
+
+    def remove(self, key: Any) -> None:
+        if self.find_by_id(key) is None:
+            raise KeyError(f"No record with {self._key_attr} {key!r}")
+        added = [x for x in self.added if getattr(x, self._key_attr) == key]
+        if added:
+            self.added.remove(added[0])
+        else:
+            self.removed.add(key)
+            self.changes.pop(key, None)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._rows = None
+        self._index = None
+
+    @property
+    def count(self) -> int:
+        return len(self.rows())
+
+    def __len__(self) -> int:
+        return len(self.rows())
+
+    def __iter__(self):
+        return iter(self.rows())
+
+
+class Scenario:
+    """
+    A what-if variant of a programme, stored as changes to a base.
+
+    Activities, relationships, assignments and projects are overlaid; every
+    other collection and attribute is read from the base unchanged. Writing
+    to a record of the scenario (for example with ``CPMScheduler.apply``)
+    changes the scenario only. Properties and methods of the base records
+    compute from the base fields.
+
+    Parameters
+    ----------
+    base : Reader or Scenario
+        The programme to vary, never modified by the scenario
+    name : str, optional
+        Label of the scenario
+
+    Examples
+    --------
+    >>> from xer_parser.scenario import Scenario
+    >>> from xer_parser.scheduling import CPMScheduler
+    >>> late = Scenario(xer, "late steel")
+    >>> late.set_duration(1001, 120)
+    >>> late.remove_relation("2045")
+    >>> dates = CPMScheduler(late).schedule()
+    >>> xer.activities.find_by_id(1001).target_drtn_hr_cnt  # unchanged
+    80.0
+    """
+
+    def __init__(self, base: Any, name: str | None = None) -> None:
+        self.base = base
+        self.name = name
+        self._tables: dict[str, _Table] = {}
+        self._next_relation: int | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _TABLES:
+            table = self._tables.get(name)
+            if table is None:
+                list_attr, key_attr = _TABLES[name]
+                table = self._tables[name] = _Table(
+                    getattr(self.base, name, None), list_attr, key_attr
+                )
+            return table
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def branch(self, name: str | None = None) -> "Scenario":
+        """
+        Start a scenario on top of this one.
+
+        Parameters
+        ----------
+        name : str, optional
+            Label of the new scenario
+
+        Returns
+        -------
+        Scenario
+            A scenario whose base is this scenario
+        """
+        return Scenario(self, name)
+
+    def update_activity(self, task_id: int, **fields: Any) -> None:
+        """
+        Change fields of an activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+        **fields : Any
+            New field values
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the activity does not exist
+        """
+        self._update("activities", task_id, fields)
+
+    def set_duration(self, task_id: int, hours: float) -> None:
+        """
+        Change the duration of an activity.
+
+        The remaining duration changes too, and is the only one changed once
+        the activity has started.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+        hours : float
+            The new duration in hours
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the activity does not exist
+        """
+        task = self._record("activities", task_id)
+        task.remain_drtn_hr_cnt = hours
+        if task.act_start_date is None:
+            task.target_drtn_hr_cnt = hours
+
+    def set_calendar(self, task_id: int, clndr_id: int) -> None:
+        """
+        Move an activity to another calendar.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+        clndr_id : int
+            The calendar
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the activity or the calendar does not exist
+        """
+        calendar = Calendar.find_by_id(clndr_id)
+        if calendar is None:
+            raise KeyError(f"No calendar with clndr_id {clndr_id!r}")
+        self._update(
+            "activities", task_id, {"clndr_id": clndr_id, "calendar": calendar}
+        )
+
+    def update_relation(self, task_pred_id: str, **fields: Any) -> None:
+        """
+        Change fields of a relationship, such as ``pred_type`` or
+        ``lag_hr_cnt``.
+
+        Parameters
+        ----------
+        task_pred_id : str
+            The relationship
+        **fields : Any
+            New field values
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the relationship does not exist
+        """
+        self._update("relations", task_pred_id, fields)
+
+    def add_relation(
+        self,
+        pred_task_id: int,
+        task_id: int,
+        pred_type: str = "PR_FS",
+        lag_hr_cnt: float = 0.0,
+    ) -> TaskPred:
+        """
+        Add a relationship to the scenario.
+
+        Parameters
+        ----------
+        pred_task_id : int
+            The predecessor
+        task_id : int
+            The successor
+        pred_type : str, optional
+            ``PR_FS`` (default), ``PR_SS``, ``PR_FF`` or ``PR_SF``
+        lag_hr_cnt : float, optional
+            Lag in hours, by default 0
+
+        Returns
+        -------
+        TaskPred
+            The new relationship, numbered after every existing one
+
+        Raises
+        ------
+        KeyError
+            If either activity does not exist
+        """
+        pred = self._record("activities", pred_task_id)
+        succ = self._record("activities", task_id)
+        relations = self.relations
+        if self._next_relation is None:
+            numbers = [
+                int(x.task_pred_id)
+                for x in relations.rows()
+                if x.task_pred_id is not None and str(x.task_pred_id).isdigit()
+            ]
+            self._next_relation = max(numbers, default=0) + 1
+        relation = TaskPred(
+            {
+                "task_pred_id": str(self._next_relation),
+                "task_id": str(task_id),
+                "pred_task_id": str(pred_task_id),
+                "proj_id": str(succ.proj_id) if succ.proj_id is not None else None,
+                "pred_proj_id": str(pred.proj_id) if pred.proj_id is not None else None,
+                "pred_type": pred_type,
+                "lag_hr_cnt": str(lag_hr_cnt),
+            }
+        )
+        # the constructor registers the record in TaskPred.obj_list, which
+        # the base's Tasks.has_no_successor and has_no_predecessor read
+        if TaskPred.obj_list and TaskPred.obj_list[-1] is relation:
+            TaskPred.obj_list.pop()
+        self._next_relation += 1
+        relations.add(relation)
+        return relation
+
+    def remove_relation(self, task_pred_id: str) -> None:
+        """
+        Remove a relationship from the scenario.
+
+        Parameters
+        ----------
+        task_pred_id : str
+            The relationship
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the relationship does not exist
+        """
+        self.relations.remove(task_pred_id)
+
+    def update_assignment(self, taskrsrc_id: int, **fields: Any) -> None:
+        """
+        Change fields of a resource assignment.
+
+        Parameters
+        ----------
+        taskrsrc_id : int
+            The assignment
+        **fields : Any
+            New field values
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the assignment does not exist
+        """
+        self._update("activityresources", taskrsrc_id, fields)
+
+    @property
+    def changes(self) -> dict[str, dict[str, Any]]:
+        """
+        Get the changes the scenario holds over its base.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            For every overlaid collection with changes, the ``updated``
+            fields by record ID, the ``added`` records and the IDs of the
+            ``removed`` records
+        """
+        return {
+            name: {
+                "updated": {k: dict(v) for k, v in table.changes.items()},
+                "added": list(table.added),
+                "removed": sorted(table.removed, key=str),
+            }
+            for name, table in self._tables.items()
+            if table.changes or table.added or table.removed
+        }
+
+    def _record(self, table: str, key: Any) -> Any:
+        record = getattr(self, table).find_by_id(key)
+        if record is None:
+            raise KeyError(f"No record with {_TABLES[table][1]} {key!r}")
+        return record
+
+    def _update(self, table: str, key: Any, fields: dict[str, Any]) -> None:
+        record = self._record(table, key)
+        for field, value in fields.items():
+            setattr(record, field, value)
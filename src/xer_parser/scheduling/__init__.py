@@ -0,0 +1,5 @@
+from xer_parser.scheduling.cpm import CPMScheduler
+from xer_parser.scheduling.incremental import IncrementalScheduler
+from xer_parser.scheduling.network import LogicNetwork
+
+__all__ = ["CPMScheduler", "IncrementalScheduler", "LogicNetwork"]
@@ -0,0 +1,535 @@
+"""Working-time arithmetic for activity calendars.
+
+Schedule dates are handled as integer minutes since the P6 serial date origin
+(1899-12-30), which keeps the scheduling passes free of ``datetime`` objects.
+Each calendar's ``clndr_data`` is compiled once into per-day working periods
+and a cumulative working-minute array, so moving a date by an amount of
+working time or measuring the working time between two dates is a binary
+search instead of a day-by-day walk.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+__all__ = [
+    "WorkCalendar",
+    "get_calendar",
+    "parse_clndr_data",
+    "to_datetime",
+    "to_minutes",
+]
+
+EPOCH = datetime(1899, 12, 30)
+_MINUTE = timedelta(minutes=1)
+_DAY = 1440
+# EPOCH is a Saturday; P6 numbers the days of the week from Sunday = 1
+_P6_DAY_OF_WEEK = [7, 1, 2, 3, 4, 5, 6]
+# Default compiled range, as P6 serial day numbers (1980-01-01 .. 2080-01-01)
+_DEFAULT_RANGE = (29221, 65745)
+
+# Compiled calendars, least recently used first; each holds about 1.5 MB of
+# day arrays, so long-lived processes reading many files keep a bounded set
+_CACHE_SIZE = 32
+_cache: OrderedDict[Any, "WorkCalendar"] = OrderedDict()
+
+
+def to_minutes(date: datetime) -> int:
+    """
+    Convert a datetime to minutes since the P6 date origin.
+
+    Parameters
+    ----------
+    date : datetime
+        The date to convert
+
+    Returns
+    -------
+    int
+        Minutes since 1899-12-30 00:00
+    """
+    return (date - EPOCH) // _MINUTE
+
+
+def to_datetime(minutes: int) -> datetime:
+    """
+    Convert minutes since the P6 date origin back to a datetime.
+
+    Parameters
+    ----------
+    minutes : int
+        Minutes since 1899-12-30 00:00
+
+    Returns
+    -------
+    datetime
+        The corresponding date
+    """
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def _skip_blanks(text: str, i: int) -> int:
+    while i < len(text) and text[i] in " \t\r\n\x7f":
+        i += 1
+    return i
+
+
+def _parse_node(text: str, i: int) -> tuple[tuple[str, str, list], int]:
+    """
+    Parse one ``(key||name(attributes)(children))`` node of ``clndr_data``.
+
+    Parameters
+    ----------
+    text : str
+        The calendar data
+    i : int
+        Position of the node's opening parenthesis
+
+    Returns
+    -------
+    tuple[tuple[str, str, list], int]
+        The ``(name, attributes, children)`` node and the position after it
+    """
+    i = text.index("||", i + 1) + 2
+    open_attrs = text.index("(", i)
+    name = text[i:open_attrs].strip()
+    close_attrs = text.index(")", open_attrs)
+    attrs = text[open_attrs + 1 : close_attrs]
+    children = []
+    i = _skip_blanks(text, close_attrs + 1)
+    if i < len(text) and text[i] == "(":
+        i = _skip_blanks(text, i + 1)
+        while i < len(text) and text[i] == "(":
+            child, i = _parse_node(text, i)
+            children.append(child)
+            i = _skip_blanks(text, i)
+        i = _skip_blanks(text, i + 1)
+    return (name, attrs, children), i + 1
+
+
+def parse_clndr_data(text: str) -> tuple[dict[int, tuple], dict[int, tuple]]:
+    """
+    Extract the weekly work pattern and the exceptions from ``clndr_data``.
+
+    Parameters
+    ----------
+    text : str
+        The ``clndr_data`` field of a CALENDAR record
+
+    Returns
+    -------
+    tuple[dict[int, tuple], dict[int, tuple]]
+        Working periods per P6 day of the week (Sunday = 1) and per exception
+        day (P6 serial day number), each as a tuple of ``(start, finish)``
+        minutes after midnight. An empty tuple is a non-working day.
+
+    Raises
+    ------
+    ValueError
+        If the text is not valid calendar data
+    """
+    start = text.find("(")
+    if start < 0:
+        raise ValueError("Calendar data contains no nodes")
+    root, _ = _parse_node(text, start)
+    week: dict[int, tuple] = {}
+    exceptions: dict[int, tuple] = {}
+    stack = [root]
+    while stack:
+        name, _, children = stack.pop()
+        if name == "DaysOfWeek":
+            for day, _, periods in children:
+                week[int(day)] = _periods(periods)
+        elif name == "Exceptions":
+            for _, attrs, periods in children:
+                fields = attrs.split("|")
+                if "d" in fields:
+                    day = int(float(fields[fields.index("d") + 1]))
+                    exceptions[day] = _periods(periods)
+        else:
+            stack.extend(children)
+    return week, exceptions
+
+
+def _periods(nodes: list) -> tuple[tuple[int, int], ...]:
+    """
+    Convert ``s|hh:mm|f|hh:mm`` nodes into sorted minute ranges.
+
+    Parameters
+    ----------
+    nodes : list
+        Parsed work period nodes
+
+    Returns
+    -------
+    tuple[tuple[int, int], ...]
+        ``(start, finish)`` minutes after midnight
+    """
+    periods = []
+    for _, attrs, _ in nodes:
+        fields = attrs.split("|")
+        values = dict(zip(fields[::2], fields[1::2], strict=False))
+        if "s" not in values or "f" not in values:
+            continue
+        hour, minute = values["s"].split(":")
+        start = int(hour) * 60 + int(minute)
+        hour, minute = values["f"].split(":")
+        finish = int(hour) * 60 + int(minute)
+        if finish <= start:
+            finish = _DAY
+        periods.append((start, finish))
+    return tuple(sorted(periods))
+
+
+class WorkCalendar:
+    """
+    Compiled working-time calendar.
+
+    The calendar is expanded over a range of days into the working periods of
+    every day and the cumulative working minutes at the start of every day.
+    A date is converted to cumulative working time with one array lookup and
+    back again with a binary search, so every operation is O(log n) in the
+    number of compiled days. The range grows automatically when a date outside
+    of it is used.
+
+    Parameters
+    ----------
+    calendar : Calendar, optional
+        The P6 calendar to compile. Without ``clndr_data`` (or without a
+        calendar) a Monday to Friday pattern of ``day_hr_cnt`` hours (default
+        8) starting at 08:00 is used.
+
+    Attributes
+    ----------
+    hours_per_day : float
+        Working hours of a day (``day_hr_cnt``, default 8), the unit of the
+        durations and floats P6 reports in days
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from xer_parser.scheduling.calendar import get_calendar
+    >>> cal = get_calendar(xer.calendars.find_by_id(1))
+    >>> cal.add_work_hours(datetime(2024, 1, 1, 8), 16)
+    datetime.datetime(2024, 1, 2, 17, 0)
+    """
+
+    def __init__(self, calendar: Any = None) -> None:
+        self.clndr_id = getattr(calendar, "clndr_id", None)
+        self.hours_per_day = float(getattr(calendar, "day_hr_cnt", None) or 8.0)
+        week: dict[int, tuple] = {}
+        exceptions: dict[int, tuple] = {}
+        text = getattr(calendar, "clndr_data", None)
+        if text:
+            try:
+                week, exceptions = parse_clndr_data(text)
+            except ValueError:
+                week, exceptions = {}, {}
+        if not any(week.values()):
+            length = min(round(self.hours_per_day * 60), _DAY)
+            start = min(8 * 60, _DAY - length)
+            week = {
+                x: ((start, start + length),) if 1 < x < 7 else () for x in range(1, 8)
+            }
+        self._week = [week.get(x, ()) for x in _P6_DAY_OF_WEEK]
+        self._exceptions = exceptions
+        self._first = 0
+        self._cum: list[int] = [0]
+        self._days: list[tuple] = []
+        self._compile(*_DEFAULT_RANGE)
+
+    def _compile(self, first: int, last: int) -> None:
+        """
+        Expand the calendar over the days ``first`` to ``last`` (exclusive).
+
+        Parameters
+        ----------
+        first : int
+            First P6 serial day number
+        last : int
+            Day after the last P6 serial day number
+
+        Returns
+        -------
+        None
+        """
+        week, exceptions = self._week, self._exceptions
+        days = []
+        cum = [0]
+        total = 0
+        for day in range(first, last):
+            periods = exceptions.get(day)
+            if periods is None:
+                periods = week[day % 7]
+            days.append(periods)
+            for start, finish in periods:
+                total += finish - start
+            cum.append(total)
+        # keep the origin fixed so cumulative values survive a range change
+        origin = cum[_DEFAULT_RANGE[0] - first]
+        self._cum = [x - origin for x in cum]
+        self._first, self._last, self._days = first, last, days
+
+    def _ensure(self, day: int) -> None:
+        """
+        Grow the compiled range so that it contains ``day``.
+
+        Parameters
+        ----------
+        day : int
+            P6 serial day number
+
+        Returns
+        -------
+        None
+        """
+        first, last = self._first, self._last
+        if first <= day < last:
+            return
+        span = last - first
+        if day < first:
+            first = min(day, first - span)
+        else:
+            last = max(day + 1, last + span)
+        self._compile(first, last)
+
+    def cumulative(self, t: int) -> int:
+        """
+        Get the working minutes between a fixed origin and ``t``.
+
+        Only differences between two cumulative values are meaningful.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+
+        Returns
+        -------
+        int
+            Cumulative working minutes
+        """
+        day, minute = divmod(t, _DAY)
+        if not self._first <= day < self._last:
+            self._ensure(day)
+        index = day - self._first
+        total = self._cum[index]
+        for start, finish in self._days[index]:
+            if minute <= start:
+                break
+            total += (finish if minute > finish else minute) - start
+        return total
+
+    def _locate(self, work: int, finish: bool) -> int:
+        """
+        Find the instant at which ``work`` cumulative minutes are reached.
+
+        Parameters
+        ----------
+        work : int
+            Cumulative working minutes
+        finish : bool
+            If True, return the end of the preceding working period when
+            ``work`` falls on a period boundary, otherwise the start of the
+            next one
+
+        Returns
+        -------
+        int
+            Minutes since the date origin
+        """
+        while True:
+            cum = self._cum
+            if finish:
+                index = bisect_left(cum, work) - 1
+            else:
+                index = bisect_right(cum, work) - 1
+            if 0 <= index < len(self._days):
+                break
+            # outside of the compiled range: grow it and search again
+            self._ensure(self._first - 1 if index < 0 else self._last)
+        rem = work - cum[index]
+        base = (self._first + index) * _DAY
+        for start, end in self._days[index]:
+            length = end - start
+            if rem < length or (finish and rem == length):
+                return base + start + rem
+            rem -= length
+        return base + _DAY
+
+    def add_work_minutes(self, t: int, minutes: int) -> int:
+        """
+        Move a date forwards (or backwards) by an amount of working time.
+
+        Moving forwards ends at the finish of a working period; moving
+        backwards ends at the start of one.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+        minutes : int
+            Working minutes to add; negative values subtract
+
+        Returns
+        -------
+        int
+            The resulting date in minutes since the date origin
+        """
+        if minutes == 0:
+            return t
+        return self._locate(self.cumulative(t) + minutes, minutes > 0)
+
+    def work_minutes_between(self, start: int, end: int) -> int:
+        """
+        Get the working minutes between two dates.
+
+        Parameters
+        ----------
+        start : int
+            Minutes since the date origin
+        end : int
+            Minutes since the date origin
+
+        Returns
+        -------
+        int
+            Working minutes, negative if ``end`` is before ``start``
+        """
+        return self.cumulative(end) - self.cumulative(start)
+
+    def to_start(self, t: int) -> int:
+        """
+        Move a date to the next instant at which work can start.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+
+        Returns
+        -------
+        int
+            ``t`` itself if it lies inside a working period, otherwise the
+            start of the next working period
+        """
+        return self._locate(self.cumulative(t), False)
+
+    def to_finish(self, t: int) -> int:
+        """
+        Move a date back to the instant at which work last stopped.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+
+        Returns
+        -------
+        int
+            ``t`` itself if it lies inside a working period, otherwise the
+            end of the previous working period
+        """
+        return self._locate(self.cumulative(t), True)
+
+    def add_work_hours(self, date: datetime, hours: float) -> datetime:
+        """
+        Add working hours to a date.
+
+        Parameters
+        ----------
+        date : datetime
+            The start date
+        hours : float
+            Working hours to add; negative values subtract
+
+        Returns
+        -------
+        datetime
+            The date at which the working time is used up
+        """
+        return to_datetime(self.add_work_minutes(to_minutes(date), round(hours * 60)))
+
+    def work_hours_between(self, start: datetime, end: datetime) -> float:
+        """
+        Get the working hours between two dates.
+
+        Parameters
+        ----------
+        start : datetime
+            The start date
+        end : datetime
+            The end date
+
+        Returns
+        -------
+        float
+            Working hours, negative if ``end`` is before ``start``
+        """
+        return self.work_minutes_between(to_minutes(start), to_minutes(end)) / 60.0
+
+    def next_working_time(self, date: datetime) -> datetime:
+        """
+        Get the first working instant at or after a date.
+
+        Parameters
+        ----------
+        date : datetime
+            The date
+
+        Returns
+        -------
+        datetime
+            ``date`` itself if it is working time, otherwise the start of the
+            next working period
+        """
+        return to_datetime(self.to_start(to_minutes(date)))
+
+    def is_working_time(self, date: datetime) -> bool:
+        """
+        Check whether a date falls inside a working period.
+
+        Parameters
+        ----------
+        date : datetime
+            The date
+
+        Returns
+        -------
+        bool
+            True if work is scheduled at that instant
+        """
+        t = to_minutes(date)
+        return self.cumulative(t + 1) > self.cumulative(t)
+
+
+def get_calendar(calendar: Any = None) -> WorkCalendar:
+    """
+    Get the compiled calendar for a P6 calendar, cached per calendar ID.
+
+    The cache keeps the ``_CACHE_SIZE`` most recently used calendars.
+
+    Parameters
+    ----------
+    calendar : Calendar, optional
+        The P6 calendar; None returns the default calendar
+
+    Returns
+    -------
+    WorkCalendar
+        The compiled calendar
+    """
+    key = (
+        getattr(calendar, "clndr_id", None),
+        getattr(calendar, "clndr_data", None),
+        getattr(calendar, "day_hr_cnt", None),
+    )
+    work_calendar = _cache.get(key)
+    if work_calendar is None:
+        work_calendar = _cache[key] = WorkCalendar(calendar)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return work_calendar
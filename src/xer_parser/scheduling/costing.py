@@ -0,0 +1,143 @@
+"""Bulk re-pricing of resource assignments.
+
+Rate-change scenarios re-cost every TASKRSRC record against a set of
+RSRCRATE and ROLERATE records. ``reprice_assignments`` does this in a single
+pass: each price comes from the per-resource rate timeline of
+``ResourceRates`` (a bisect on the sorted start dates) and is memoised per
+resource, price level and date, so assignments sharing a resource and a
+start date are priced once.
+"""
+
+from typing import Any
+
+from xer_parser.scheduling.loading import ResourceLoading, _as_float
+
+__all__ = ["reprice_assignments"]
+
+# TASKRSRC.rate_type values and the price level they select
+_RATE_LEVELS = {
+    "COST_PER_QTY": 1,
+    "COST_PER_QTY2": 2,
+    "COST_PER_QTY3": 3,
+    "COST_PER_QTY4": 4,
+    "COST_PER_QTY5": 5,
+}
+
+
+def reprice_assignments(
+    programme: Any,
+    resourcerates: Any = None,
+    rolerates: Any = None,
+    assignments: list[Any] | None = None,
+    apply: bool = False,
+) -> dict[int, dict[str, float]]:
+    """
+    Recompute the price and costs of resource assignments.
+
+    The price of an assignment depends on its ``cost_per_qty_source_type``:
+    ``ST_Role`` takes the ROLERATE price of its role (or of the assigned
+    resource's role), ``ST_Rsrc`` or no source the RSRCRATE price of its
+    resource, and any other source keeps the assignment's own
+    ``cost_per_qty``. The price level follows ``rate_type``
+    (``COST_PER_QTY`` to ``COST_PER_QTY5``, by default the first). Resource
+    prices are those in effect at the planned start for ``target_cost`` and
+    at the remaining start for ``remain_cost`` and ``cost_per_qty``, falling
+    back to the activity dates. Actual costs are left as recorded, and
+    assignments whose costs are not linked to their units
+    (``cost_qty_link_flag`` of ``N``) or that have no price are skipped.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activityresources`` and
+        ``activities``; ``resourcerates``, ``rolerates`` and ``resources``
+        are used when present) to re-price
+    resourcerates : ResourceRates, optional
+        Resource rates to price with, by default the programme's
+    rolerates : RoleRates, optional
+        Role rates to price with, by default the programme's
+    assignments : list[TaskRsrc], optional
+        The assignments to re-price, by default every assignment
+    apply : bool, optional
+        Write the new price and costs onto the assignments, by default False
+
+    Returns
+    -------
+    dict[int, dict[str, float]]
+        ``cost_per_qty``, ``target_cost`` and ``remain_cost`` keyed by
+        ``taskrsrc_id`` for every assignment re-priced
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.costing import reprice_assignments
+    >>> costs = reprice_assignments(xer, resourcerates=scenario_rates)
+    >>> sum(x["remain_cost"] for x in costs.values())
+    """
+    if resourcerates is None:
+        resourcerates = getattr(programme, "resourcerates", None)
+    if rolerates is None:
+        rolerates = getattr(programme, "rolerates", None)
+    if assignments is None:
+        assignments = programme.activityresources.assignments
+    resources = getattr(programme, "resources", None)
+    loading = ResourceLoading(programme)
+    prices: dict[tuple, float | None] = {}
+
+    def resource_price(rsrc_id: Any, level: int, when: Any) -> float | None:
+        key = (rsrc_id, level, when)
+        if key not in prices:
+            prices[key] = (
+                None
+                if resourcerates is None or rsrc_id is None
+                else resourcerates.cost_per_qty(rsrc_id, when, level)
+            )
+        return prices[key]
+
+    def role_price(assignment: Any, level: int) -> float | None:
+        role_id = assignment.role_id
+        if role_id is None and resources is not None and assignment.rsrc_id is not None:
+            resource = resources.get_resource_by_id(assignment.rsrc_id)
+            role_id = None if resource is None else resource.role_id
+        if role_id is None or rolerates is None:
+            return None
+        key = ("role", role_id, level)
+        if key not in prices:
+            prices[key] = rolerates.cost_per_qty(int(role_id), level)
+        return prices[key]
+
+    result = {}
+    for assignment in assignments:
+        if assignment.cost_qty_link_flag == "N":
+            continue
+        level = _RATE_LEVELS.get(assignment.rate_type, 1)
+        source = assignment.cost_per_qty_source_type
+        if source == "ST_Role":
+            target_price = remain_price = role_price(assignment, level)
+        elif source in (None, "ST_Rsrc"):
+            target_start = loading.window(assignment, "target")[0]
+            remain_start = loading.window(assignment, "remaining")[0]
+            target_price = resource_price(assignment.rsrc_id, level, target_start)
+            remain_price = resource_price(assignment.rsrc_id, level, remain_start)
+        else:
+            target_price = remain_price = (
+                None
+                if assignment.cost_per_qty in (None, "")
+                else _as_float(assignment.cost_per_qty)
+            )
+        if target_price is None or remain_price is None:
+            continue
+        result[assignment.taskrsrc_id] = {
+            "cost_per_qty": remain_price,
+            "target_cost": _as_float(assignment.target_qty) * target_price,
+            "remain_cost": _as_float(assignment.remain_qty) * remain_price,
+        }
+
+    if apply and result:
+        for assignment in assignments:
+            costs = result.get(assignment.taskrsrc_id)
+            if costs is not None:
+                for field, value in costs.items():
+                    setattr(assignment, field, value)
+        if resources is not None:
+            resources.invalidate_rollup()
+    return result
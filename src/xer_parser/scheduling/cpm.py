@@ -0,0 +1,622 @@
+"""Critical path method scheduling over the parsed activity network.
+
+This module recomputes early and late dates, total float and free float from
+the TASK and TASKPRED tables, so a schedule can be recalculated after edits
+without going back to Primavera P6.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from xer_parser.model.classes.p6codes import ActivityType, ConstraintType
+from xer_parser.scheduling.calendar import get_calendar, to_datetime, to_minutes
+from xer_parser.scheduling.network import FF, FS, SF, SS, LogicNetwork
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+__all__ = ["CPMScheduler"]
+
+_DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Node states
+_NOT_STARTED, _IN_PROGRESS, _COMPLETE = 0, 1, 2
+
+# Constraints that push the early dates (forward pass)
+_EARLY_START = (ConstraintType.StartOn, ConstraintType.StartOnOrAfter)
+_EARLY_FINISH = (ConstraintType.FinishOn, ConstraintType.FinishOnOrAfter)
+# Constraints that pull the late dates (backward pass)
+_LATE_START = (ConstraintType.StartOn, ConstraintType.StartOnOrBefore)
+_LATE_FINISH = (ConstraintType.FinishOn, ConstraintType.FinishOnOrBefore)
+
+
+def _parse_date(value: Any) -> datetime | None:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value.strip(), _DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+class CPMScheduler:
+    """
+    Forward/backward pass scheduler for a parsed XER programme.
+
+    The network is ordered topologically once and each pass visits every
+    activity and relationship exactly once, so a full schedule costs
+    O(N + M) calendar operations.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities``,
+        ``relations`` and ``projects`` collections) to schedule
+    data_date : datetime, optional
+        Data date used for every project. Defaults to each project's
+        ``last_recalc_date``.
+
+    Attributes
+    ----------
+    network : LogicNetwork
+        The indexed activity network
+    es, ef, ls, lf : list[int]
+        Early/late start and finish of every node, in minutes since the
+        calendar date origin
+    total_float, free_float : list[int | None]
+        Float of every node in working minutes of the activity calendar
+    rel_free_float : list[int | None]
+        Free float of every relationship in working minutes of the
+        predecessor calendar; zero marks a driving relationship
+    project_finish : dict[Any, int]
+        Latest early finish of each project
+
+    Notes
+    -----
+    The scheduler follows P6 defaults:
+
+    - Relationship lags are counted on the predecessor's calendar.
+    - In-progress activities keep their actual start and schedule their
+      remaining duration from the data date (retained logic).
+    - Completed activities keep their actual dates and carry no float.
+    - Start On/Finish On and the "on or after" constraints delay the early
+      dates, the "on or before" constraints pull the late dates, mandatory
+      constraints override logic and As Late As Possible activities consume
+      their free float. Both ``cstr_type`` and ``cstr_type2`` are honoured.
+    - Level of effort and WBS summary activities do not drive other
+      activities; they span from their predecessors to their successors.
+    - Total float is finish float, measured on the activity calendar.
+
+    Examples
+    --------
+    >>> from xer_parser.reader import Reader
+    >>> from xer_parser.scheduling import CPMScheduler
+    >>> xer = Reader("project.xer")
+    >>> cpm = CPMScheduler(xer)
+    >>> dates = cpm.schedule()
+    >>> cpm.apply()
+    """
+
+    def __init__(self, programme: Any, data_date: datetime | None = None) -> None:
+        self.programme = programme
+        self.data_date = data_date
+        self.network = LogicNetwork(
+            programme.activities.activities, programme.relations.relations
+        )
+        self.es: list[int] = []
+        self.ef: list[int] = []
+        self.ls: list[int] = []
+        self.lf: list[int] = []
+        self.total_float: list[int | None] = []
+        self.free_float: list[int | None] = []
+        self.rel_free_float: list[int | None] = []
+        self.project_finish: dict[Any, int] = {}
+
+    def schedule(self) -> dict[int, dict[str, Any]]:
+        """
+        Run the forward and backward passes.
+
+        Returns
+        -------
+        dict[int, dict[str, Any]]
+            Mapping of ``task_id`` to the recomputed ``early_start_date``,
+            ``early_end_date``, ``late_start_date``, ``late_end_date``,
+            ``total_float_hr_cnt`` and ``free_float_hr_cnt``
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        self._prepare()
+        order = self.network.topological_order()
+        for node in order:
+            self._forward(node)
+        self._finish_forward()
+        for node in reversed(order):
+            self._backward(node)
+        for node in reversed(order):
+            self._floats(node)
+        self._late_activities()
+        return self.results()
+
+    def results(self) -> dict[int, dict[str, Any]]:
+        """
+        Get the computed dates and floats keyed by task ID.
+
+        Returns
+        -------
+        dict[int, dict[str, Any]]
+            Dates as datetimes and floats in hours, as returned by ``schedule``
+        """
+        return {
+            task_id: self.dates(node)
+            for node, task_id in enumerate(self.network.task_ids)
+        }
+
+    def dates(self, node: int) -> dict[str, Any]:
+        """
+        Get the computed dates and floats of a single node.
+
+        Parameters
+        ----------
+        node : int
+            Node number in ``network``
+
+        Returns
+        -------
+        dict[str, Any]
+            Dates as datetimes and floats in hours
+        """
+        cal = self.cal[node]
+        tf = self.total_float[node]
+        ff = self.free_float[node]
+        return {
+            "early_start_date": to_datetime(self.es[node]),
+            "early_end_date": to_datetime(self.ef[node]),
+            "late_start_date": to_datetime(self.ls[node]),
+            "late_end_date": to_datetime(cal.to_finish(self.lf[node])),
+            "total_float_hr_cnt": None if tf is None else tf / 60.0,
+            "free_float_hr_cnt": None if ff is None else ff / 60.0,
+        }
+
+    def apply(self) -> None:
+        """
+        Write the computed dates and floats back onto the Task objects.
+
+        Returns
+        -------
+        None
+        """
+        for node, task in enumerate(self.network.tasks):
+            for field, value in self.dates(node).items():
+                setattr(task, field, value)
+
+    def _prepare(self) -> None:
+        """
+        Translate the activities into per-node arrays.
+
+        Returns
+        -------
+        None
+        """
+        net = self.network
+        n = net.node_count
+        projects = self._projects()
+        data_dates = {}
+        for proj_id, project in projects.items():
+            date = self.data_date or _parse_date(project.last_recalc_date)
+            if date is not None:
+                data_dates[proj_id] = to_minutes(date)
+        fallback = self._fallback_data_date(data_dates)
+        self.must_finish = {}
+        for proj_id, project in projects.items():
+            date = _parse_date(getattr(project, "plan_end_date", None))
+            if date is not None:
+                self.must_finish[proj_id] = to_minutes(date)
+
+        self.cal = [get_calendar(task.calendar) for task in net.tasks]
+        self.proj = [task.proj_id for task in net.tasks]
+        self.dd = [data_dates.get(task.proj_id, fallback) for task in net.tasks]
+        self.state = [_NOT_STARTED] * n
+        self.dur = [0] * n
+        self.act_start: list[int | None] = [None] * n
+        self.act_end: list[int | None] = [None] * n
+        self.drives = [True] * n
+        self.cstr: list[tuple[tuple[str, int], ...]] = [()] * n
+        self.finish_milestone = [False] * n
+        for i, task in enumerate(net.tasks):
+            self._prepare_node(i, task)
+        self._alap = [
+            i
+            for i, cstr in enumerate(self.cstr)
+            if any(x == ConstraintType.AsLateAsPossible for x, _ in cstr)
+        ]
+        self._alap_shifted: dict[int, tuple] = {}
+        self.lag = [round(x * 60) for x in net.rel_lag]
+        self.es = [0] * n
+        self.ef = [0] * n
+        self.ls = [0] * n
+        self.lf = [0] * n
+        self.total_float = [None] * n
+        self.free_float = [None] * n
+        self.rel_free_float = [None] * len(net.relations)
+
+    def _prepare_node(self, i: int, task: Any) -> None:
+        """
+        Read the scheduling inputs of a single activity.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+        task : Task
+            The activity
+
+        Returns
+        -------
+        None
+        """
+        if task.act_start_date is not None:
+            self.act_start[i] = to_minutes(task.act_start_date)
+            self.state[i] = _IN_PROGRESS
+            if task.act_end_date is not None:
+                self.act_end[i] = to_minutes(task.act_end_date)
+                self.state[i] = _COMPLETE
+        if task.task_type in (
+            ActivityType.StartMilestone,
+            ActivityType.FinishMilestone,
+        ):
+            hours = 0.0
+        elif self.state[i] == _IN_PROGRESS:
+            hours = task.remain_drtn_hr_cnt or 0.0
+        else:
+            hours = task.remain_drtn_hr_cnt or task.target_drtn_hr_cnt or 0.0
+        self.dur[i] = round(hours * 60)
+        self.finish_milestone[i] = task.task_type == ActivityType.FinishMilestone
+        self.drives[i] = task.task_type not in (
+            ActivityType.LevelOfEffort,
+            ActivityType.WBSSummary,
+        )
+        cstr = []
+        for ctype, cdate in (
+            (task.cstr_type, task.cstr_date),
+            (task.cstr_type2, task.cstr_date2),
+        ):
+            if ctype == ConstraintType.AsLateAsPossible:
+                cstr.append((ctype, 0))
+            elif ctype and cdate is not None:
+                cstr.append((ctype, to_minutes(cdate)))
+        self.cstr[i] = tuple(cstr)
+
+    def _projects(self) -> dict[Any, Any]:
+        """
+        Index the programme's projects by ID.
+
+        Returns
+        -------
+        dict[Any, Project]
+            Projects keyed by ``proj_id``
+        """
+        projects = getattr(self.programme, "projects", None)
+        projects = getattr(projects, "projects", None) or []
+        return {x.proj_id: x for x in projects}
+
+    def _fallback_data_date(self, data_dates: dict[Any, int]) -> int:
+        """
+        Pick a data date for activities whose project has none.
+
+        Returns
+        -------
+        int
+            The given data date, the earliest known project data date, or
+            otherwise the earliest planned or actual start of any activity
+        """
+        if self.data_date is not None:
+            return to_minutes(self.data_date)
+        if data_dates:
+            return min(data_dates.values())
+        starts = [
+            x.act_start_date or x.target_start_date or x.early_start_date
+            for x in self.network.tasks
+        ]
+        starts = [x for x in starts if x is not None]
+        if not starts:
+            raise ValueError("No data date given and none found in the programme")
+        return to_minutes(min(starts))
+
+    def _forward(self, j: int) -> None:
+        """
+        Compute the early dates of a node from its predecessors.
+
+        Parameters
+        ----------
+        j : int
+            Node number
+
+        Returns
+        -------
+        None
+        """
+        state = self.state[j]
+        if state == _COMPLETE:
+            self.es[j] = self.act_start[j]
+            self.ef[j] = self.act_end[j]
+            return
+        net, es, ef, cal = self.network, self.es, self.ef, self.cal
+        rel_pred, rel_type, lag, drives = (
+            net.rel_pred,
+            net.rel_type,
+            self.lag,
+            self.drives,
+        )
+        cal_j, dur = cal[j], self.dur[j]
+        start = self.dd[j]
+        finish = None
+        for k in net.pred_rels[j]:
+            i = rel_pred[k]
+            if not drives[i]:
+                continue
+            kind = rel_type[k]
+            base = ef[i] if kind in (FS, FF) else es[i]
+            if lag[k]:
+                base = cal[i].add_work_minutes(base, lag[k])
+            if kind in (FS, SS):
+                if base > start:
+                    start = base
+            elif finish is None or base > finish:
+                finish = base
+        if finish is not None:
+            finish = cal_j.add_work_minutes(finish, -dur)
+            if finish > start:
+                start = finish
+        if state == _NOT_STARTED:
+            start = self._early_constraints(j, start)
+        if self.finish_milestone[j]:
+            start = cal_j.to_finish(start)
+        else:
+            start = cal_j.to_start(start)
+        if state == _IN_PROGRESS:
+            es[j] = self.act_start[j]
+        else:
+            es[j] = start
+        ef[j] = cal_j.add_work_minutes(start, dur)
+
+    def _early_constraints(self, j: int, start: int) -> int:
+        """
+        Apply the forward-pass constraints of a node.
+
+        Parameters
+        ----------
+        j : int
+            Node number
+        start : int
+            Logic-driven early start
+
+        Returns
+        -------
+        int
+            The constrained early start
+        """
+        cal_j, dur = self.cal[j], self.dur[j]
+        mandatory = None
+        for ctype, date in self.cstr[j]:
+            if ctype in _EARLY_START:
+                start = max(start, date)
+            elif ctype in _EARLY_FINISH:
+                start = max(start, cal_j.add_work_minutes(date, -dur))
+            elif ctype == ConstraintType.MandatoryStart:
+                mandatory = date
+            elif ctype == ConstraintType.MandatoryFinish:
+                mandatory = cal_j.add_work_minutes(date, -dur)
+        return start if mandatory is None else mandatory
+
+    def _finish_forward(self) -> None:
+        """
+        Derive the spanning dates of non-driving activities and the project
+        finish dates once all driving activities have early dates.
+
+        Returns
+        -------
+        None
+        """
+        net = self.network
+        # successors first, so a span can reach through another spanning node
+        for i in reversed(net.topological_order()):
+            if not self.drives[i] and self.state[i] != _COMPLETE:
+                finish = self._span_finish(i, self.es, self.ef)
+                if finish > self.ef[i]:
+                    self.ef[i] = finish
+        self.project_finish = {}
+        for i in range(net.node_count):
+            proj_id = self.proj[i]
+            if self.ef[i] > self.project_finish.get(proj_id, self.ef[i] - 1):
+                self.project_finish[proj_id] = self.ef[i]
+
+    def _span_finish(self, i: int, start: list[int], finish: list[int]) -> int:
+        """
+        Get the date up to which a level of effort activity spans.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+        start, finish : list[int]
+            Start and finish dates of the successors to span to
+
+        Returns
+        -------
+        int
+            The latest successor date reached through the node's relationships
+        """
+        net = self.network
+        span = finish[i]
+        for k in net.successors(i):
+            j = net.rel_succ[k]
+            kind = net.rel_type[k]
+            date = start[j] if kind in (FS, SS) else finish[j]
+            if date > span:
+                span = date
+        return span
+
+    def _anchor(self, i: int) -> int:
+        """
+        Get the late finish of an activity without successors.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+
+        Returns
+        -------
+        int
+            The project's must-finish-by date, otherwise its early finish
+        """
+        proj_id = self.proj[i]
+        return self.must_finish.get(proj_id, self.project_finish[proj_id])
+
+    def _backward(self, i: int) -> None:
+        """
+        Compute the late dates of a node from its successors.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+
+        Returns
+        -------
+        None
+        """
+        if self.state[i] == _COMPLETE:
+            self.ls[i] = self.es[i]
+            self.lf[i] = self.ef[i]
+            return
+        if not self.drives[i]:
+            return
+        net, ls, lf, state, drives = (
+            self.network,
+            self.ls,
+            self.lf,
+            self.state,
+            self.drives,
+        )
+        rel_succ, rel_type, lag = net.rel_succ, net.rel_type, self.lag
+        cal_i, dur = self.cal[i], self.dur[i]
+        finish = self._anchor(i)
+        for k in net.succ_rels[i]:
+            j = rel_succ[k]
+            if not drives[j] or state[j] == _COMPLETE:
+                continue
+            kind = rel_type[k]
+            base = ls[j] if kind in (FS, SS) else lf[j]
+            if lag[k]:
+                base = cal_i.add_work_minutes(base, -lag[k])
+            if kind in (SS, SF):
+                base = cal_i.add_work_minutes(base, dur)
+            if base < finish:
+                finish = base
+        finish = self._late_constraints(i, finish)
+        lf[i] = finish
+        if dur:
+            ls[i] = cal_i.add_work_minutes(finish, -dur)
+        else:
+            ls[i] = finish if self.finish_milestone[i] else cal_i.to_start(finish)
+
+    def _late_constraints(self, i: int, finish: int) -> int:
+        """
+        Apply the backward-pass constraints of a node.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+        finish : int
+            Logic-driven late finish
+
+        Returns
+        -------
+        int
+            The constrained late finish
+        """
+        cal_i, dur = self.cal[i], self.dur[i]
+        mandatory = None
+        for ctype, date in self.cstr[i]:
+            if ctype in _LATE_START:
+                finish = min(finish, cal_i.add_work_minutes(date, dur))
+            elif ctype in _LATE_FINISH:
+                finish = min(finish, date)
+            elif ctype == ConstraintType.MandatoryStart:
+                mandatory = cal_i.add_work_minutes(date, dur)
+            elif ctype == ConstraintType.MandatoryFinish:
+                mandatory = date
+        return finish if mandatory is None else mandatory
+
+    def _floats(self, i: int) -> None:
+        """
+        Compute total float, free float and the relationship free floats of
+        the relationships leaving a node.
+
+        Parameters
+        ----------
+        i : int
+            Node number
+
+        Returns
+        -------
+        None
+        """
+        if self.state[i] == _COMPLETE:
+            return
+        net, es, ef = self.network, self.es, self.ef
+        cal_i = self.cal[i]
+        if not self.drives[i]:
+            self.lf[i] = self.ef[i]
+            self.lf[i] = self._span_finish(i, self.ls, self.lf)
+            span = cal_i.work_minutes_between(es[i], ef[i])
+            self.ls[i] = cal_i.add_work_minutes(self.lf[i], -span)
+        self.total_float[i] = cal_i.work_minutes_between(ef[i], self.lf[i])
+        free = None
+        for k in net.successors(i):
+            j = net.rel_succ[k]
+            if not self.drives[i] or not self.drives[j] or self.state[j] == _COMPLETE:
+                continue
+            kind = net.rel_type[k]
+            own = ef[i] if kind in (FS, FF) else es[i]
+            other = es[j] if kind in (FS, SS) else ef[j]
+            if self.lag[k]:
+                other = cal_i.add_work_minutes(other, -self.lag[k])
+            slack = cal_i.work_minutes_between(own, other)
+            self.rel_free_float[k] = slack
+            if free is None or slack < free:
+                free = slack
+        if free is None:
+            free = cal_i.work_minutes_between(ef[i], self._anchor(i))
+        self.free_float[i] = free
+
+    def _late_activities(self) -> None:
+        """
+        Delay As Late As Possible activities by their free float.
+
+        Returns
+        -------
+        None
+        """
+        self._alap_shifted = {}
+        for i in self._alap:
+            free = self.free_float[i]
+            if self.state[i] != _NOT_STARTED or not free or free < 0:
+                continue
+            cal_i = self.cal[i]
+            self._alap_shifted[i] = (
+                self.es[i],
+                self.ef[i],
+                self.total_float[i],
+                self.free_float[i],
+            )
+            self.es[i] = cal_i.to_start(cal_i.add_work_minutes(self.es[i], free))
+            self.ef[i] = cal_i.add_work_minutes(self.ef[i], free)
+            self.total_float[i] -= free
+            self.free_float[i] = 0
@@ -0,0 +1,382 @@
+"""Earned value analysis.
+
+Planned value (BCWS) is the ``target_cost`` of every assignment spread over
+its planned window along its resource curve, the same way ``ResourceLoading``
+spreads units. Earned value (BCWP) is that budget times the percent complete
+of the activity, and actual cost (ACWP) is ``act_reg_cost`` plus
+``act_ot_cost``; both are spread over the actual window. The per-activity
+figures are rolled up the WBS once, so every WBS node gets its totals and
+its cumulative S-curves in a single pass over the assignments.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from xer_parser.scheduling.calendar import to_datetime, to_minutes
+from xer_parser.scheduling.cpm import _parse_date
+from xer_parser.scheduling.loading import PERIODS, ResourceLoading, _as_float
+
+__all__ = ["EarnedValue"]
+
+# Indexes of the totals kept for every WBS node
+_BAC, _PV, _EV, _AC = range(4)
+
+
+class EarnedValue:
+    """
+    Compute earned value totals and S-curves per WBS node.
+
+    The percent complete of an activity follows its ``complete_pct_type``:
+
+    - ``CP_Phys``: ``phys_complete_pct``
+    - ``CP_Drtn``: the share of ``target_drtn_hr_cnt`` no longer remaining
+    - ``CP_Units``: actual units over actual plus remaining units of its
+      assignments
+
+    Completed activities are 100% complete and activities that have not
+    started are 0% complete unless they report physical progress.
+
+    Figures of a WBS node include every activity below it; the key None
+    stands for the whole programme. Planned value at the data date uses the
+    data date of each activity's project.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activityresources``,
+        ``activities`` and ``projects``; ``wbss`` and ``resourcecurves`` are
+        used when present) to analyse
+    period : str, optional
+        ``day``, ``week`` (default) or ``month``
+    data_date : datetime, optional
+        Status date used for every project. Defaults to each project's
+        ``last_recalc_date``.
+
+    Raises
+    ------
+    ValueError
+        If ``period`` is not supported
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.earnedvalue import EarnedValue
+    >>> ev = EarnedValue(xer, period="month")
+    >>> for wbs_id, totals in ev.summary().items():
+    ...     print(wbs_id, totals["cpi"], totals["spi"], totals["eac"])
+    >>> curves = ev.series()
+    """
+
+    def __init__(
+        self, programme: Any, period: str = "week", data_date: datetime | None = None
+    ) -> None:
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, use one of {PERIODS}")
+        self.programme = programme
+        self.period = period
+        self.data_date = data_date
+        self._loading = ResourceLoading(programme)
+        self._totals: dict[Any, list[float]] | None = None
+        self._phased: dict[Any, tuple[dict[int, float], ...]] = {}
+        self._data_dates: dict[Any, int | None] = {}
+        self._axis: list[int] = []
+
+    @property
+    def periods(self) -> list[datetime]:
+        """
+        Get the period starts shared by every series.
+
+        Returns
+        -------
+        list[datetime]
+            Consecutive period starts covering every planned and actual cost
+        """
+        self._compute()
+        return [to_datetime(x) for x in self._axis]
+
+    def summary(self) -> dict[Any, dict[str, float | None]]:
+        """
+        Get the earned value figures at the data date.
+
+        Returns
+        -------
+        dict[Any, dict[str, float | None]]
+            For every ``wbs_id`` with costs below it (and None for the
+            programme): ``bac``, ``pv``, ``ev``, ``ac``, the cost and schedule
+            variances ``cv`` and ``sv``, the ``cpi`` and ``spi`` indexes and
+            the estimate at completion ``eac`` (BAC / CPI). Indexes are None
+            when their denominator is zero, and ``eac`` then falls back to
+            ``bac``.
+        """
+        self._compute()
+        return {wbs_id: _figures(*totals) for wbs_id, totals in self._totals.items()}
+
+    def series(self, wbs_id: Any = None) -> dict[str, list[float | None]]:
+        """
+        Get the cumulative S-curves of a WBS node.
+
+        Parameters
+        ----------
+        wbs_id : int, optional
+            The WBS node, by default the whole programme
+
+        Returns
+        -------
+        dict[str, list[float | None]]
+            ``pv``, ``ev`` and ``ac`` at the end of every period of
+            ``periods``, and the ``cpi``, ``spi`` and ``eac`` they give. The
+            indexes are None for periods starting after the data date.
+
+        Raises
+        ------
+        KeyError
+            If no costs are recorded below ``wbs_id``
+        """
+        self._compute()
+        phased = self._phased.get(wbs_id)
+        if phased is None:
+            raise KeyError(f"No costs recorded below wbs_id {wbs_id}")
+        bac = self._totals[wbs_id][_BAC]
+        cutoff = max(
+            (x for x in self._data_dates.values() if x is not None), default=None
+        )
+        curves: dict[str, list[float | None]] = {
+            x: [] for x in ("pv", "ev", "ac", "cpi", "spi", "eac")
+        }
+        pv = ev = ac = 0.0
+        for start in self._axis:
+            pv += phased[0].get(start, 0.0)
+            ev += phased[1].get(start, 0.0)
+            ac += phased[2].get(start, 0.0)
+            curves["pv"].append(pv)
+            curves["ev"].append(ev)
+            curves["ac"].append(ac)
+            if cutoff is not None and start > cutoff:
+                curves["cpi"].append(None)
+                curves["spi"].append(None)
+                curves["eac"].append(None)
+            else:
+                figures = _figures(bac, pv, ev, ac)
+                curves["cpi"].append(figures["cpi"])
+                curves["spi"].append(figures["spi"])
+                curves["eac"].append(figures["eac"])
+        return curves
+
+    def _compute(self) -> None:
+        """
+        Spread and roll up the costs of every assignment, once.
+
+        Returns
+        -------
+        None
+        """
+        if self._totals is not None:
+            return
+        loading, period = self._loading, self.period
+        tasks = loading.tasks
+        assignments = self.programme.activityresources.assignments
+        percent = self._percents(assignments)
+        totals: dict[Any, list[float]] = {}
+        phased: dict[Any, tuple[dict[int, float], ...]] = {}
+        for assignment in assignments:
+            task = tasks.get(assignment.task_id)
+            if task is None:
+                continue
+            bac = _as_float(assignment.target_cost)
+            ac = _as_float(assignment.act_reg_cost) + _as_float(assignment.act_ot_cost)
+            ev = bac * percent.get(assignment.task_id, 0.0)
+            if not bac and not ac:
+                continue
+            wbs_id = task.wbs_id
+            node = totals.get(wbs_id)
+            if node is None:
+                node = totals[wbs_id] = [0.0, 0.0, 0.0, 0.0]
+                phased[wbs_id] = ({}, {}, {})
+            buckets = phased[wbs_id]
+            data_date = self._data_date(task.proj_id)
+            start, finish, _, own_curve = loading.window(assignment, "target")
+            node[_BAC] += bac
+            node[_EV] += ev
+            node[_AC] += ac
+            if bac:
+                if data_date is not None:
+                    node[_PV] += bac * loading.reached(
+                        assignment, start, finish, own_curve, data_date
+                    )
+                for bucket, share in loading.shares(
+                    assignment, start, finish, own_curve, period
+                ):
+                    buckets[0][bucket] = buckets[0].get(bucket, 0.0) + bac * share
+            if ev or ac:
+                start, finish, _, own_curve = loading.window(assignment, "actual")
+                profile = loading.shares(assignment, start, finish, own_curve, period)
+                if not profile and data_date is not None:
+                    profile = [(loading.period_start(data_date, period), 1.0)]
+                for bucket, share in profile:
+                    buckets[1][bucket] = buckets[1].get(bucket, 0.0) + ev * share
+                    buckets[2][bucket] = buckets[2].get(bucket, 0.0) + ac * share
+        self._rollup(totals, phased)
+        self._totals, self._phased = totals, phased
+        self._axis = self._periods(phased.get(None, ({}, {}, {})))
+
+    def _percents(self, assignments: list[Any]) -> dict[Any, float]:
+        """
+        Get the percent complete of every activity, as a fraction.
+
+        Parameters
+        ----------
+        assignments : list[TaskRsrc]
+            The assignments, for units percent complete
+
+        Returns
+        -------
+        dict[int, float]
+            Fraction complete keyed by ``task_id``
+        """
+        units: dict[Any, list[float]] = {}
+        for assignment in assignments:
+            done = _as_float(assignment.act_reg_qty) + _as_float(assignment.act_ot_qty)
+            pair = units.get(assignment.task_id)
+            if pair is None:
+                pair = units[assignment.task_id] = [0.0, 0.0]
+            pair[0] += done
+            pair[1] += done + _as_float(assignment.remain_qty)
+        percents = {}
+        for task_id, task in self._loading.tasks.items():
+            kind = task.complete_pct_type
+            if task.act_end_date is not None:
+                value = 1.0
+            elif kind == "CP_Units":
+                done, total = units.get(task_id, (0.0, 0.0))
+                value = (
+                    done / total if total and task.act_start_date is not None else 0.0
+                )
+            elif kind == "CP_Drtn":
+                target = _as_float(task.target_drtn_hr_cnt)
+                remaining = _as_float(task.remain_drtn_hr_cnt)
+                started = task.act_start_date is not None
+                value = (target - remaining) / target if target and started else 0.0
+            else:
+                value = _as_float(task.phys_complete_pct) / 100
+            percents[task_id] = min(max(value, 0.0), 1.0)
+        return percents
+
+    def _rollup(
+        self,
+        totals: dict[Any, list[float]],
+        phased: dict[Any, tuple[dict[int, float], ...]],
+    ) -> None:
+        """
+        Add the figures of every WBS node to its ancestors and to the
+        programme total (key None).
+
+        Parameters
+        ----------
+        totals : dict[Any, list[float]]
+            Totals of the WBS nodes holding activities, completed in place
+        phased : dict[Any, tuple[dict[int, float], ...]]
+            Planned value, earned value and actual cost per period of the
+            same nodes, completed in place
+
+        Returns
+        -------
+        None
+        """
+        wbss = getattr(self.programme, "wbss", None)
+        parent = {x.wbs_id: x.parent_wbs_id for x in getattr(wbss, "wbss", None) or []}
+
+        def depth(wbs_id: Any) -> int:
+            level, seen = 0, set()
+            while parent.get(wbs_id) in parent and wbs_id not in seen:
+                seen.add(wbs_id)
+                wbs_id = parent[wbs_id]
+                level += 1
+            return level
+
+        nodes = set(totals)
+        for wbs_id in list(nodes):
+            while parent.get(wbs_id) in parent and parent[wbs_id] not in nodes:
+                wbs_id = parent[wbs_id]
+                nodes.add(wbs_id)
+        nodes.discard(None)
+        # deepest first, so a node is complete before it is added to its parent
+        for wbs_id in sorted(nodes, key=depth, reverse=True):
+            up = parent.get(wbs_id)
+            _merge(totals, phased, wbs_id, up if up in parent else None)
+
+    def _periods(self, phased: tuple[dict[int, float], ...]) -> list[int]:
+        """
+        Get consecutive period starts covering every bucket.
+
+        Parameters
+        ----------
+        phased : tuple[dict[int, float], ...]
+            Buckets of the programme
+
+        Returns
+        -------
+        list[int]
+            Period starts in minutes, in date order
+        """
+        used = set().union(*phased)
+        if not used:
+            return []
+        first, last = min(used), max(used)
+        loading = self._loading
+        return [first, *loading.boundaries(first, last + 1, self.period)]
+
+    def _data_date(self, proj_id: Any) -> int | None:
+        """
+        Get the data date of a project, cached per project.
+
+        Parameters
+        ----------
+        proj_id : int
+            The project
+
+        Returns
+        -------
+        int or None
+            The data date in minutes since the date origin
+        """
+        if proj_id in self._data_dates:
+            return self._data_dates[proj_id]
+        date = self.data_date
+        if date is None:
+            projects = getattr(self.programme.projects, "projects", None) or []
+            project = next((x for x in projects if x.proj_id == proj_id), None)
+            date = _parse_date(getattr(project, "last_recalc_date", None))
+        minutes = None if date is None else to_minutes(date)
+        self._data_dates[proj_id] = minutes
+        return minutes
+
+
+def _merge(
+    totals: dict[Any, list[float]],
+    phased: dict[Any, tuple[dict[int, float], ...]],
+    child: Any,
+    parent: Any,
+) -> None:
+    node = totals.get(parent)
+    if node is None:
+        node = totals[parent] = [0.0, 0.0, 0.0, 0.0]
+        phased[parent] = ({}, {}, {})
+    for i, value in enumerate(totals[child]):
+        node[i] += value
+    for source, target in zip(phased[child], phased[parent], strict=True):
+        for bucket, value in source.items():
+            target[bucket] = target.get(bucket, 0.0) + value
+
+
+def _figures(bac: float, pv: float, ev: float, ac: float) -> dict[str, float | None]:
+    cpi = ev / ac if ac else None
+    return {
+        "bac": bac,
+        "pv": pv,
+        "ev": ev,
+        "ac": ac,
+        "cv": ev - ac,
+        "sv": ev - pv,
+        "cpi": cpi,
+        "spi": ev / pv if pv else None,
+        "eac": bac / cpi if cpi else bac,
+    }
@@ -0,0 +1,453 @@
+"""Incremental re-scheduling after local edits.
+
+A full CPM pass visits every activity. After a what-if edit, such as a new
+duration or an added relationship, only the activities downstream of the edit
+can move early and only the ones upstream of it can move late. This module
+re-runs the forward pass from the edited activities towards their successors
+and the backward pass towards their predecessors, in topological order, and
+stops wherever the recomputed dates come out unchanged.
+"""
+
+import heapq
+import logging
+from typing import Any
+
+from xer_parser.model.classes.p6codes import RelationshipType
+from xer_parser.scheduling.cpm import _COMPLETE, CPMScheduler
+from xer_parser.scheduling.network import _REL_CODES, FS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+__all__ = ["IncrementalScheduler"]
+
+
+class IncrementalScheduler(CPMScheduler):
+    """
+    CPM scheduler that keeps its results up to date after local edits.
+
+    Edits mark the activities they touch as dirty; ``reschedule`` then
+    propagates early dates forward from the dirty activities and late dates
+    backward from them through a worklist ordered by topological position, so
+    every activity is recomputed at most once per pass and only while its
+    dates keep changing. When an edit moves a project's finish date (and the
+    project has no must-finish date) the late dates of the whole project
+    depend on it, and the backward pass is run in full.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities``,
+        ``relations`` and ``projects`` collections) to schedule
+    data_date : datetime, optional
+        Data date used for every project. Defaults to each project's
+        ``last_recalc_date``.
+
+    Notes
+    -----
+    Edits only change the scheduler's working arrays; the Task and TaskPred
+    records of the programme are left untouched until ``apply`` is called.
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.incremental import IncrementalScheduler
+    >>> cpm = IncrementalScheduler(xer)
+    >>> cpm.schedule()
+    >>> cpm.set_duration(1001, 40)
+    >>> cpm.add_relationship(1001, 1002, "PR_FS", 8)
+    >>> moved = cpm.reschedule()
+    """
+
+    def __init__(self, programme: Any, data_date: Any = None) -> None:
+        super().__init__(programme, data_date)
+        self._scheduled = False
+        self._dirty: set[int] = set()
+
+    def schedule(self) -> dict[int, dict[str, Any]]:
+        """
+        Run a full forward and backward pass and clear pending edits.
+
+        Returns
+        -------
+        dict[int, dict[str, Any]]
+            Mapping of ``task_id`` to the recomputed dates and floats
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        results = super().schedule()
+        self._scheduled = True
+        self._dirty = set()
+        return results
+
+    def set_duration(self, task_id: int, hours: float) -> None:
+        """
+        Change the remaining duration of an activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+        hours : float
+            New remaining duration in hours
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        KeyError
+            If the activity is not part of the network
+        """
+        node = self._node(task_id)
+        self.dur[node] = round(hours * 60)
+        self._dirty.add(node)
+
+    def add_relationship(
+        self,
+        pred_task_id: int,
+        task_id: int,
+        pred_type: str = RelationshipType.FS,
+        lag_hr_cnt: float = 0.0,
+        relation: Any = None,
+    ) -> int:
+        """
+        Add a relationship between two activities.
+
+        Parameters
+        ----------
+        pred_task_id : int
+            The predecessor activity
+        task_id : int
+            The successor activity
+        pred_type : str, optional
+            Relationship type, by default ``PR_FS``
+        lag_hr_cnt : float, optional
+            Lag in hours, by default 0
+        relation : TaskPred, optional
+            The relationship record, if there is one
+
+        Returns
+        -------
+        int
+            The relationship number in ``network``
+
+        Raises
+        ------
+        KeyError
+            If either activity is not part of the network
+        ValueError
+            If the relationship would create circular logic
+        """
+        pred, succ = self._node(pred_task_id), self._node(task_id)
+        rel = self.network.add_relation(
+            pred, succ, _REL_CODES.get(pred_type, FS), lag_hr_cnt, relation
+        )
+        self.lag.append(round(lag_hr_cnt * 60))
+        self.rel_free_float.append(None)
+        self._dirty.update((pred, succ))
+        return rel
+
+    def remove_relationship(self, pred_task_id: int, task_id: int) -> int:
+        """
+        Remove the relationships from one activity to another.
+
+        Parameters
+        ----------
+        pred_task_id : int
+            The predecessor activity
+        task_id : int
+            The successor activity
+
+        Returns
+        -------
+        int
+            Number of relationships removed
+
+        Raises
+        ------
+        KeyError
+            If either activity is not part of the network
+        """
+        pred, succ = self._node(pred_task_id), self._node(task_id)
+        net = self.network
+        removed = [k for k in net.succ_rels[pred] if net.rel_succ[k] == succ]
+        for k in removed:
+            net.remove_relation(k)
+            self.rel_free_float[k] = None
+        if removed:
+            self._dirty.update((pred, succ))
+        return len(removed)
+
+    def reschedule(self) -> set[int]:
+        """
+        Bring the schedule up to date with the pending edits.
+
+        Returns
+        -------
+        set[int]
+            ``task_id`` of every edited activity and of every activity whose
+            dates or floats changed
+        """
+        if not self._scheduled:
+            self.schedule()
+            return set(self.network.task_ids)
+        if not self._dirty:
+            return set()
+        seeds, self._dirty = self._dirty, set()
+        net = self.network
+        before: dict[int, tuple] = {}
+        for i, values in self._alap_shifted.items():
+            self._touch(i, before)
+            self.es[i], self.ef[i], self.total_float[i], self.free_float[i] = values
+        self._alap_shifted = {}
+
+        early, spans = self._propagate_forward(seeds, before)
+        spans = self._spanning(early | spans)
+        self._respan(spans, before)
+
+        if self._update_project_finish(early | spans, before):
+            logger.debug("Project finish moved, running a full backward pass")
+            for i in range(net.node_count):
+                self._touch(i, before)
+            for node in reversed(net.topological_order()):
+                self._backward(node)
+            for node in reversed(net.topological_order()):
+                self._floats(node)
+        else:
+            late = self._propagate_backward(seeds, before)
+            refresh = seeds | early | late | spans | self._spanning(late)
+            for j in early:
+                refresh.update(net.rel_pred[k] for k in net.pred_rels[j])
+            position = net.topological_positions()
+            for i in sorted(refresh, key=position.__getitem__, reverse=True):
+                self._touch(i, before)
+                self._floats(i)
+        self._late_activities()
+
+        task_ids = self.network.task_ids
+        affected = {task_ids[i] for i in seeds}
+        affected.update(
+            task_ids[i] for i, old in before.items() if self._snapshot(i) != old
+        )
+        return affected
+
+    def _node(self, task_id: int) -> int:
+        """
+        Get the node number of an activity, scheduling first if needed.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+
+        Returns
+        -------
+        int
+            Node number in ``network``
+
+        Raises
+        ------
+        KeyError
+            If the activity is not part of the network
+        """
+        if not self._scheduled:
+            self.schedule()
+        node = self.network.pos.get(task_id)
+        if node is None:
+            raise KeyError(f"task_id {task_id} is not part of the network")
+        return node
+
+    def _snapshot(self, i: int) -> tuple:
+        return (
+            self.es[i],
+            self.ef[i],
+            self.ls[i],
+            self.lf[i],
+            self.total_float[i],
+            self.free_float[i],
+        )
+
+    def _touch(self, i: int, before: dict[int, tuple]) -> None:
+        if i not in before:
+            before[i] = self._snapshot(i)
+
+    def _propagate_forward(
+        self, seeds: set[int], before: dict[int, tuple]
+    ) -> tuple[set[int], set[int]]:
+        """
+        Recompute early dates downstream of the dirty nodes.
+
+        Parameters
+        ----------
+        seeds : set[int]
+            The dirty nodes
+        before : dict[int, tuple]
+            Values of every node before the update, filled in as nodes are
+            recomputed
+
+        Returns
+        -------
+        tuple[set[int], set[int]]
+            The driving nodes whose early dates changed and the non-driving
+            nodes that were reached
+        """
+        net, es, ef, drives = self.network, self.es, self.ef, self.drives
+        rel_succ, succ_rels = net.rel_succ, net.succ_rels
+        position = net.topological_positions()
+        heap = [(position[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed: set[int] = set()
+        spans: set[int] = set()
+        while heap:
+            _, j = heapq.heappop(heap)
+            if not drives[j]:
+                spans.add(j)
+                continue
+            old_start, old_finish = es[j], ef[j]
+            self._touch(j, before)
+            self._forward(j)
+            if es[j] == old_start and ef[j] == old_finish:
+                continue
+            changed.add(j)
+            for k in succ_rels[j]:
+                succ = rel_succ[k]
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (position[succ], succ))
+        return changed, spans
+
+    def _spanning(self, nodes: set[int]) -> set[int]:
+        """
+        Find the non-driving nodes whose span depends on the given nodes.
+
+        Parameters
+        ----------
+        nodes : set[int]
+            Nodes whose dates changed
+
+        Returns
+        -------
+        set[int]
+            The non-driving nodes among ``nodes`` and every non-driving node
+            linked to them as a predecessor, directly or through other
+            non-driving nodes
+        """
+        net, drives = self.network, self.drives
+        found = {i for i in nodes if not drives[i]}
+        stack = list(nodes)
+        while stack:
+            j = stack.pop()
+            for k in net.pred_rels[j]:
+                pred = net.rel_pred[k]
+                if not drives[pred] and pred not in found:
+                    found.add(pred)
+                    stack.append(pred)
+        return found
+
+    def _respan(self, nodes: set[int], before: dict[int, tuple]) -> None:
+        """
+        Recompute the early dates of non-driving activities.
+
+        Parameters
+        ----------
+        nodes : set[int]
+            Level of effort and WBS summary nodes next to a change
+        before : dict[int, tuple]
+            Values of every node before the update
+
+        Returns
+        -------
+        None
+        """
+        position = self.network.topological_positions()
+        for i in sorted(nodes, key=position.__getitem__, reverse=True):
+            self._touch(i, before)
+            self._forward(i)
+            if self.state[i] != _COMPLETE:
+                finish = self._span_finish(i, self.es, self.ef)
+                if finish > self.ef[i]:
+                    self.ef[i] = finish
+
+    def _update_project_finish(self, nodes: set[int], before: dict[int, tuple]) -> bool:
+        """
+        Update the project finish dates after early dates changed.
+
+        Parameters
+        ----------
+        nodes : set[int]
+            Nodes whose early dates were recomputed
+        before : dict[int, tuple]
+            Values of every node before the update
+
+        Returns
+        -------
+        bool
+            True if the finish of a project without a must-finish date moved,
+            which invalidates the late dates of the whole project
+        """
+        ef, proj, finish = self.ef, self.proj, self.project_finish
+        rescan = set()
+        moved = set()
+        for i in nodes:
+            proj_id = proj[i]
+            current = finish[proj_id]
+            if ef[i] > current:
+                finish[proj_id] = ef[i]
+                moved.add(proj_id)
+            elif before[i][1] == current and ef[i] < current:
+                rescan.add(proj_id)
+        for proj_id in rescan - moved:
+            latest = max(
+                ef[i] for i in range(self.network.node_count) if proj[i] == proj_id
+            )
+            if latest != finish[proj_id]:
+                finish[proj_id] = latest
+                moved.add(proj_id)
+        return any(x not in self.must_finish for x in moved)
+
+    def _propagate_backward(
+        self, seeds: set[int], before: dict[int, tuple]
+    ) -> set[int]:
+        """
+        Recompute late dates upstream of the dirty nodes.
+
+        Parameters
+        ----------
+        seeds : set[int]
+            The dirty nodes
+        before : dict[int, tuple]
+            Values of every node before the update
+
+        Returns
+        -------
+        set[int]
+            The driving nodes whose late dates changed
+        """
+        net, ls, lf, drives = self.network, self.ls, self.lf, self.drives
+        rel_pred, pred_rels = net.rel_pred, net.pred_rels
+        position = net.topological_positions()
+        heap = [(-position[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed: set[int] = set()
+        while heap:
+            _, i = heapq.heappop(heap)
+            if not drives[i]:
+                continue
+            old_start, old_finish = ls[i], lf[i]
+            self._touch(i, before)
+            self._backward(i)
+            if ls[i] == old_start and lf[i] == old_finish:
+                continue
+            changed.add(i)
+            for k in pred_rels[i]:
+                pred = rel_pred[k]
+                if pred not in queued:
+                    queued.add(pred)
+                    heapq.heappush(heap, (-position[pred], pred))
+        return changed
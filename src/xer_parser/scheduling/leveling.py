@@ -0,0 +1,552 @@
+"""Resource leveling on top of a CPM pass.
+
+``ResourceLeveler`` schedules the activities one at a time (a serial
+schedule generation scheme). An activity becomes ready once all of its
+predecessors are placed; the ready activities sit in a heap ordered by their
+logic-driven early start and then by the leveling priorities, so whenever
+several activities compete for a resource at the same time the one with the
+highest priority is served first. Each leveled resource keeps a step function
+of its free capacity over time, searched with ``bisect``, and an activity is
+delayed past every stretch in which one of its resources lacks capacity.
+"""
+
+import heapq
+import re
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any
+
+from xer_parser.scheduling.calendar import to_datetime
+from xer_parser.scheduling.cpm import (
+    _COMPLETE,
+    _DATE_FORMAT,
+    _NOT_STARTED,
+    CPMScheduler,
+)
+from xer_parser.scheduling.loading import ResourceLoading, _as_float
+
+__all__ = ["ResourceLeveler"]
+
+# Ranks of Task.priority_type, highest priority first
+_PRIORITY_TYPES = {
+    "PT_Top": 0,
+    "PT_High": 1,
+    "PT_Normal": 2,
+    "PT_Low": 3,
+    "PT_Lowest": 4,
+}
+
+# Priority fields computed by the CPM pass, as scheduler attributes
+_CPM_FIELDS = {
+    "early_start_date": "es",
+    "early_end_date": "ef",
+    "late_start_date": "ls",
+    "late_end_date": "lf",
+    "total_float_hr_cnt": "total_float",
+    "free_float_hr_cnt": "free_float",
+    "remain_drtn_hr_cnt": "dur",
+}
+
+_DEFAULT_PRIORITIES = (("priority_type", True), ("total_float_hr_cnt", True))
+
+# Returned by _Capacity.blocked_until when the capacity never suffices
+_NEVER = 1 << 62
+
+
+class _Capacity:
+    """
+    Free capacity of one resource over time.
+
+    The capacity is a step function: ``free[i]`` units per hour are free from
+    ``times[i]`` up to ``times[i + 1]``, and ``free[-1]`` from the last
+    breakpoint on.
+
+    Parameters
+    ----------
+    limits : list[tuple[int, float]]
+        ``(time, units per hour)`` at which the limit of the resource changes
+    """
+
+    def __init__(self, limits: list[tuple[int, float]]) -> None:
+        limits.sort()
+        self.times = [-1]
+        self.free = [limits[0][1]]
+        for time, limit in limits:
+            if time <= self.times[-1]:
+                self.free[-1] = limit
+            else:
+                self.times.append(time)
+                self.free.append(limit)
+
+    def blocked_until(self, start: int, finish: int, rate: float) -> int | None:
+        """
+        Check whether a load fits between two times.
+
+        Parameters
+        ----------
+        start, finish : int
+            The window, in minutes since the calendar date origin
+        rate : float
+            Units per hour needed throughout the window
+
+        Returns
+        -------
+        int or None
+            None if the load fits, otherwise the end of the last stretch of
+            the window without enough capacity, ``_NEVER`` if that stretch
+            never ends
+        """
+        times, free = self.times, self.free
+        i = bisect_right(times, start) - 1
+        end = None
+        n = len(times)
+        while i < n and times[i] < finish:
+            if free[i] < rate - 1e-9:
+                end = times[i + 1] if i + 1 < n else _NEVER
+            i += 1
+        return end
+
+    def book(self, start: int, finish: int, rate: float) -> None:
+        """
+        Take capacity between two times.
+
+        Parameters
+        ----------
+        start, finish : int
+            The window, in minutes since the calendar date origin
+        rate : float
+            Units per hour taken throughout the window
+
+        Returns
+        -------
+        None
+        """
+        free = self.free
+        i = self._split(start)
+        j = self._split(finish)
+        for k in range(i, j):
+            free[k] -= rate
+
+    def _split(self, time: int) -> int:
+        """
+        Make sure a breakpoint exists at a time.
+
+        Parameters
+        ----------
+        time : int
+            Minutes since the calendar date origin
+
+        Returns
+        -------
+        int
+            Index of the breakpoint
+        """
+        i = bisect_right(self.times, time) - 1
+        if self.times[i] == time:
+            return i
+        self.times.insert(i + 1, time)
+        self.free.insert(i + 1, self.free[i])
+        return i + 1
+
+
+class ResourceLeveler:
+    """
+    Delay activities until their resources are available.
+
+    A CPM pass first computes the unleveled dates and floats. The activities
+    are then placed in order of their logic-driven early start (recomputed
+    from the already leveled predecessors), ties going to the leveling
+    priorities, each at the earliest time at which every leveled resource it
+    uses has the capacity for its remaining units per hour over the whole
+    remaining duration.
+
+    The leveling options are read from the SCHEDOPTIONS record of the first
+    project that has one, or taken from ``options``:
+
+    - ``level_all_rsrc_flag``: level every resource with a limit; otherwise
+      only resources whose ``level_flag`` is set.
+    - ``level_over_alloc_pct``: allow the load to exceed the limit
+      (``max_qty_per_hr`` of the RSRCRATE records) by this percentage.
+    - ``level_within_float_flag``: never delay an activity past its late
+      start less ``level_float_thrs_cnt`` hours; activities that cannot be
+      placed within that window keep their logic-driven dates and are
+      reported in ``overallocated``.
+    - ``level_keep_sched_date_flag``: ``apply`` writes the leveled dates to
+      the remaining dates only and preserves the early and late dates and
+      the floats.
+    - ``LevelPriorityList``: the priority fields, each optionally followed
+      by ``ASC`` or ``DESC``. Any Task field may be used; dates and floats
+      are taken from the CPM pass. The default is ``priority_type`` then
+      ``total_float_hr_cnt``, both ascending.
+
+    Completed activities keep their actual dates, in-progress activities are
+    not delayed but take their capacity first, and level of effort and WBS
+    summary activities span the leveled dates of their neighbours. Resources
+    with no RSRCRATE limit are not leveled. The late dates and floats are
+    then recomputed by a backward pass from the leveled early dates.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities``,
+        ``relations``, ``projects``, ``activityresources``, ``resources``,
+        ``resourcerates`` and ``scheduleoptions`` collections) to level
+    data_date : datetime, optional
+        Data date used for every project, as for ``CPMScheduler``
+    options : SchedOption, optional
+        Leveling options overriding the programme's SCHEDOPTIONS
+    priorities : list[tuple[str, bool]], optional
+        ``(field, ascending)`` pairs overriding ``LevelPriorityList``
+
+    Attributes
+    ----------
+    scheduler : CPMScheduler
+        The scheduler holding the leveled dates and floats after ``level``
+    overallocated : list[int]
+        ``task_id`` of the activities that could not be leveled
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.leveling import ResourceLeveler
+    >>> leveler = ResourceLeveler(xer)
+    >>> dates = leveler.level()
+    >>> leveler.apply()
+    """
+
+    def __init__(
+        self,
+        programme: Any,
+        data_date: datetime | None = None,
+        options: Any = None,
+        priorities: list[tuple[str, bool]] | None = None,
+    ) -> None:
+        self.programme = programme
+        self.scheduler = CPMScheduler(programme, data_date)
+        self.options = options if options is not None else self._options()
+        self.priorities = priorities or self._priorities()
+        self.overallocated: list[int] = []
+        self._early: list[int] = []
+
+    def level(self) -> dict[int, dict[str, Any]]:
+        """
+        Run the CPM pass and level the resources.
+
+        Returns
+        -------
+        dict[int, dict[str, Any]]
+            Mapping of ``task_id`` to the leveled ``start_date`` and
+            ``end_date`` and the ``delay_hr_cnt``, in working hours of the
+            activity calendar, relative to the unleveled early start
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        sched = self.scheduler
+        sched.schedule()
+        net = sched.network
+        n = net.node_count
+        self._early = list(sched.es)
+        demands = self._demands()
+        latest = self._latest()
+        key = self._keys()
+        es, ef, dur, state, drives = (
+            sched.es,
+            sched.ef,
+            sched.dur,
+            sched.state,
+            sched.drives,
+        )
+        rel_succ = net.rel_succ
+        waiting = [len(x) for x in net.pred_rels]
+        ready = []
+        for i in range(n):
+            if not waiting[i]:
+                sched._forward(i)
+                ready.append((es[i], key[i], i))
+        heapq.heapify(ready)
+        self.overallocated = []
+        while ready:
+            _, _, j = heapq.heappop(ready)
+            needs = demands[j]
+            if needs and drives[j]:
+                if state[j] == _NOT_STARTED and dur[j]:
+                    self._place(j, needs, latest[j])
+                for capacity, rate in needs:
+                    capacity.book(es[j], ef[j], rate)
+            for k in net.succ_rels[j]:
+                s = rel_succ[k]
+                waiting[s] -= 1
+                if not waiting[s]:
+                    sched._forward(s)
+                    heapq.heappush(ready, (es[s], key[s], s))
+        sched._finish_forward()
+        order = net.topological_order()
+        for i in reversed(order):
+            sched._backward(i)
+        for i in reversed(order):
+            sched._floats(i)
+        return self.results()
+
+    def results(self) -> dict[int, dict[str, Any]]:
+        """
+        Get the leveled dates keyed by task ID.
+
+        Returns
+        -------
+        dict[int, dict[str, Any]]
+            Dates as datetimes and delays in hours, as returned by ``level``
+        """
+        sched = self.scheduler
+        return {
+            task_id: {
+                "start_date": to_datetime(sched.es[i]),
+                "end_date": to_datetime(sched.ef[i]),
+                "delay_hr_cnt": sched.cal[i].work_minutes_between(
+                    self._early[i], sched.es[i]
+                )
+                / 60.0,
+            }
+            for i, task_id in enumerate(sched.network.task_ids)
+        }
+
+    def apply(self) -> None:
+        """
+        Write the leveled dates back onto the Task and TaskRsrc objects.
+
+        The remaining dates (``restart_date``, ``reend_date``) of activities
+        and assignments always take the leveled dates; the early and late
+        dates and the floats of the activities do too unless
+        ``level_keep_sched_date_flag`` is set.
+
+        Returns
+        -------
+        None
+        """
+        sched = self.scheduler
+        keep = _flag(getattr(self.options, "level_keep_sched_date_flag", None))
+        for i, task in enumerate(sched.network.tasks):
+            if sched.state[i] == _COMPLETE:
+                continue
+            task.restart_date = to_datetime(sched.es[i])
+            task.reend_date = to_datetime(sched.ef[i])
+            if not keep:
+                for field, value in sched.dates(i).items():
+                    setattr(task, field, value)
+        pos = sched.network.pos
+        for assignment in self._assignments():
+            i = pos.get(assignment.task_id)
+            if i is not None and sched.state[i] != _COMPLETE:
+                assignment.restart_date = to_datetime(sched.es[i]).strftime(
+                    _DATE_FORMAT
+                )
+                assignment.reend_date = to_datetime(sched.ef[i]).strftime(_DATE_FORMAT)
+
+    def _place(
+        self, j: int, needs: list[tuple[_Capacity, float]], latest: int | None
+    ) -> None:
+        """
+        Move a node to the first time its resources are available.
+
+        Parameters
+        ----------
+        j : int
+            Node number, with logic-driven early dates
+        needs : list[tuple[_Capacity, float]]
+            Capacity and units per hour of every leveled resource it uses
+        latest : int or None
+            Latest start allowed, None if unlimited
+
+        Returns
+        -------
+        None
+        """
+        sched = self.scheduler
+        cal_j, dur = sched.cal[j], sched.dur[j]
+        start, finish = sched.es[j], sched.ef[j]
+        while True:
+            blocked = None
+            for capacity, rate in needs:
+                end = capacity.blocked_until(start, finish, rate)
+                if end is not None and (blocked is None or end > blocked):
+                    blocked = end
+            if blocked is None:
+                break
+            if blocked == _NEVER:
+                self.overallocated.append(sched.network.task_ids[j])
+                return
+            start = cal_j.to_start(blocked)
+            if latest is not None and start > latest:
+                self.overallocated.append(sched.network.task_ids[j])
+                return
+            finish = cal_j.add_work_minutes(start, dur)
+        sched.es[j], sched.ef[j] = start, finish
+
+    def _demands(self) -> list[list[tuple[_Capacity, float]]]:
+        """
+        Get the leveled resource needs of every node.
+
+        Returns
+        -------
+        list[list[tuple[_Capacity, float]]]
+            Capacity and units per hour of every leveled resource used by
+            every node
+        """
+        sched = self.scheduler
+        factor = (
+            1 + _as_float(getattr(self.options, "level_over_alloc_pct", None)) / 100
+        )
+        level_all = _flag(getattr(self.options, "level_all_rsrc_flag", None))
+        resources = getattr(self.programme, "resources", None)
+        loading = ResourceLoading(self.programme)
+        limits: dict[int, list[tuple[int, float]]] = {}
+        for rate in self.programme.resourcerates.resourcerates:
+            if rate.rsrc_id is None or rate.max_qty_per_hr is None:
+                continue
+            rsrc_id = int(rate.rsrc_id)
+            if not level_all:
+                rsrc = resources.get_resource_by_id(rsrc_id) if resources else None
+                if not _flag(getattr(rsrc, "level_flag", None)):
+                    continue
+            start = loading.to_minutes(rate.start_date)
+            limits.setdefault(rsrc_id, []).append(
+                (
+                    start if start is not None else -1,
+                    float(rate.max_qty_per_hr) * factor,
+                )
+            )
+        capacities = {rsrc_id: _Capacity(x) for rsrc_id, x in limits.items()}
+        demands: list[list[tuple[_Capacity, float]]] = [
+            [] for _ in range(sched.network.node_count)
+        ]
+        pos = sched.network.pos
+        for assignment in self._assignments():
+            capacity = capacities.get(assignment.rsrc_id)
+            i = pos.get(assignment.task_id)
+            if capacity is None or i is None or sched.state[i] == _COMPLETE:
+                continue
+            rate = _as_float(assignment.remain_qty_per_hr)
+            if not rate and sched.dur[i]:
+                rate = _as_float(assignment.remain_qty) * 60 / sched.dur[i]
+            if rate:
+                demands[i].append((capacity, rate))
+        return demands
+
+    def _latest(self) -> list[int | None]:
+        """
+        Get the latest start each node may be delayed to.
+
+        Returns
+        -------
+        list[int | None]
+            The late start less the float threshold when leveling within
+            float, otherwise None
+        """
+        sched = self.scheduler
+        n = sched.network.node_count
+        if not _flag(getattr(self.options, "level_within_float_flag", None)):
+            return [None] * n
+        threshold = round(
+            _as_float(getattr(self.options, "level_float_thrs_cnt", None)) * 60
+        )
+        return [
+            sched.cal[i].add_work_minutes(sched.ls[i], -threshold) for i in range(n)
+        ]
+
+    def _keys(self) -> list[tuple]:
+        """
+        Rank every node by the leveling priorities.
+
+        Returns
+        -------
+        list[tuple]
+            One integer rank per priority field for every node, lowest first
+        """
+        sched = self.scheduler
+        tasks = sched.network.tasks
+        columns = []
+        for field, ascending in self.priorities:
+            if field in _CPM_FIELDS:
+                values = getattr(sched, _CPM_FIELDS[field])
+            elif field == "priority_type":
+                values = [_PRIORITY_TYPES.get(x.priority_type, 2) for x in tasks]
+            else:
+                values = [getattr(x, field, None) for x in tasks]
+            columns.append(_ranks(values, ascending))
+        return list(zip(*columns, strict=True)) if columns else [()] * len(tasks)
+
+    def _options(self) -> Any:
+        """
+        Find the leveling options of the programme.
+
+        Returns
+        -------
+        SchedOption or None
+            The SCHEDOPTIONS record of the first project that has one
+        """
+        options = getattr(self.programme, "scheduleoptions", None)
+        options = getattr(options, "schedoptions", None) or []
+        by_project = {x.proj_id: x for x in options}
+        for proj_id in self.scheduler._projects():
+            if str(proj_id) in by_project:
+                return by_project[str(proj_id)]
+        return options[0] if options else None
+
+    def _priorities(self) -> list[tuple[str, bool]]:
+        """
+        Parse ``LevelPriorityList`` of the leveling options.
+
+        Returns
+        -------
+        list[tuple[str, bool]]
+            ``(field, ascending)`` pairs, the defaults if none are recognised
+        """
+        text = getattr(self.options, "LevelPriorityList", None) or ""
+        tasks = self.scheduler.network.tasks
+        known = set(_CPM_FIELDS) | set(vars(tasks[0]) if tasks else ())
+        priorities: list[tuple[str, bool]] = []
+        for token in re.findall(r"\w+", text):
+            if token.upper() in ("ASC", "DESC") and priorities:
+                priorities[-1] = (priorities[-1][0], token.upper() == "ASC")
+            elif token in known:
+                priorities.append((token, True))
+        return priorities or list(_DEFAULT_PRIORITIES)
+
+    def _assignments(self) -> list[Any]:
+        """
+        Get the resource assignments of the programme.
+
+        Returns
+        -------
+        list[TaskRsrc]
+            Every assignment, none if the programme has no TASKRSRC table
+        """
+        assignments = getattr(self.programme, "activityresources", None)
+        return getattr(assignments, "assignments", None) or []
+
+
+def _ranks(values: list[Any], ascending: bool) -> list[int]:
+    """
+    Replace values by their rank, missing values last.
+
+    Parameters
+    ----------
+    values : list[Any]
+        Comparable values, or None
+    ascending : bool
+        Rank the lowest value first if True, the highest otherwise
+
+    Returns
+    -------
+    list[int]
+        Rank of every value
+    """
+    distinct = sorted({x for x in values if x is not None}, reverse=not ascending)
+    rank = {x: n for n, x in enumerate(distinct)}
+    missing = len(distinct)
+    return [missing if x is None else rank[x] for x in values]
+
+
+def _flag(value: Any) -> bool:
+    return value is not None and str(value).strip().upper() == "Y"
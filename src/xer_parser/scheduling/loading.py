@@ -0,0 +1,621 @@
+"""Time-phased resource loading.
+
+Spreads the quantities of the TASKRSRC assignments over daily, weekly or
+monthly periods. Within its window an assignment's units follow its resource
+curve, measured in working time of its activity's calendar, so no units fall
+on weekends or holidays and a front-loaded curve puts more units in the first
+periods. Many assignments share the same window, calendar and curve (every
+resource of an activity does), so the per-period fractions are computed once
+per distinct window and reused.
+"""
+
+import re
+from bisect import bisect_right
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from itertools import pairwise
+from typing import Any
+
+from xer_parser.model.resources import _as_float
+from xer_parser.scheduling.calendar import _DAY, EPOCH, get_calendar, to_datetime
+
+__all__ = ["PERIODS", "QUANTITIES", "ResourceLoading"]
+
+PERIODS = ("day", "week", "month")
+QUANTITIES = ("target", "remaining", "actual")
+
+_EPOCH_ORDINAL = EPOCH.toordinal()
+# EPOCH is a Saturday; weeks start on Monday
+_MONDAY = 2
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _cumulative_curve(points: Iterable[float]) -> tuple[float, ...] | None:
+    """
+    Turn the 21 points of a resource curve into a cumulative distribution.
+
+    Each of the 20 intervals between two points gets the average of its two
+    points as its share of the units.
+
+    Parameters
+    ----------
+    points : Iterable[float]
+        Usage at 0%, 5%, ... 100% of the duration
+
+    Returns
+    -------
+    tuple[float, ...] or None
+        Share of the units used by 0%, 5%, ... 100% of the duration, or None
+        for a flat curve or one without usage
+    """
+    points = list(points)
+    if len(points) != 21 or len(set(points)) == 1:
+        return None
+    weights = [(a + b) / 2 for a, b in pairwise(points)]
+    total = sum(weights)
+    if total <= 0:
+        return None
+    cumulative = [0.0]
+    for weight in weights:
+        cumulative.append(cumulative[-1] + weight / total)
+    cumulative[-1] = 1.0
+    return tuple(cumulative)
+
+
+class ResourceLoading:
+    """
+    Spread resource assignments over calendar periods.
+
+    The window of an assignment depends on the quantity spread:
+
+    - ``target``: ``target_qty`` between ``target_start_date`` and
+      ``target_end_date``, following ``target_crv``
+    - ``remaining``: ``remain_qty`` between ``restart_date`` and
+      ``reend_date``, following ``remain_crv``
+    - ``actual``: ``act_reg_qty`` plus ``act_ot_qty`` between
+      ``act_start_date`` and ``act_end_date`` (or ``restart_date`` while in
+      progress), following ``actual_crv``
+
+    Missing assignment dates fall back to the matching dates of the activity.
+    An assignment without its own curve data follows the resource curve
+    ``curv_id``, and without one its units are spread evenly over the working
+    time of the window.
+
+    The steps of a spread are public for the other time-phased analyses
+    (earned value, over-allocation, leveling and costing): ``window`` gives
+    the dates, units and curve of an assignment, ``shares`` and ``reached``
+    measure its units along that window, and ``calendar``, ``to_minutes``,
+    ``period_start`` and ``boundaries`` convert between activities, dates
+    and periods.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activityresources`` and
+        ``activities``; ``resourcecurves`` and ``resources`` are used when
+        present) to spread
+
+    Attributes
+    ----------
+    tasks : dict[int, Task]
+        The activities of the programme by ``task_id``
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.loading import ResourceLoading
+    >>> loading = ResourceLoading(xer)
+    >>> weekly = loading.histogram(by="resource", period="week")
+    >>> for week, qty in weekly[1001].items():
+    ...     print(week, qty)
+    """
+
+    def __init__(self, programme: Any) -> None:
+        self.programme = programme
+        curves = getattr(programme, "resourcecurves", None)
+        self._curves = {
+            x.curv_id: _cumulative_curve(x.pct_usage)
+            for x in getattr(curves, "resourcecurves", None) or []
+        }
+        self.tasks = {x.task_id: x for x in programme.activities.activities}
+        self._minutes: dict[Any, int | None] = {}
+        self._calendars: dict[Any, Any] = {}
+        self._profiles: dict[tuple, list[tuple[int, float]]] = {}
+        self._months: list[int] = []
+
+    def spread(
+        self, assignment: Any, quantity: str = "remaining", period: str = "day"
+    ) -> dict[datetime, float]:
+        """
+        Spread one assignment over periods.
+
+        Parameters
+        ----------
+        assignment : TaskRsrc
+            The assignment
+        quantity : str, optional
+            ``target``, ``remaining`` (default) or ``actual``
+        period : str, optional
+            ``day`` (default), ``week`` or ``month``
+
+        Returns
+        -------
+        dict[datetime, float]
+            Units per period, keyed by the start of the period; empty if the
+            assignment has no units or no dates
+
+        Raises
+        ------
+        ValueError
+            If ``quantity`` or ``period`` is not supported
+        """
+        self._check(quantity, period)
+        qty, profile = self._phase(assignment, quantity, period)
+        return {to_datetime(start): qty * share for start, share in profile}
+
+    def histogram(
+        self,
+        by: str | Callable[[Any], Any] = "resource",
+        quantity: str = "remaining",
+        period: str = "day",
+        assignments: Iterable[Any] | None = None,
+    ) -> dict[Any, dict[datetime, float]]:
+        """
+        Add up the spread units of many assignments.
+
+        Parameters
+        ----------
+        by : str or Callable[[TaskRsrc], Any], optional
+            ``resource`` (default) groups by ``rsrc_id``, ``role`` by
+            ``role_id`` (or the role of the assigned resource); a function
+            returning the group of an assignment can also be given.
+            Assignments whose group is None are skipped.
+        quantity : str, optional
+            ``target``, ``remaining`` (default) or ``actual``
+        period : str, optional
+            ``day`` (default), ``week`` or ``month``
+        assignments : Iterable[TaskRsrc], optional
+            The assignments to spread, by default every assignment of the
+            programme
+
+        Returns
+        -------
+        dict[Any, dict[datetime, float]]
+            Units per period for every group, periods in date order
+
+        Raises
+        ------
+        ValueError
+            If ``by``, ``quantity`` or ``period`` is not supported
+        """
+        self._check(quantity, period)
+        if by == "resource":
+            group_of = _rsrc_id
+        elif by == "role":
+            group_of = self._role
+        elif callable(by):
+            group_of = by
+        else:
+            raise ValueError(f"Unknown grouping {by!r}, use 'resource' or 'role'")
+        if assignments is None:
+            assignments = self.programme.activityresources.assignments
+        totals: dict[Any, dict[int, float]] = {}
+        for assignment in assignments:
+            group = group_of(assignment)
+            if group is None:
+                continue
+            buckets = totals.get(group)
+            if buckets is None:
+                buckets = totals[group] = {}
+            qty, profile = self._phase(assignment, quantity, period)
+            for start, share in profile:
+                buckets[start] = buckets.get(start, 0.0) + qty * share
+        dates: dict[int, datetime] = {}
+        result = {}
+        for group, buckets in totals.items():
+            phased = {}
+            for start in sorted(buckets):
+                when = dates.get(start)
+                if when is None:
+                    when = dates[start] = to_datetime(start)
+                phased[when] = buckets[start]
+            result[group] = phased
+        return result
+
+    def _check(self, quantity: str, period: str) -> None:
+        if quantity not in QUANTITIES:
+            raise ValueError(f"Unknown quantity {quantity!r}, use one of {QUANTITIES}")
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, use one of {PERIODS}")
+
+    def _role(self, assignment: Any) -> Any:
+        role_id = assignment.role_id
+        if role_id is not None:
+            return int(role_id) if str(role_id).isdigit() else role_id
+        resources = getattr(self.programme, "resources", None)
+        if resources is None or assignment.rsrc_id is None:
+            return None
+        resource = resources.get_resource_by_id(assignment.rsrc_id)
+        return None if resource is None else resource.role_id
+
+    def window(self, assignment: Any, quantity: str) -> tuple[Any, Any, float, Any]:
+        """
+        Get the dates, units and curve data of an assignment.
+
+        Missing assignment dates fall back to the dates of the activity.
+
+        Parameters
+        ----------
+        assignment : TaskRsrc
+            The assignment
+        quantity : str
+            The quantity spread, one of ``QUANTITIES``
+
+        Returns
+        -------
+        tuple[Any, Any, float, Any]
+            Start, finish, units and the assignment's own curve data; the
+            dates as found on the records (datetime, XER string or None)
+        """
+        task = self.tasks.get(assignment.task_id)
+        if quantity == "target":
+            return (
+                assignment.target_start_date
+                or getattr(task, "target_start_date", None),
+                assignment.target_end_date or getattr(task, "target_end_date", None),
+                _as_float(assignment.target_qty),
+                assignment.target_crv,
+            )
+        if quantity == "remaining":
+            return (
+                assignment.restart_date or getattr(task, "early_start_date", None),
+                assignment.reend_date or getattr(task, "early_end_date", None),
+                _as_float(assignment.remain_qty),
+                assignment.remain_crv,
+            )
+        return (
+            assignment.act_start_date or getattr(task, "act_start_date", None),
+            assignment.act_end_date
+            or getattr(task, "act_end_date", None)
+            or assignment.restart_date,
+            _as_float(assignment.act_reg_qty) + _as_float(assignment.act_ot_qty),
+            assignment.actual_crv,
+        )
+
+    def _phase(
+        self, assignment: Any, quantity: str, period: str
+    ) -> tuple[float, list[tuple[int, float]]]:
+        """
+        Get the units of an assignment and their share in each period.
+
+        Parameters
+        ----------
+        assignment : TaskRsrc
+            The assignment
+        quantity : str
+            The quantity spread
+        period : str
+            The period length
+
+        Returns
+        -------
+        tuple[float, list[tuple[int, float]]]
+            The units and ``(period start, share)`` for every period with a
+            share, period starts in minutes
+        """
+        start, finish, qty, own_curve = self.window(assignment, quantity)
+        if not qty:
+            return 0.0, []
+        return qty, self.shares(assignment, start, finish, own_curve, period)
+
+    def shares(
+        self, assignment: Any, start: Any, finish: Any, own_curve: Any, period: str
+    ) -> list[tuple[int, float]]:
+        """
+        Get the share of an assignment window falling in each period, cached
+        per distinct window, curve and calendar.
+
+        Parameters
+        ----------
+        assignment : TaskRsrc
+            The assignment
+        start, finish : datetime, str or None
+            The window
+        own_curve : str or None
+            The assignment's own curve data for the window
+        period : str
+            The period length
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            ``(period start, share)`` for every period with a share, period
+            starts in minutes; empty if the window has no start
+        """
+        calendar = self.calendar(assignment.task_id)
+        key = (period, start, finish, own_curve, assignment.curv_id, calendar)
+        profile = self._profiles.get(key)
+        if profile is None:
+            first, last = self.to_minutes(start), self.to_minutes(finish)
+            if first is None:
+                profile = []
+            else:
+                if last is None or last < first:
+                    last = first
+                curve = self._curve(own_curve, assignment.curv_id)
+                profile = self._profile(calendar, first, last, curve, period)
+            self._profiles[key] = profile
+        return profile
+
+    def reached(
+        self, assignment: Any, start: Any, finish: Any, own_curve: Any, t: int
+    ) -> float:
+        """
+        Get the share of an assignment window's units used by a given time.
+
+        Parameters
+        ----------
+        assignment : TaskRsrc
+            The assignment
+        start, finish : datetime, str or None
+            The window
+        own_curve : str or None
+            The assignment's own curve data for the window
+        t : int
+            The time, in minutes since the date origin
+
+        Returns
+        -------
+        float
+            Share between 0 and 1; 0 if the window has no start
+        """
+        first, last = self.to_minutes(start), self.to_minutes(finish)
+        if first is None or t <= first:
+            return 0.0
+        if last is None or t >= last:
+            return 1.0
+        calendar = self.calendar(assignment.task_id)
+        origin = calendar.cumulative(first)
+        work = calendar.cumulative(last) - origin
+        if work <= 0:
+            return 1.0
+        x = (calendar.cumulative(t) - origin) / work
+        return _along(self._curve(own_curve, assignment.curv_id), x)
+
+    def calendar(self, task_id: Any) -> Any:
+        """
+        Get the compiled calendar of an activity, cached per activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+
+        Returns
+        -------
+        WorkCalendar
+            Its calendar, or the default calendar
+        """
+        calendar = self._calendars.get(task_id)
+        if calendar is None:
+            task = self.tasks.get(task_id)
+            calendar = get_calendar(getattr(task, "calendar", None))
+            self._calendars[task_id] = calendar
+        return calendar
+
+    def _curve(self, own: Any, curv_id: Any) -> tuple[float, ...] | None:
+        """
+        Get the cumulative curve of an assignment.
+
+        Parameters
+        ----------
+        own : str or None
+            The assignment's own curve data, as 21 numbers
+        curv_id : str or None
+            The resource curve assigned
+
+        Returns
+        -------
+        tuple[float, ...] or None
+            The cumulative distribution, None for an even spread
+        """
+        if own:
+            points = _NUMBER.findall(own)
+            if len(points) == 21:
+                return _cumulative_curve(float(x) for x in points)
+        if curv_id is None:
+            return None
+        try:
+            return self._curves.get(int(curv_id))
+        except ValueError:
+            return None
+
+    def _profile(
+        self,
+        calendar: Any,
+        start: int,
+        finish: int,
+        curve: tuple[float, ...] | None,
+        period: str,
+    ) -> list[tuple[int, float]]:
+        """
+        Compute the share of the units falling in each period of a window.
+
+        Parameters
+        ----------
+        calendar : WorkCalendar
+            Calendar of the activity
+        start, finish : int
+            The window, in minutes since the date origin
+        curve : tuple[float, ...] or None
+            Cumulative curve, None for an even spread
+        period : str
+            The period length
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            ``(period start, share)`` for every period with a share
+        """
+        first = self.period_start(start, period)
+        origin = calendar.cumulative(start)
+        work = calendar.cumulative(finish) - origin
+        if work <= 0:
+            return [(first, 1.0)]
+        profile = []
+        done = 0.0
+        bucket = first
+        for boundary in self.boundaries(start, finish, period):
+            reached = _along(curve, (calendar.cumulative(boundary) - origin) / work)
+            if reached > done:
+                profile.append((bucket, reached - done))
+                done = reached
+            bucket = boundary
+        if done < 1.0:
+            profile.append((bucket, 1.0 - done))
+        return profile
+
+    def period_start(self, t: int, period: str) -> int:
+        """
+        Get the start of the period containing a time.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+        period : str
+            The period length, one of ``PERIODS``
+
+        Returns
+        -------
+        int
+            Start of the day, of the week (Monday) or of the month, in
+            minutes
+        """
+        day = t // _DAY
+        if period == "day":
+            return day * _DAY
+        if period == "week":
+            return (day - (day - _MONDAY) % 7) * _DAY
+        months = self._month_starts(t)
+        return months[bisect_right(months, t) - 1]
+
+    def boundaries(self, start: int, finish: int, period: str) -> Iterable[int]:
+        """
+        List the period starts strictly inside a window.
+
+        Parameters
+        ----------
+        start, finish : int
+            The window, in minutes since the date origin
+        period : str
+            The period length
+
+        Returns
+        -------
+        Iterable[int]
+            Period starts in minutes, in date order
+        """
+        if period == "day":
+            return range((start // _DAY + 1) * _DAY, finish, _DAY)
+        if period == "week":
+            day = start // _DAY + 1
+            day += (_MONDAY - day) % 7
+            return range(day * _DAY, finish, 7 * _DAY)
+        self._month_starts(start)
+        months = self._month_starts(finish)
+        return months[bisect_right(months, start) : bisect_right(months, finish - 1)]
+
+    def _month_starts(self, t: int) -> list[int]:
+        """
+        Get the sorted month starts, extended to cover ``t``.
+
+        Parameters
+        ----------
+        t : int
+            Minutes since the date origin
+
+        Returns
+        -------
+        list[int]
+            Start of every month from 1980 (or earlier, if needed) to 2080
+            (or later), in minutes
+        """
+        months = self._months
+        if not months or t < months[0] or t >= months[-1]:
+            year = to_datetime(t).year
+            first = (
+                min(1980, year - 1) if not months else min(year - 1, _year(months[0]))
+            )
+            last = (
+                max(2080, year + 1) if not months else max(year + 1, _year(months[-1]))
+            )
+            months = [
+                (date(y, m, 1).toordinal() - _EPOCH_ORDINAL) * _DAY
+                for y in range(first, last + 1)
+                for m in range(1, 13)
+            ]
+            self._months = months
+        return months
+
+    def to_minutes(self, value: Any) -> int | None:
+        """
+        Convert a date or an XER date string to minutes, memoised.
+
+        Parameters
+        ----------
+        value : datetime, str or None
+            The date
+
+        Returns
+        -------
+        int or None
+            Minutes since the date origin, None if there is no valid date
+        """
+        minutes = self._minutes.get(value, -1)
+        if minutes != -1:
+            return minutes
+        when = value
+        if isinstance(when, str):
+            try:
+                when = datetime.strptime(when.strip(), "%Y-%m-%d %H:%M")
+            except ValueError:
+                when = None
+        minutes = None
+        if isinstance(when, datetime):
+            minutes = (when.toordinal() - _EPOCH_ORDINAL) * _DAY
+            minutes += when.hour * 60 + when.minute
+        self._minutes[value] = minutes
+        return minutes
+
+
+def _along(curve: tuple[float, ...] | None, x: float) -> float:
+    """
+    Interpolate a cumulative curve.
+
+    Parameters
+    ----------
+    curve : tuple[float, ...] or None
+        Cumulative curve, None for an even spread
+    x : float
+        Elapsed share of the working time, between 0 and 1
+
+    Returns
+    -------
+    float
+        Share of the units used
+    """
+    if curve is None:
+        return x
+    position = x * 20
+    i = int(position)
+    if i >= 20:
+        return 1.0
+    return curve[i] + (curve[i + 1] - curve[i]) * (position - i)
+
+
+def _rsrc_id(assignment: Any) -> Any:
+    return assignment.rsrc_id
+
+
+def _year(minutes: int) -> int:
+    return to_datetime(minutes).year
@@ -0,0 +1,66 @@
+"""Detection of circular logic in the TASKPRED network.
+
+A single loop makes a schedule impossible to calculate and stops every path
+walk from terminating. ``find_loops`` reports every loop at once, with the
+activities and relationships that form it, so they can be fixed in one go.
+"""
+
+from typing import Any
+
+from xer_parser.scheduling.network import LogicNetwork
+
+__all__ = ["find_loops"]
+
+
+def find_loops(programme: Any) -> list[dict[str, list[Any]]]:
+    """
+    Find every loop in the relationships of a programme.
+
+    Each loop is a strongly connected component of the activity network:
+    every activity in it is, directly or indirectly, both a predecessor and
+    a successor of every other one.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities`` and
+        ``relations`` collections) to check
+
+    Returns
+    -------
+    list[dict[str, list[Any]]]
+        One entry per loop, largest first, with the ``task_id`` of its
+        ``activities`` and the ``task_pred_id`` of the ``relations`` between
+        them
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.loops import find_loops
+    >>> for loop in find_loops(xer):
+    ...     print(loop["activities"], loop["relations"])
+    """
+    network = LogicNetwork(
+        programme.activities.activities, programme.relations.relations
+    )
+    task_ids, relations, rel_succ = (
+        network.task_ids,
+        network.relations,
+        network.rel_succ,
+    )
+    loops = []
+    for component in network.loops():
+        members = set(component)
+        component.sort()
+        loops.append(
+            {
+                "activities": [task_ids[i] for i in component],
+                "relations": [
+                    relations[k].task_pred_id
+                    for i in component
+                    for k in network.succ_rels[i]
+                    if rel_succ[k] in members
+                ],
+            }
+        )
+    loops.sort(key=lambda x: -len(x["activities"]))
+    return loops
@@ -0,0 +1,486 @@
+"""Monte Carlo schedule risk analysis.
+
+Activity durations are sampled from three-point distributions and the network
+is re-scheduled for every iteration. Instead of looping over iterations, the
+simulation is laid out node-major: every activity holds a column with one
+value per iteration and each forward or backward pass step combines whole
+columns with ``map`` over the C-level functions of the ``operator`` module.
+The iterations are split into chunks of bounded size, each with its own
+random seed, and the chunks are spread over a process pool, so the results do
+not depend on the number of workers.
+
+The simulation works in working hours counted from the data date, which
+keeps the column arithmetic simple: lags and durations add up directly and
+each iteration's finish is converted back to a date on the calendar of the
+activity that finishes the deterministic schedule. Each activity's calendar
+places its earliest start and the dates of completed activities, but the
+sampled durations and lags are added as hours of one common working time: the
+dates are exact when the driving activities share their working hours, and
+approximate where calendars with different working hours meet.
+"""
+
+import logging
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat, starmap
+from operator import add, le, mul, sub
+from typing import Any
+
+from xer_parser.scheduling.calendar import to_datetime
+from xer_parser.scheduling.cpm import _COMPLETE, _NOT_STARTED, CPMScheduler
+from xer_parser.scheduling.network import FF, FS, SF, SS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+__all__ = ["DISTRIBUTIONS", "MonteCarlo"]
+
+DISTRIBUTIONS = ("triangular", "pert", "uniform")
+
+# Upper bound for (activities x iterations) values held per column in a chunk
+_CHUNK_CELLS = 1_000_000
+# Two floats closer than this (in hours) are considered equal
+_TOLERANCE = 1e-6
+
+
+def _sample(
+    rng: random.Random, shape: str, low: float, likely: float, high: float, n: int
+) -> list[float]:
+    """
+    Draw ``n`` durations from a three-point distribution.
+
+    Parameters
+    ----------
+    rng : random.Random
+        The random number generator
+    shape : str
+        One of ``DISTRIBUTIONS``
+    low, likely, high : float
+        Minimum, most likely and maximum duration in hours
+    n : int
+        Number of samples
+
+    Returns
+    -------
+    list[float]
+        The sampled durations
+    """
+    if high <= low:
+        return [likely] * n
+    span = high - low
+    if shape == "pert":
+        alpha = 1 + 4 * (likely - low) / span
+        beta = 1 + 4 * (high - likely) / span
+        betavariate = rng.betavariate
+        return [low + span * betavariate(alpha, beta) for _ in range(n)]
+    u = list(starmap(rng.random, repeat((), n)))
+    if shape == "uniform":
+        return list(map(add, map(mul, u, repeat(span)), repeat(low)))
+    # (1 - c) * min(U, V) + c * max(U, V) is triangular on [0, 1] with mode c
+    v = list(starmap(rng.random, repeat((), n)))
+    mode = (likely - low) / span
+    lower = map(mul, map(min, u, v), repeat((1 - mode) * span))
+    upper = map(mul, map(max, u, v), repeat(mode * span))
+    return list(map(add, map(add, lower, upper), repeat(low)))
+
+
+def _simulate(model: tuple, iterations: int, seed: int) -> tuple:
+    """
+    Run one chunk of iterations.
+
+    Parameters
+    ----------
+    model : tuple
+        The compiled network, see ``MonteCarlo._compile``
+    iterations : int
+        Number of iterations in the chunk
+    seed : int
+        Seed of the chunk's random number generator
+
+    Returns
+    -------
+    tuple
+        Finish of every iteration in hours, critical counts per node and the
+        duration sums used for the sensitivity of every sampled node
+    """
+    order, preds, succs, floors, fixed, dists, proj, deadlines = model
+    n = len(floors)
+    rng = random.Random(seed)
+    zero = [0.0] * iterations
+    es: list[Any] = [None] * n
+    ef: list[Any] = [None] * n
+    dur: list[Any] = [None] * n
+    # finish of every project, which anchors the backward pass of its nodes
+    finishes = [[-math.inf] * iterations for _ in range(max(proj, default=-1) + 1)]
+    for i in order:
+        if fixed[i] is not None:
+            start, end = fixed[i]
+            es[i], ef[i], dur[i] = [start] * iterations, [end] * iterations, zero
+            continue
+        dist = dists[i]
+        d = (
+            _sample(rng, *dist, iterations)
+            if len(dist) == 4
+            else [dist[0]] * iterations
+        )
+        start = [floors[i]] * iterations
+        for p, kind, lag in preds[i]:
+            base = ef[p] if kind in (FS, FF) else es[p]
+            if lag:
+                base = map(add, base, repeat(lag))
+            if kind in (FF, SF):
+                base = map(sub, base, d)
+            start = list(map(max, start, base))
+        es[i], dur[i] = start, d
+        ef[i] = end = list(map(add, start, d))
+        finishes[proj[i]] = list(map(max, finishes[proj[i]], end))
+    finish = [-math.inf] * iterations
+    for column in finishes:
+        finish = list(map(max, finish, column))
+
+    critical = [0] * n
+    ls: list[Any] = [None] * n
+    lf: list[Any] = [None] * n
+    for i in reversed(order):
+        if fixed[i] is not None:
+            continue
+        deadline = deadlines[i]
+        late = finishes[proj[i]] if deadline is None else [deadline] * iterations
+        d = dur[i]
+        for j, kind, lag in succs[i]:
+            base = ls[j] if kind in (FS, SS) else lf[j]
+            if lag:
+                base = map(sub, base, repeat(lag))
+            if kind in (SS, SF):
+                base = map(add, base, d)
+            late = list(map(min, late, base))
+        lf[i] = late
+        ls[i] = list(map(sub, late, d))
+        critical[i] = sum(map(le, map(sub, late, ef[i]), repeat(_TOLERANCE)))
+        es[i] = None
+
+    sums = {}
+    for i, dist in enumerate(dists):
+        if dist is not None and len(dist) == 4:
+            d = dur[i]
+            sums[i] = (sum(d), sum(map(mul, d, d)), sum(map(mul, d, finish)))
+    return finish, critical, sums
+
+
+class MonteCarlo:
+    """
+    Monte Carlo schedule risk analysis over a CPM network.
+
+    Parameters
+    ----------
+    scheduler : CPMScheduler
+        The deterministic scheduler; it is scheduled first if it has not been
+    distributions : dict[int, tuple[str, float, float, float]], optional
+        Duration distribution per ``task_id`` as ``(shape, minimum,
+        most_likely, maximum)`` in hours, with ``shape`` one of
+        ``DISTRIBUTIONS``
+    default : tuple[str, float, float, float] or None, optional
+        Distribution for the remaining activities as ``(shape, minimum,
+        most_likely, maximum)`` factors of their remaining duration, by
+        default ``("triangular", 0.9, 1.0, 1.25)``. None keeps their
+        durations fixed.
+
+    Notes
+    -----
+    Completed activities keep their actual dates, level of effort and WBS
+    summary activities are ignored, and only the early start constraints are
+    honoured: the simulation measures how logic and duration uncertainty
+    move the finish. As in the deterministic backward pass, the late dates of
+    every project are anchored to its must-finish-by date, otherwise to its
+    own finish in the iteration.
+
+    Durations and lags are sampled in hours and added on one common working
+    time, not on each activity's calendar, so the simulated dates are
+    approximate where activities on calendars with different working hours
+    drive each other.
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling import CPMScheduler
+    >>> from xer_parser.scheduling.montecarlo import MonteCarlo
+    >>> risk = MonteCarlo(CPMScheduler(xer)).run(iterations=2000, seed=1)
+    >>> risk["p80_finish"]
+    """
+
+    def __init__(
+        self,
+        scheduler: CPMScheduler,
+        distributions: dict[int, tuple[str, float, float, float]] | None = None,
+        default: tuple[str, float, float, float] | None = (
+            "triangular",
+            0.9,
+            1.0,
+            1.25,
+        ),
+    ) -> None:
+        if not scheduler.es:
+            scheduler.schedule()
+        self.scheduler = scheduler
+        self.network = scheduler.network
+        self.distributions = dict(distributions or {})
+        self.default = default
+        for shape, *_ in [*self.distributions.values(), default or ("triangular",)]:
+            if shape not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution {shape!r}")
+
+    @classmethod
+    def from_udf(
+        cls,
+        scheduler: CPMScheduler,
+        udfvalues: Any,
+        udftypes: Any,
+        minimum: str,
+        maximum: str,
+        most_likely: str | None = None,
+        shape: str = "triangular",
+        default: tuple[str, float, float, float] | None = None,
+    ) -> "MonteCarlo":
+        """
+        Build the distributions from activity user defined fields.
+
+        Parameters
+        ----------
+        scheduler : CPMScheduler
+            The deterministic scheduler
+        udfvalues : UDFValues
+            The UDFVALUE table, e.g. ``Reader.udfvalues``
+        udftypes : UDFTypes
+            The UDFTYPE table, e.g. ``Reader.udftypes``
+        minimum, maximum : str
+            Label (or name) of the TASK UDFs holding the minimum and maximum
+            duration in hours
+        most_likely : str, optional
+            Label of the UDF holding the most likely duration; by default the
+            remaining duration
+        shape : str, optional
+            Distribution shape, by default ``"triangular"``
+        default : tuple, optional
+            Distribution of the activities without UDF values, see
+            ``MonteCarlo``; by default their durations are fixed
+
+        Returns
+        -------
+        MonteCarlo
+            The configured simulation
+
+        Raises
+        ------
+        ValueError
+            If a UDF label is not defined for the TASK table
+        """
+        types = {}
+        for udftype in udftypes.udftypes:
+            if udftype.table_name == "TASK":
+                types[udftype.udf_type_label] = udftype.udf_type_id
+                types.setdefault(udftype.udf_type_name, udftype.udf_type_id)
+        labels = {"minimum": minimum, "maximum": maximum, "most_likely": most_likely}
+        ids = {}
+        for field, label in labels.items():
+            if label is None:
+                continue
+            if label not in types:
+                raise ValueError(f"No TASK user defined field labelled {label!r}")
+            ids[types[label]] = field
+        values: dict[str, dict[str, float]] = {}
+        for udf in udfvalues.udfvalues:
+            field = ids.get(udf.udf_type_id)
+            if field is not None and udf.udf_number not in (None, ""):
+                values.setdefault(udf.fk_id, {})[field] = float(udf.udf_number)
+        if not scheduler.es:
+            scheduler.schedule()
+        distributions = {}
+        for node, task_id in enumerate(scheduler.network.task_ids):
+            found = values.get(str(task_id))
+            if not found or "minimum" not in found or "maximum" not in found:
+                continue
+            likely = found.get("most_likely", scheduler.dur[node] / 60.0)
+            distributions[task_id] = (shape, found["minimum"], likely, found["maximum"])
+        return cls(scheduler, distributions, default)
+
+    def run(
+        self, iterations: int = 1000, seed: int = 0, workers: int | None = None
+    ) -> dict[str, Any]:
+        """
+        Run the simulation.
+
+        Parameters
+        ----------
+        iterations : int, optional
+            Number of iterations, by default 1000
+        seed : int, optional
+            Seed of the random numbers, by default 0
+        workers : int, optional
+            Number of worker processes; by default one per CPU. 0 or 1 runs
+            in the calling process.
+
+        Returns
+        -------
+        dict[str, Any]
+            ``deterministic_finish``, ``p50_finish`` and ``p80_finish`` dates,
+            finish ``percentiles`` (10 to 90), ``probability_on_time`` of
+            finishing no later than the deterministic finish and, per
+            ``task_id`` in ``activities``, the ``criticality`` index (share of
+            iterations in which the activity is critical) and the duration
+            ``sensitivity`` (correlation of its duration with the finish)
+
+        Raises
+        ------
+        ValueError
+            If ``iterations`` is less than 1
+        """
+        if iterations < 1:
+            raise ValueError(f"iterations must be at least 1, got {iterations}")
+        model = self._compile()
+        n = max(1, len(model[3]))
+        size = max(1, min(iterations, _CHUNK_CELLS // n))
+        chunks = [
+            (model, min(size, iterations - start), seed * 1_000_003 + k)
+            for k, start in enumerate(range(0, iterations, size))
+        ]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(chunks) == 1:
+            outputs = [_simulate(*chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                outputs = list(pool.map(_simulate, *zip(*chunks, strict=True)))
+        return self._summarise(outputs, iterations)
+
+    def _compile(self) -> tuple:
+        """
+        Reduce the scheduled network to the picklable inputs of a simulation.
+
+        Returns
+        -------
+        tuple
+            Topological order, driving predecessors and successors per node
+            as ``(node, type, lag hours)``, earliest start per node, fixed
+            dates of completed nodes, the distribution per node, the project
+            number per node and the must-finish-by date of its project per
+            node (None for projects without one)
+        """
+        cpm, net = self.scheduler, self.network
+        n = net.node_count
+        self._reference = min(cpm.dd) if n else 0
+        reference = self._reference
+        drives, state = cpm.drives, cpm.state
+        preds: list[list] = [[] for _ in range(n)]
+        succs: list[list] = [[] for _ in range(n)]
+        for i in range(n):
+            for k in net.pred_rels[i]:
+                p = net.rel_pred[k]
+                if drives[p] and drives[i]:
+                    preds[i].append((p, net.rel_type[k], cpm.lag[k] / 60.0))
+                    if state[i] != _COMPLETE:
+                        succs[p].append((i, net.rel_type[k], cpm.lag[k] / 60.0))
+        floors: list[float] = [0.0] * n
+        fixed: list[Any] = [None] * n
+        dists: list[Any] = [None] * n
+        numbers: dict[Any, int] = {}
+        proj = [numbers.setdefault(proj_id, len(numbers)) for proj_id in cpm.proj]
+        deadlines: list[float | None] = [None] * n
+        for i in range(n):
+            cal = cpm.cal[i]
+            must_finish = cpm.must_finish.get(cpm.proj[i])
+            if must_finish is not None:
+                deadlines[i] = cal.work_minutes_between(reference, must_finish) / 60.0
+            if state[i] == _COMPLETE:
+                fixed[i] = (
+                    cal.work_minutes_between(reference, cpm.es[i]) / 60.0,
+                    cal.work_minutes_between(reference, cpm.ef[i]) / 60.0,
+                )
+                continue
+            start = cpm.dd[i]
+            if state[i] == _NOT_STARTED:
+                start = max(start, cpm._early_constraints(i, start))
+            floors[i] = cal.work_minutes_between(reference, start) / 60.0
+            hours = cpm.dur[i] / 60.0
+            dist = self.distributions.get(net.task_ids[i])
+            if dist is None and self.default is not None and hours > 0:
+                shape, low, likely, high = self.default
+                dist = (shape, hours * low, hours * likely, hours * high)
+            dists[i] = (hours,) if dist is None else tuple(dist)
+        order = [i for i in net.topological_order() if drives[i]]
+        if len({id(cpm.cal[i]) for i in order}) > 1:
+            logger.debug("Activity calendars differ, durations are summed as hours")
+        return order, preds, succs, floors, fixed, dists, proj, deadlines
+
+    def _summarise(self, outputs: list[tuple], iterations: int) -> dict[str, Any]:
+        """
+        Combine the chunk outputs into the simulation results.
+
+        Parameters
+        ----------
+        outputs : list[tuple]
+            Results of ``_simulate`` for every chunk
+        iterations : int
+            Total number of iterations
+
+        Returns
+        -------
+        dict[str, Any]
+            The results described in ``run``
+        """
+        cpm, net = self.scheduler, self.network
+        finishes = sorted(x for out in outputs for x in out[0])
+        critical = [0] * net.node_count
+        sums: dict[int, list[float]] = {}
+        for _, counts, node_sums in outputs:
+            critical = list(map(add, critical, counts))
+            for i, values in node_sums.items():
+                total = sums.setdefault(i, [0.0, 0.0, 0.0])
+                for x, value in enumerate(values):
+                    total[x] += value
+        finish_sum = math.fsum(finishes)
+        finish_var = math.fsum(x * x for x in finishes) - finish_sum**2 / iterations
+
+        drivers = [i for i in range(net.node_count) if cpm.drives[i]]
+        last = max(drivers, key=cpm.ef.__getitem__) if drivers else None
+        calendar = cpm.cal[last] if last is not None else None
+
+        def to_date(hours: float) -> datetime | None:
+            if calendar is None or hours == -math.inf:
+                return None
+            return to_datetime(
+                calendar.add_work_minutes(self._reference, round(hours * 60))
+            )
+
+        def percentile(p: int) -> float:
+            return finishes[max(0, math.ceil(p / 100 * len(finishes)) - 1)]
+
+        deterministic = to_datetime(cpm.ef[last]) if last is not None else None
+        on_time = 0.0
+        if last is not None:
+            target = calendar.work_minutes_between(self._reference, cpm.ef[last]) / 60.0
+            on_time = sum(1 for x in finishes if x <= target + _TOLERANCE) / iterations
+
+        activities = {}
+        for i in drivers:
+            sensitivity = 0.0
+            if i in sums and finish_var > 0:
+                d_sum, d_sq, d_finish = sums[i]
+                d_var = d_sq - d_sum**2 / iterations
+                if d_var > 0:
+                    cov = d_finish - d_sum * finish_sum / iterations
+                    sensitivity = cov / math.sqrt(d_var * finish_var)
+            activities[net.task_ids[i]] = {
+                "criticality": critical[i] / iterations,
+                "sensitivity": sensitivity,
+            }
+        return {
+            "iterations": iterations,
+            "deterministic_finish": deterministic,
+            "p50_finish": to_date(percentile(50)),
+            "p80_finish": to_date(percentile(80)),
+            "percentiles": {p: to_date(percentile(p)) for p in range(10, 100, 10)},
+            "probability_on_time": on_time,
+            "activities": activities,
+        }
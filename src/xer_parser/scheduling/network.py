@@ -0,0 +1,496 @@
+"""Array-backed index of the activity network.
+
+This module turns the TASK and TASKPRED tables into dense, integer indexed
+adjacency lists that the scheduling algorithms can walk in linear time.
+"""
+
+import gc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from xer_parser.model.classes.p6codes import RelationshipType
+
+__all__ = ["FF", "FS", "SF", "SS", "LogicNetwork"]
+
+# Relationship type codes stored in ``LogicNetwork.rel_type``
+FS, SS, FF, SF = 0, 1, 2, 3
+
+_REL_CODES = {
+    RelationshipType.FS: FS,
+    RelationshipType.SS: SS,
+    RelationshipType.FF: FF,
+    RelationshipType.SF: SF,
+}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector.
+
+    Allocating one container per node triggers full collections that walk
+    every object of the loaded programme, which costs more than the
+    algorithms themselves on large files. None of the containers created
+    here form reference cycles.
+
+    Yields
+    ------
+    None
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class LogicNetwork:
+    """
+    Dense adjacency index over activities and their relationships.
+
+    Activities are numbered ``0 .. n-1`` in the order they are given and every
+    relationship whose two ends are both present is numbered ``0 .. m-1``.
+    The relationships leaving node ``i`` are ``succ_rels[i]`` and the ones
+    entering it are ``pred_rels[i]``. Building the index and the topological
+    order are both O(N + M). Relationships can be added and removed
+    afterwards; the topological order is then repaired locally instead of
+    being rebuilt.
+
+    Parameters
+    ----------
+    tasks : Iterable[Task]
+        The activities of the network
+    relations : Iterable[TaskPred]
+        The relationships between the activities. Relationships pointing at
+        activities that are not part of ``tasks`` (e.g. external links) are
+        skipped.
+
+    Attributes
+    ----------
+    tasks : list[Task]
+        The activities, indexed by node number
+    task_ids : list[int]
+        ``task_id`` of every node
+    pos : dict[int, int]
+        Mapping of ``task_id`` to node number
+    relations : list[TaskPred]
+        The relationships kept in the index, indexed by relationship number
+    rel_pred, rel_succ : list[int]
+        Predecessor and successor node of every relationship
+    rel_type : list[int]
+        Relationship type code (``FS``, ``SS``, ``FF`` or ``SF``)
+    rel_lag : list[float]
+        Relationship lag in hours
+    succ_rels, pred_rels : list[list[int]]
+        Relationship numbers leaving and entering every node
+    revision : int
+        Number of relationships added or removed since the index was built
+    """
+
+    def __init__(self, tasks: Iterable[Any], relations: Iterable[Any]) -> None:
+        self.tasks = list(tasks)
+        self.task_ids = [x.task_id for x in self.tasks]
+        self.pos = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        self.relations: list[Any] = []
+        self.rel_pred: list[int] = []
+        self.rel_succ: list[int] = []
+        self.rel_type: list[int] = []
+        self.rel_lag: list[float] = []
+        pos = self.pos
+        for rel in relations:
+            pred = pos.get(rel.pred_task_id)
+            succ = pos.get(rel.task_id)
+            if pred is None or succ is None:
+                continue
+            self.relations.append(rel)
+            self.rel_pred.append(pred)
+            self.rel_succ.append(succ)
+            self.rel_type.append(_REL_CODES.get(rel.pred_type, FS))
+            self.rel_lag.append(rel.lag_hr_cnt or 0.0)
+        n = len(self.tasks)
+        with _gc_paused():
+            self.succ_rels: list[list[int]] = [[] for _ in range(n)]
+            self.pred_rels: list[list[int]] = [[] for _ in range(n)]
+            for k, pred in enumerate(self.rel_pred):
+                self.succ_rels[pred].append(k)
+                self.pred_rels[self.rel_succ[k]].append(k)
+        self.revision = 0
+        self._removed: set[int] = set()
+        self._topo_order: list[int] | None = None
+        self._topo_pos: list[int] = []
+
+    @property
+    def node_count(self) -> int:
+        """
+        Get the number of activities in the network.
+
+        Returns
+        -------
+        int
+            Number of nodes
+        """
+        return len(self.tasks)
+
+    @property
+    def relation_count(self) -> int:
+        """
+        Get the number of relationships in the network.
+
+        Returns
+        -------
+        int
+            Number of relationships, not counting removed ones
+        """
+        return len(self.relations) - len(self._removed)
+
+    def successors(self, node: int) -> list[int]:
+        """
+        Get the relationships leaving a node.
+
+        Parameters
+        ----------
+        node : int
+            Node number
+
+        Returns
+        -------
+        list[int]
+            Relationship numbers whose predecessor is ``node``
+        """
+        return self.succ_rels[node]
+
+    def predecessors(self, node: int) -> list[int]:
+        """
+        Get the relationships entering a node.
+
+        Parameters
+        ----------
+        node : int
+            Node number
+
+        Returns
+        -------
+        list[int]
+            Relationship numbers whose successor is ``node``
+        """
+        return self.pred_rels[node]
+
+    def topological_order(self) -> list[int]:
+        """
+        Order the nodes so that every predecessor comes before its successors.
+
+        Uses Kahn's algorithm; the result is cached.
+
+        Returns
+        -------
+        list[int]
+            Node numbers in topological order
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        if self._topo_order is not None:
+            return self._topo_order
+        n = len(self.tasks)
+        succ_rels, rel_succ = self.succ_rels, self.rel_succ
+        indegree = [len(x) for x in self.pred_rels]
+        order = [i for i in range(n) if indegree[i] == 0]
+        head = 0
+        while head < len(order):
+            node = order[head]
+            head += 1
+            for k in succ_rels[node]:
+                succ = rel_succ[k]
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    order.append(succ)
+        if len(order) < n:
+            loops = self.loops()
+            raise ValueError(
+                f"Circular logic detected in {len(loops)} loops, e.g. between "
+                f"task_id {sorted(self.task_ids[i] for i in loops[0])[:10]}"
+            )
+        position = [0] * n
+        for i, node in enumerate(order):
+            position[node] = i
+        self._topo_order = order
+        self._topo_pos = position
+        return order
+
+    def topological_positions(self) -> list[int]:
+        """
+        Get the position of every node in the topological order.
+
+        Returns
+        -------
+        list[int]
+            ``topological_order()[positions[i]] == i`` for every node ``i``
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        self.topological_order()
+        return self._topo_pos
+
+    def loops(self) -> list[list[int]]:
+        """
+        Find the groups of nodes caught in circular logic.
+
+        Nodes that cannot be part of a loop are discarded first by repeatedly
+        peeling off nodes without predecessors, then nodes without
+        successors; the strongly connected components of what remains are
+        found with an iterative version of Tarjan's algorithm. Both steps are
+        O(N + M).
+
+        Returns
+        -------
+        list[list[int]]
+            Node numbers of every strongly connected component with more
+            than one node, or a single node that is its own predecessor
+        """
+        n = len(self.tasks)
+        rel_pred, rel_succ = self.rel_pred, self.rel_succ
+        alive = [True] * n
+        for degree_of, rels_of, end_of in (
+            (self.pred_rels, self.succ_rels, rel_succ),
+            (self.succ_rels, self.pred_rels, rel_pred),
+        ):
+            degree = [len(x) for x in degree_of]
+            queue = [i for i in range(n) if alive[i] and degree[i] == 0]
+            for i in queue:
+                alive[i] = False
+                for k in rels_of[i]:
+                    j = end_of[k]
+                    degree[j] -= 1
+                    if degree[j] == 0 and alive[j]:
+                        queue.append(j)
+        remaining = [i for i in range(n) if alive[i]]
+        if not remaining:
+            return []
+        with _gc_paused():
+            return self._tarjan(remaining)
+
+    def _tarjan(self, nodes: list[int]) -> list[list[int]]:
+        """
+        Find the loops among the given nodes with Tarjan's algorithm.
+
+        Parameters
+        ----------
+        nodes : list[int]
+            Candidate node numbers; every other node is treated as visited
+
+        Returns
+        -------
+        list[list[int]]
+            The strongly connected components forming loops
+        """
+        n = len(self.tasks)
+        rel_succ, succ_rels = self.rel_succ, self.succ_rels
+        # the other nodes count as already visited; ``depth`` is the
+        # position of a node on the Tarjan stack, -1 once it has left it
+        index = [n] * n
+        for i in nodes:
+            index[i] = -1
+        low = [0] * n
+        depth = [-1] * n
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+        for root in nodes:
+            if index[root] >= 0:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            depth[root] = len(stack)
+            stack.append(root)
+            work = [(root, iter(succ_rels[root]))]
+            while work:
+                node, rels = work[-1]
+                for k in rels:
+                    succ = rel_succ[k]
+                    if index[succ] < 0:
+                        index[succ] = low[succ] = counter
+                        counter += 1
+                        depth[succ] = len(stack)
+                        stack.append(succ)
+                        work.append((succ, iter(succ_rels[succ])))
+                        break
+                    if depth[succ] >= 0 and index[succ] < low[node]:
+                        low[node] = index[succ]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == index[node]:
+                        component = stack[depth[node] :]
+                        del stack[depth[node] :]
+                        for member in component:
+                            depth[member] = -1
+                        if len(component) > 1 or any(
+                            rel_succ[k] == node for k in succ_rels[node]
+                        ):
+                            components.append(component)
+        return components
+
+    def add_relation(
+        self,
+        pred: int,
+        succ: int,
+        rel_type: int = FS,
+        lag: float = 0.0,
+        relation: Any = None,
+    ) -> int:
+        """
+        Add a relationship between two nodes.
+
+        If the topological order has been computed it is repaired in place
+        with the Pearce-Kelly algorithm, which only reorders the nodes lying
+        between the two ends of the new relationship.
+
+        Parameters
+        ----------
+        pred : int
+            Predecessor node number
+        succ : int
+            Successor node number
+        rel_type : int, optional
+            Relationship type code, by default ``FS``
+        lag : float, optional
+            Lag in hours, by default 0
+        relation : TaskPred, optional
+            The relationship record, if there is one
+
+        Returns
+        -------
+        int
+            The number of the new relationship
+
+        Raises
+        ------
+        ValueError
+            If the relationship would create circular logic; the network is
+            left unchanged
+        """
+        if pred == succ:
+            raise ValueError(
+                f"Circular logic detected: task_id {self.task_ids[pred]} "
+                "cannot be its own predecessor"
+            )
+        if self._topo_order is not None:
+            self._reorder(pred, succ)
+        k = len(self.relations)
+        self.relations.append(relation)
+        self.rel_pred.append(pred)
+        self.rel_succ.append(succ)
+        self.rel_type.append(rel_type)
+        self.rel_lag.append(lag)
+        self.succ_rels[pred].append(k)
+        self.pred_rels[succ].append(k)
+        self.revision += 1
+        return k
+
+    def remove_relation(self, rel: int) -> None:
+        """
+        Remove a relationship from the adjacency lists.
+
+        The relationship keeps its number, so the per-relationship arrays stay
+        aligned, but it is no longer returned by ``successors`` or
+        ``predecessors``.
+
+        Parameters
+        ----------
+        rel : int
+            Relationship number
+
+        Returns
+        -------
+        None
+        """
+        if rel in self._removed:
+            return
+        self.succ_rels[self.rel_pred[rel]].remove(rel)
+        self.pred_rels[self.rel_succ[rel]].remove(rel)
+        self._removed.add(rel)
+        self.revision += 1
+
+    def is_removed(self, rel: int) -> bool:
+        """
+        Check whether a relationship has been removed.
+
+        Parameters
+        ----------
+        rel : int
+            Relationship number
+
+        Returns
+        -------
+        bool
+            True if ``remove_relation`` was called for it
+        """
+        return rel in self._removed
+
+    def _reorder(self, pred: int, succ: int) -> None:
+        """
+        Repair the topological order before adding ``pred -> succ``.
+
+        Parameters
+        ----------
+        pred : int
+            Predecessor node number
+        succ : int
+            Successor node number
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If ``succ`` already reaches ``pred``
+        """
+        order, position = self._topo_order, self._topo_pos
+        lower, upper = position[succ], position[pred]
+        if lower > upper:
+            return
+        # nodes reachable from succ that currently sit before pred
+        forward, seen, stack = [], {succ}, [succ]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for k in self.succ_rels[node]:
+                nxt = self.rel_succ[k]
+                if nxt == pred:
+                    raise ValueError(
+                        f"Circular logic detected: task_id {self.task_ids[pred]} "
+                        f"is already a successor of task_id {self.task_ids[succ]}"
+                    )
+                if nxt not in seen and position[nxt] < upper:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        # nodes reaching pred that currently sit after succ
+        backward, seen, stack = [], {pred}, [pred]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for k in self.pred_rels[node]:
+                prev = self.rel_pred[k]
+                if prev not in seen and position[prev] > lower:
+                    seen.add(prev)
+                    stack.append(prev)
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        nodes = backward + forward
+        slots = sorted(position[x] for x in nodes)
+        for slot, node in zip(slots, nodes, strict=True):
+            order[slot] = node
+            position[node] = slot
@@ -0,0 +1,155 @@
+"""Resource over-allocation detection.
+
+A resource is over-allocated while the summed hourly rates of the
+assignments it is working on exceed its maximum units per hour. Each
+assignment contributes a start event (its rate is added) and a finish event
+(its rate is removed), and every RSRCRATE record contributes an event where
+the limit changes. Sorting these events and sweeping through them once finds
+every over-allocated interval in O(A log A) per resource, instead of
+comparing the assignments pairwise.
+"""
+
+from typing import Any
+
+from xer_parser.scheduling.calendar import to_datetime
+from xer_parser.scheduling.loading import ResourceLoading, _as_float
+
+__all__ = ["find_overallocations"]
+
+# Event kinds, in the order they are applied at the same instant
+_LIMIT, _FINISH, _START = 0, 1, 2
+
+
+def find_overallocations(
+    programme: Any, quantity: str = "remaining", tolerance: float = 1e-6
+) -> dict[int, dict[str, Any]]:
+    """
+    Find the periods in which resources are over-allocated.
+
+    The load of an assignment is its ``remain_qty_per_hr`` between its
+    remaining dates (``target_qty_per_hr`` between its planned dates for
+    ``quantity="target"``), or its units divided by the working hours of
+    that window when the rate is missing. The limit of a resource is the
+    ``max_qty_per_hr`` of its latest RSRCRATE record whose ``start_date`` is
+    not after the time considered; resources without rates are not checked.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activityresources``,
+        ``activities`` and ``resourcerates`` collections) to check
+    quantity : str, optional
+        ``remaining`` (default) or ``target``
+    tolerance : float, optional
+        Load above the limit that is ignored, by default 1e-6
+
+    Returns
+    -------
+    dict[int, dict[str, Any]]
+        For every over-allocated ``rsrc_id``, its ``peak`` load, the
+        ``peak_date`` at which it is first reached and the over-allocated
+        ``intervals``, each with its ``start``, ``end``, ``peak`` load and the
+        ``limit`` in force at the peak
+
+    Raises
+    ------
+    ValueError
+        If ``quantity`` is not supported
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.overallocation import find_overallocations
+    >>> for rsrc_id, found in find_overallocations(xer).items():
+    ...     print(rsrc_id, found["peak"], len(found["intervals"]))
+    """
+    if quantity not in ("remaining", "target"):
+        raise ValueError(f"Unknown quantity {quantity!r}, use 'remaining' or 'target'")
+    loading = ResourceLoading(programme)
+    events: dict[int, list[tuple[int, int, float]]] = {}
+    for rate in programme.resourcerates.resourcerates:
+        if rate.rsrc_id is None or rate.max_qty_per_hr is None:
+            continue
+        start = loading.to_minutes(rate.start_date)
+        events.setdefault(int(rate.rsrc_id), []).append(
+            (start if start is not None else -1, _LIMIT, float(rate.max_qty_per_hr))
+        )
+    field = "remain_qty_per_hr" if quantity == "remaining" else "target_qty_per_hr"
+    for assignment in programme.activityresources.assignments:
+        resource_events = events.get(assignment.rsrc_id)
+        if resource_events is None:
+            continue
+        start, finish, qty, _ = loading.window(assignment, quantity)
+        start, finish = loading.to_minutes(start), loading.to_minutes(finish)
+        if start is None or finish is None or finish <= start:
+            continue
+        rate = _as_float(getattr(assignment, field))
+        if not rate and qty:
+            calendar = loading.calendar(assignment.task_id)
+            work = calendar.work_minutes_between(start, finish)
+            rate = qty * 60 / work if work else 0.0
+        if rate:
+            resource_events.append((start, _START, rate))
+            resource_events.append((finish, _FINISH, rate))
+
+    result = {}
+    for rsrc_id, resource_events in events.items():
+        found = _sweep(resource_events, tolerance)
+        if found is not None:
+            result[rsrc_id] = found
+    return result
+
+
+def _sweep(events: list[tuple[int, int, float]], tolerance: float) -> dict | None:
+    """
+    Sweep through the events of one resource.
+
+    Parameters
+    ----------
+    events : list[tuple[int, int, float]]
+        ``(time, kind, value)`` events: limit changes, assignment finishes
+        and assignment starts
+    tolerance : float
+        Load above the limit that is ignored
+
+    Returns
+    -------
+    dict or None
+        The peak load and the over-allocated intervals, None if the resource
+        is never over-allocated
+    """
+    events.sort()
+    limit = float("inf")
+    load = 0.0
+    peak, peak_time = 0.0, None
+    intervals = []
+    current = None
+    i, n = 0, len(events)
+    while i < n:
+        time = events[i][0]
+        # apply every event of this instant before looking at the load
+        while i < n and events[i][0] == time:
+            _, kind, value = events[i]
+            if kind == _LIMIT:
+                limit = value
+            elif kind == _START:
+                load += value
+            else:
+                load -= value
+            i += 1
+        if load > peak + tolerance:
+            peak, peak_time = load, time
+        if load > limit + tolerance:
+            if current is None:
+                current = {"start": time, "end": None, "peak": load, "limit": limit}
+                intervals.append(current)
+            elif load > current["peak"]:
+                current["peak"], current["limit"] = load, limit
+        elif current is not None:
+            current["end"] = time
+            current = None
+    if not intervals:
+        return None
+    for interval in intervals:
+        interval["start"] = to_datetime(interval["start"])
+        interval["end"] = to_datetime(interval["end"])
+    return {"peak": peak, "peak_date": to_datetime(peak_time), "intervals": intervals}
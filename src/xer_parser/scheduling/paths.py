@@ -0,0 +1,284 @@
+"""Driving path, longest path and multiple float path tracing.
+
+A relationship is driving when its relationship free float is zero, i.e. the
+successor could not start (or finish) any earlier without moving the
+predecessor. Walking driving relationships backward from an activity gives
+its driving path; walking them back from the activities that finish a project
+gives the longest path. Every walk uses the adjacency lists of the scheduled
+``LogicNetwork`` and visits each node and relationship at most once.
+"""
+
+import heapq
+from typing import Any
+
+from xer_parser.scheduling.cpm import _COMPLETE, CPMScheduler
+
+__all__ = ["PathTracer"]
+
+
+class PathTracer:
+    """
+    Trace driving and float paths through a scheduled network.
+
+    Parameters
+    ----------
+    scheduler : CPMScheduler
+        The scheduler whose results are traced; it is scheduled first if it
+        has not been yet
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling import CPMScheduler
+    >>> from xer_parser.scheduling.paths import PathTracer
+    >>> tracer = PathTracer(CPMScheduler(xer))
+    >>> critical = tracer.longest_path()
+    >>> paths = tracer.float_paths(max_paths=5)
+    """
+
+    def __init__(self, scheduler: CPMScheduler) -> None:
+        if not scheduler.es:
+            scheduler.schedule()
+        self.scheduler = scheduler
+        self.network = scheduler.network
+
+    def finish_nodes(self, proj_id: Any = None) -> list[int]:
+        """
+        Get the activities that set the finish date of a project.
+
+        Parameters
+        ----------
+        proj_id : Any, optional
+            The project; by default the activities finishing every project
+
+        Returns
+        -------
+        list[int]
+            Node numbers of the driving activities whose early finish equals
+            their project's finish
+        """
+        cpm = self.scheduler
+        finish = cpm.project_finish
+        return [
+            i
+            for i in range(self.network.node_count)
+            if cpm.drives[i]
+            and cpm.ef[i] == finish[cpm.proj[i]]
+            and (proj_id is None or cpm.proj[i] == proj_id)
+        ]
+
+    def driving_predecessors(self, node: int) -> list[int]:
+        """
+        Get the driving relationships entering a node.
+
+        Parameters
+        ----------
+        node : int
+            Node number
+
+        Returns
+        -------
+        list[int]
+            Relationship numbers with zero relationship free float
+        """
+        free = self.scheduler.rel_free_float
+        return [k for k in self.network.pred_rels[node] if free[k] == 0]
+
+    def driving_path(
+        self, task_id: int | None = None, proj_id: Any = None
+    ) -> list[int]:
+        """
+        Trace the driving path back from an activity.
+
+        Parameters
+        ----------
+        task_id : int, optional
+            The target activity; by default the activities that finish the
+            project, which gives the longest path
+        proj_id : Any, optional
+            Restricts the default targets to one project
+
+        Returns
+        -------
+        list[int]
+            ``task_id`` of every activity on the path, by early start
+
+        Raises
+        ------
+        KeyError
+            If ``task_id`` is not part of the network
+        """
+        if task_id is None:
+            targets = self.finish_nodes(proj_id)
+        else:
+            node = self.network.pos.get(task_id)
+            if node is None:
+                raise KeyError(f"task_id {task_id} is not part of the network")
+            targets = [node]
+        nodes = self._trace(targets, set())
+        return [self.network.task_ids[i] for i in self._ordered(nodes)]
+
+    def longest_path(self, proj_id: Any = None) -> list[int]:
+        """
+        Trace the longest path of a project.
+
+        Parameters
+        ----------
+        proj_id : Any, optional
+            The project; by default every project of the network
+
+        Returns
+        -------
+        list[int]
+            ``task_id`` of every activity on the longest path, by early start
+        """
+        return self.driving_path(proj_id=proj_id)
+
+    def float_paths(
+        self,
+        task_id: int | None = None,
+        proj_id: Any = None,
+        max_paths: int = 10,
+    ) -> dict[int, tuple[int, int]]:
+        """
+        Group activities into float paths, like P6's multiple float paths.
+
+        Path 1 is the driving path to the target. Each following path starts
+        from the unassigned activity that feeds an already assigned one with
+        the lowest total float (ties broken by relationship free float) and
+        follows its own driving predecessors back, skipping activities that
+        already belong to a path. Completed and non-driving activities are
+        not assigned.
+
+        Parameters
+        ----------
+        task_id : int, optional
+            The target activity; by default the activities that finish the
+            project
+        proj_id : Any, optional
+            Restricts the default targets to one project
+        max_paths : int, optional
+            Number of paths to trace, by default 10
+
+        Returns
+        -------
+        dict[int, tuple[int, int]]
+            Mapping of ``task_id`` to ``(float_path, float_path_order)``,
+            both numbered from 1
+
+        Raises
+        ------
+        KeyError
+            If ``task_id`` is not part of the network
+        """
+        cpm, net = self.scheduler, self.network
+        if task_id is None:
+            targets = self.finish_nodes(proj_id)
+        else:
+            node = net.pos.get(task_id)
+            if node is None:
+                raise KeyError(f"task_id {task_id} is not part of the network")
+            targets = [node]
+        assigned: set[int] = set()
+        candidates: list[tuple[int, int, int, int]] = []
+        result: dict[int, tuple[int, int]] = {}
+        path = 0
+        while targets and path < max_paths:
+            path += 1
+            nodes = self._trace(targets, assigned)
+            for order, i in enumerate(self._ordered(nodes), 1):
+                result[net.task_ids[i]] = (path, order)
+            assigned.update(nodes)
+            for j in nodes:
+                for k in net.pred_rels[j]:
+                    i = net.rel_pred[k]
+                    if i in assigned or cpm.rel_free_float[k] is None:
+                        continue
+                    heapq.heappush(
+                        candidates,
+                        (cpm.total_float[i], cpm.rel_free_float[k], cpm.ef[i], i),
+                    )
+            targets = []
+            while candidates:
+                i = heapq.heappop(candidates)[3]
+                if i not in assigned:
+                    targets = [i]
+                    break
+        return result
+
+    def apply(self, max_paths: int = 10) -> None:
+        """
+        Write the float paths and the longest path flag onto the Task objects.
+
+        Sets ``int_path`` and ``int_path_order`` (written to the
+        ``float_path`` and ``float_path_order`` columns) and
+        ``driving_path_flag``.
+
+        Parameters
+        ----------
+        max_paths : int, optional
+            Number of float paths to trace, by default 10
+
+        Returns
+        -------
+        None
+        """
+        paths = self.float_paths(max_paths=max_paths)
+        longest = set(self.longest_path())
+        for task in self.network.tasks:
+            path = paths.get(task.task_id)
+            task.int_path = None if path is None else str(path[0])
+            task.int_path_order = None if path is None else str(path[1])
+            task.driving_path_flag = "Y" if task.task_id in longest else "N"
+
+    def _trace(self, targets: list[int], skip: set[int]) -> set[int]:
+        """
+        Collect the nodes reached backward over driving relationships.
+
+        Parameters
+        ----------
+        targets : list[int]
+            Nodes to start from
+        skip : set[int]
+            Nodes that are neither collected nor walked through
+
+        Returns
+        -------
+        set[int]
+            The targets and their driving predecessors
+        """
+        net, free, state = (
+            self.network,
+            self.scheduler.rel_free_float,
+            self.scheduler.state,
+        )
+        rel_pred, pred_rels = net.rel_pred, net.pred_rels
+        found = {i for i in targets if i not in skip and state[i] != _COMPLETE}
+        stack = list(found)
+        while stack:
+            j = stack.pop()
+            for k in pred_rels[j]:
+                if free[k] != 0:
+                    continue
+                i = rel_pred[k]
+                if i not in found and i not in skip:
+                    found.add(i)
+                    stack.append(i)
+        return found
+
+    def _ordered(self, nodes: set[int]) -> list[int]:
+        """
+        Sort nodes by early start, early finish and topological position.
+
+        Parameters
+        ----------
+        nodes : set[int]
+            Node numbers
+
+        Returns
+        -------
+        list[int]
+            The sorted node numbers
+        """
+        es, ef = self.scheduler.es, self.scheduler.ef
+        position = self.network.topological_positions()
+        return sorted(nodes, key=lambda i: (es[i], ef[i], position[i]))
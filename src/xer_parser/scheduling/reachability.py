@@ -0,0 +1,392 @@
+"""Reachability queries between activities.
+
+Impact analysis keeps asking the same two questions: is one activity
+upstream of another, and what lies downstream (or upstream) of an activity.
+``Reachability`` answers them over the adjacency lists of a
+``LogicNetwork`` with a breadth-first search whose visited set is a byte
+per node, caches those visited sets as the answers, and can precompute
+interval labels that rule out most negative ``is_ancestor`` queries without
+walking the network at all.
+"""
+
+import random
+from collections import OrderedDict
+from itertools import compress
+from typing import Any
+
+from xer_parser.scheduling.network import LogicNetwork, _gc_paused
+
+__all__ = ["Reachability"]
+
+
+class Reachability:
+    """
+    Answer upstream and downstream queries on an activity network.
+
+    ``downstream`` and ``upstream`` walk the network once per activity and
+    keep the most recent answers. ``is_ancestor`` uses a cached answer when
+    there is one; otherwise it searches forward from the first activity,
+    skipping every activity that comes after the second one in topological
+    order. After ``build_index`` it also skips every activity whose interval
+    labels show it cannot reach the target.
+
+    The caches and the index are dropped automatically when relationships
+    are added to or removed from the network.
+
+    Parameters
+    ----------
+    network : LogicNetwork or Reader
+        The network to query, or a Reader object (or any object exposing
+        ``activities`` and ``relations`` collections) to build it from
+    cache_size : int, optional
+        Number of ``downstream`` and ``upstream`` answers kept, by default
+        256; each answer takes a byte per activity of the network
+
+    Examples
+    --------
+    >>> from xer_parser.scheduling.reachability import Reachability
+    >>> reach = Reachability(xer)
+    >>> reach.is_ancestor(1001, 1050)
+    True
+    >>> impacted = reach.downstream(1001)
+    """
+
+    def __init__(self, network: Any, cache_size: int = 256) -> None:
+        if not isinstance(network, LogicNetwork):
+            network = LogicNetwork(
+                network.activities.activities, network.relations.relations
+            )
+        self.network = network
+        self.cache_size = cache_size
+        self._revision = network.revision
+        self._cache: OrderedDict[tuple[bool, int], bytearray] = OrderedDict()
+        self._labels: list[tuple[list[int], list[int]]] = []
+        self._children: list[list[int]] | None = None
+
+    def downstream(self, task_id: int) -> set[int]:
+        """
+        Get every activity that directly or indirectly succeeds an activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+
+        Returns
+        -------
+        set[int]
+            ``task_id`` of the successors, not including the activity itself
+            unless it is part of a loop
+
+        Raises
+        ------
+        KeyError
+            If ``task_id`` is not part of the network
+        """
+        reached = self._reach(self._node(task_id), True)
+        return set(compress(self.network.task_ids, reached))
+
+    def upstream(self, task_id: int) -> set[int]:
+        """
+        Get every activity that directly or indirectly precedes an activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+
+        Returns
+        -------
+        set[int]
+            ``task_id`` of the predecessors, not including the activity
+            itself unless it is part of a loop
+
+        Raises
+        ------
+        KeyError
+            If ``task_id`` is not part of the network
+        """
+        reached = self._reach(self._node(task_id), False)
+        return set(compress(self.network.task_ids, reached))
+
+    def is_ancestor(self, task_id: int, other_id: int) -> bool:
+        """
+        Check whether an activity is upstream of another one.
+
+        Parameters
+        ----------
+        task_id : int
+            The possible predecessor
+        other_id : int
+            The possible successor
+
+        Returns
+        -------
+        bool
+            True if a chain of relationships leads from ``task_id`` to
+            ``other_id``
+
+        Raises
+        ------
+        KeyError
+            If either activity is not part of the network
+        """
+        source, target = self._node(task_id), self._node(other_id)
+        reached = self._cache.get((True, source))
+        if reached is not None:
+            return bool(reached[target])
+        reached = self._cache.get((False, target))
+        if reached is not None:
+            return bool(reached[source])
+        return self._search(source, target)
+
+    def build_index(self, labels: int = 2, seed: int = 0) -> None:
+        """
+        Precompute interval labels for repeated ``is_ancestor`` queries.
+
+        Every labeling numbers the activities in the post-order of a
+        depth-first traversal (visiting successors in a random order) and
+        gives each one the interval from the lowest number among its
+        successors to its own. An activity can only reach another one if its
+        interval contains the other's in every labeling, so most negative
+        queries are answered in O(``labels``). Building the index is
+        O(``labels`` x (N + M)).
+
+        Parameters
+        ----------
+        labels : int, optional
+            Number of labelings, by default 2
+        seed : int, optional
+            Seed of the traversal orders, by default 0
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the network contains circular logic
+        """
+        self._refresh()
+        net = self.network
+        net.topological_order()
+        children = self._adjacency()
+        roots = [i for i in range(net.node_count) if not net.pred_rels[i]]
+        rng = random.Random(seed)
+        with _gc_paused():
+            self._labels = [self._label(children, roots, rng) for _ in range(labels)]
+
+    def _label(
+        self, children: list[list[int]], roots: list[int], rng: random.Random
+    ) -> tuple[list[int], list[int]]:
+        """
+        Compute one interval labeling.
+
+        Parameters
+        ----------
+        children : list[list[int]]
+            Successor nodes of every node
+        roots : list[int]
+            Nodes without predecessors
+        rng : random.Random
+            Source of the traversal order
+
+        Returns
+        -------
+        tuple[list[int], list[int]]
+            Lowest post-order number reachable from every node and the
+            post-order number of every node
+        """
+        n = len(children)
+        low, post = [0] * n, [0] * n
+        seen = bytearray(n)
+        rank = 0
+        for root in rng.sample(roots, len(roots)):
+            seen[root] = 1
+            work = [(root, iter(rng.sample(children[root], len(children[root]))))]
+            while work:
+                node, successors = work[-1]
+                for succ in successors:
+                    if not seen[succ]:
+                        seen[succ] = 1
+                        order = rng.sample(children[succ], len(children[succ]))
+                        work.append((succ, iter(order)))
+                        break
+                else:
+                    work.pop()
+                    post[node] = rank
+                    low[node] = min([rank] + [low[x] for x in children[node]])
+                    rank += 1
+        return low, post
+
+    def clear(self) -> None:
+        """
+        Drop the cached answers and the index.
+
+        Returns
+        -------
+        None
+        """
+        self._cache.clear()
+        self._labels = []
+        self._children = None
+        self._revision = self.network.revision
+
+    def _node(self, task_id: int) -> int:
+        """
+        Get the node number of an activity.
+
+        Parameters
+        ----------
+        task_id : int
+            The activity
+
+        Returns
+        -------
+        int
+            Node number in ``network``
+
+        Raises
+        ------
+        KeyError
+            If the activity is not part of the network
+        """
+        self._refresh()
+        node = self.network.pos.get(task_id)
+        if node is None:
+            raise KeyError(f"task_id {task_id} is not part of the network")
+        return node
+
+    def _adjacency(self) -> list[list[int]]:
+        """
+        Get the successor nodes of every node.
+
+        The lists are built once and sorted by topological position when the
+        network has no loops.
+
+        Returns
+        -------
+        list[list[int]]
+            Successor node numbers of every node
+        """
+        if self._children is None:
+            net = self.network
+            rel_succ = net.rel_succ
+            try:
+                position = net.topological_positions()
+            except ValueError:
+                position = None
+            with _gc_paused():
+                children = [[rel_succ[k] for k in x] for x in net.succ_rels]
+                if position is not None:
+                    for x in children:
+                        x.sort(key=position.__getitem__)
+            self._children = children
+        return self._children
+
+    def _refresh(self) -> None:
+        """
+        Drop the caches if the network changed since they were filled.
+
+        Returns
+        -------
+        None
+        """
+        if self.network.revision != self._revision:
+            self.clear()
+
+    def _reach(self, node: int, forward: bool) -> bytearray:
+        """
+        Walk the network breadth first from a node.
+
+        Parameters
+        ----------
+        node : int
+            Node number
+        forward : bool
+            Follow successors if True, predecessors otherwise
+
+        Returns
+        -------
+        bytearray
+            1 for every node reached, 0 for the others
+        """
+        key = (forward, node)
+        cache = self._cache
+        reached = cache.get(key)
+        if reached is not None:
+            cache.move_to_end(key)
+            return reached
+        net = self.network
+        rels, ends = (
+            (net.succ_rels, net.rel_succ) if forward else (net.pred_rels, net.rel_pred)
+        )
+        reached = bytearray(net.node_count)
+        frontier = [node]
+        while frontier:
+            level = []
+            for i in frontier:
+                for k in rels[i]:
+                    j = ends[k]
+                    if not reached[j]:
+                        reached[j] = 1
+                        level.append(j)
+            frontier = level
+        cache[key] = reached
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return reached
+
+    def _search(self, source: int, target: int) -> bool:
+        """
+        Search forward from ``source`` for ``target``, pruning where possible.
+
+        Successors placed after the target in topological order, and with an
+        index the ones whose labels do not contain the target's, are not
+        walked. Successors are tried latest in topological order first, so
+        the search heads for the target.
+
+        Parameters
+        ----------
+        source : int
+            Node number to start from
+        target : int
+            Node number looked for
+
+        Returns
+        -------
+        bool
+            True if ``target`` is reachable from ``source``
+        """
+        net = self.network
+        try:
+            position = net.topological_positions()
+        except ValueError:
+            position = None
+        limit = net.node_count if position is None else position[target]
+        if position is not None and position[source] >= limit:
+            return False
+        bounds = [(low, post, low[target], post[target]) for low, post in self._labels]
+        for low, post, lower, upper in bounds:
+            if low[source] > lower or post[source] < upper:
+                return False
+        children = self._adjacency()
+        seen = bytearray(net.node_count)
+        seen[source] = 1
+        stack = [source]
+        while stack:
+            for j in children[stack.pop()]:
+                if j == target:
+                    return True
+                if seen[j]:
+                    continue
+                seen[j] = 1
+                if position is not None and position[j] > limit:
+                    continue
+                for low, post, lower, upper in bounds:
+                    if low[j] > lower or post[j] < upper:
+                        break
+                else:
+                    stack.append(j)
+        return False
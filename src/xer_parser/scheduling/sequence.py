@@ -0,0 +1,133 @@
+"""Out-of-sequence progress detection.
+
+Progress is out of sequence when a successor has actual dates its
+relationship with a predecessor does not allow yet: it started before its
+finish-to-start predecessor finished, for example. Each relationship is
+joined with the actual dates of both of its activities through a dict of the
+activities, then the checks run column by column over the relationships
+whose successor has progressed, the only ones that can be out of sequence.
+Lags are added on the successor's calendar, and only for relationships
+whose predecessor has reached the date they are measured from, so the
+calendar arithmetic is limited to the few candidate violations.
+"""
+
+from typing import Any
+
+from xer_parser.scheduling.calendar import get_calendar, to_minutes
+
+__all__ = ["find_out_of_sequence"]
+
+# Per relationship type: the predecessor date the lag runs from and the
+# successor date it constrains
+_DATES = {
+    "PR_FS": ("act_end_date", "act_start_date"),
+    "PR_SS": ("act_start_date", "act_start_date"),
+    "PR_FF": ("act_end_date", "act_end_date"),
+    "PR_SF": ("act_start_date", "act_end_date"),
+}
+
+
+def find_out_of_sequence(
+    programme: Any,
+    tasks: dict[Any, Any] | None = None,
+    relations: list[Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Find the relationships violated by actual progress.
+
+    A relationship is violated when its successor has the actual date the
+    relationship constrains (the start for FS and SS, the finish for FF and
+    SF) and either its predecessor does not have the actual date the lag
+    runs from (the finish for FS and FF, the start for SS and SF), an
+    ``open`` violation, or the successor's date is earlier than that date
+    plus the lag, an ``early`` violation.
+
+    Parameters
+    ----------
+    programme : Reader
+        The Reader object (or any object exposing ``activities`` and
+        ``relations``) to check
+    tasks : dict[int, Task], optional
+        The activities of the programme by ``task_id``, if already built
+    relations : list[TaskPred], optional
+        The relationships of the programme, if already collected
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        For every violated relationship, in the order of the relationships,
+        its ``task_pred_id``, ``pred_task_id``, ``task_id``, ``pred_type``
+        and ``lag_hr_cnt``, the ``violation`` (``open`` or ``early``) and,
+        for early violations, ``early_hr``: the working hours by which the
+        successor is early
+
+    Examples
+    --------
+    >>> from collections import Counter
+    >>> from xer_parser.scheduling.sequence import find_out_of_sequence
+    >>> found = find_out_of_sequence(xer)
+    >>> Counter((x["pred_type"], x["violation"]) for x in found)
+    """
+    if tasks is None:
+        tasks = {x.task_id: x for x in programme.activities.activities}
+    if relations is None:
+        relations = programme.relations.relations
+    succs = [tasks.get(x.task_id) for x in relations]
+    # only successors with progress can be out of sequence
+    rows = [
+        i
+        for i, succ in enumerate(succs)
+        if succ is not None and succ.act_start_date is not None
+    ]
+    types = [relations[i].pred_type for i in rows]
+    succ_dates = [
+        getattr(succs[i], _DATES.get(kind, _DATES["PR_FS"])[1])
+        for i, kind in zip(rows, types, strict=True)
+    ]
+    # the successor dates every relationship type constrains
+    keep = [k for k, date in enumerate(succ_dates) if date is not None]
+    rows, types, succ_dates = (
+        [rows[k] for k in keep],
+        [types[k] for k in keep],
+        [succ_dates[k] for k in keep],
+    )
+    preds = [tasks.get(relations[i].pred_task_id) for i in rows]
+    pred_dates = [
+        None if pred is None else getattr(pred, _DATES.get(kind, _DATES["PR_FS"])[0])
+        for pred, kind in zip(preds, types, strict=True)
+    ]
+
+    found = []
+    for i, pred, pred_date, succ_date in zip(
+        rows, preds, pred_dates, succ_dates, strict=True
+    ):
+        if pred is None:
+            continue
+        relation = relations[i]
+        if pred_date is None:
+            found.append(_violation(relation, "open", None))
+            continue
+        lag = relation.lag_hr_cnt or 0.0
+        if not lag and succ_date >= pred_date:
+            continue
+        calendar = get_calendar(succs[i].calendar)
+        allowed = to_minutes(pred_date)
+        if lag:
+            allowed = calendar.add_work_minutes(allowed, round(lag * 60))
+        early = calendar.work_minutes_between(to_minutes(succ_date), allowed)
+        # earlier only by non-working time is not out of sequence
+        if early > 0:
+            found.append(_violation(relation, "early", early / 60.0))
+    return found
+
+
+def _violation(relation: Any, kind: str, early: float | None) -> dict[str, Any]:
+    return {
+        "task_pred_id": relation.task_pred_id,
+        "pred_task_id": relation.pred_task_id,
+        "task_id": relation.task_id,
+        "pred_type": relation.pred_type,
+        "lag_hr_cnt": relation.lag_hr_cnt,
+        "violation": kind,
+        "early_hr": early,
+    }
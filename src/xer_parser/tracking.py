@@ -0,0 +1,245 @@
+"""
+Change tracking of the records of a parsed XER file.
+
+A ``Reader`` created with ``track_changes=True`` keeps the byte span of the
+header, the table headers and every record of its file in a ``SourceSpans``,
+and marks its records clean. A clean record is an instance of a subclass of
+its own class whose ``__setattr__`` turns it back into an instance of the
+original class before setting the field, so a record is dirty from its first
+change on, and neither reading fields nor changing a record again costs
+anything extra.
+
+``writeXER`` copies the bytes of the clean records and of the table headers
+of such a Reader from the source file, coalescing adjacent spans into one
+copy, and formats only the dirty and added records: writing an update costs
+time in proportion to the change rather than to the file.
+"""
+
+import copyreg
+import csv
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+__all__ = ["SourceSpans", "is_dirty", "source_span", "track"]
+
+# Tracking subclass of every record class, and the other way round
+_TRACKED: dict[type, type] = {}
+_ORIGINAL: dict[type, type] = {}
+
+
+def _tracked_class(cls: type) -> type:
+    tracked = _TRACKED.get(cls)
+    if tracked is not None:
+        return tracked
+
+    def _setattr(self: Any, name: str, value: Any) -> None:
+        object.__setattr__(self, "__class__", cls)
+        setattr(self, name, value)
+
+    def _delattr(self: Any, name: str) -> None:
+        object.__setattr__(self, "__class__", cls)
+        delattr(self, name)
+
+    def _reduce_ex(self: Any, protocol: Any) -> tuple:
+        # copies and pickles are plain, hence dirty, records
+        state = dict(self.__dict__)
+        del state["_xer_span"]
+        return copyreg.__newobj__, (cls,), state
+
+    tracked = type(
+        cls.__name__,
+        (cls,),
+        {
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+            "__setattr__": _setattr,
+            "__delattr__": _delattr,
+            "__reduce_ex__": _reduce_ex,
+        },
+    )
+    _TRACKED[cls] = tracked
+    _ORIGINAL[tracked] = cls
+    return tracked
+
+
+def track(record: Any, source: "SourceSpans", span: tuple[int, int]) -> None:
+    """
+    Mark a record clean, with the byte span of its row in the source file.
+
+    Parameters
+    ----------
+    record : Any
+        The record
+    source : SourceSpans
+        The spans of the file the record was read from
+    span : tuple[int, int]
+        Start and end offsets of the row, line end included
+
+    Returns
+    -------
+    None
+    """
+    cls = _ORIGINAL.get(type(record), type(record))
+    object.__setattr__(record, "_xer_span", (source, *span))
+    object.__setattr__(record, "__class__", _tracked_class(cls))
+
+
+def source_span(
+    record: Any, source: "SourceSpans", clean: bool = True
+) -> tuple[int, int] | None:
+    """
+    Get the byte span of the row a record was read from.
+
+    Parameters
+    ----------
+    record : Any
+        The record
+    source : SourceSpans
+        The spans of the file
+    clean : bool, optional
+        Only if the record was not changed since, by default True
+
+    Returns
+    -------
+    tuple[int, int] or None
+        Start and end offsets of its row, None if the record was not read
+        from that file (or was changed)
+    """
+    if clean and type(record) not in _ORIGINAL:
+        return None
+    span = record.__dict__.get("_xer_span")
+    if span is None or span[0] is not source:
+        return None
+    return span[1], span[2]
+
+
+def is_dirty(record: Any) -> bool:
+    """
+    Check whether a record has to be formatted again when written.
+
+    Parameters
+    ----------
+    record : Any
+        The record
+
+    Returns
+    -------
+    bool
+        True if a field of the record was set or deleted since it was read,
+        or if it was not read from a file with ``track_changes``
+    """
+    return type(record) not in _ORIGINAL
+
+
+class SourceSpans:
+    """
+    Byte spans of the rows of a parsed XER file.
+
+    Parameters
+    ----------
+    path : str
+        The XER file
+
+    Attributes
+    ----------
+    path : str
+        The XER file
+    header : tuple[int, int] or None
+        Span of the ``ERMHDR`` line
+    end : tuple[int, int] or None
+        Span of the ``%E`` line
+    tables : dict[str, tuple[int, int]]
+        Span of the ``%T`` and ``%F`` lines of every table
+    fields : dict[str, list[str]]
+        Field names of every table
+    rows : dict[str, list[tuple[int, int]]]
+        Span of every ``%R`` line of every table, until the records are
+        tracked with ``attach``
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        stat = os.stat(path)
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+        self.header: tuple[int, int] | None = None
+        self.end: tuple[int, int] | None = None
+        self.tables: dict[str, tuple[int, int]] = {}
+        self.fields: dict[str, list[str]] = {}
+        self.rows: dict[str, list[tuple[int, int]]] = {}
+
+    def read(self) -> Iterator[list[str]]:
+        """
+        Parse the rows of the file, recording the span of each.
+
+        Yields
+        ------
+        list[str]
+            The fields of every row, as ``csv.reader`` parses them
+        """
+        offsets = [0, 0]
+
+        def lines() -> Iterator[str]:
+            with open(self.path, "rb") as source:
+                for line in source:
+                    offsets[1] += len(line)
+                    yield line.decode("utf-8", errors="ignore")
+
+        table = table_start = None
+        for row in csv.reader(lines(), delimiter="\t"):
+            span = (offsets[0], offsets[1])
+            offsets[0] = offsets[1]
+            kind = row[0] if row else None
+            if kind == "%R" and table is not None:
+                self.rows[table].append(span)
+            elif kind == "%T":
+                table = row[1].strip()
+                table_start = span[0]
+                self.rows.setdefault(table, [])
+            elif kind == "%F" and table is not None:
+                self.tables[table] = (table_start, span[1])
+                self.fields[table] = [x.strip() for x in row[1:]]
+            elif kind == "ERMHDR":
+                self.header = span
+            elif kind == "%E":
+                self.end = span
+            yield row
+
+    def attach(self, table: str, records: Iterable[Any]) -> bool:
+        """
+        Track the records read from a table.
+
+        Parameters
+        ----------
+        table : str
+            The table, such as ``TASK``
+        records : Iterable[Any]
+            Its records, in the order of the file
+
+        Returns
+        -------
+        bool
+            False, tracking nothing, if there are not as many records as rows
+        """
+        spans = self.rows.pop(table, [])
+        records = list(records)
+        if len(records) != len(spans):
+            return False
+        for record, span in zip(records, spans, strict=True):
+            track(record, self, span)
+        return True
+
+    def unchanged(self) -> bool:
+        """
+        Check that the file has not changed since it was read.
+
+        Returns
+        -------
+        bool
+            True if the file still has the same size and modification time
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._stamp
@@ -2,13 +2,178 @@
 
 This module provides functionality to write data from the Reader
 object back to an XER file in the Primavera P6 format.
+
+The file is streamed: every collection yields its rows one at a time
+(``iter_tsv``), its dates, numbers and flags are formatted as P6 writes them
+(see ``xer_parser.formatting``) and it is written by ``csv.writer`` and
+encoded into a buffered binary file as soon as it is produced, so writing
+needs no memory beyond the buffers, whatever the size of the programme.
+
+The unchanged rows of a Reader created with ``track_changes`` are copied
+from its file instead (see ``xer_parser.tracking``).
 """
 
 import csv
-from typing import Any
+import io
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import islice
+from typing import Any, BinaryIO
+
+from xer_parser.formatting import RowFormatter
+from xer_parser.tracking import SourceSpans, source_span
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["XER_TABLES", "iter_rows", "writeXER", "write_rows"]
+
+# Tables written, in order, with the collection of the Reader holding their
+# records and the list property of the collection
+XER_TABLES = (
+    ("CURRTYPE", "currencies", "currencies"),
+    ("FINTMPL", "fintmpls", "fintmpls"),
+    ("NONWORK", "nonworks", "nonworks"),
+    ("OBS", "obss", "obss"),
+    ("PCATTYPE", "pcattypes", "pcattypes"),
+    ("RSRCCURVDATA", "resourcecurves", "resourcecurves"),
+    ("UDFTYPE", "udftypes", "udftypes"),
+    ("ACCOUNT", "accounts", "accounts"),
+    ("PCATVAL", "pcatvals", "pcatvals"),
+    ("PROJECT", "projects", "projects"),
+    ("CALENDAR", "calendars", "calendars"),
+    ("PROJPCAT", "projpcats", "projcats"),
+    ("SCHEDOPTIONS", "scheduleoptions", "schedoptions"),
+    ("PROJWBS", "wbss", "wbss"),
+    ("RSRC", "resources", "resources"),
+    ("ACTVTYPE", "acttypes", "acttypes"),
+    ("RSRCRATE", "resourcerates", "resourcerates"),
+    ("TASK", "activities", "activities"),
+    ("ACTVCODE", "actvcodes", "activitycodes"),
+    # PROJCOST
+    ("TASKPRED", "relations", "relations"),
+    ("TASKPROC", "taskprocs", "taskprocs"),
+    ("TASKRSRC", "activityresources", "assignments"),
+    ("TASKACTV", "activitycodes", "taskactvs"),
+    ("UDFVALUE", "udfvalues", "udfvalues"),
+)
+
+_HEADER = [
+    "ERMHDR",
+    "8.0",
+    "2021-11-02",
+    "Project",
+    "admin",
+    "Primavera",
+    "Admin",
+    "dbxDatabaseNoName",
+    "Project Management",
+    "U.K.",
+]
+
+
+def iter_rows(
+    r: Any, records: Mapping[str, list[Any]] | None = None
+) -> Iterator[list[Any]]:
+    """
+    Yield the rows of the XER file of a Reader, one at a time.
+
+    Parameters
+    ----------
+    r : Reader
+        The Reader object containing the parsed XER data
+    records : Mapping[str, list[Any]], optional
+        The records to write by table, such as ``{"TASK": [...]}``, instead
+        of every record of the Reader; tables missing from it are left out
+
+    Yields
+    ------
+    list[Any]
+        The ``ERMHDR`` header row, the ``%T``, ``%F`` and ``%R`` rows of
+        every table, then the ``%E`` end row
+    """
+    yield _HEADER
+    for table, collection, _ in XER_TABLES:
+        collection = getattr(r, collection)
+        if records is None:
+            yield from collection.iter_tsv()
+            continue
+        rows = records.get(table)
+        if rows:
+            yield from islice(collection.iter_tsv(), 2)
+            for record in rows:
+                yield record.get_tsv()
+    yield ["%E"]
+
+
+def write_rows(
+    output: BinaryIO, rows: Iterable[list[Any]], formatted: bool = True
+) -> None:
+    """
+    Write rows as tab separated lines to a binary file.
+
+    The rows are formatted and encoded as they come, through a text layer
+    over ``output`` that is detached again afterwards. The dates, numbers and
+    flags of every ``%R`` row are formatted as P6 writes them, following the
+    field names of the last ``%F`` row.
+
+    Parameters
+    ----------
+    output : BinaryIO
+        The file, preferably buffered
+    rows : Iterable[list[Any]]
+        The rows to write
+    formatted : bool, optional
+        Format the dates, numbers and flags of the rows, by default True;
+        rows of text only are written as they are without
+
+    Returns
+    -------
+    None
+    """
+    text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    try:
+        if formatted:
+            rows = _formatted(rows)
+        csv.writer(text, delimiter="\t").writerows(rows)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def _formatted(rows: Iterable[list[Any]]) -> Iterator[list[Any]]:
+    """
+    Format the ``%R`` rows of tables with a ``RowFormatter`` per table.
+
+    Parameters
+    ----------
+    rows : Iterable[list[Any]]
+        The rows of a file
+
+    Yields
+    ------
+    list[Any]
+        The rows, records formatted
+    """
+    formatter = None
+    for row in rows:
+        if row and row[0] == "%R":
+            if formatter is not None:
+                row = formatter(row)
+        elif row and row[0] == "%F":
+            formatter = RowFormatter(row[1:])
+        yield row
 
 
-def writeXER(r: Any, filename: str) -> None:
+def writeXER(
+    r: Any,
+    filename: str,
+    buffer_size: int = 1 << 20,
+    records: Mapping[str, list[Any]] | None = None,
+) -> None:
     """
     Write parsed data back to an XER file.
 
@@ -23,6 +188,11 @@ def writeXER(r: Any, filename: str) -> None:
         The Reader object containing the parsed XER data
     filename : str
         Path to the output XER file
+    buffer_size : int, optional
+        Size of the write buffer in bytes, by default 1 MiB
+    records : Mapping[str, list[Any]], optional
+        The records to write by table instead of every record of the Reader,
+        such as a project selected by ``xer_parser.extract.ProjectIndex``
 
     Returns
     -------
@@ -32,7 +202,13 @@ def writeXER(r: Any, filename: str) -> None:
     -----
     The order of tables written to the XER file is important and follows Primavera P6's
     requirements for dependencies between tables. The function adds appropriate headers
-    and format indicators for the XER file format.
+    and format indicators for the XER file format. Rows are streamed from the
+    collections, so no table is built in memory.
+
+    If the Reader was created with ``track_changes``, the header and the
+    table headers of its file and every record not changed since it was read
+    are copied from the file byte for byte, and only the other records are
+    formatted. The file can then be written over itself.
 
     Examples
     --------
@@ -42,44 +218,184 @@ def writeXER(r: Any, filename: str) -> None:
     >>> # Make modifications to the data
     >>> writeXER(xer, "output.xer")
     """
-    header = [
-        "ERMHDR",
-        "8.0",
-        "2021-11-02",
-        "Project",
-        "admin",
-        "Primavera",
-        "Admin",
-        "dbxDatabaseNoName",
-        "Project Management",
-        "U.K.",
-    ]
-    with open(filename, "w", newline="", encoding="utf-8") as output:
-        tsv_writer = csv.writer(output, delimiter="\t")
-        tsv_writer.writerow(header)
-        tsv_writer.writerows(r.currencies.get_tsv())
-        tsv_writer.writerows(r.fintmpls.get_tsv())
-        tsv_writer.writerows(r.nonworks.get_tsv())
-        tsv_writer.writerows(r.obss.get_tsv())
-        tsv_writer.writerows(r.pcattypes.get_tsv())
-        tsv_writer.writerows(r.resourcecurves.get_tsv())
-        tsv_writer.writerows(r.udftypes.get_tsv())
-        tsv_writer.writerows(r.accounts.get_tsv())
-        tsv_writer.writerows(r.pcatvals.get_tsv())
-        tsv_writer.writerows(r.projects.get_tsv())
-        tsv_writer.writerows(r.calendars.get_tsv())
-        tsv_writer.writerows(r.projpcats.get_tsv())
-        tsv_writer.writerows(r.scheduleoptions.get_tsv())
-        tsv_writer.writerows(r.wbss.get_tsv())
-        tsv_writer.writerows(r.resources.get_tsv())
-        tsv_writer.writerows(r.acttypes.get_tsv())
-        tsv_writer.writerows(r.resourcerates.get_tsv())
-        tsv_writer.writerows(r.activities.get_tsv())
-        tsv_writer.writerows(r.actvcodes.get_tsv())
-        # PROJCOST
-        tsv_writer.writerows(r.relations.get_tsv())
-        tsv_writer.writerows(r.taskprocs.get_tsv())
-        tsv_writer.writerows(r.activityresources.get_tsv())
-        tsv_writer.writerows(r.activitycodes.get_tsv())
-        tsv_writer.writerows(r.udfvalues.get_tsv())
-        tsv_writer.writerow(["%E"])
+    spans = getattr(r, "spans", None)
+    if spans is not None and not spans.unchanged():
+        logger.warning("%s changed since it was read, writing every record", spans.path)
+        spans = None
+    if spans is None:
+        with open(filename, "wb", buffering=buffer_size) as output:
+            write_rows(output, iter_rows(r, records))
+        return
+    if os.path.exists(filename) and os.path.samefile(filename, spans.path):
+        # the rows are copied from the file, write next to it and replace it
+        fd, path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)))
+        try:
+            with os.fdopen(fd, "wb", buffering=buffer_size) as output:
+                _write_tracked(r, spans, output, records)
+            shutil.copymode(filename, path)
+            os.replace(path, filename)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return
+    with open(filename, "wb", buffering=buffer_size) as output:
+        _write_tracked(r, spans, output, records)
+
+
+def _write_tracked(
+    r: Any,
+    spans: SourceSpans,
+    output: BinaryIO,
+    records: Mapping[str, list[Any]] | None = None,
+) -> None:
+    """
+    Write a Reader with tracked changes, copying its unchanged rows.
+
+    Parameters
+    ----------
+    r : Reader
+        The Reader object, created with ``track_changes``
+    spans : SourceSpans
+        The byte spans of its file
+    output : BinaryIO
+        The file to write
+    records : Mapping[str, list[Any]], optional
+        The records to write by table, by default every record
+
+    Returns
+    -------
+    None
+    """
+    with open(spans.path, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        buffer = None
+        if size:
+            buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer if buffer is not None else b"")
+        try:
+            writer = _SpanWriter(output, view)
+            if spans.header is None:
+                writer.write(_HEADER)
+            else:
+                writer.copy(spans.header)
+            for table, collection, name in XER_TABLES:
+                collection = getattr(r, collection)
+                if records is None:
+                    rows = getattr(collection, name)
+                else:
+                    rows = records.get(table)
+                if not rows:
+                    continue
+                header = spans.tables.get(table)
+                if header is None:
+                    for row in islice(collection.iter_tsv(), 2):
+                        writer.write(row)
+                else:
+                    writer.copy(header)
+                formatter = layout = None
+                for record in rows:
+                    span = source_span(record, spans)
+                    if span is not None:
+                        writer.copy(span)
+                        continue
+                    if formatter is None:
+                        if header is None:
+                            fields = next(islice(collection.iter_tsv(), 1, 2))[1:]
+                        else:
+                            # rows follow the fields of the source table
+                            fields = spans.fields[table]
+                            layout = _layout(collection, fields)
+                        formatter = RowFormatter(fields)
+                    row = record.get_tsv()
+                    if layout is not None:
+                        row = writer.project(
+                            row, layout, source_span(record, spans, clean=False)
+                        )
+                    writer.write(formatter(row))
+            if spans.end is None:
+                writer.write(["%E"])
+            else:
+                writer.copy(spans.end)
+            writer.flush()
+        finally:
+            view.release()
+            if buffer is not None:
+                buffer.close()
+
+
+def _layout(collection: Any, fields: list[str]) -> list[int | None]:
+    """
+    Map the fields of a source table to the fields written for it.
+
+    Parameters
+    ----------
+    collection : Any
+        The collection of the table
+    fields : list[str]
+        Field names of the table in the source file
+
+    Returns
+    -------
+    list[int or None]
+        For every source field, its position in the rows of the records
+        (``get_tsv``), None if the records do not have it
+    """
+    names = next(islice(collection.iter_tsv(), 1, 2))
+    positions = {name: i for i, name in enumerate(names) if i}
+    return [positions.get(name) for name in fields]
+
+
+class _SpanWriter:
+    """
+    Writes rows and copies of byte spans of the source file, joining
+    adjacent spans into one copy.
+
+    Parameters
+    ----------
+    output : BinaryIO
+        The file to write
+    source : memoryview
+        The contents of the source file
+    """
+
+    def __init__(self, output: BinaryIO, source: memoryview) -> None:
+        self.output = output
+        self.source = source
+        self.start = self.end = -1
+        self.line = io.StringIO()
+        self.csv = csv.writer(self.line, delimiter="\t")
+
+    def copy(self, span: tuple[int, int]) -> None:
+        if span[0] != self.end:
+            self.flush()
+            self.start = span[0]
+        self.end = span[1]
+
+    def write(self, row: list[Any]) -> None:
+        self.flush()
+        self.line.seek(0)
+        self.line.truncate()
+        self.csv.writerow(row)
+        self.output.write(self.line.getvalue().encode("utf-8"))
+
+    def project(
+        self, row: list[Any], layout: list[int | None], span: tuple[int, int] | None
+    ) -> list[Any]:
+        # fields the records do not have are kept from the source row
+        source = []
+        if span is not None:
+            text = bytes(self.source[span[0] : span[1]])
+            text = text.decode("utf-8", errors="ignore")
+            source = next(csv.reader(io.StringIO(text, newline=""), delimiter="\t"), [])
+        projected = [row[0]]
+        for i, position in enumerate(layout, 1):
+            if position is not None:
+                projected.append(row[position])
+            else:
+                projected.append(source[i] if i < len(source) else None)
+        return projected
+
+    def flush(self) -> None:
+        if self.end > self.start:
+            self.output.write(self.source[self.start : self.end])
+        self.start = self.end = -1
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from xer_parser.model.classes.calendar import Calendar
+from xer_parser.scheduling.calendar import (
+    WorkCalendar,
+    get_calendar,
+    parse_clndr_data,
+    to_minutes,
+)
+
+# Monday to Friday 08:00-12:00 and 13:00-17:00, Saturday 00:00-24:00.
+# 2024-01-03 (serial 45294) is a holiday and 2024-01-04 (45295) works 10-14.
+CLNDR_DATA = (
+    "(0||CalendarData()(  (0||DaysOfWeek()(  (0||1()())"
+    + "".join(
+        f"(0||{day}()( (0||0(s|08:00|f|12:00)()) (0||1(f|17:00|s|13:00)())))"
+        for day in range(2, 7)
+    )
+    + "(0||7()((0||0(s|00:00|f|00:00)())))))"
+    + "(0||VIEW(ShowTotal|Y)())"
+    + "(0||Exceptions()( (0||0(d|45294)())"
+    + " (0||1(d|45295)((0||0(s|10:00|f|14:00)())))))"
+)
+
+
+def make_calendar(**params):
+    fields = {"clndr_id": "7", "clndr_data": CLNDR_DATA, "day_hr_cnt": "8"}
+    fields.update(params)
+    return Calendar({k: v for k, v in fields.items() if v is not None})
+
+
+def test_parse_clndr_data():
+    week, exceptions = parse_clndr_data(CLNDR_DATA)
+    assert week[1] == ()
+    assert week[2] == ((480, 720), (780, 1020))
+    assert week[7] == ((0, 1440),)
+    assert exceptions == {45294: (), 45295: ((600, 840),)}
+
+
+def test_work_hours_arithmetic():
+    cal = WorkCalendar(make_calendar())
+    monday = datetime(2024, 1, 1, 8)
+    assert cal.add_work_hours(monday, 8) == datetime(2024, 1, 1, 17)
+    assert cal.add_work_hours(monday, 10) == datetime(2024, 1, 2, 10)
+    # Wednesday is a holiday and Thursday only works 10:00-14:00
+    assert cal.add_work_hours(datetime(2024, 1, 2, 17), 4) == datetime(2024, 1, 4, 14)
+    assert cal.add_work_hours(datetime(2024, 1, 4, 14), 8) == datetime(2024, 1, 5, 17)
+    assert cal.add_work_hours(datetime(2024, 1, 4, 10), -1) == datetime(2024, 1, 2, 16)
+    assert cal.work_hours_between(monday, datetime(2024, 1, 8, 8)) == 8 + 8 + 4 + 8 + 24
+    assert cal.work_hours_between(datetime(2024, 1, 2), monday) == -8
+    assert cal.next_working_time(datetime(2024, 1, 1, 12, 30)) == datetime(
+        2024, 1, 1, 13
+    )
+    assert cal.next_working_time(datetime(2024, 1, 3, 9)) == datetime(2024, 1, 4, 10)
+    assert cal.is_working_time(datetime(2024, 1, 6, 23))
+    assert not cal.is_working_time(datetime(2024, 1, 7, 9))
+
+
+def test_finish_and_start_bias():
+    cal = WorkCalendar(make_calendar())
+    noon = to_minutes(datetime(2024, 1, 1, 12))
+    assert cal.to_finish(noon + 30) == noon
+    assert cal.to_start(noon) == to_minutes(datetime(2024, 1, 1, 13))
+    start = to_minutes(datetime(2024, 1, 1, 8))
+    assert cal.add_work_minutes(start, 240) == noon
+
+
+def test_dates_outside_the_compiled_range():
+    cal = WorkCalendar(make_calendar())
+    before = cal.cumulative(to_minutes(datetime(2024, 1, 1, 8)))
+    far = datetime(2150, 1, 1)
+    assert cal.add_work_hours(far, 8) == datetime(2150, 1, 1, 17)
+    assert cal.add_work_hours(datetime(1960, 1, 4, 8), 8) == datetime(1960, 1, 4, 17)
+    assert cal.cumulative(to_minutes(datetime(2024, 1, 1, 8))) == before
+
+
+def test_default_pattern_and_cache():
+    cal = get_calendar(make_calendar(clndr_id="8", clndr_data=None, day_hr_cnt="10"))
+    assert cal.add_work_hours(datetime(2024, 1, 5, 8), 12) == datetime(2024, 1, 8, 10)
+    assert get_calendar(make_calendar()) is get_calendar(make_calendar())
+    assert get_calendar(None).add_work_hours(datetime(2024, 1, 1, 8), 8) == datetime(
+        2024, 1, 1, 16
+    )
+
+
+def test_calendar_cache_is_bounded():
+    from xer_parser.scheduling import calendar
+
+    first = get_calendar(make_calendar(clndr_id="900", clndr_data=None))
+    for i in range(calendar._CACHE_SIZE):
+        get_calendar(make_calendar(clndr_id=str(1000 + i), clndr_data=None))
+    assert len(calendar._cache) == calendar._CACHE_SIZE
+    assert get_calendar(make_calendar(clndr_id="900", clndr_data=None)) is not first
@@ -25,3 +25,287 @@ Unit tests for the DCMA14 module in the xer_parser package.
 #     except ZeroDivisionError:
 #         # Skip test if there are no activities resulting in division by zero
 #         pytest.skip("Skipping missing logic test due to no activities in sample file")
+
+from types import SimpleNamespace
+
+from test_scheduling import build_programme, sample_network
+
+from xer_parser.dcma14 import DCMA14
+
+
+def test_critical_path_test_and_cpli():
+    programme = build_programme(
+        [{"task_id": i, "target_drtn_hr_cnt": 8} for i in (1, 2, 3)],
+        [(1, 2, "PR_FS", 0), (2, 3, "PR_FS", 0)],
+    )
+    dcma = DCMA14(programme)
+    finish = dict(dcma.scheduler().project_finish)
+    test = dcma.critical_path_test()
+    assert test["passed"]
+    assert test["activity"]["id"] == "A1"
+    assert test["slip"] == 600
+    # the schedule is restored afterwards
+    assert dcma.scheduler().project_finish == finish
+    assert dcma.cpli()["cpli"] == 1.0
+
+    programme.projects.projects[0].plan_end_date = "2024-01-02 16:00"
+    cpli = DCMA14(programme).cpli()
+    assert cpli["projects"][1] == {"length": 3.0, "float": -1.0, "cpli": 2 / 3}
+    assert not cpli["passed"]
+
+
+def test_critical_path_days_follow_the_calendar():
+    programme = build_programme(
+        [{"task_id": i, "target_drtn_hr_cnt": 10} for i in (1, 2, 3)],
+        [(1, 2, "PR_FS", 0), (2, 3, "PR_FS", 0)],
+    )
+    for task in programme.activities:
+        task.calendar = SimpleNamespace(clndr_id=10, day_hr_cnt=10)
+    dcma = DCMA14(programme)
+    test = dcma.critical_path_test(delay=5)
+    assert test["passed"]
+    assert test["slip"] == 5
+    assert dcma.cpli()["projects"][1]["length"] == 3.0
+
+
+def test_critical_path_test_fails_on_broken_path():
+    # activity 1 only drives the finish through a start-to-start link
+    assert not DCMA14(sample_network()).critical_path_test()["passed"]
+
+
+def test_risk_analysis():
+    risk = DCMA14(sample_network()).risk_analysis(iterations=200, workers=0)
+    assert risk["p80_finish"] >= risk["p50_finish"]
+    critical = {
+        x["activity"]["id"] for x in risk["activities"] if x["criticality"] == 1
+    }
+    assert {"A1", "A4"} <= critical
+
+
+def test_analysis_checks():
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 16},
+            {"task_id": 2, "target_drtn_hr_cnt": 8, "cstr_type": "CS_MANDFIN"},
+            {"task_id": 3, "target_drtn_hr_cnt": 8, "total_float_hr_cnt": -8},
+            {
+                "task_id": 4,
+                "target_drtn_hr_cnt": 8,
+                "act_start_date": "2024-01-03 08:00",
+                "total_float_hr_cnt": 40,
+            },
+        ],
+        [(1, 2, "PR_FS", 16), (1, 3, "PR_SS", -8), (2, 3, "PR_FF", 0)],
+    )
+    analysis = DCMA14(programme).analysis()["analysis"]
+    assert analysis["summary"] == {"activity_cnt": 4, "relationship_cnt": 3}
+    assert [x["id"] for x in analysis["successors"]["activities"]] == ["A3", "A4"]
+    assert [x["id"] for x in analysis["predecessors"]["activities"]] == ["A1", "A4"]
+    assert analysis["lags"]["relations"][0]["lag"] == 2
+    assert analysis["leads"]["cnt"] == 1
+    assert analysis["relations"]["fs_cnt"] == 1
+    assert analysis["relations"]["pct"] == 1 / 3
+    assert [x["id"] for x in analysis["constraints"]["cstrs"]] == ["A2"]
+    assert [x["id"] for x in analysis["totalfloat"]["activities"]] == ["A4"]
+    assert [x["id"] for x in analysis["negativefloat"]["activities"]] == ["A3"]
+    assert [x["id"] for x in analysis["duration"]["activities"]] == ["A1"]
+    assert [x["id"] for x in analysis["invaliddates"]["actual_start"]] == ["A4"]
+    # the programme has no assignments at all
+    assert analysis["resources"]["cnt"] == 4
+
+    # an assignment of a role alone does not resource an activity
+    from xer_parser.model.activityresources import ActivityResources
+
+    programme.activityresources = ActivityResources()
+    programme.activityresources.add(
+        {"taskrsrc_id": "1", "task_id": "1", "rsrc_id": "7"}, None
+    )
+    programme.activityresources.add(
+        {"taskrsrc_id": "2", "task_id": "2", "role_id": "3"}, None
+    )
+    analysis = DCMA14(programme).analysis()["analysis"]
+    assert analysis["resources"]["cnt"] == 3
+    assert "A2" in [x["id"] for x in analysis["resources"]["activities"]]
+
+
+def test_grouped_analysis():
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 16, "wbs_id": 11},
+            {"task_id": 2, "target_drtn_hr_cnt": 8, "wbs_id": 12},
+            {"task_id": 3, "target_drtn_hr_cnt": 8, "wbs_id": 12, "proj_id": 2},
+        ],
+        [(1, 2, "PR_FS", 16), (2, 3, "PR_SS", 0)],
+    )
+    programme.projects.add({"proj_id": "2"}, None)
+    programme.wbss = SimpleNamespace(
+        wbss=[
+            SimpleNamespace(wbs_id=10, parent_wbs_id=None),
+            SimpleNamespace(wbs_id=11, parent_wbs_id=10),
+            SimpleNamespace(wbs_id=12, parent_wbs_id=10),
+        ]
+    )
+    programme.acttypes = SimpleNamespace(
+        acttypes=[SimpleNamespace(actv_code_type_id=5, actv_code_type="Phase")]
+    )
+    programme.actvcodes = SimpleNamespace(
+        activitycodes=[SimpleNamespace(actv_code_id=50, short_name="DES")]
+    )
+    programme.activitycodes = SimpleNamespace(
+        taskactvs=[SimpleNamespace(task_id=1, actv_code_type_id="5", actv_code_id=50)]
+    )
+    dcma = DCMA14(programme, group_by=["project", "wbs", "Phase"])
+    groups = dcma.analysis()["groups"]
+    assert groups["project"][1]["summary"] == {"activity_cnt": 2, "relationship_cnt": 1}
+    assert groups["project"][1]["lags"] == {"cnt": 1, "pct": 1.0}
+    assert groups["project"][1]["predecessors"] == {"cnt": 1, "pct": 0.5}
+    assert groups["project"][2]["successors"]["cnt"] == 1
+    assert groups["wbs"][10]["summary"]["activity_cnt"] == 3
+    assert groups["wbs"][12]["relations"] == {"cnt": 1, "pct": 0.5}
+    assert groups["Phase"]["DES"]["duration"]["cnt"] == 1
+    assert groups["Phase"][None]["summary"]["activity_cnt"] == 2
+    # project 2 has no data date: its dates are not checked unless given one
+    assert "2" not in dcma._data_dates()
+    assert DCMA14(programme, data_date="2024-01-01 08:00")._data_dates()["2"]
+
+
+def _write_xer(path, lag):
+    rows = [
+        "ERMHDR\t19.12",
+        "%T\tPROJECT",
+        "%F\tproj_id\tproj_short_name\tlast_recalc_date",
+        "%R\t1\tP1\t2024-01-01 08:00",
+        "%T\tUDFVALUE",
+        "%F\tudf_type_id\tfk_id\tudf_text",
+        "%R\t1\t1\tskipped",
+        "%T\tTASK",
+        "%F\ttask_id\tproj_id\ttask_code\ttask_type\ttarget_drtn_hr_cnt",
+        "%R\t1\t1\tA1\tTT_Task\t8",
+        "%R\t2\t1\tA2\tTT_Task\t16",
+        "%T\tTASKPRED",
+        "%F\ttask_pred_id\ttask_id\tpred_task_id\tpred_type\tlag_hr_cnt",
+        f"%R\t1\t2\t1\tPR_FS\t{lag}",
+        "%E",
+    ]
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_batch_trend_table(tmp_path):
+    import csv
+    import json
+
+    from xer_parser.dcma14 import run_batch
+
+    paths = [
+        _write_xer(tmp_path / "jan.xer", 0),
+        _write_xer(tmp_path / "feb.xer", 16),
+        str(tmp_path / "missing.xer"),
+    ]
+    output = str(tmp_path / "trend.csv")
+    assert run_batch(paths, output, workers=0) == 2 * 12
+    with open(output, newline="") as stream:
+        rows = list(csv.DictReader(stream))
+    lags = {x["file"]: x for x in rows if x["metric"] == "lags"}
+    assert lags["jan.xer"]["count"] == "0"
+    assert lags["feb.xer"] == {
+        "file": "feb.xer",
+        "project": "P1",
+        "data_date": "2024-01-01 08:00",
+        "metric": "lags",
+        "count": "1",
+        "pct": "1.0",
+    }
+
+    output = str(tmp_path / "trend.jsonl")
+    assert run_batch(paths[:2], output, workers=2, schedule=True) == 2 * 14
+    with open(output) as stream:
+        records = [json.loads(x) for x in stream]
+    assert {x["file"] for x in records} == {"jan.xer", "feb.xer"}
+    assert {x["metric"] for x in records} >= {"cpli", "critical_path_test"}
+
+
+def test_rule_engine():
+    from xer_parser.dcma14.rules import RULES, RuleEngine, rule
+    from xer_parser.model.activityresources import ActivityResources
+
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 8, "status_code": "TK_Complete"},
+            {"task_id": 2, "target_drtn_hr_cnt": 16, "total_float_hr_cnt": -8},
+            {"task_id": 3, "target_drtn_hr_cnt": 8},
+        ],
+        [(1, 2, "PR_FS", 0), (1, 3, "PR_SS", 16)],
+    )
+    programme.activityresources = ActivityResources()
+    programme.activityresources.add({"task_id": "1", "rsrc_id": "7"}, None)
+    programme.activityresources.add({"task_id": "2", "role_id": "3"}, None)
+
+    @rule("three_links", needs=("successors",))
+    def three_links(snapshot):
+        return [k for k, v in snapshot["successors"].items() if len(v) >= 2]
+
+    try:
+        engine = RuleEngine(programme)
+        results = engine.run()
+        assert results["missing_predecessors"]["ids"] == [1]
+        assert results["missing_successors"]["ids"] == [2, 3]
+        assert results["negative_float"]["ids"] == [2]
+        assert results["high_duration"]["ids"] == [2]
+        assert results["lags"]["ids"] == ["2"]
+        assert results["long_ss_lags"] == {
+            "subject": "relation",
+            "ids": ["2"],
+            "cnt": 1,
+            "pct": 0.5,
+            "seconds": results["long_ss_lags"]["seconds"],
+        }
+        assert results["missing_actual_dates"]["ids"] == [1]
+        assert results["no_resources"]["ids"] == [2, 3]
+        assert results["three_links"]["ids"] == [1]
+        # every index is built once, and every rule is timed
+        assert set(engine.timings["indexes"]) >= {"successors", "predecessors"}
+        assert set(engine.timings["rules"]) == set(RULES)
+
+        parallel = RuleEngine(programme, ["three_links", "lags"]).run(workers=2)
+        assert parallel["three_links"]["ids"] == [1]
+        assert parallel["lags"]["ids"] == ["2"]
+    finally:
+        del RULES["three_links"]
+
+
+def test_compact_analysis_and_findings():
+    import io
+    import json
+
+    programme = sample_network(A3={"cstr_type": "CS_MANDFIN"})
+    findings = io.StringIO()
+    results = DCMA14(programme, schedule=True, compact=True).analysis(findings)
+    analysis = results["analysis"]
+    assert analysis["successors"] == {"cnt": 1, "ids": [4], "pct": 0.25}
+    assert analysis["constraints"]["ids"] == [3]
+    assert analysis["lags"]["ids"] == ["2"]
+    assert analysis["lags"]["predecessors"] == [1]
+    assert analysis["lags"]["successors"] == [3]
+    assert analysis["critical"]["ids"] == [1, 3, 4]
+    assert results["activities"][1] == ("A1", None)
+    assert set(results["activities"]) == {1, 2, 3, 4}
+    json.dumps(results, default=str)
+
+    lines = [json.loads(x) for x in findings.getvalue().splitlines()]
+    assert {
+        "check": "lags",
+        "task_pred_id": "2",
+        "pred_task_id": 1,
+        "task_id": 3,
+        "pred_type": "PR_SS",
+        "lag_hr_cnt": 8.0,
+    } in lines
+    assert {
+        "check": "constraints",
+        "task_id": 3,
+        "task_code": "A3",
+        "task_name": None,
+    } in lines
+    checks = ("lags", "successors", "predecessors", "duration", "resources")
+    assert len(lines) == 1 + sum(analysis[x]["cnt"] for x in checks)
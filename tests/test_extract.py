@@ -0,0 +1,147 @@
+import pytest
+
+from xer_parser.extract import ProjectIndex
+from xer_parser.reader import Reader
+
+# PROJWBS fields WBS expects
+WBS_FIELDS = [
+    "seq_num", "est_wt", "proj_node_flag", "sum_data_flag", "status_code",
+    "wbs_name", "phase_id", "parent_wbs_id", "ev_user_pct", "ev_etc_user_value",
+    "orig_cost", "indep_remain_total_cost", "ann_dscnt_rate_pct",
+    "dscnt_period_type", "indep_remain_work_qty", "anticip_start_date",
+    "anticip_end_date", "ev_compute_type", "ev_etc_compute_type", "guid",
+    "tmpl_guid", "plan_open_state",
+]  # fmt: skip
+
+
+def write_portfolio(path):
+    blank = [""] * len(WBS_FIELDS)
+    tables = {
+        "CURRTYPE": (
+            ["curr_id", "curr_short_name", "curr_type", "group_digit_cnt"],
+            [["1", "USD", "Dollar", "3"], ["2", "EUR", "Euro", "3"]],
+        ),
+        "OBS": (
+            ["obs_id", "parent_obs_id", "obs_name"],
+            [["4", "", "Company"], ["5", "4", "Site"], ["6", "4", "Office"]],
+        ),
+        "PROJECT": (
+            ["proj_id", "proj_short_name", "clndr_id"],
+            [["1", "P1", "10"], ["2", "P2", "11"]],
+        ),
+        "CALENDAR": (
+            ["clndr_id", "clndr_name", "proj_id", "base_clndr_id"],
+            [
+                ["9", "Base", "", ""],
+                ["10", "Global", "", "9"],
+                ["11", "Other", "", ""],
+                ["12", "P1 own", "1", ""],
+            ],
+        ),
+        "PROJWBS": (
+            ["wbs_id", "proj_id", "wbs_short_name", "obs_id", *WBS_FIELDS],
+            [["100", "1", "W1", "5", *blank], ["200", "2", "W2", "", *blank]],
+        ),
+        "RSRC": (
+            ["rsrc_id", "parent_rsrc_id", "clndr_id", "rsrc_short_name", "curr_id"],
+            [
+                ["50", "", "11", "CREWS", "2"],
+                ["51", "50", "", "CREW", ""],
+                ["52", "", "", "X", "1"],
+            ],
+        ),
+        "ACTVTYPE": (
+            ["actv_code_type_id", "actv_code_type", "proj_id"],
+            [["7", "Phase", ""], ["8", "Area", ""]],
+        ),
+        "TASK": (
+            ["task_id", "proj_id", "wbs_id", "clndr_id", "task_code"],
+            [
+                ["1000", "1", "100", "10", "A1"],
+                ["1001", "1", "100", "12", "A2"],
+                ["2000", "2", "200", "11", "B1"],
+            ],
+        ),
+        "ACTVCODE": (
+            ["actv_code_id", "actv_code_type_id", "short_name"],
+            [["70", "7", "DES"], ["71", "7", "CON"], ["80", "8", "N"]],
+        ),
+        "TASKPRED": (
+            ["task_pred_id", "task_id", "pred_task_id", "proj_id", "pred_type"],
+            [
+                ["1", "1001", "1000", "1", "PR_FS"],
+                ["2", "1000", "2000", "1", "PR_FS"],
+                ["3", "2000", "1001", "2", "PR_FS"],
+            ],
+        ),
+        "TASKRSRC": (
+            ["taskrsrc_id", "task_id", "proj_id", "rsrc_id"],
+            [["1", "1000", "1", "51"], ["2", "2000", "2", "52"]],
+        ),
+        "TASKACTV": (
+            ["task_id", "actv_code_type_id", "actv_code_id", "proj_id"],
+            [["1000", "7", "71", "1"], ["2000", "8", "80", "2"]],
+        ),
+    }
+    lines = ["ERMHDR\t19.12"]
+    for table, (fields, rows) in tables.items():
+        lines.append(f"%T\t{table}")
+        lines.append("\t".join(["%F", *fields]))
+        lines.extend("\t".join(["%R", *row]) for row in rows)
+    lines.append("%E")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def read_ids(path):
+    ids, table = {}, None
+    for line in path.read_text().splitlines():
+        row = line.split("\t")
+        if row[0] == "%T":
+            table = row[1]
+            ids[table] = []
+        elif row[0] == "%R":
+            ids[table].append(row[1])
+    return ids
+
+
+@pytest.mark.parametrize("track_changes", [False, True])
+def test_extract_project(tmp_path, track_changes):
+    source = tmp_path / "portfolio.xer"
+    write_portfolio(source)
+    xer = Reader(str(source), track_changes=track_changes)
+
+    output = tmp_path / "p1.xer"
+    xer.extract_project(1, str(output))
+    assert read_ids(output) == {
+        "CURRTYPE": ["2"],
+        "OBS": ["4", "5"],
+        "PROJECT": ["1"],
+        "CALENDAR": ["9", "10", "11", "12"],
+        "PROJWBS": ["100"],
+        "RSRC": ["50", "51"],
+        "ACTVTYPE": ["7"],
+        "TASK": ["1000", "1001"],
+        "ACTVCODE": ["70", "71"],
+        "TASKPRED": ["1"],
+        "TASKRSRC": ["1"],
+        "TASKACTV": ["1000"],
+    }
+    assert output.read_text().splitlines()[-1] == "%E"
+
+    xer.extract_project("2", str(output))
+    assert read_ids(output)["RSRC"] == ["52"]
+    assert read_ids(output)["CALENDAR"] == ["11"]
+    with pytest.raises(ValueError):
+        xer.extract_project(3, str(output))
+
+
+def test_project_index_is_stale_after_adding_records(tmp_path):
+    source = tmp_path / "portfolio.xer"
+    write_portfolio(source)
+    xer = Reader(str(source))
+    index = ProjectIndex(xer)
+    assert not index.stale()
+    xer.activities.add({"task_id": "1002", "proj_id": "1"}, xer._data)
+    assert index.stale()
+    tasks = ProjectIndex(xer).select(1)["TASK"]
+    assert [x.task_id for x in tasks] == [1000, 1001, 1002]
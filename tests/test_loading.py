@@ -0,0 +1,270 @@
+from datetime import datetime
+
+import pytest
+from test_scheduling import build_programme
+
+from xer_parser.model.activityresources import ActivityResources
+from xer_parser.model.rsrccurves import ResourceCurves
+from xer_parser.scheduling.loading import ResourceLoading
+
+
+def loaded_programme(*assignments, curves=()):
+    # one activity over 7 working days, Monday 2024-01-01 to Tuesday 2024-01-09
+    programme = build_programme(
+        [
+            {
+                "task_id": 1,
+                "target_drtn_hr_cnt": 56,
+                "target_start_date": "2024-01-01 08:00",
+                "target_end_date": "2024-01-09 16:00",
+            }
+        ],
+        [],
+    )
+    programme.activityresources = ActivityResources()
+    for n, fields in enumerate(assignments, 1):
+        params = {"taskrsrc_id": str(n), "task_id": "1", "rsrc_id": "7"}
+        params.update(fields)
+        programme.activityresources.add(params, None)
+    programme.resourcecurves = ResourceCurves()
+    for params in curves:
+        programme.resourcecurves.add(params)
+    return programme
+
+
+def test_even_spread_follows_the_calendar():
+    loading = ResourceLoading(loaded_programme({"target_qty": "56"}))
+    assignment = loading.programme.activityresources.assignments[0]
+    daily = loading.spread(assignment, "target")
+    assert len(daily) == 7
+    assert list(daily.values()) == pytest.approx([8.0] * 7)
+    assert datetime(2024, 1, 6) not in daily
+    assert loading.spread(assignment, "target", "week") == {
+        datetime(2024, 1, 1): pytest.approx(40),
+        datetime(2024, 1, 8): pytest.approx(16),
+    }
+    assert loading.spread(assignment, "target", "month") == {datetime(2024, 1, 1): 56.0}
+    assert loading.spread(assignment, "actual") == {}
+    with pytest.raises(ValueError):
+        loading.spread(assignment, "target", "fortnight")
+
+
+def test_curves_and_histograms():
+    points = {f"pct_usage_{i}": str(20 - i) for i in range(21)}
+    programme = loaded_programme(
+        {"target_qty": "56", "curv_id": "3", "role_id": "5"},
+        {"target_qty": "14", "rsrc_id": "8", "role_id": "5"},
+        curves=[{"curv_id": "3", "curv_name": "Front loaded", **points}],
+    )
+    loading = ResourceLoading(programme)
+    by_resource = loading.histogram(quantity="target")
+    front = list(by_resource[7].values())
+    assert front == sorted(front, reverse=True)
+    assert sum(front) == pytest.approx(56)
+    assert sum(by_resource[8].values()) == pytest.approx(14)
+
+    by_role = loading.histogram(by="role", quantity="target", period="week")
+    assert list(by_role) == [5]
+    assert sum(by_role[5].values()) == pytest.approx(70)
+
+    by_task = loading.histogram(
+        by=lambda x: x.task_id, quantity="target", period="month"
+    )
+    assert by_task == {1: {datetime(2024, 1, 1): pytest.approx(70)}}
+
+
+def test_overallocation_sweep():
+    from xer_parser.model.rsrcrates import ResourceRates
+    from xer_parser.scheduling.overallocation import find_overallocations
+
+    programme = loaded_programme(
+        {"remain_qty_per_hr": "1", "restart_date": "2024-01-01 08:00",
+         "reend_date": "2024-01-02 16:00"},
+        {"remain_qty_per_hr": "1", "restart_date": "2024-01-02 08:00",
+         "reend_date": "2024-01-03 16:00"},
+        {"remain_qty": "8", "rsrc_id": "8", "restart_date": "2024-01-02 08:00",
+         "reend_date": "2024-01-02 16:00"},
+    )  # fmt: skip
+    programme.resourcerates = ResourceRates()
+    for rsrc_id, limit, start in (("7", "1", None), ("7", "0.5", "2024-01-03 00:00"),
+                                  ("8", "1", None)):  # fmt: skip
+        programme.resourcerates.add(
+            {"rsrc_id": rsrc_id, "max_qty_per_hr": limit, "start_date": start}
+        )
+    found = find_overallocations(programme)
+    assert list(found) == [7]
+    assert found[7]["peak"] == 2
+    assert found[7]["peak_date"] == datetime(2024, 1, 2, 8)
+    assert [
+        (x["start"], x["end"], x["peak"], x["limit"]) for x in found[7]["intervals"]
+    ] == [
+        (datetime(2024, 1, 2, 8), datetime(2024, 1, 2, 16), 2.0, 1.0),
+        (datetime(2024, 1, 3), datetime(2024, 1, 3, 16), 1.0, 0.5),
+    ]
+
+
+def test_resource_leveling():
+    from xer_parser.model.classes.schedoption import SchedOption
+    from xer_parser.model.rsrcrates import ResourceRates
+    from xer_parser.scheduling.leveling import ResourceLeveler
+
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 16, "priority_type": "PT_Low"},
+            {"task_id": 2, "target_drtn_hr_cnt": 16, "priority_type": "PT_High"},
+            {"task_id": 3, "target_drtn_hr_cnt": 8},
+            {"task_id": 4, "target_drtn_hr_cnt": 32},
+        ],
+        [(1, 3, "PR_FS", 0)],
+    )
+    programme.activityresources = ActivityResources()
+    for task_id in (1, 2):
+        programme.activityresources.add(
+            {"taskrsrc_id": str(task_id), "task_id": str(task_id), "rsrc_id": "7",
+             "remain_qty": "16"}, None
+        )  # fmt: skip
+    programme.resourcerates = ResourceRates()
+    programme.resourcerates.add({"rsrc_id": "7", "max_qty_per_hr": "1"})
+    options = SchedOption({"level_all_rsrc_flag": "Y"})
+
+    leveler = ResourceLeveler(programme, options=options)
+    dates = leveler.level()
+    assert dates[2]["start_date"] == datetime(2024, 1, 1, 8)
+    assert dates[1]["start_date"] == datetime(2024, 1, 3, 8)
+    assert dates[1]["delay_hr_cnt"] == 16
+    assert dates[3]["start_date"] == datetime(2024, 1, 5, 8)
+    assert leveler.overallocated == []
+
+    # ties on the early start go to the first priority field
+    leveler = ResourceLeveler(
+        programme, options=options, priorities=[("task_code", False)]
+    )
+    dates = leveler.level()
+    assert dates[2]["start_date"] == datetime(2024, 1, 1, 8)
+    leveler = ResourceLeveler(
+        programme, options=options, priorities=[("task_code", True)]
+    )
+    assert leveler.level()[1]["start_date"] == datetime(2024, 1, 1, 8)
+
+    # activity 1 has 8 hours of float, not enough to wait for activity 2
+    within = SchedOption({"level_all_rsrc_flag": "Y", "level_within_float_flag": "Y"})
+    leveler = ResourceLeveler(programme, options=within)
+    dates = leveler.level()
+    assert dates[1]["start_date"] == datetime(2024, 1, 1, 8)
+    assert leveler.overallocated == [1]
+
+    # doubling the limit, or leveling only flagged resources, removes the delay
+    for params in ({"level_all_rsrc_flag": "Y", "level_over_alloc_pct": "100"}, {}):
+        leveler = ResourceLeveler(programme, options=SchedOption(params))
+        assert leveler.level()[1]["delay_hr_cnt"] == 0
+
+    keep = SchedOption({"level_all_rsrc_flag": "Y", "level_keep_sched_date_flag": "Y"})
+    leveler = ResourceLeveler(programme, options=keep)
+    leveler.level()
+    leveler.apply()
+    task = programme.activities.activities[0]
+    assert task.restart_date == datetime(2024, 1, 3, 8)
+    assert task.early_start_date != task.restart_date
+    assert programme.activityresources.assignments[0].restart_date == "2024-01-03 08:00"
+
+    # the late dates and floats follow the leveled dates
+    leveler = ResourceLeveler(programme, options=options)
+    leveler.level()
+    leveler.apply()
+    task = programme.activities.activities[0]
+    assert task.late_start_date == datetime(2024, 1, 3, 8)
+    assert task.total_float_hr_cnt == 0
+    assert programme.activities.activities[3].total_float_hr_cnt == 8
+
+
+def test_earned_value():
+    from types import SimpleNamespace
+
+    from xer_parser.scheduling.earnedvalue import EarnedValue
+
+    programme = build_programme(
+        [
+            {"task_id": 1, "wbs_id": 11, "target_drtn_hr_cnt": 40, "remain_drtn_hr_cnt": 20,
+             "complete_pct_type": "CP_Phys", "phys_complete_pct": 50,
+             "act_start_date": "2024-01-01 08:00", "target_start_date": "2024-01-01 08:00",
+             "target_end_date": "2024-01-05 16:00"},
+            {"task_id": 2, "wbs_id": 12, "target_drtn_hr_cnt": 40, "complete_pct_type": "CP_Drtn",
+             "target_start_date": "2024-01-08 08:00", "target_end_date": "2024-01-12 16:00"},
+        ],
+        [],
+        data_date="2024-01-08 08:00",
+    )  # fmt: skip
+    programme.activityresources = ActivityResources()
+    for task_id, cost, actual in ((1, "400", "300"), (2, "100", None)):
+        params = {"taskrsrc_id": str(task_id), "task_id": str(task_id), "rsrc_id": "7",
+                  "target_cost": cost, "act_reg_cost": actual}  # fmt: skip
+        programme.activityresources.add({k: v for k, v in params.items() if v}, None)
+    programme.wbss = SimpleNamespace(
+        wbss=[
+            SimpleNamespace(wbs_id=10, parent_wbs_id=None),
+            SimpleNamespace(wbs_id=11, parent_wbs_id=10),
+            SimpleNamespace(wbs_id=12, parent_wbs_id=10),
+        ]
+    )
+
+    ev = EarnedValue(programme)
+    summary = ev.summary()
+    assert set(summary) == {None, 10, 11, 12}
+    top = summary[10]
+    assert (top["bac"], top["pv"], top["ev"], top["ac"]) == (500, 400, 200, 300)
+    assert top["cpi"] == pytest.approx(2 / 3)
+    assert top["spi"] == 0.5
+    assert top["eac"] == pytest.approx(750)
+    assert summary[None] == top
+    assert summary[12]["spi"] is None and summary[12]["cpi"] is None
+
+    assert ev.periods == [datetime(2024, 1, 1), datetime(2024, 1, 8)]
+    curves = ev.series(10)
+    assert curves["pv"] == pytest.approx([400, 500])
+    assert curves["ev"] == [200, 200]
+    assert curves["ac"] == [300, 300]
+    assert curves["spi"] == [0.5, pytest.approx(0.4)]
+    with pytest.raises(KeyError):
+        ev.series(99)
+
+
+def test_reprice_assignments():
+    from xer_parser.model.resources import Resources
+    from xer_parser.model.rolerates import RoleRates
+    from xer_parser.model.rsrcrates import ResourceRates
+    from xer_parser.scheduling.costing import reprice_assignments
+
+    programme = loaded_programme(
+        {"target_qty": "10", "remain_qty": "4", "target_start_date": "2024-01-01 08:00",
+         "restart_date": "2024-03-01 08:00"},
+        {"target_qty": "10", "remain_qty": "10", "role_id": "5",
+         "cost_per_qty_source_type": "ST_Role", "rate_type": "COST_PER_QTY2"},
+        {"target_qty": "10", "cost_per_qty_source_type": "ST_Custom", "cost_per_qty": "3"},
+        {"target_qty": "10", "cost_qty_link_flag": "N"},
+    )  # fmt: skip
+    programme.resourcerates = ResourceRates()
+    programme.resourcerates.add({"rsrc_id": "7", "cost_per_qty": "100"})
+    programme.resourcerates.add(
+        {"rsrc_id": "7", "cost_per_qty": "120", "start_date": "2024-02-01 00:00"}
+    )
+    programme.rolerates = RoleRates()
+    programme.rolerates.add({"role_id": "5", "cost_per_qty": "1", "cost_per_qty2": "2"})
+
+    costs = reprice_assignments(programme)
+    assert costs == {
+        1: {"cost_per_qty": 120, "target_cost": 1000, "remain_cost": 480},
+        2: {"cost_per_qty": 2, "target_cost": 20, "remain_cost": 20},
+        3: {"cost_per_qty": 3, "target_cost": 30, "remain_cost": 0},
+    }
+    assert programme.activityresources.assignments[0].target_cost is None
+
+    # applying the prices drops the cached resource rollup
+    programme.resources = Resources()
+    programme.resources.add({"rsrc_id": "7"})
+    programme.resources.rollup(programme.activityresources.assignments)
+    scenario = ResourceRates()
+    scenario.add({"rsrc_id": "7", "cost_per_qty": "150"})
+    costs = reprice_assignments(programme, resourcerates=scenario, apply=True)
+    assert costs[1]["remain_cost"] == 600
+    assert programme.activityresources.assignments[0].target_cost == 1500
+    assert programme.resources.get_rollup(7) is None
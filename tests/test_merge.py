@@ -0,0 +1,137 @@
+import csv
+
+from xer_parser.merge import XERMerger, merge_xer
+
+
+def write_xer(path, tables):
+    lines = ["ERMHDR\t19.12"]
+    for table, (fields, rows) in tables.items():
+        lines.append(f"%T\t{table}")
+        lines.append("\t".join(["%F", *fields]))
+        lines.extend("\t".join(["%R", *row]) for row in rows)
+    lines.append("%E")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def contractor(path, name, rsrc_id, task_name):
+    write_xer(
+        path,
+        {
+            "CURRTYPE": (["curr_id", "curr_short_name"], [["1", "USD"]]),
+            "UDFTYPE": (
+                ["udf_type_id", "table_name", "udf_type_name"],
+                [["3", "TASK", "user_text1"]],
+            ),
+            "PROJECT": (["proj_id", "proj_short_name", "clndr_id"], [["1", name, "1"]]),
+            "CALENDAR": (
+                ["clndr_id", "clndr_type", "clndr_name", "proj_id"],
+                [["1", "CA_Base", "Standard", ""], ["2", "CA_Project", name, "1"]],
+            ),
+            "PROJWBS": (["wbs_id", "proj_id", "parent_wbs_id"], [["10", "1", ""]]),
+            "RSRC": (
+                ["rsrc_id", "rsrc_short_name", "clndr_id", "curr_id"],
+                [[rsrc_id, "CREW", "1", "1"], ["7", f"{name} ONLY", "2", "1"]],
+            ),
+            "RSRCRATE": (["rsrc_rate_id", "rsrc_id"], [["1", rsrc_id]]),
+            "TASK": (
+                ["task_id", "proj_id", "wbs_id", "clndr_id", "task_name"],
+                [["100", "1", "10", "2", task_name], ["101", "1", "10", "1", "Finish"]],
+            ),
+            "TASKPRED": (
+                ["task_pred_id", "task_id", "pred_task_id", "proj_id", "pred_proj_id"],
+                [["1", "101", "100", "1", "1"]],
+            ),
+            "TASKRSRC": (
+                ["taskrsrc_id", "task_id", "proj_id", "rsrc_id"],
+                [["1", "100", "1", rsrc_id]],
+            ),
+            "UDFVALUE": (
+                ["udf_type_id", "fk_id", "proj_id", "udf_text"],
+                [["3", "100", "1", task_name]],
+            ),
+        },
+    )
+
+
+def read_tables(path):
+    tables, table, fields = {}, None, None
+    with open(path, newline="", encoding="utf-8") as source:
+        for row in csv.reader(source, delimiter="\t"):
+            if row[0] == "%T":
+                table = tables[row[1]] = []
+            elif row[0] == "%F":
+                fields = row[1:]
+            elif row[0] == "%R":
+                table.append(dict(zip(fields, row[1:], strict=True)))
+    return tables
+
+
+def test_merge_renumbers_and_shares(tmp_path):
+    north, south = tmp_path / "north.xer", tmp_path / "south.xer"
+    contractor(north, "NORTH", "5", "Dig")
+    contractor(south, "SOUTH", "6", "Pour, cure")
+    output = tmp_path / "portfolio.xer"
+    merger = merge_xer([str(north), str(south)], str(output))
+    tables = read_tables(output)
+
+    # shared records are written once, with the first file's ID
+    assert [x["curr_id"] for x in tables["CURRTYPE"]] == ["1"]
+    assert [x["rsrc_short_name"] for x in tables["RSRC"]] == [
+        "CREW",
+        "NORTH ONLY",
+        "SOUTH ONLY",
+    ]
+    assert [x["rsrc_id"] for x in tables["RSRCRATE"]] == ["5"]
+    assert merger.is_merged(1, "RSRC", 6) and merger.new_id(1, "RSRC", 6) == "5"
+    calendars = [x["clndr_name"] for x in tables["CALENDAR"]]
+    assert calendars == ["Standard", "NORTH", "SOUTH"]
+
+    # colliding IDs are renumbered, with every reference to them
+    assert [x["proj_id"] for x in tables["PROJECT"]] == ["1", "2"]
+    assert [x["task_id"] for x in tables["TASK"]] == ["100", "101", "102", "103"]
+    south_pour = tables["TASK"][2]
+    assert south_pour == {
+        "task_id": "102",
+        "proj_id": "2",
+        "wbs_id": "11",
+        "clndr_id": "3",
+        "task_name": "Pour, cure",
+    }
+    assert tables["TASKPRED"][1] == {
+        "task_pred_id": "2",
+        "task_id": "103",
+        "pred_task_id": "102",
+        "proj_id": "2",
+        "pred_proj_id": "2",
+    }
+    assert tables["TASKRSRC"][1]["rsrc_id"] == "5"
+    assert tables["UDFVALUE"][1] == {
+        "udf_type_id": "3",
+        "fk_id": "102",
+        "proj_id": "2",
+        "udf_text": "Pour, cure",
+    }
+    assert tables["RSRC"][2]["rsrc_id"] == "8"
+    assert tables["RSRC"][2]["clndr_id"] == "3"
+    assert merger.order == list(tables)
+    assert XERMerger([str(north)]).new_id(0, "TASK", 100) == "100"
+
+
+def test_merge_adds_fields_and_tables(tmp_path):
+    first, second = tmp_path / "a.xer", tmp_path / "b.xer"
+    write_xer(first, {"TASK": (["task_id", "proj_id"], [["1", "1"]])})
+    write_xer(
+        second,
+        {
+            "PROJECT": (["proj_id"], [["1"]]),
+            "TASK": (["task_id", "proj_id", "task_code"], [["1", "1", "B1"]]),
+        },
+    )
+    output = tmp_path / "merged.xer"
+    merger = merge_xer([str(first), str(second)], str(output))
+    assert merger.order == ["PROJECT", "TASK"]
+    tables = read_tables(output)
+    assert tables["TASK"] == [
+        {"task_id": "1", "proj_id": "1", "task_code": ""},
+        {"task_id": "2", "proj_id": "1", "task_code": "B1"},
+    ]
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+from test_scheduling import build_programme, sample_network
+
+from xer_parser.model.udftypes import UDFTypes
+from xer_parser.model.udfvalues import UDFValues
+from xer_parser.scheduling import CPMScheduler, montecarlo
+from xer_parser.scheduling.montecarlo import MonteCarlo
+
+
+def test_fixed_durations_match_the_deterministic_schedule():
+    risk = MonteCarlo(CPMScheduler(sample_network()), default=None).run(50, workers=0)
+    assert risk["deterministic_finish"] == datetime(2024, 1, 4, 16)
+    assert risk["p50_finish"] == risk["p80_finish"] == risk["deterministic_finish"]
+    assert risk["probability_on_time"] == 1.0
+    criticality = {k: v["criticality"] for k, v in risk["activities"].items()}
+    assert criticality == {1: 1.0, 2: 0.0, 3: 1.0, 4: 1.0}
+
+
+def test_uncertain_activity_drives_the_finish(monkeypatch):
+    distributions = {2: ("uniform", 8, 16, 80)}
+    cpm = CPMScheduler(sample_network())
+    risk = MonteCarlo(cpm, distributions, default=None).run(400, seed=3, workers=0)
+    assert risk["p80_finish"] > risk["deterministic_finish"]
+    assert 0.5 < risk["activities"][2]["criticality"] < 1.0
+    assert risk["activities"][2]["sensitivity"] > 0.5
+    assert risk["activities"][3]["sensitivity"] == 0.0
+
+    # chunked and parallel runs give the same results
+    monkeypatch.setattr(montecarlo, "_CHUNK_CELLS", 40)
+    serial = MonteCarlo(cpm, distributions, default=None).run(100, seed=3, workers=0)
+    parallel = MonteCarlo(cpm, distributions, default=None).run(100, seed=3, workers=2)
+    assert serial == parallel
+
+
+def test_distributions_from_udf():
+    udftypes, udfvalues = UDFTypes(), UDFValues()
+    for type_id, label in (("10", "Min Dur"), ("11", "Max Dur")):
+        udftypes.add(
+            {"udf_type_id": type_id, "table_name": "TASK", "udf_type_label": label}
+        )
+    udfvalues.add({"udf_type_id": "10", "fk_id": "2", "udf_number": "4"})
+    udfvalues.add({"udf_type_id": "11", "fk_id": "2", "udf_number": "40"})
+    risk = MonteCarlo.from_udf(
+        CPMScheduler(sample_network()),
+        udfvalues,
+        udftypes,
+        "Min Dur",
+        "Max Dur",
+        shape="pert",
+    )
+    assert risk.distributions == {2: ("pert", 4.0, 8.0, 40.0)}
+    assert risk.run(20, workers=0)["activities"][1]["criticality"] == 1.0
+
+
+def test_late_dates_are_anchored_per_project():
+    # two unrelated chains: the shorter project is critical to its own finish
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 16},
+            {"task_id": 2, "target_drtn_hr_cnt": 40, "proj_id": 2},
+        ],
+        [],
+    )
+    risk = MonteCarlo(CPMScheduler(programme), default=None).run(20, workers=0)
+    criticality = {k: v["criticality"] for k, v in risk["activities"].items()}
+    assert criticality == {1: 1.0, 2: 1.0}
+
+    # a must-finish-by date later than the finish leaves float
+    programme.projects.projects[0].plan_end_date = datetime(2024, 1, 5, 16)
+    risk = MonteCarlo(CPMScheduler(programme), default=None).run(20, workers=0)
+    assert risk["activities"][1]["criticality"] == 0.0
+    assert risk["activities"][2]["criticality"] == 1.0
+
+
+def test_iterations_must_be_positive():
+    with pytest.raises(ValueError):
+        MonteCarlo(CPMScheduler(sample_network())).run(0)
@@ -34,3 +34,35 @@ def test_relations_property(sample_xer):
     relations = sample_xer.relations
     assert relations is not None
     # Add more specific assertions based on your sample.xer content
+
+
+def test_reader_validation(tmp_path):
+    """Test that validating on load reports the circular logic"""
+    path = tmp_path / "loop.xer"
+    path.write_text(
+        "\n".join(
+            [
+                "ERMHDR\t19.12",
+                "%T\tPROJECT",
+                "%F\tproj_id\tproj_short_name",
+                "%R\t1\tP1",
+                "%T\tTASK",
+                "%F\ttask_id\tproj_id\ttask_code",
+                "%R\t10\t1\tA10",
+                "%R\t20\t1\tA20",
+                "%R\t30\t1\tA30",
+                "%T\tTASKPRED",
+                "%F\ttask_pred_id\ttask_id\tpred_task_id\tproj_id\tpred_type",
+                "%R\t1\t20\t10\t1\tPR_FS",
+                "%R\t2\t10\t20\t1\tPR_FS",
+                "%R\t3\t30\t20\t1\tPR_FS",
+                "%E",
+            ]
+        )
+        + "\n"
+    )
+    reader = Reader(str(path), validate=True)
+    assert len(reader.loops) == 1
+    assert reader.loops[0]["activities"] == [10, 20]
+    assert sorted(reader.loops[0]["relations"]) == ["1", "2"]
+    assert Reader(str(path)).loops is None
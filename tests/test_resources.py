@@ -0,0 +1,92 @@
+from xer_parser.model.classes.taskrsrc import TaskRsrc
+from xer_parser.model.resources import Resources
+
+
+def _resources():
+    # 1 -> (2 -> (4, 5), 3); 6 is a separate root
+    resources = Resources()
+    for rsrc_id, parent_id in [(1, None), (2, 1), (3, 1), (4, 2), (5, 2), (6, None)]:
+        resources.add(
+            {
+                "rsrc_id": str(rsrc_id),
+                "parent_rsrc_id": str(parent_id) if parent_id else "",
+                "rsrc_name": f"R{rsrc_id}",
+            }
+        )
+    return resources
+
+
+def test_parent_and_children():
+    resources = _resources()
+    assert resources.get_resource_by_id(4).rsrc_name == "R4"
+    assert resources.get_parent(4).rsrc_id == 2
+    assert resources.get_parent(1) is None
+    assert [x.rsrc_id for x in resources.get_children(1)] == [2, 3]
+
+
+def test_ancestors_and_descendants():
+    resources = _resources()
+    assert [x.rsrc_id for x in resources.get_ancestors(5)] == [2, 1]
+    assert [x.rsrc_id for x in resources.get_descendants(1)] == [2, 4, 5, 3]
+    assert resources.get_descendants(6) == []
+    assert resources.is_ancestor(1, 5)
+    assert not resources.is_ancestor(3, 5)
+    assert not resources.is_ancestor(5, 5)
+
+
+def test_build_tree_keeps_structure():
+    forest = _resources().build_tree()
+    assert [next(iter(x)) for x in forest] == [1, 6]
+    assert [next(iter(x)) for x in forest[0]["children"]] == [2, 3]
+
+
+def test_rollup_over_subtrees():
+    resources = _resources()
+    assignments = [
+        TaskRsrc({"rsrc_id": "4", "target_qty": "10", "target_cost": "100"}),
+        TaskRsrc({"rsrc_id": "5", "target_qty": "5", "act_reg_cost": "20"}),
+        TaskRsrc({"rsrc_id": "3", "target_qty": "1"}),
+        TaskRsrc({"rsrc_id": "99", "target_qty": "1000"}),
+    ]
+    totals = resources.rollup(assignments)
+    assert totals[2]["target_qty"] == 15.0
+    assert totals[1]["target_qty"] == 16.0
+    assert totals[1]["target_cost"] == 100.0
+    assert totals[1]["act_reg_cost"] == 20.0
+    assert totals[6]["target_qty"] == 0.0
+    assert resources.get_rollup(2) is totals[2]
+    resources.invalidate_rollup()
+    assert resources.get_rollup(2) is None
+    resources.rollup(assignments)
+    resources.add({"rsrc_id": "7", "parent_rsrc_id": "6"})
+    assert resources.get_rollup(2) is None
+
+
+def test_rate_timelines():
+    from datetime import datetime
+
+    from xer_parser.model.rolerates import RoleRates
+    from xer_parser.model.rsrcrates import ResourceRates
+
+    rates = ResourceRates()
+    for rate_id, start, price in [("1", "2024-07-01 00:00", "60"), ("2", None, "50"),
+                                  ("3", "2025-01-01 00:00", "70")]:  # fmt: skip
+        rates.add({"rsrc_rate_id": rate_id, "rsrc_id": "4", "cost_per_qty": price,
+                   "cost_per_qty2": "90", "start_date": start})  # fmt: skip
+    assert [x.rsrc_rate_id for x in rates.get_rates(4)] == ["2", "1", "3"]
+    assert rates.get_rate(4, datetime(2024, 3, 1)).rsrc_rate_id == "2"
+    assert rates.cost_per_qty(4, "2024-07-01 00:00") == 60
+    assert rates.cost_per_qty(4, datetime(2030, 1, 1)) == 70
+    assert rates.cost_per_qty(4) == 70
+    assert rates.cost_per_qty(4, level=2) == 90
+    assert rates.cost_per_qty(4, level=3) is None
+    assert rates.get_rate(5) is None
+    assert rates.find_by_id(3).start_date == "2025-01-01 00:00"
+
+    roles = RoleRates()
+    roles.add({"role_rate_id": "1", "role_id": "7", "cost_per_qty": "40"})
+    roles.add({"role_rate_id": "2", "role_id": "8", "cost_per_qty": "45"})
+    assert len(roles) == 2
+    assert roles.find_by_id(2).role_id == 8
+    assert roles.cost_per_qty(7) == 40
+    assert roles.cost_per_qty(9) is None
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from test_scheduling import sample_network
+
+from xer_parser.model.classes.taskpred import TaskPred
+from xer_parser.scenario import Scenario
+from xer_parser.scheduling import CPMScheduler
+
+
+def test_changes_stay_in_the_scenario():
+    base = sample_network()
+    before = CPMScheduler(base).schedule()
+    scenario = Scenario(base, "longer")
+    scenario.set_duration(2, 40)
+    scenario.update_relation("3", lag_hr_cnt=8)
+
+    dates = CPMScheduler(scenario).schedule()
+    assert dates[2]["early_end_date"] == datetime(2024, 1, 9, 16)
+    assert dates[4]["early_end_date"] == datetime(2024, 1, 10, 16)
+    assert CPMScheduler(base).schedule() == before
+    assert base.activities.find_by_id(2).target_drtn_hr_cnt == 8
+    assert scenario.activities.find_by_id(2).target_drtn_hr_cnt == 40
+    assert scenario.projects is not base.projects
+    assert scenario.changes["activities"]["updated"] == {
+        2: {"remain_drtn_hr_cnt": 40, "target_drtn_hr_cnt": 40}
+    }
+
+    # writes from a scheduler land in the scenario too
+    scheduler = CPMScheduler(scenario)
+    scheduler.schedule()
+    scheduler.apply()
+    assert scenario.activities.find_by_id(4).early_end_date == datetime(2024, 1, 10, 16)
+    assert base.activities.find_by_id(4).early_end_date != datetime(2024, 1, 10, 16)
+
+
+def test_added_relations_leave_the_base_unchanged(monkeypatch):
+    # the registry is shared by every programme loaded in the session
+    monkeypatch.setattr(TaskPred, "obj_list", [])
+    base = sample_network()
+    no_successor = [x.task_id for x in base.activities.has_no_successor]
+    no_predecessor = [x.task_id for x in base.activities.has_no_predecessor]
+    scenario = Scenario(base)
+    scenario.add_relation(4, 1)
+    assert [x.task_id for x in base.activities.has_no_successor] == no_successor
+    assert [x.task_id for x in base.activities.has_no_predecessor] == no_predecessor
+    assert 4 in no_successor and 1 in no_predecessor
+
+
+def test_relations_can_be_added_and_removed():
+    base = sample_network()
+    scenario = Scenario(base)
+    scenario.remove_relation("1")
+    relation = scenario.add_relation(3, 2)
+    assert relation.task_pred_id == "5"
+    ids = [x.task_pred_id for x in scenario.relations.relations]
+    assert ids == ["2", "3", "4", "5"]
+    assert len(base.relations.relations) == 4
+    dates = CPMScheduler(scenario).schedule()
+    assert dates[2]["early_start_date"] == datetime(2024, 1, 5, 8)
+
+    branch = scenario.branch("no 3-2")
+    branch.remove_relation("5")
+    assert len(branch.relations) == 3
+    assert len(scenario.relations) == 4
+    assert scenario.changes["relations"]["removed"] == ["1"]
+
+    with pytest.raises(KeyError):
+        scenario.remove_relation("1")
+    with pytest.raises(KeyError):
+        scenario.set_duration(99, 8)
@@ -0,0 +1,269 @@
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from xer_parser.model.classes.data import Data
+from xer_parser.model.predecessors import Predecessors
+from xer_parser.model.projects import Projects
+from xer_parser.model.tasks import Tasks
+from xer_parser.scheduling import CPMScheduler, IncrementalScheduler
+from xer_parser.scheduling.paths import PathTracer
+
+
+def build_programme(tasks, relations, data_date="2024-01-01 08:00"):
+    """Build an in-memory programme; 2024-01-01 is a Monday."""
+    data = Data()
+    data.tasks, data.predecessors, data.projects = Tasks(), Predecessors(), Projects()
+    data.projects.add({"proj_id": "1", "last_recalc_date": data_date}, data)
+    for task in tasks:
+        params = {"proj_id": "1", "task_type": "TT_Task"}
+        params.update({k: str(v) for k, v in task.items()})
+        params.setdefault("task_code", f"A{task['task_id']}")
+        data.tasks.add(params, data)
+    for n, (pred, succ, kind, lag) in enumerate(relations):
+        data.predecessors.add(
+            {
+                "task_pred_id": str(n + 1),
+                "pred_task_id": str(pred),
+                "task_id": str(succ),
+                "pred_type": kind,
+                "lag_hr_cnt": str(lag),
+            }
+        )
+    return SimpleNamespace(
+        activities=data.tasks, relations=data.predecessors, projects=data.projects
+    )
+
+
+def sample_network(**overrides):
+    tasks = {
+        1: {"task_id": 1, "target_drtn_hr_cnt": 16},
+        2: {"task_id": 2, "target_drtn_hr_cnt": 8},
+        3: {"task_id": 3, "target_drtn_hr_cnt": 24},
+        4: {"task_id": 4, "target_drtn_hr_cnt": 0, "task_type": "TT_FinMile"},
+    }
+    for task_id, fields in overrides.items():
+        tasks[int(task_id[1:])].update(fields)
+    relations = [
+        (1, 2, "PR_FS", 0),
+        (1, 3, "PR_SS", 8),
+        (2, 4, "PR_FS", 0),
+        (3, 4, "PR_FS", 0),
+    ]
+    return build_programme(list(tasks.values()), relations)
+
+
+def test_forward_and_backward_pass():
+    dates = CPMScheduler(sample_network()).schedule()
+    assert dates[1]["early_start_date"] == datetime(2024, 1, 1, 8)
+    assert dates[1]["early_end_date"] == datetime(2024, 1, 2, 16)
+    assert dates[2]["early_start_date"] == datetime(2024, 1, 3, 8)
+    assert dates[3]["early_start_date"] == datetime(2024, 1, 2, 8)
+    assert dates[3]["early_end_date"] == datetime(2024, 1, 4, 16)
+    assert dates[4]["early_end_date"] == datetime(2024, 1, 4, 16)
+    assert dates[2]["late_start_date"] == datetime(2024, 1, 4, 8)
+    assert dates[1]["total_float_hr_cnt"] == 0
+    assert dates[2]["total_float_hr_cnt"] == 8
+    assert dates[2]["free_float_hr_cnt"] == 8
+    assert dates[3]["total_float_hr_cnt"] == 0
+
+
+def test_constraints_and_progress():
+    programme = sample_network(
+        t1={"act_start_date": "2024-01-01 08:00", "act_end_date": "2024-01-02 16:00"},
+        t3={"cstr_type": "CS_MSOA", "cstr_date": "2024-01-05 08:00"},
+    )
+    dates = CPMScheduler(programme, data_date=datetime(2024, 1, 3, 8)).schedule()
+    assert dates[1]["early_start_date"] == datetime(2024, 1, 1, 8)
+    assert dates[1]["total_float_hr_cnt"] is None
+    assert dates[2]["early_start_date"] == datetime(2024, 1, 3, 8)
+    assert dates[3]["early_start_date"] == datetime(2024, 1, 5, 8)
+    assert dates[4]["early_end_date"] == datetime(2024, 1, 9, 16)
+
+
+def test_apply_writes_task_fields():
+    programme = sample_network()
+    CPMScheduler(programme).schedule()
+    task = programme.activities.find_by_id(2)
+    assert task.early_start_date is None
+    cpm = CPMScheduler(programme)
+    cpm.schedule()
+    cpm.apply()
+    assert task.early_start_date == datetime(2024, 1, 3, 8)
+    assert task.total_float_hr_cnt == 8
+
+
+def test_circular_logic_is_rejected():
+    programme = build_programme(
+        [
+            {"task_id": 1, "target_drtn_hr_cnt": 8},
+            {"task_id": 2, "target_drtn_hr_cnt": 8},
+        ],
+        [(1, 2, "PR_FS", 0), (2, 1, "PR_FS", 0)],
+    )
+    with pytest.raises(ValueError):
+        CPMScheduler(programme).schedule()
+
+
+def test_incremental_matches_full_schedule():
+    rng = random.Random(7)
+    tasks = [
+        {"task_id": i, "target_drtn_hr_cnt": rng.choice([8, 16, 24, 40])}
+        for i in range(1, 41)
+    ]
+    tasks[5].update(task_type="TT_LOE")
+    tasks[9].update(cstr_type="CS_ALAP")
+    tasks[12].update(cstr_type="CS_MSOA", cstr_date="2024-01-15 08:00")
+    relations = []
+    for succ in range(2, 41):
+        for pred in rng.sample(range(1, succ), min(2, succ - 1)):
+            relations.append((pred, succ, rng.choice(["PR_FS", "PR_SS", "PR_FF"]), 0))
+    relations.append((6, 30, "PR_FS", 0))
+
+    cpm = IncrementalScheduler(build_programme(tasks, relations))
+    previous = cpm.schedule()
+    for step in range(30):
+        task_id = rng.randint(1, 40)
+        if step % 3 == 0:
+            hours = rng.choice([8, 16, 32, 80])
+            tasks[task_id - 1]["remain_drtn_hr_cnt"] = hours
+            cpm.set_duration(task_id, hours)
+        elif step % 3 == 1:
+            pred, succ = sorted(rng.sample(range(1, 41), 2))
+            relations.append((pred, succ, "PR_FS", 8))
+            cpm.add_relationship(pred, succ, "PR_FS", 8)
+        else:
+            pred, succ, _, _ = relations.pop(rng.randrange(len(relations)))
+            cpm.remove_relationship(pred, succ)
+            relations = [x for x in relations if x[:2] != (pred, succ)]
+        affected = cpm.reschedule()
+        expected = CPMScheduler(build_programme(tasks, relations)).schedule()
+        assert cpm.results() == expected
+        assert {k for k in expected if expected[k] != previous[k]} <= affected
+        previous = expected
+
+
+def test_incremental_add_relationship_reorders_and_rejects_loops():
+    cpm = IncrementalScheduler(sample_network())
+    cpm.schedule()
+    with pytest.raises(ValueError):
+        cpm.add_relationship(4, 1)
+    cpm.remove_relationship(1, 3)
+    cpm.add_relationship(3, 1, "PR_FS", 0)
+    affected = cpm.reschedule()
+    assert affected == {1, 2, 3, 4}
+    assert cpm.dates(cpm.network.pos[1])["early_start_date"] == datetime(2024, 1, 4, 8)
+    order = cpm.network.topological_positions()
+    assert order[cpm.network.pos[3]] < order[cpm.network.pos[1]]
+
+
+def test_driving_and_float_paths():
+    tracer = PathTracer(CPMScheduler(sample_network()))
+    assert tracer.longest_path() == [1, 3, 4]
+    assert tracer.driving_path(2) == [1, 2]
+    assert tracer.float_paths() == {1: (1, 1), 3: (1, 2), 4: (1, 3), 2: (2, 1)}
+    assert tracer.float_paths(max_paths=1) == {1: (1, 1), 3: (1, 2), 4: (1, 3)}
+    tracer.apply()
+    task = tracer.network.tasks[tracer.network.pos[2]]
+    path = (task.int_path, task.int_path_order, task.driving_path_flag)
+    assert path == ("2", "1", "N")
+
+
+def test_find_loops():
+    from xer_parser.scheduling.loops import find_loops
+
+    tasks = [{"task_id": i, "target_drtn_hr_cnt": 8} for i in range(1, 8)]
+    relations = [
+        (1, 2, "PR_FS", 0),
+        (2, 3, "PR_FS", 0),
+        (3, 4, "PR_FS", 0),
+        (4, 2, "PR_SS", 0),  # 2 -> 3 -> 4 -> 2
+        (4, 5, "PR_FS", 0),
+        (6, 6, "PR_FS", 0),  # self loop
+        (5, 7, "PR_FS", 0),
+    ]
+    programme = build_programme(tasks, relations)
+    assert find_loops(programme) == [
+        {"activities": [2, 3, 4], "relations": ["2", "3", "4"]},
+        {"activities": [6], "relations": ["6"]},
+    ]
+    assert find_loops(sample_network()) == []
+    with pytest.raises(ValueError, match=r"2 loops.*\[2, 3, 4\]"):
+        CPMScheduler(programme).schedule()
+
+
+def test_reachability():
+    from xer_parser.scheduling.reachability import Reachability
+
+    reach = Reachability(sample_network())
+    assert reach.downstream(1) == {2, 3, 4}
+    assert reach.upstream(4) == {1, 2, 3}
+    assert reach.downstream(4) == set()
+    assert reach.is_ancestor(1, 4) and not reach.is_ancestor(2, 3)
+    with pytest.raises(KeyError):
+        reach.downstream(99)
+
+    # indexed searches agree with plain walks on a random network
+    rng = random.Random(5)
+    tasks = [{"task_id": i, "target_drtn_hr_cnt": 8} for i in range(1, 81)]
+    relations = {
+        (a, b, "PR_FS", 0)
+        for a, b in (sorted(rng.sample(range(1, 81), 2)) for _ in range(120))
+    }
+    programme = build_programme(tasks, sorted(relations))
+    plain = Reachability(programme)
+    indexed = Reachability(programme)
+    indexed.build_index(labels=3)
+    for a in range(1, 81):
+        downstream = plain.downstream(a)
+        for b in range(1, 81):
+            assert indexed.is_ancestor(a, b) == (b in downstream)
+
+    # the caches follow edits of the network
+    indexed.network.add_relation(indexed.network.pos[4], indexed.network.pos[1])
+    assert plain.is_ancestor(4, 1) is False
+    assert indexed.is_ancestor(4, 1) and 1 in indexed.downstream(4)
+
+
+def test_find_out_of_sequence():
+    from xer_parser.scheduling.sequence import find_out_of_sequence
+
+    programme = sample_network(
+        A1={"act_start_date": "2024-01-01 08:00", "act_end_date": "2024-01-02 16:00"},
+        # starts before 1 finishes, and less than 8 hours after 1 starts
+        A2={"act_start_date": "2024-01-02 08:00"},
+        A3={"act_start_date": "2024-01-01 12:00"},
+        # finished before 2 and 3
+        A4={"act_start_date": "2024-01-03 08:00", "act_end_date": "2024-01-03 08:00"},
+    )
+    found = find_out_of_sequence(programme)
+    assert [(x["task_pred_id"], x["violation"], x["early_hr"]) for x in found] == [
+        ("1", "early", 8.0),
+        ("2", "early", 4.0),
+        ("3", "open", None),
+        ("4", "open", None),
+    ]
+    assert found[1]["pred_type"] == "PR_SS"
+    assert found[1]["lag_hr_cnt"] == 8.0
+    # prebuilt activities and relationships are used as given
+    tasks = {x.task_id: x for x in programme.activities.activities}
+    relations = programme.relations.relations[2:]
+    found = find_out_of_sequence(programme, tasks, relations)
+    assert [x["task_pred_id"] for x in found] == ["3", "4"]
+    assert find_out_of_sequence(sample_network()) == []
+
+    # earlier only by the night between two working days
+    programme = build_programme(
+        [
+            {
+                "task_id": 1,
+                "act_start_date": "2024-01-01 08:00",
+                "act_end_date": "2024-01-03 08:00",
+            },
+            {"task_id": 2, "act_start_date": "2024-01-02 16:00"},
+        ],
+        [(1, 2, "PR_FS", 0)],
+    )
+    assert find_out_of_sequence(programme) == []
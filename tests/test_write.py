@@ -37,3 +37,124 @@ def test_reader_write_method(sample_xer, fixtures_dir):
 
     # Clean up the test file
     os.remove(output_file)
+
+
+def test_streamed_rows_match_csv_writer(tmp_path):
+    import csv
+    import io
+    import types
+
+    from xer_parser.write import XER_TABLES, _formatted, iter_rows
+
+    source = tmp_path / "source.xer"
+    source.write_text(
+        "\n".join(
+            [
+                "ERMHDR\t19.12",
+                "%T\tPROJECT",
+                "%F\tproj_id\tproj_short_name\tlast_recalc_date",
+                "%R\t1\tP1\t2024-01-01 08:00",
+                "%T\tTASK",
+                "%F\ttask_id\tproj_id\ttask_code\ttask_name\ttarget_drtn_hr_cnt",
+                '%R\t1\t1\tA1\t"Pour" slab\t8',
+                "%R\t2\t1\tA2\tCure, strip\t16",
+                "%E",
+            ]
+        )
+        + "\n"
+    )
+    xer = Reader(str(source))
+    xer.activities.find_by_id(2).task_name = "Cure\tstrip"
+    assert isinstance(xer.activities.iter_tsv(), types.GeneratorType)
+
+    output = tmp_path / "output.xer"
+    writeXER(xer, str(output))
+    expected = io.StringIO(newline="")
+    writer = csv.writer(expected, delimiter="\t")
+    for _, name, _ in XER_TABLES:
+        writer.writerows(_formatted(getattr(xer, name).get_tsv()))
+    lines = output.read_bytes().decode("utf-8").split("\r\n")
+    assert lines[1:-2] == expected.getvalue().split("\r\n")[:-1]
+    task = lines[lines.index("%T\tTASK") + 3]
+    assert '\t"Cure\tstrip"\t' in task and "\t16\t" in task and ".0" not in task
+    assert "\t2024-01-01 08:00\t" in lines[lines.index("%T\tPROJECT") + 2]
+    assert list(iter_rows(xer))[-1] == ["%E"]
+
+
+def test_tracked_write_copies_unchanged_rows(tmp_path):
+    import copy
+
+    from xer_parser.tracking import is_dirty
+
+    rows = [
+        "ERMHDR\t19.12\t2024-01-01",
+        "%T\tPROJECT",
+        "%F\tproj_id\tproj_short_name\tlast_recalc_date",
+        "%R\t1\tP1\t2024-01-01 08:00",
+        "%T\tTASK",
+        "%F\ttask_id\tproj_id\ttask_code\ttask_name\ttarget_drtn_hr_cnt\tcustom_field",
+        "%R\t1\t1\tA1\tPour\t8\tkept",
+        "%R\t2\t1\tA2\tCure\t16\talso kept",
+        "%T\tTASKPRED",
+        "%F\ttask_pred_id\ttask_id\tpred_task_id\tpred_type\tlag_hr_cnt",
+        "%R\t1\t2\t1\tPR_FS\t0",
+        "%E",
+    ]
+    source = tmp_path / "source.xer"
+    source.write_bytes("\r\n".join(rows).encode() + b"\r\n")
+    xer = Reader(str(source), track_changes=True)
+    output = tmp_path / "output.xer"
+
+    xer.write(str(output))
+    assert output.read_bytes() == source.read_bytes()
+
+    task = xer.activities.find_by_id(2)
+    assert not is_dirty(task)
+    task.task_name = "Cure slab"
+    assert is_dirty(task)
+    assert is_dirty(copy.copy(xer.activities.find_by_id(1)))
+    xer.relations.add(
+        {
+            "task_pred_id": "2",
+            "task_id": "1",
+            "pred_task_id": "2",
+            "pred_type": "PR_SS",
+            "lag_hr_cnt": "0",
+        }
+    )
+    xer.write(str(source))
+    lines = source.read_bytes().decode().split("\r\n")
+    # the changed record keeps the layout and the unknown field of its row
+    assert lines[:7] == rows[:7]
+    assert lines[7] == "%R\t2\t1\tA2\tCure slab\t16\talso kept"
+    assert lines[10:12] == ["%R\t1\t2\t1\tPR_FS\t0", "%R\t2\t1\t2\tPR_SS\t0"]
+    assert lines[12] == "%E"
+
+
+def test_formatters():
+    from datetime import datetime
+
+    from xer_parser.formatting import (
+        RowFormatter,
+        format_date,
+        format_flag,
+        format_number,
+    )
+
+    date = datetime(2024, 1, 2, 7, 5)
+    assert format_date(date) == "2024-01-02 07:05"
+    assert format_date(date) is format_date(datetime(2024, 1, 2, 7, 5))
+    assert [format_number(x) for x in (8.0, 0.25, 1e-05, 3, None)] == [
+        "8",
+        "0.25",
+        "0.00001",
+        3,
+        None,
+    ]
+    assert (format_flag(True), format_flag(False), format_flag("Y")) == ("Y", "N", "Y")
+
+    formatter = RowFormatter(["task_id", "target_drtn_hr_cnt", "act_start_date"])
+    row = ["%R", 1, 8.0, date]
+    assert formatter(row) == ["%R", 1, "8", "2024-01-02 07:05"]
+    assert row[2] == 8.0
+    assert formatter(["%R", 1, None]) == ["%R", 1, None]